@@ -4,6 +4,8 @@ import os
 import shutil
 import base64
 import redis
+import threading
+import time
 
 from datetime import datetime
 from pathlib import Path
@@ -222,10 +224,27 @@ class PersistentConfig(Generic[T]):
 
 
 class AppConfig:
+    """
+    Attribute access to the registered PersistentConfig values.
+
+    Reads are served from the local values. With Redis configured, writes are
+    also stored in Redis, bump a shared version counter and are announced on a
+    pub/sub channel; a background listener applies other nodes' writes locally
+    and falls back to a full resync whenever it sees it missed a version
+    (e.g. after a reconnect).
+    """
+
     _redis: Union[redis.Redis, redis.cluster.RedisCluster] = None
     _redis_key_prefix: str
 
     _state: dict[str, PersistentConfig]
+    # Version of the shared config this node last synced to
+    _version: int
+    # Keys whose Redis value hasn't been loaded yet
+    _unsynced: set[str]
+
+    # Seconds between version checks while no updates arrive
+    _version_check_interval = 30
 
     def __init__(
         self,
@@ -234,6 +253,11 @@ class AppConfig:
         redis_cluster: Optional[bool] = False,
         redis_key_prefix: str = "open-webui",
     ):
+        super().__setattr__("_state", {})
+        super().__setattr__("_version", 0)
+        super().__setattr__("_unsynced", set())
+        super().__setattr__("_sync_lock", threading.Lock())
+
         if redis_url:
             super().__setattr__("_redis_key_prefix", redis_key_prefix)
             super().__setattr__(
@@ -245,43 +269,131 @@ class AppConfig:
                     decode_responses=True,
                 ),
             )
+            threading.Thread(
+                target=self._listen, name="app-config-listener", daemon=True
+            ).start()
 
-        super().__setattr__("_state", {})
+    def _redis_key(self, key: str) -> str:
+        return f"{self._redis_key_prefix}:config:{key}"
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self._redis_key_prefix}:config:version"
+
+    @property
+    def _channel(self) -> str:
+        return f"{self._redis_key_prefix}:config:updates"
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
             self._state[key] = value
+            if self._redis:
+                self._unsynced.add(key)
         else:
             self._state[key].value = value
             self._state[key].save()
 
             if self._redis:
-                redis_key = f"{self._redis_key_prefix}:config:{key}"
-                self._redis.set(redis_key, json.dumps(self._state[key].value))
+                pipe = self._redis.pipeline(transaction=False)
+                pipe.set(self._redis_key(key), json.dumps(self._state[key].value))
+                pipe.incr(self._version_key)
+                _, version = pipe.execute()
+                self._redis.publish(
+                    self._channel, json.dumps({"key": key, "version": version})
+                )
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"{self._redis_key_prefix}:config:{key}"
-            redis_value = self._redis.get(redis_key)
-
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
-
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
-
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+        if self._unsynced:
+            # Picks up values written by other nodes before this one started,
+            # one round-trip for every key registered since the last read
+            self._sync(list(self._unsynced))
 
         return self._state[key].value
 
+    def _apply(self, key: str, redis_value: Optional[str]):
+        if redis_value is None:
+            return
+        try:
+            decoded_value = json.loads(redis_value)
+
+            # Update the in-memory value if different
+            if self._state[key].value != decoded_value:
+                self._state[key].value = decoded_value
+                log.info(f"Updated {key} from Redis: {decoded_value}")
+
+        except json.JSONDecodeError:
+            log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+    def _sync(self, keys: list[str]):
+        with self._sync_lock:
+            if not keys:
+                return
+            try:
+                version = self._redis.get(self._version_key)
+                if len(keys) == 1:
+                    values = [self._redis.get(self._redis_key(keys[0]))]
+                else:
+                    # Single-key GETs rather than MGET, which a cluster
+                    # rejects across hash slots
+                    pipe = self._redis.pipeline(transaction=False)
+                    for key in keys:
+                        pipe.get(self._redis_key(key))
+                    values = pipe.execute()
+            except redis.exceptions.RedisError as e:
+                # Don't retry on every read; the listener resyncs once Redis
+                # is reachable and its version is ahead of ours
+                log.error(f"Failed to sync config from Redis: {e}")
+                self._unsynced.difference_update(keys)
+                return
+
+            for key, redis_value in zip(keys, values):
+                self._apply(key, redis_value)
+                self._unsynced.discard(key)
+
+            if version is not None:
+                super().__setattr__("_version", max(self._version, int(version)))
+
+    def _check_version(self):
+        version = self._redis.get(self._version_key)
+        if version is not None and int(version) > self._version:
+            log.info(f"Config version {version} is ahead of {self._version}, resyncing")
+            self._sync(list(self._state.keys()))
+
+    def _on_message(self, data: str):
+        update = json.loads(data)
+        key, version = update.get("key"), int(update.get("version", 0))
+
+        if version == self._version + 1 and key in self._state:
+            with self._sync_lock:
+                self._apply(key, self._redis.get(self._redis_key(key)))
+                super().__setattr__("_version", version)
+        elif version > self._version:
+            # Missed at least one update
+            self._sync(list(self._state.keys()))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                # Anything published while we weren't subscribed
+                self._check_version()
+
+                last_check = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._on_message(message["data"])
+                    elif time.monotonic() - last_check > self._version_check_interval:
+                        self._check_version()
+                        last_check = time.monotonic()
+            except Exception as e:
+                log.warning(f"Config update listener disconnected: {e}")
+                time.sleep(5)
+
 
 ####################################
 # WEBUI_AUTH (Required for security)
@@ -914,6 +1026,29 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Local copies of files kept by the cloud storage providers, in MB; least
+# recently used files are removed from CACHE_DIR/storage beyond this size, and
+# 0 downloads files to UPLOAD_DIR on every use as before
+try:
+    STORAGE_CACHE_MAX_SIZE = int(os.environ.get("STORAGE_CACHE_MAX_SIZE", "2048"))
+except ValueError:
+    STORAGE_CACHE_MAX_SIZE = 2048
+
+# Part size, in MB, for multipart uploads and ranged downloads
+try:
+    STORAGE_TRANSFER_CHUNK_SIZE = max(
+        5, int(os.environ.get("STORAGE_TRANSFER_CHUNK_SIZE", "8"))
+    )
+except ValueError:
+    STORAGE_TRANSFER_CHUNK_SIZE = 8
+
+try:
+    STORAGE_TRANSFER_CONCURRENCY = max(
+        1, int(os.environ.get("STORAGE_TRANSFER_CONCURRENCY", "4"))
+    )
+except ValueError:
+    STORAGE_TRANSFER_CONCURRENCY = 4
+
 ####################################
 # File Upload DIR
 ####################################
@@ -998,6 +1133,39 @@ OLLAMA_API_CONFIGS = PersistentConfig(
     {},
 )
 
+# Routing across OLLAMA_BASE_URLS when a model is served by several of them:
+#   least_outstanding  fewest in-flight requests, then lowest recent latency
+#   sticky             least_outstanding, but a chat stays on the node that served it
+#   random             uniform choice, ignoring load
+OLLAMA_ROUTING_POLICY = os.environ.get(
+    "OLLAMA_ROUTING_POLICY", "least_outstanding"
+).lower()
+if OLLAMA_ROUTING_POLICY not in ("least_outstanding", "sticky", "random"):
+    OLLAMA_ROUTING_POLICY = "least_outstanding"
+
+# Consecutive failures after which a node is skipped for OLLAMA_ROUTING_EJECT_SECONDS
+try:
+    OLLAMA_ROUTING_EJECT_FAILURES = int(
+        os.environ.get("OLLAMA_ROUTING_EJECT_FAILURES", "3")
+    )
+except ValueError:
+    OLLAMA_ROUTING_EJECT_FAILURES = 3
+
+try:
+    OLLAMA_ROUTING_EJECT_SECONDS = float(
+        os.environ.get("OLLAMA_ROUTING_EJECT_SECONDS", "30")
+    )
+except ValueError:
+    OLLAMA_ROUTING_EJECT_SECONDS = 30.0
+
+# How often each node's loaded models (/api/ps) are refreshed
+try:
+    OLLAMA_ROUTING_PS_INTERVAL = float(
+        os.environ.get("OLLAMA_ROUTING_PS_INTERVAL", "10")
+    )
+except ValueError:
+    OLLAMA_ROUTING_PS_INTERVAL = 10.0
+
 ####################################
 # OPENAI_API
 ####################################
@@ -1060,6 +1228,33 @@ except Exception:
     pass
 OPENAI_API_BASE_URL = "https://api.openai.com/v1"
 
+# Failover across OPENAI_API_BASE_URLS that serve the same model id
+# (utils/openai_routing.py). Endpoints are picked by the "weight" in their
+# OPENAI_API_CONFIGS entry (default 1); weight 0 marks a fallback that is only
+# used when the others are unavailable.
+try:
+    OPENAI_API_MAX_ATTEMPTS = max(
+        1, int(os.environ.get("OPENAI_API_MAX_ATTEMPTS", "3"))
+    )
+except ValueError:
+    OPENAI_API_MAX_ATTEMPTS = 3
+
+# Consecutive failures (connection errors, timeouts, 429 and 5xx) that open an
+# endpoint's circuit, and how long it stays open before a trial request
+try:
+    OPENAI_API_CIRCUIT_BREAKER_FAILURES = int(
+        os.environ.get("OPENAI_API_CIRCUIT_BREAKER_FAILURES", "5")
+    )
+except ValueError:
+    OPENAI_API_CIRCUIT_BREAKER_FAILURES = 5
+
+try:
+    OPENAI_API_CIRCUIT_BREAKER_COOLDOWN = float(
+        os.environ.get("OPENAI_API_CIRCUIT_BREAKER_COOLDOWN", "30")
+    )
+except ValueError:
+    OPENAI_API_CIRCUIT_BREAKER_COOLDOWN = 30.0
+
 
 ####################################
 # MODELS
@@ -1973,6 +2168,30 @@ CODE_INTERPRETER_BLOCKED_MODULES = [
     if library.strip()
 ]
 
+# Idle Jupyter kernels kept started, so code runs without waiting for one
+try:
+    CODE_INTERPRETER_JUPYTER_WARM_KERNELS = max(
+        0, int(os.environ.get("CODE_INTERPRETER_JUPYTER_WARM_KERNELS", "1"))
+    )
+except ValueError:
+    CODE_INTERPRETER_JUPYTER_WARM_KERNELS = 1
+
+# Kernels started on a Jupyter server at once, warm ones included
+try:
+    CODE_INTERPRETER_JUPYTER_MAX_KERNELS = max(
+        1, int(os.environ.get("CODE_INTERPRETER_JUPYTER_MAX_KERNELS", "8"))
+    )
+except ValueError:
+    CODE_INTERPRETER_JUPYTER_MAX_KERNELS = 8
+
+# Seconds a chat's kernel is kept, with its state, after the chat last ran code
+try:
+    CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TIMEOUT = max(
+        1, int(os.environ.get("CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TIMEOUT", "600"))
+    )
+except ValueError:
+    CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TIMEOUT = 600
+
 DEFAULT_CODE_INTERPRETER_PROMPT = """
 #### Tools Available
 
@@ -2132,6 +2351,47 @@ else:
     except Exception:
         PGVECTOR_POOL_RECYCLE = 3600
 
+# ANN index used for the vector column: "hnsw" or "ivfflat"
+PGVECTOR_INDEX_METHOD = os.environ.get("PGVECTOR_INDEX_METHOD", "hnsw").lower()
+if PGVECTOR_INDEX_METHOD not in ["hnsw", "ivfflat"]:
+    PGVECTOR_INDEX_METHOD = "hnsw"
+
+try:
+    PGVECTOR_HNSW_M = int(os.environ.get("PGVECTOR_HNSW_M", "16"))
+except Exception:
+    PGVECTOR_HNSW_M = 16
+
+try:
+    PGVECTOR_HNSW_EF_CONSTRUCTION = int(
+        os.environ.get("PGVECTOR_HNSW_EF_CONSTRUCTION", "64")
+    )
+except Exception:
+    PGVECTOR_HNSW_EF_CONSTRUCTION = 64
+
+# Size of the candidate list per query, raised to the query's top-k if lower
+try:
+    PGVECTOR_HNSW_EF_SEARCH = int(os.environ.get("PGVECTOR_HNSW_EF_SEARCH", "40"))
+except Exception:
+    PGVECTOR_HNSW_EF_SEARCH = 40
+
+# pgvector >= 0.8: "off", "relaxed_order" or "strict_order". Keeps scanning the
+# index until enough rows pass the collection filter. Ignored on older servers.
+PGVECTOR_HNSW_ITERATIVE_SCAN = os.environ.get(
+    "PGVECTOR_HNSW_ITERATIVE_SCAN", "relaxed_order"
+).lower()
+if PGVECTOR_HNSW_ITERATIVE_SCAN not in ["off", "relaxed_order", "strict_order"]:
+    PGVECTOR_HNSW_ITERATIVE_SCAN = "relaxed_order"
+
+try:
+    PGVECTOR_IVFFLAT_LISTS = int(os.environ.get("PGVECTOR_IVFFLAT_LISTS", "100"))
+except Exception:
+    PGVECTOR_IVFFLAT_LISTS = 100
+
+try:
+    PGVECTOR_IVFFLAT_PROBES = int(os.environ.get("PGVECTOR_IVFFLAT_PROBES", "1"))
+except Exception:
+    PGVECTOR_IVFFLAT_PROBES = 1
+
 # Pinecone
 PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", None)
 PINECONE_ENVIRONMENT = os.environ.get("PINECONE_ENVIRONMENT", None)
@@ -2171,6 +2431,74 @@ log.info(f"VECTOR_DB: {VECTOR_DB}")
 S3_VECTOR_BUCKET_NAME = os.environ.get("S3_VECTOR_BUCKET_NAME", None)
 S3_VECTOR_REGION = os.environ.get("S3_VECTOR_REGION", None)
 
+# Embedded (in-process, on-disk ANN index)
+EMBEDDED_VECTOR_DB_PATH = os.environ.get(
+    "EMBEDDED_VECTOR_DB_PATH", f"{DATA_DIR}/embedded_vector_db"
+)
+
+# "none" stores float32 vectors, "int8" quantises them to a quarter of the size
+EMBEDDED_VECTOR_QUANTIZATION = os.environ.get(
+    "EMBEDDED_VECTOR_QUANTIZATION", "none"
+).lower()
+if EMBEDDED_VECTOR_QUANTIZATION not in ["none", "int8"]:
+    EMBEDDED_VECTOR_QUANTIZATION = "none"
+
+try:
+    EMBEDDED_VECTOR_SEGMENT_ROWS = int(
+        os.environ.get("EMBEDDED_VECTOR_SEGMENT_ROWS", "16384")
+    )
+except Exception:
+    EMBEDDED_VECTOR_SEGMENT_ROWS = 16384
+
+try:
+    EMBEDDED_VECTOR_HNSW_M = int(os.environ.get("EMBEDDED_VECTOR_HNSW_M", "16"))
+except Exception:
+    EMBEDDED_VECTOR_HNSW_M = 16
+
+try:
+    EMBEDDED_VECTOR_HNSW_EF_CONSTRUCTION = int(
+        os.environ.get("EMBEDDED_VECTOR_HNSW_EF_CONSTRUCTION", "100")
+    )
+except Exception:
+    EMBEDDED_VECTOR_HNSW_EF_CONSTRUCTION = 100
+
+try:
+    EMBEDDED_VECTOR_HNSW_EF_SEARCH = int(
+        os.environ.get("EMBEDDED_VECTOR_HNSW_EF_SEARCH", "64")
+    )
+except Exception:
+    EMBEDDED_VECTOR_HNSW_EF_SEARCH = 64
+
+# Collections smaller than this are searched exactly, without a graph
+try:
+    EMBEDDED_VECTOR_HNSW_MIN_ROWS = int(
+        os.environ.get("EMBEDDED_VECTOR_HNSW_MIN_ROWS", "10000")
+    )
+except Exception:
+    EMBEDDED_VECTOR_HNSW_MIN_ROWS = 10000
+
+# Fraction of deleted or superseded rows that triggers a compaction
+try:
+    EMBEDDED_VECTOR_COMPACTION_RATIO = float(
+        os.environ.get("EMBEDDED_VECTOR_COMPACTION_RATIO", "0.3")
+    )
+except Exception:
+    EMBEDDED_VECTOR_COMPACTION_RATIO = 0.3
+
+try:
+    EMBEDDED_VECTOR_MAINTENANCE_INTERVAL = int(
+        os.environ.get("EMBEDDED_VECTOR_MAINTENANCE_INTERVAL", "60")
+    )
+except Exception:
+    EMBEDDED_VECTOR_MAINTENANCE_INTERVAL = 60
+
+# Whether the app's own processes compact collections and build their graphs
+# (one of them at a time). Turn off to run the maintenance in its own process
+# instead, with `python -m open_webui.retrieval.vector.dbs.embedded`.
+ENABLE_EMBEDDED_VECTOR_MAINTENANCE = (
+    os.environ.get("ENABLE_EMBEDDED_VECTOR_MAINTENANCE", "True").lower() == "true"
+)
+
 ####################################
 # Information Retrieval (RAG)
 ####################################
@@ -2570,6 +2898,35 @@ PDF_EXTRACT_IMAGES = PersistentConfig(
     os.environ.get("PDF_EXTRACT_IMAGES", "False").lower() == "true",
 )
 
+PDF_PARALLEL_EXTRACTION = PersistentConfig(
+    "PDF_PARALLEL_EXTRACTION",
+    "rag.pdf_parallel_extraction",
+    os.environ.get("PDF_PARALLEL_EXTRACTION", "False").lower() == "true",
+)
+
+# Process pool limits for page-parallel PDF extraction
+try:
+    PDF_PARALLEL_EXTRACTION_MAX_WORKERS = max(
+        1, int(os.environ.get("PDF_PARALLEL_EXTRACTION_MAX_WORKERS", "4"))
+    )
+except ValueError:
+    PDF_PARALLEL_EXTRACTION_MAX_WORKERS = 4
+
+try:
+    PDF_PARALLEL_EXTRACTION_PAGES_PER_TASK = max(
+        1, int(os.environ.get("PDF_PARALLEL_EXTRACTION_PAGES_PER_TASK", "8"))
+    )
+except ValueError:
+    PDF_PARALLEL_EXTRACTION_PAGES_PER_TASK = 8
+
+try:
+    # Address-space limit per worker process in MB, 0 disables the limit
+    PDF_PARALLEL_EXTRACTION_WORKER_MAX_MEMORY_MB = int(
+        os.environ.get("PDF_PARALLEL_EXTRACTION_WORKER_MAX_MEMORY_MB", "0")
+    )
+except ValueError:
+    PDF_PARALLEL_EXTRACTION_WORKER_MAX_MEMORY_MB = 0
+
 RAG_EMBEDDING_MODEL = PersistentConfig(
     "RAG_EMBEDDING_MODEL",
     "rag.embedding_model",
@@ -2595,6 +2952,28 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+# Files extracted and split at once by the batch ingestion pipeline
+try:
+    RAG_INGEST_WORKERS = max(1, int(os.environ.get("RAG_INGEST_WORKERS", "4")))
+except ValueError:
+    RAG_INGEST_WORKERS = 4
+
+# Embedding batches in flight at once during batch ingestion
+try:
+    RAG_INGEST_EMBEDDING_CONCURRENCY = max(
+        1, int(os.environ.get("RAG_INGEST_EMBEDDING_CONCURRENCY", "2"))
+    )
+except ValueError:
+    RAG_INGEST_EMBEDDING_CONCURRENCY = 2
+
+# Chunks written to a collection per vector DB insert during batch ingestion
+try:
+    RAG_INGEST_INSERT_BATCH_SIZE = max(
+        1, int(os.environ.get("RAG_INGEST_INSERT_BATCH_SIZE", "1000"))
+    )
+except ValueError:
+    RAG_INGEST_INSERT_BATCH_SIZE = 1000
+
 RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
@@ -2838,6 +3217,23 @@ WEB_SEARCH_TRUST_ENV = PersistentConfig(
     os.getenv("WEB_SEARCH_TRUST_ENV", "False").lower() == "true",
 )
 
+# Keep fetched pages and their chunk embeddings, see retrieval/web/cache.py
+ENABLE_WEB_FETCH_CACHE = os.getenv("ENABLE_WEB_FETCH_CACHE", "True").lower() == "true"
+
+# Seconds a fetched page is used as is, before checking whether it changed
+try:
+    WEB_FETCH_CACHE_TTL = max(0, int(os.getenv("WEB_FETCH_CACHE_TTL", "3600")))
+except ValueError:
+    WEB_FETCH_CACHE_TTL = 3600
+
+# Megabytes of fetched pages kept, least recently used ones go first
+try:
+    WEB_FETCH_CACHE_MAX_SIZE = max(
+        0, int(os.getenv("WEB_FETCH_CACHE_MAX_SIZE", "1024"))
+    )
+except ValueError:
+    WEB_FETCH_CACHE_MAX_SIZE = 1024
+
 
 OLLAMA_CLOUD_WEB_SEARCH_API_KEY = PersistentConfig(
     "OLLAMA_CLOUD_WEB_SEARCH_API_KEY",
@@ -3335,6 +3731,24 @@ WHISPER_VAD_FILTER = PersistentConfig(
 
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "").lower() or None
 
+# Local transcriptions run at once, each on its own model replica
+try:
+    WHISPER_REPLICAS = max(1, int(os.environ.get("WHISPER_REPLICAS", "1")))
+except ValueError:
+    WHISPER_REPLICAS = 1
+
+# CPU threads per replica, 0 for the faster-whisper default
+try:
+    WHISPER_CPU_THREADS = max(0, int(os.environ.get("WHISPER_CPU_THREADS", "0")))
+except ValueError:
+    WHISPER_CPU_THREADS = 0
+
+# Local transcriptions waiting for a replica before new ones are refused
+try:
+    WHISPER_QUEUE_SIZE = max(1, int(os.environ.get("WHISPER_QUEUE_SIZE", "64")))
+except ValueError:
+    WHISPER_QUEUE_SIZE = 64
+
 # Add Deepgram configuration
 DEEPGRAM_API_KEY = PersistentConfig(
     "DEEPGRAM_API_KEY",
@@ -3464,6 +3878,22 @@ AUDIO_TTS_SPLIT_ON = PersistentConfig(
     os.getenv("AUDIO_TTS_SPLIT_ON", "punctuation"),
 )
 
+# Synthesised speech kept on disk, in MB
+try:
+    AUDIO_TTS_CACHE_MAX_SIZE = max(
+        0, int(os.environ.get("AUDIO_TTS_CACHE_MAX_SIZE", "1024"))
+    )
+except ValueError:
+    AUDIO_TTS_CACHE_MAX_SIZE = 1024
+
+# Seconds synthesised speech is kept unused, 0 for no limit
+try:
+    AUDIO_TTS_CACHE_MAX_AGE = max(
+        0, int(os.environ.get("AUDIO_TTS_CACHE_MAX_AGE", str(30 * 24 * 60 * 60)))
+    )
+except ValueError:
+    AUDIO_TTS_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
 AUDIO_TTS_AZURE_SPEECH_REGION = PersistentConfig(
     "AUDIO_TTS_AZURE_SPEECH_REGION",
     "audio.tts.azure.speech_region",
@@ -357,6 +357,20 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Last-active timestamps recorded on authentication are written in one batch
+# at this interval, so each user costs at most one write per interval. 0
+# writes them on every request.
+DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = os.environ.get(
+    "DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL", "30"
+)
+
+try:
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = float(
+        DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL
+    )
+except Exception:
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = 30.0
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -535,6 +549,31 @@ else:
         MODELS_CACHE_TTL = 1
 
 
+####################################
+# ACCESS CONTROL
+####################################
+
+# Seconds a user's resolved group memberships and permissions are reused
+# across requests. Changes made in this process apply immediately, this only
+# bounds staleness for changes made by other workers.
+PERMISSION_CACHE_TTL = os.environ.get("PERMISSION_CACHE_TTL", "5")
+
+try:
+    PERMISSION_CACHE_TTL = float(PERMISSION_CACHE_TTL)
+except Exception:
+    PERMISSION_CACHE_TTL = 5.0
+
+# Seconds an authenticated user is reused across requests without reading the
+# user table. Changes made in this process apply immediately, this only bounds
+# staleness (e.g. of a role change or a revoked API key) for other workers.
+USER_CACHE_TTL = os.environ.get("USER_CACHE_TTL", "5")
+
+try:
+    USER_CACHE_TTL = float(USER_CACHE_TTL)
+except Exception:
+    USER_CACHE_TTL = 5.0
+
+
 ####################################
 # CHAT
 ####################################
@@ -622,6 +661,32 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = 10
 
+# Shared upstream connection pool (utils/http_client.py)
+AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "100"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 100
+
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "60"
+)
+
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT)
+except Exception:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 60.0
+
+AIOHTTP_CLIENT_DNS_CACHE_TTL = os.environ.get("AIOHTTP_CLIENT_DNS_CACHE_TTL", "300")
+
+try:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_DNS_CACHE_TTL)
+except Exception:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = 300
+
 
 AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA = os.environ.get(
     "AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA", "10"
@@ -272,6 +272,7 @@ from open_webui.config import (
     RAG_TEXT_SPLITTER,
     TIKTOKEN_ENCODING_NAME,
     PDF_EXTRACT_IMAGES,
+    PDF_PARALLEL_EXTRACTION,
     YOUTUBE_LOADER_LANGUAGE,
     YOUTUBE_LOADER_PROXY_URL,
     # Retrieval (Web Search)
@@ -464,8 +465,8 @@ from open_webui.env import (
 from open_webui.utils.models import (
     get_all_models,
     get_all_base_models,
+    get_model_catalog,
     check_model_access,
-    get_filtered_models,
 )
 from open_webui.utils.chat import (
     generate_chat_completion as chat_completion_handler,
@@ -474,7 +475,7 @@ from open_webui.utils.chat import (
 )
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, permission_context_scope
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -482,6 +483,7 @@ from open_webui.utils.auth import (
     decode_token,
     get_admin_user,
     get_verified_user,
+    periodic_user_last_active_flush,
 )
 from open_webui.utils.plugin import install_tool_and_function_dependencies
 from open_webui.utils.oauth import (
@@ -492,6 +494,12 @@ from open_webui.utils.oauth import (
 )
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.http_client import (
+    init_upstream_clients,
+    get_upstream_clients,
+    close_upstream_clients,
+)
+from open_webui.utils.code_interpreter import close_jupyter_kernel_pools
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -578,11 +586,17 @@ async def lifespan(app: FastAPI):
             redis_task_command_listener(app)
         )
 
+    # Keep-alive connections to OpenAI/Ollama upstreams, shared by all requests
+    app.state.upstream_clients = init_upstream_clients()
+
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    app.state.user_last_active_flush = asyncio.create_task(
+        periodic_user_last_active_flush()
+    )
 
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         await get_all_models(
@@ -610,6 +624,15 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    app.state.user_last_active_flush.cancel()
+    try:
+        await app.state.user_last_active_flush
+    except asyncio.CancelledError:
+        pass
+
+    await close_upstream_clients()
+    await close_jupyter_kernel_pools()
+
 
 app = FastAPI(
     title="reInvent",
@@ -894,6 +917,7 @@ app.state.config.RAG_OLLAMA_BASE_URL = RAG_OLLAMA_BASE_URL
 app.state.config.RAG_OLLAMA_API_KEY = RAG_OLLAMA_API_KEY
 
 app.state.config.PDF_EXTRACT_IMAGES = PDF_EXTRACT_IMAGES
+app.state.config.PDF_PARALLEL_EXTRACTION = PDF_PARALLEL_EXTRACTION
 
 app.state.config.YOUTUBE_LOADER_LANGUAGE = YOUTUBE_LOADER_LANGUAGE
 app.state.config.YOUTUBE_LOADER_PROXY_URL = YOUTUBE_LOADER_PROXY_URL
@@ -1182,6 +1206,7 @@ app.state.config.AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH = (
 ########################################
 
 app.state.MODELS = {}
+app.state.MODEL_CATALOG = None
 
 
 class RedirectMiddleware(BaseHTTPMiddleware):
@@ -1240,6 +1265,13 @@ async def commit_session_after_request(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def scope_permission_context(request: Request, call_next):
+    # Resolve each user's groups and permissions at most once per request
+    with permission_context_scope():
+        return await call_next(request)
+
+
 @app.middleware("http")
 async def check_url(request: Request, call_next):
     start_time = int(time.time())
@@ -1353,42 +1385,8 @@ if audit_level != AuditLevel.NONE:
 async def get_models(
     request: Request, refresh: bool = False, user=Depends(get_verified_user)
 ):
-    all_models = await get_all_models(request, refresh=refresh, user=user)
-
-    models = []
-    for model in all_models:
-        # Filter out filter pipelines
-        if "pipeline" in model and model["pipeline"].get("type", None) == "filter":
-            continue
-
-        try:
-            model_tags = [
-                tag.get("name")
-                for tag in model.get("info", {}).get("meta", {}).get("tags", [])
-            ]
-            tags = [tag.get("name") for tag in model.get("tags", [])]
-
-            tags = list(set(model_tags + tags))
-            model["tags"] = [{"name": tag} for tag in tags]
-        except Exception as e:
-            log.debug(f"Error processing model tags: {e}")
-            model["tags"] = []
-            pass
-
-        models.append(model)
-
-    model_order_list = request.app.state.config.MODEL_ORDER_LIST
-    if model_order_list:
-        model_order_dict = {model_id: i for i, model_id in enumerate(model_order_list)}
-        # Sort models by order list priority, with fallback for those not in the list
-        models.sort(
-            key=lambda model: (
-                model_order_dict.get(model.get("id", ""), float("inf")),
-                (model.get("name", "") or ""),
-            )
-        )
-
-    models = get_filtered_models(models, user)
+    catalog = await get_model_catalog(request, refresh=refresh, user=user)
+    models = catalog.get_models(user)
 
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model.get('id') for model in models])}"
@@ -1920,6 +1918,15 @@ async def get_app_changelog():
     return {key: CHANGELOG[key] for idx, key in enumerate(CHANGELOG) if idx < 5}
 
 
+@app.get("/api/usage/upstream")
+async def get_upstream_connection_stats(user=Depends(get_admin_user)):
+    """
+    Per-upstream request and connection counters of the shared HTTP client
+    pool, to check that connections to LLM providers are being reused.
+    """
+    return get_upstream_clients().get_stats()
+
+
 @app.get("/api/usage")
 async def get_current_usage(user=Depends(get_verified_user)):
     """
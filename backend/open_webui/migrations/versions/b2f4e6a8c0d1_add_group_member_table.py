@@ -0,0 +1,75 @@
+"""Add group_member table
+
+Revision ID: b2f4e6a8c0d1
+Revises: a5c220713937
+Create Date: 2025-10-02 10:12:41.318204
+
+"""
+
+import json
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "b2f4e6a8c0d1"
+down_revision: Union[str, None] = "a5c220713937"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create group_member table
+    op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+        sa.ForeignKeyConstraint(["group_id"], ["group.id"], ondelete="CASCADE"),
+    )
+
+    # The primary key covers lookups by group, this one covers lookups by user
+    op.create_index("idx_group_member_user_id", "group_member", ["user_id", "group_id"])
+
+    # Backfill from the user_ids JSON column
+    group = table(
+        "group",
+        column("id", sa.Text()),
+        column("user_ids", sa.JSON()),
+    )
+    group_member = table(
+        "group_member",
+        column("group_id", sa.Text()),
+        column("user_id", sa.Text()),
+        column("created_at", sa.BigInteger()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+
+    for row in conn.execute(sa.select(group.c.id, group.c.user_ids)):
+        user_ids = row.user_ids
+        if isinstance(user_ids, str):
+            try:
+                user_ids = json.loads(user_ids)
+            except json.JSONDecodeError:
+                user_ids = []
+        if not isinstance(user_ids, list):
+            continue
+
+        members = [
+            {"group_id": row.id, "user_id": user_id, "created_at": now}
+            for user_id in dict.fromkeys(user_ids)
+            if isinstance(user_id, str)
+        ]
+        if members:
+            conn.execute(group_member.insert(), members)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_group_member_user_id", table_name="group_member")
+    op.drop_table("group_member")
@@ -0,0 +1,41 @@
+"""Add message indexes
+
+Revision ID: c4d8e2f6a1b3
+Revises: b2f4e6a8c0d1
+Create Date: 2025-10-09 14:21:07.532118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d8e2f6a1b3"
+down_revision: Union[str, None] = "b2f4e6a8c0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Channel and thread pages
+    op.create_index(
+        "idx_message_channel_parent_created",
+        "message",
+        ["channel_id", "parent_id", "created_at"],
+    )
+    # Thread reply counts
+    op.create_index(
+        "idx_message_parent_created", "message", ["parent_id", "created_at"]
+    )
+    # Reactions by message
+    op.create_index(
+        "idx_message_reaction_message_id", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_message_reaction_message_id", table_name="message_reaction")
+    op.drop_index("idx_message_parent_created", table_name="message")
+    op.drop_index("idx_message_channel_parent_created", table_name="message")
@@ -0,0 +1,136 @@
+"""Add chat search index
+
+Revision ID: d7e1f3a5b9c2
+Revises: c4d8e2f6a1b3
+Create Date: 2025-10-13 09:42:18.207561
+
+"""
+
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+log = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e1f3a5b9c2"
+down_revision: Union[str, None] = "c4d8e2f6a1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Message text of a chat row, as indexed. Messages that aren't objects have
+# no content (and json_extract would fail on plain strings).
+SQLITE_CONTENT_SQL = """
+(SELECT group_concat(
+    CASE WHEN message.type = 'object'
+    THEN json_extract(message.value, '$.content') END, ' ')
+ FROM json_each({row}.chat, '$.messages') AS message)
+"""
+
+SQLITE_INSERT_SQL = """
+INSERT INTO chat_fts (chat_id, user_id, title, content)
+VALUES ({row}.id, {row}.user_id, {row}.title, {content});
+"""
+
+# chat_id is indexed so that rows can be found without a full scan
+SQLITE_DELETE_SQL = """
+DELETE FROM chat_fts WHERE chat_fts MATCH 'chat_id:"' || {row}.id || '"';
+"""
+
+POSTGRES_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION chat_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', left(coalesce((
+            SELECT string_agg(message->>'content', ' ')
+            FROM json_array_elements(
+                CASE WHEN json_typeof(NEW.chat->'messages') = 'array'
+                THEN NEW.chat->'messages' ELSE '[]'::json END
+            ) AS message
+        ), ''), 500000)), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    if conn.dialect.name == "sqlite":
+        try:
+            op.execute(
+                "CREATE VIRTUAL TABLE chat_fts USING fts5("
+                "chat_id, user_id, title, content, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except sa.exc.OperationalError as e:
+            # Chat search falls back to scanning the chat table
+            log.warning(
+                f"SQLite FTS5 is not available, skipping chat search index: {e}"
+            )
+            return
+
+        new_content = SQLITE_CONTENT_SQL.format(row="new")
+        op.execute(
+            "CREATE TRIGGER chat_fts_insert AFTER INSERT ON chat BEGIN "
+            + SQLITE_INSERT_SQL.format(row="new", content=new_content)
+            + " END"
+        )
+        op.execute(
+            "CREATE TRIGGER chat_fts_update AFTER UPDATE OF user_id, title, chat ON chat BEGIN "
+            + SQLITE_DELETE_SQL.format(row="old")
+            + SQLITE_INSERT_SQL.format(row="new", content=new_content)
+            + " END"
+        )
+        op.execute(
+            "CREATE TRIGGER chat_fts_delete AFTER DELETE ON chat BEGIN "
+            + SQLITE_DELETE_SQL.format(row="old")
+            + " END"
+        )
+
+        op.execute(
+            "INSERT INTO chat_fts (chat_id, user_id, title, content) "
+            "SELECT chat.id, chat.user_id, chat.title, "
+            + SQLITE_CONTENT_SQL.format(row="chat")
+            + " FROM chat"
+        )
+
+    elif conn.dialect.name == "postgresql":
+        op.add_column("chat", sa.Column("search_vector", postgresql.TSVECTOR()))
+        op.execute(POSTGRES_FUNCTION_SQL)
+        op.execute(
+            "CREATE TRIGGER chat_search_vector_trigger "
+            "BEFORE INSERT OR UPDATE OF title, chat ON chat "
+            "FOR EACH ROW EXECUTE PROCEDURE chat_search_vector_update()"
+        )
+
+        # Fill in existing chats through the trigger
+        op.execute("UPDATE chat SET title = title")
+        op.create_index(
+            "idx_chat_search_vector",
+            "chat",
+            ["search_vector"],
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+
+    if conn.dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS chat_fts_insert")
+        op.execute("DROP TRIGGER IF EXISTS chat_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS chat_fts_delete")
+        op.execute("DROP TABLE IF EXISTS chat_fts")
+
+    elif conn.dialect.name == "postgresql":
+        op.drop_index("idx_chat_search_vector", table_name="chat")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_vector_trigger ON chat")
+        op.execute("DROP FUNCTION IF EXISTS chat_search_vector_update()")
+        op.drop_column("chat", "search_vector")
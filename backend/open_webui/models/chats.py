@@ -1,3 +1,4 @@
+import html
 import logging
 import json
 import time
@@ -11,7 +12,8 @@ from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import or_, func, select, and_, text, inspect, null
+from sqlalchemy import column, literal_column, table
 from sqlalchemy.sql import exists
 from sqlalchemy.sql.expression import bindparam
 
@@ -122,7 +124,34 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+class ChatSearchResponse(ChatTitleIdResponse):
+    snippet: Optional[str] = None  # html, with the matches in <mark> tags
+
+
+# Full-text index over chat titles and messages on SQLite, kept in sync by
+# triggers on the chat table (see migration d7e1f3a5b9c2)
+CHAT_FTS_TABLE = table("chat_fts", column("chat_id"))
+
+# Private use characters marking matches in snippets, before escaping
+SEARCH_SNIPPET_START = "\ue000"
+SEARCH_SNIPPET_END = "\ue001"
+
+
+def get_search_snippet(snippet: Optional[str]) -> Optional[str]:
+    # Chats that only matched on the title have nothing to highlight
+    if not snippet or SEARCH_SNIPPET_START not in snippet:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(SEARCH_SNIPPET_START, "<mark>")
+        .replace(SEARCH_SNIPPET_END, "</mark>")
+    )
+
+
 class ChatTable:
+    # "fts5", "tsvector" or "" when there is no search index, once checked
+    _search_index: Optional[str] = None
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -621,24 +650,103 @@ class ChatTable:
             )
             return [ChatModel.model_validate(chat) for chat in all_chats]
 
-    def get_chats_by_user_id_and_search_text(
+    def _get_search_index(self, db) -> Optional[str]:
+        # Created by migration d7e1f3a5b9c2, unless SQLite lacks FTS5
+        if self._search_index is None:
+            inspector = inspect(db.bind)
+            dialect_name = db.bind.dialect.name
+            if dialect_name == "sqlite" and inspector.has_table("chat_fts"):
+                ChatTable._search_index = "fts5"
+            elif dialect_name == "postgresql" and "search_vector" in {
+                column["name"] for column in inspector.get_columns("chat")
+            }:
+                ChatTable._search_index = "tsvector"
+            else:
+                ChatTable._search_index = ""
+        return self._search_index or None
+
+    def _filter_chats_by_tags(self, query, dialect_name: str, tag_ids: list[str]):
+        if dialect_name == "sqlite":
+            # Check if there are any tags to filter, it should have all the tags
+            if "none" in tag_ids:
+                query = query.filter(
+                    text(
+                        """
+                        NOT EXISTS (
+                            SELECT 1
+                            FROM json_each(Chat.meta, '$.tags') AS tag
+                        )
+                        """
+                    )
+                )
+            elif tag_ids:
+                query = query.filter(
+                    and_(
+                        *[
+                            text(
+                                f"""
+                                EXISTS (
+                                    SELECT 1
+                                    FROM json_each(Chat.meta, '$.tags') AS tag
+                                    WHERE tag.value = :tag_id_{tag_idx}
+                                )
+                                """
+                            ).params(**{f"tag_id_{tag_idx}": tag_id})
+                            for tag_idx, tag_id in enumerate(tag_ids)
+                        ]
+                    )
+                )
+
+        elif dialect_name == "postgresql":
+            # Check if there are any tags to filter, it should have all the tags
+            if "none" in tag_ids:
+                query = query.filter(
+                    text(
+                        """
+                        NOT EXISTS (
+                            SELECT 1
+                            FROM json_array_elements_text(Chat.meta->'tags') AS tag
+                        )
+                        """
+                    )
+                )
+            elif tag_ids:
+                query = query.filter(
+                    and_(
+                        *[
+                            text(
+                                f"""
+                                EXISTS (
+                                    SELECT 1
+                                    FROM json_array_elements_text(Chat.meta->'tags') AS tag
+                                    WHERE tag = :tag_id_{tag_idx}
+                                )
+                                """
+                            ).params(**{f"tag_id_{tag_idx}": tag_id})
+                            for tag_idx, tag_id in enumerate(tag_ids)
+                        ]
+                    )
+                )
+        else:
+            raise NotImplementedError(f"Unsupported dialect: {dialect_name}")
+
+        return query
+
+    def _search_chats(
         self,
+        db,
+        entities: list,
         user_id: str,
         search_text: str,
         include_archived: bool = False,
-        skip: int = 0,
-        limit: int = 60,
-    ) -> list[ChatModel]:
+    ):
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Build the query for a chat search. ``search_text`` can mix words with
+        tag:, folder:, pinned:, archived: and shared: filters. Words are looked
+        up in the chat search index when there is one and results are ranked
+        by relevance; the last column is a snippet with the matches marked
+        (see get_search_snippet), or None.
         """
-        search_text = search_text.replace("\u0000", "").lower().strip()
-
-        if not search_text:
-            return self.get_chat_list_by_user_id(
-                user_id, include_archived, filter={}, skip=skip, limit=limit
-            )
-
         search_text_words = search_text.split(" ")
 
         # search_text might contain 'tag:tag_name' format so we need to extract the tag_name, split the search_text and remove the tags
@@ -691,126 +799,181 @@ class ChatTable:
 
         search_text = " ".join(search_text_words)
 
-        with get_db() as db:
-            query = db.query(Chat).filter(Chat.user_id == user_id)
+        query = db.query(*entities).filter(Chat.user_id == user_id)
 
-            if is_archived is not None:
-                query = query.filter(Chat.archived == is_archived)
-            elif not include_archived:
-                query = query.filter(Chat.archived == False)
+        if is_archived is not None:
+            query = query.filter(Chat.archived == is_archived)
+        elif not include_archived:
+            query = query.filter(Chat.archived == False)
 
-            if is_pinned is not None:
-                query = query.filter(Chat.pinned == is_pinned)
+        if is_pinned is not None:
+            query = query.filter(Chat.pinned == is_pinned)
 
-            if is_shared is not None:
-                if is_shared:
-                    query = query.filter(Chat.share_id.isnot(None))
-                else:
-                    query = query.filter(Chat.share_id.is_(None))
+        if is_shared is not None:
+            if is_shared:
+                query = query.filter(Chat.share_id.isnot(None))
+            else:
+                query = query.filter(Chat.share_id.is_(None))
 
-            if folder_ids:
-                query = query.filter(Chat.folder_id.in_(folder_ids))
+        if folder_ids:
+            query = query.filter(Chat.folder_id.in_(folder_ids))
 
-            query = query.order_by(Chat.updated_at.desc())
+        dialect_name = db.bind.dialect.name
+        query = self._filter_chats_by_tags(query, dialect_name, tag_ids)
 
-            # Check if the database dialect is either 'sqlite' or 'postgresql'
-            dialect_name = db.bind.dialect.name
-            if dialect_name == "sqlite":
-                # SQLite case: using JSON1 extension for JSON searching
-                sqlite_content_sql = (
-                    "EXISTS ("
-                    "    SELECT 1 "
-                    "    FROM json_each(Chat.chat, '$.messages') AS message "
-                    "    WHERE LOWER(message.value->>'content') LIKE '%' || :content_key || '%'"
-                    ")"
-                )
-                sqlite_content_clause = text(sqlite_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")), sqlite_content_clause
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
+        # Only words the index can tokenize. The index drops their symbols
+        # ("c++" becomes the prefix "c"), so words with any are also matched
+        # as a substring.
+        index_words = [
+            word
+            for word in search_text_words
+            if any(character.isalnum() for character in word)
+        ]
+        search_index = self._get_search_index(db) if index_words else None
+
+        if search_index:
+            substring_words = [
+                word for word in search_text_words if word and not word.isalnum()
+            ]
+            if substring_words:
+                query = self._filter_chats_by_substrings(
+                    query, dialect_name, substring_words
                 )
 
-                # Check if there are any tags to filter, it should have all the tags
-                if "none" in tag_ids:
-                    query = query.filter(
-                        text(
-                            """
-                            NOT EXISTS (
-                                SELECT 1
-                                FROM json_each(Chat.meta, '$.tags') AS tag
-                            )
-                            """
-                        )
-                    )
-                elif tag_ids:
-                    query = query.filter(
-                        and_(
-                            *[
-                                text(
-                                    f"""
-                                    EXISTS (
-                                        SELECT 1
-                                        FROM json_each(Chat.meta, '$.tags') AS tag
-                                        WHERE tag.value = :tag_id_{tag_idx}
-                                    )
-                                    """
-                                ).params(**{f"tag_id_{tag_idx}": tag_id})
-                                for tag_idx, tag_id in enumerate(tag_ids)
-                            ]
-                        )
-                    )
+        if search_index == "fts5":
+            # Every word as a prefix, in the title or the messages
+            fts_words = " ".join(
+                '"{}"*'.format(word.replace('"', '""')) for word in index_words
+            )
+            fts_query = 'user_id : "{}" AND {{title content}} : ({})'.format(
+                user_id.replace('"', '""'), fts_words
+            )
 
-            elif dialect_name == "postgresql":
-                # PostgreSQL relies on proper JSON query for search
-                postgres_content_sql = (
-                    "EXISTS ("
-                    "    SELECT 1 "
-                    "    FROM json_array_elements(Chat.chat->'messages') AS message "
-                    "    WHERE LOWER(message->>'content') LIKE '%' || :content_key || '%'"
-                    ")"
+            chat_fts = literal_column("chat_fts")
+            return (
+                query.join(CHAT_FTS_TABLE, CHAT_FTS_TABLE.c.chat_id == Chat.id)
+                .filter(chat_fts.op("MATCH")(fts_query))
+                .add_columns(
+                    func.snippet(
+                        chat_fts,
+                        3,
+                        SEARCH_SNIPPET_START,
+                        SEARCH_SNIPPET_END,
+                        "…",
+                        16,
+                    )
                 )
-                postgres_content_clause = text(postgres_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")),
-                        postgres_content_clause,
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
+                # Title matches weigh more than message matches
+                .order_by(
+                    func.bm25(chat_fts, 0.0, 0.0, 10.0, 1.0),
+                    Chat.updated_at.desc(),
                 )
+            )
 
-                # Check if there are any tags to filter, it should have all the tags
-                if "none" in tag_ids:
-                    query = query.filter(
-                        text(
-                            """
-                            NOT EXISTS (
-                                SELECT 1
-                                FROM json_array_elements_text(Chat.meta->'tags') AS tag
-                            )
-                            """
-                        )
-                    )
-                elif tag_ids:
-                    query = query.filter(
-                        and_(
-                            *[
-                                text(
-                                    f"""
-                                    EXISTS (
-                                        SELECT 1
-                                        FROM json_array_elements_text(Chat.meta->'tags') AS tag
-                                        WHERE tag = :tag_id_{tag_idx}
-                                    )
-                                    """
-                                ).params(**{f"tag_id_{tag_idx}": tag_id})
-                                for tag_idx, tag_id in enumerate(tag_ids)
-                            ]
-                        )
+        if search_index == "tsvector":
+            ts_query = func.to_tsquery(
+                "simple",
+                " & ".join(
+                    "'{}':*".format(word.replace("\\", "\\\\").replace("'", "''"))
+                    for word in index_words
+                ),
+            )
+            search_vector = literal_column("chat.search_vector")
+            content = literal_column(
+                "(SELECT string_agg(message->>'content', ' ') "
+                "FROM json_array_elements("
+                "CASE WHEN json_typeof(chat.chat->'messages') = 'array' "
+                "THEN chat.chat->'messages' ELSE '[]'::json END) AS message)"
+            )
+            return (
+                query.filter(search_vector.op("@@")(ts_query))
+                .add_columns(
+                    func.ts_headline(
+                        "simple",
+                        func.coalesce(content, Chat.title),
+                        ts_query,
+                        f"StartSel={SEARCH_SNIPPET_START}, "
+                        f"StopSel={SEARCH_SNIPPET_END}, "
+                        "MaxWords=24, MinWords=8, MaxFragments=1",
                     )
-            else:
-                raise NotImplementedError(
-                    f"Unsupported dialect: {db.bind.dialect.name}"
                 )
+                .order_by(
+                    func.ts_rank_cd(search_vector, ts_query).desc(),
+                    Chat.updated_at.desc(),
+                )
+            )
+
+        # No search index, or nothing to look up in it: substring match
+        return (
+            self._filter_chats_by_substrings(query, dialect_name, [search_text])
+            .add_columns(null())
+            .order_by(Chat.updated_at.desc())
+        )
+
+    def _filter_chats_by_substrings(
+        self, query, dialect_name: str, substrings: list[str]
+    ):
+        """Chats whose title or messages contain every one of ``substrings``."""
+        if dialect_name == "sqlite":
+            # SQLite case: using JSON1 extension for JSON searching
+            content_sql = (
+                "EXISTS ("
+                "    SELECT 1 "
+                "    FROM json_each(Chat.chat, '$.messages') AS message "
+                "    WHERE LOWER(CASE WHEN message.type = 'object' "
+                "THEN message.value->>'content' END) "
+                "LIKE '%' || :content_key_{idx} || '%'"
+                ")"
+            )
+        else:
+            # PostgreSQL relies on proper JSON query for search
+            content_sql = (
+                "EXISTS ("
+                "    SELECT 1 "
+                "    FROM json_array_elements(Chat.chat->'messages') AS message "
+                "    WHERE LOWER(message->>'content') LIKE '%' || :content_key_{idx} || '%'"
+                ")"
+            )
+
+        return query.filter(
+            and_(
+                *[
+                    or_(
+                        Chat.title.ilike(bindparam(f"title_key_{idx}")),
+                        text(content_sql.format(idx=idx)),
+                    ).params(
+                        **{
+                            f"title_key_{idx}": f"%{substring}%",
+                            f"content_key_{idx}": substring,
+                        }
+                    )
+                    for idx, substring in enumerate(substrings)
+                ]
+            )
+        )
+
+    def get_chats_by_user_id_and_search_text(
+        self,
+        user_id: str,
+        search_text: str,
+        include_archived: bool = False,
+        skip: int = 0,
+        limit: int = 60,
+    ) -> list[ChatModel]:
+        """
+        Filters chats based on a search query, allowing pagination using skip and limit.
+        """
+        search_text = search_text.replace("\u0000", "").lower().strip()
+
+        if not search_text:
+            return self.get_chat_list_by_user_id(
+                user_id, include_archived, filter={}, skip=skip, limit=limit
+            )
+
+        with get_db() as db:
+            query = self._search_chats(
+                db, [Chat], user_id, search_text, include_archived
+            )
 
             # Perform pagination at the SQL level
             all_chats = query.offset(skip).limit(limit).all()
@@ -818,7 +981,56 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [ChatModel.model_validate(chat) for chat, _ in all_chats]
+
+    def search_chats_by_user_id(
+        self,
+        user_id: str,
+        search_text: str,
+        include_archived: bool = False,
+        skip: int = 0,
+        limit: int = 60,
+    ) -> list[ChatSearchResponse]:
+        """
+        Like get_chats_by_user_id_and_search_text, but without loading the
+        chats themselves, and with a highlighted snippet of the match.
+        """
+        search_text = search_text.replace("\u0000", "").lower().strip()
+
+        if not search_text:
+            return [
+                ChatSearchResponse(**chat.model_dump())
+                for chat in self.get_chat_title_id_list_by_user_id(
+                    user_id,
+                    include_archived=include_archived,
+                    include_folders=True,
+                    include_pinned=True,
+                    skip=skip,
+                    limit=limit,
+                )
+            ]
+
+        with get_db() as db:
+            query = self._search_chats(
+                db,
+                [Chat.id, Chat.title, Chat.updated_at, Chat.created_at],
+                user_id,
+                search_text,
+                include_archived,
+            )
+
+            return [
+                ChatSearchResponse(
+                    id=id,
+                    title=title,
+                    updated_at=updated_at,
+                    created_at=created_at,
+                    snippet=get_search_snippet(snippet),
+                )
+                for id, title, updated_at, created_at, snippet in query.offset(skip)
+                .limit(limit)
+                .all()
+            ]
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str, skip: int = 0, limit: int = 60
@@ -5,6 +5,7 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.models.users import Users, UserModel
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.model_catalog import invalidate_model_catalog
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, Index
 
@@ -122,6 +123,7 @@ class FunctionsTable:
                 result = Function(**function.model_dump())
                 db.add(result)
                 db.commit()
+                invalidate_model_catalog()
                 db.refresh(result)
                 if result:
                     return FunctionModel.model_validate(result)
@@ -170,6 +172,7 @@ class FunctionsTable:
                         db.delete(func)
 
                 db.commit()
+                invalidate_model_catalog()
 
                 return [
                     FunctionModel.model_validate(func)
@@ -283,6 +286,7 @@ class FunctionsTable:
                 function.updated_at = int(time.time())
                 db.commit()
                 db.refresh(function)
+                invalidate_model_catalog()
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -303,6 +307,7 @@ class FunctionsTable:
                     function.updated_at = int(time.time())
                     db.commit()
                     db.refresh(function)
+                    invalidate_model_catalog()
                     return self.get_function_by_id(id)
                 else:
                     return None
@@ -363,6 +368,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                invalidate_model_catalog()
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -377,6 +383,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                invalidate_model_catalog()
                 return True
             except Exception:
                 return None
@@ -386,6 +393,7 @@ class FunctionsTable:
             try:
                 db.query(Function).filter_by(id=id).delete()
                 db.commit()
+                invalidate_model_catalog()
 
                 return True
             except Exception:
@@ -11,7 +11,7 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Text, JSON
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +41,19 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    group_id = Column(
+        Text, ForeignKey("group.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id = Column(Text, primary_key=True)
+    created_at = Column(BigInteger)
+
+    # The primary key covers lookups by group, this one covers lookups by user
+    __table_args__ = (Index("idx_group_member_user_id", "user_id", "group_id"),)
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -92,6 +105,44 @@ class GroupUpdateForm(GroupForm, UserIdsForm):
 
 
 class GroupTable:
+    # Bumped on every change to group permissions or membership, so that
+    # callers caching resolved permissions can tell when to drop them.
+    version = 0
+
+    def _set_members(self, db, group: Group, user_ids: list[str]):
+        """Replace the members of a group, keeping group_member and user_ids in sync."""
+        user_ids = list(dict.fromkeys(user_ids))  # Deduplicate, keep order
+        existing_user_ids = {
+            user_id
+            for (user_id,) in db.query(GroupMember.user_id).filter_by(group_id=group.id)
+        }
+
+        removed_user_ids = existing_user_ids - set(user_ids)
+        if removed_user_ids:
+            db.query(GroupMember).filter(
+                GroupMember.group_id == group.id,
+                GroupMember.user_id.in_(removed_user_ids),
+            ).delete(synchronize_session=False)
+
+        now = int(time.time())
+        db.add_all(
+            [
+                GroupMember(group_id=group.id, user_id=user_id, created_at=now)
+                for user_id in user_ids
+                if user_id not in existing_user_ids
+            ]
+        )
+
+        group.user_ids = user_ids
+        group.updated_at = now
+
+    def _get_groups_by_member_id(self, db, user_id: str):
+        return (
+            db.query(Group)
+            .join(GroupMember, GroupMember.group_id == Group.id)
+            .filter(GroupMember.user_id == user_id)
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -130,17 +181,20 @@ class GroupTable:
         with get_db() as db:
             return [
                 GroupModel.model_validate(group)
-                for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                for group in self._get_groups_by_member_id(db, user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> list[str]:
+        with get_db() as db:
+            return [
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id).filter_by(
+                    user_id=user_id
+                )
+            ]
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -149,26 +203,38 @@ class GroupTable:
         except Exception:
             return None
 
-    def get_group_user_ids_by_id(self, id: str) -> Optional[str]:
-        group = self.get_group_by_id(id)
-        if group:
-            return group.user_ids
-        else:
-            return None
+    def get_group_user_ids_by_id(self, id: str) -> Optional[list[str]]:
+        with get_db() as db:
+            if not db.query(Group.id).filter_by(id=id).first():
+                return None
+            return [
+                user_id
+                for (user_id,) in db.query(GroupMember.user_id).filter_by(group_id=id)
+            ]
 
     def update_group_by_id(
         self, id: str, form_data: GroupUpdateForm, overwrite: bool = False
     ) -> Optional[GroupModel]:
         try:
             with get_db() as db:
-                db.query(Group).filter_by(id=id).update(
-                    {
-                        **form_data.model_dump(exclude_none=True),
-                        "updated_at": int(time.time()),
-                    }
-                )
+                group = db.query(Group).filter_by(id=id).first()
+                if not group:
+                    return None
+
+                data = form_data.model_dump(exclude_none=True)
+                user_ids = data.pop("user_ids", None)
+
+                for key, value in data.items():
+                    setattr(group, key, value)
+                group.updated_at = int(time.time())
+
+                if user_ids is not None:
+                    self._set_members(db, group, user_ids)
+
                 db.commit()
-                return self.get_group_by_id(id=id)
+                self.version += 1
+                db.refresh(group)
+                return GroupModel.model_validate(group)
         except Exception as e:
             log.exception(e)
             return None
@@ -176,8 +242,10 @@ class GroupTable:
     def delete_group_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
+                self.version += 1
                 return True
         except Exception:
             return False
@@ -185,8 +253,10 @@ class GroupTable:
     def delete_all_groups(self) -> bool:
         with get_db() as db:
             try:
+                db.query(GroupMember).delete()
                 db.query(Group).delete()
                 db.commit()
+                self.version += 1
 
                 return True
             except Exception:
@@ -195,18 +265,19 @@ class GroupTable:
     def remove_user_from_all_groups(self, user_id: str) -> bool:
         with get_db() as db:
             try:
-                groups = self.get_groups_by_member_id(user_id)
-
-                for group in groups:
-                    group.user_ids.remove(user_id)
-                    db.query(Group).filter_by(id=group.id).update(
-                        {
-                            "user_ids": group.user_ids,
-                            "updated_at": int(time.time()),
-                        }
+                for group in self._get_groups_by_member_id(db, user_id).all():
+                    self._set_members(
+                        db,
+                        group,
+                        [
+                            member_id
+                            for member_id in (group.user_ids or [])
+                            if member_id != user_id
+                        ],
                     )
-                    db.commit()
 
+                db.commit()
+                self.version += 1
                 return True
             except Exception:
                 return False
@@ -247,33 +318,31 @@ class GroupTable:
         with get_db() as db:
             try:
                 groups = db.query(Group).filter(Group.name.in_(group_names)).all()
-                group_ids = [group.id for group in groups]
+                group_ids = {group.id for group in groups}
 
                 # Remove user from groups not in the new list
-                existing_groups = self.get_groups_by_member_id(user_id)
+                existing_groups = self._get_groups_by_member_id(db, user_id).all()
+                existing_group_ids = {group.id for group in existing_groups}
 
                 for group in existing_groups:
                     if group.id not in group_ids:
-                        group.user_ids.remove(user_id)
-                        db.query(Group).filter_by(id=group.id).update(
-                            {
-                                "user_ids": group.user_ids,
-                                "updated_at": int(time.time()),
-                            }
+                        self._set_members(
+                            db,
+                            group,
+                            [
+                                member_id
+                                for member_id in (group.user_ids or [])
+                                if member_id != user_id
+                            ],
                         )
 
                 # Add user to new groups
                 for group in groups:
-                    if user_id not in group.user_ids:
-                        group.user_ids.append(user_id)
-                        db.query(Group).filter_by(id=group.id).update(
-                            {
-                                "user_ids": group.user_ids,
-                                "updated_at": int(time.time()),
-                            }
-                        )
+                    if group.id not in existing_group_ids:
+                        self._set_members(db, group, [*(group.user_ids or []), user_id])
 
                 db.commit()
+                self.version += 1
                 return True
             except Exception as e:
                 log.exception(e)
@@ -292,15 +361,9 @@ class GroupTable:
                 if not group_user_ids or not isinstance(group_user_ids, list):
                     group_user_ids = []
 
-                group_user_ids = list(set(group_user_ids))  # Deduplicate
-
-                for user_id in user_ids:
-                    if user_id not in group_user_ids:
-                        group_user_ids.append(user_id)
-
-                group.user_ids = group_user_ids
-                group.updated_at = int(time.time())
+                self._set_members(db, group, [*group_user_ids, *(user_ids or [])])
                 db.commit()
+                self.version += 1
                 db.refresh(group)
                 return GroupModel.model_validate(group)
         except Exception as e:
@@ -317,20 +380,22 @@ class GroupTable:
                     return None
 
                 group_user_ids = group.user_ids
-
                 if not group_user_ids or not isinstance(group_user_ids, list):
-                    return GroupModel.model_validate(group)
-
-                group_user_ids = list(set(group_user_ids))  # Deduplicate
-
-                for user_id in user_ids:
-                    if user_id in group_user_ids:
-                        group_user_ids.remove(user_id)
+                    group_user_ids = []
 
-                group.user_ids = group_user_ids
-                group.updated_at = int(time.time())
+                removed_user_ids = set(user_ids or [])
+                self._set_members(
+                    db,
+                    group,
+                    [
+                        member_id
+                        for member_id in group_user_ids
+                        if member_id not in removed_user_ids
+                    ],
+                )
 
                 db.commit()
+                self.version += 1
                 db.refresh(group)
                 return GroupModel.model_validate(group)
         except Exception as e:
@@ -9,7 +9,7 @@ from open_webui.models.users import Users, UserNameResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -26,6 +26,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("idx_message_reaction_message_id", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -54,6 +56,19 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        # Channel and thread pages: WHERE channel_id = ... AND parent_id = ...
+        # ORDER BY created_at DESC
+        Index(
+            "idx_message_channel_parent_created",
+            "channel_id",
+            "parent_id",
+            "created_at",
+        ),
+        # Reply counts: WHERE parent_id IN (...) GROUP BY parent_id
+        Index("idx_message_parent_created", "parent_id", "created_at"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -141,32 +156,125 @@ class MessageTable:
             if not message:
                 return None
 
-            reply_to_message = (
-                self.get_message_by_id(message.reply_to_id)
-                if message.reply_to_id
-                else None
-            )
-
-            reactions = self.get_reactions_by_message_id(id)
-            thread_replies = self.get_thread_replies_by_message_id(id)
-
-            user = Users.get_user_by_id(message.user_id)
-            return MessageResponse.model_validate(
+            return self._get_message_responses(db, [message])[0]
+
+    def _get_message_responses(
+        self, db, messages: list[Message], include_reply_stats: bool = True
+    ) -> list[MessageResponse]:
+        """
+        Hydrate messages with their user, the message they reply to, reactions
+        and thread reply stats, in a fixed number of queries for the whole page.
+        """
+        if not messages:
+            return []
+
+        message_ids = [message.id for message in messages]
+
+        reply_to_ids = {
+            message.reply_to_id for message in messages if message.reply_to_id
+        }
+        reply_to_messages = (
+            db.query(Message).filter(Message.id.in_(reply_to_ids)).all()
+            if reply_to_ids
+            else []
+        )
+
+        users = Users.get_user_names_by_ids(
+            [message.user_id for message in messages + reply_to_messages]
+        )
+
+        def get_user(user_id):
+            user = users.get(user_id)
+            return user.model_dump() if user else None
+
+        reply_to_message_by_id = {
+            message.id: {
+                **MessageModel.model_validate(message).model_dump(),
+                "user": get_user(message.user_id),
+            }
+            for message in reply_to_messages
+        }
+
+        reactions = self._get_reactions_by_message_ids(db, message_ids)
+        reply_stats = (
+            self._get_reply_stats_by_message_ids(db, message_ids)
+            if include_reply_stats
+            else {}
+        )
+
+        return [
+            MessageResponse.model_validate(
                 {
                     **MessageModel.model_validate(message).model_dump(),
-                    "user": user.model_dump() if user else None,
-                    "reply_to_message": (
-                        reply_to_message.model_dump() if reply_to_message else None
-                    ),
-                    "latest_reply_at": (
-                        thread_replies[0].created_at if thread_replies else None
-                    ),
-                    "reply_count": len(thread_replies),
-                    "reactions": reactions,
+                    "user": get_user(message.user_id),
+                    "reply_to_message": reply_to_message_by_id.get(message.reply_to_id),
+                    "reply_count": reply_stats.get(message.id, (0, None))[0],
+                    "latest_reply_at": reply_stats.get(message.id, (0, None))[1],
+                    "reactions": reactions.get(message.id, []),
                 }
             )
+            for message in messages
+        ]
+
+    def _get_reply_stats_by_message_ids(
+        self, db, ids: list[str]
+    ) -> dict[str, tuple[int, Optional[int]]]:
+        rows = (
+            db.query(
+                Message.parent_id,
+                func.count(Message.id),
+                func.max(Message.created_at),
+            )
+            .filter(Message.parent_id.in_(ids))
+            .group_by(Message.parent_id)
+            .all()
+        )
+        return {
+            parent_id: (count, latest_reply_at)
+            for parent_id, count, latest_reply_at in rows
+        }
+
+    def _get_reactions_by_message_ids(
+        self, db, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        all_reactions = (
+            db.query(
+                MessageReaction.message_id,
+                MessageReaction.name,
+                MessageReaction.user_id,
+            )
+            .filter(MessageReaction.message_id.in_(ids))
+            .order_by(MessageReaction.created_at)
+            .all()
+        )
+
+        reactions_by_message_id = {}
+        for message_id, name, user_id in all_reactions:
+            reactions = reactions_by_message_id.setdefault(message_id, {})
+            if name not in reactions:
+                reactions[name] = {"name": name, "user_ids": [], "count": 0}
+            reactions[name]["user_ids"].append(user_id)
+            reactions[name]["count"] += 1
+
+        return {
+            message_id: [Reactions(**reaction) for reaction in reactions.values()]
+            for message_id, reactions in reactions_by_message_id.items()
+        }
+
+    def get_reply_stats_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, tuple[int, Optional[int]]]:
+        """Reply count and latest reply time (time_ns) per thread parent."""
+        with get_db() as db:
+            return self._get_reply_stats_by_message_ids(db, ids)
 
-    def get_thread_replies_by_message_id(self, id: str) -> list[MessageReplyToResponse]:
+    def get_reactions_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        with get_db() as db:
+            return self._get_reactions_by_message_ids(db, ids)
+
+    def get_thread_replies_by_message_id(self, id: str) -> list[MessageResponse]:
         with get_db() as db:
             all_messages = (
                 db.query(Message)
@@ -174,27 +282,9 @@ class MessageTable:
                 .order_by(Message.created_at.desc())
                 .all()
             )
-
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(message.reply_to_id)
-                    if message.reply_to_id
-                    else None
-                )
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._get_message_responses(
+                db, all_messages, include_reply_stats=False
+            )
 
     def get_reply_user_ids_by_message_id(self, id: str) -> list[str]:
         with get_db() as db:
@@ -203,53 +293,63 @@ class MessageTable:
                 for message in db.query(Message).filter_by(parent_id=id).all()
             ]
 
+    def _filter_before(self, db, query, before: Optional[str]):
+        # Keyset pagination: messages older than the ``before`` message, in
+        # (created_at, id) order so equal timestamps are neither skipped nor
+        # repeated
+        cursor = db.get(Message, before) if before else None
+        if cursor:
+            query = query.filter(
+                or_(
+                    Message.created_at < cursor.created_at,
+                    and_(
+                        Message.created_at == cursor.created_at,
+                        Message.id < cursor.id,
+                    ),
+                )
+            )
+        return query
+
     def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
-    ) -> list[MessageReplyToResponse]:
+        self,
+        channel_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[str] = None,
+    ) -> list[MessageResponse]:
         with get_db() as db:
+            query = db.query(Message).filter_by(channel_id=channel_id, parent_id=None)
+            query = self._filter_before(db, query, before)
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
+                query.order_by(Message.created_at.desc(), Message.id.desc())
                 .offset(skip)
                 .limit(limit)
                 .all()
             )
-
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(message.reply_to_id)
-                    if message.reply_to_id
-                    else None
-                )
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._get_message_responses(db, all_messages)
 
     def get_messages_by_parent_id(
-        self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
-    ) -> list[MessageReplyToResponse]:
+        self,
+        channel_id: str,
+        parent_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[str] = None,
+    ) -> list[MessageResponse]:
         with get_db() as db:
             message = db.get(Message, parent_id)
 
             if not message:
                 return []
 
+            query = db.query(Message).filter_by(
+                channel_id=channel_id, parent_id=parent_id
+            )
+            query = self._filter_before(db, query, before)
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=parent_id)
-                .order_by(Message.created_at.desc())
+                query.order_by(Message.created_at.desc(), Message.id.desc())
                 .offset(skip)
                 .limit(limit)
                 .all()
@@ -259,26 +359,9 @@ class MessageTable:
             if len(all_messages) < limit:
                 all_messages.append(message)
 
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(message.reply_to_id)
-                    if message.reply_to_id
-                    else None
-                )
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._get_message_responses(
+                db, all_messages, include_reply_stats=False
+            )
 
     def update_message_by_id(
         self, id: str, form_data: MessageForm
@@ -318,21 +401,7 @@ class MessageTable:
             return MessageReactionModel.model_validate(result) if result else None
 
     def get_reactions_by_message_id(self, id: str) -> list[Reactions]:
-        with get_db() as db:
-            all_reactions = db.query(MessageReaction).filter_by(message_id=id).all()
-
-            reactions = {}
-            for reaction in all_reactions:
-                if reaction.name not in reactions:
-                    reactions[reaction.name] = {
-                        "name": reaction.name,
-                        "user_ids": [],
-                        "count": 0,
-                    }
-                reactions[reaction.name]["user_ids"].append(reaction.user_id)
-                reactions[reaction.name]["count"] += 1
-
-            return [Reactions(**reaction) for reaction in reactions.values()]
+        return self.get_reactions_by_message_ids([id]).get(id, [])
 
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
@@ -5,7 +5,6 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 
-from open_webui.models.groups import Groups
 from open_webui.models.users import Users, UserResponse
 
 
@@ -16,7 +15,8 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_permission_context, has_access
+from open_webui.utils.model_catalog import invalidate_model_catalog
 
 
 log = logging.getLogger(__name__)
@@ -160,6 +160,7 @@ class ModelsTable:
                 result = Model(**model.model_dump())
                 db.add(result)
                 db.commit()
+                invalidate_model_catalog()
                 db.refresh(result)
 
                 if result:
@@ -207,7 +208,7 @@ class ModelsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
         models = self.get_models()
-        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user_id)}
+        user_group_ids = get_permission_context(user_id).group_ids
         return [
             model
             for model in models
@@ -235,6 +236,7 @@ class ModelsTable:
                     }
                 )
                 db.commit()
+                invalidate_model_catalog()
 
                 return self.get_model_by_id(id)
             except Exception:
@@ -250,6 +252,7 @@ class ModelsTable:
                     .update(model.model_dump(exclude={"id"}))
                 )
                 db.commit()
+                invalidate_model_catalog()
 
                 model = db.get(Model, id)
                 db.refresh(model)
@@ -263,6 +266,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).filter_by(id=id).delete()
                 db.commit()
+                invalidate_model_catalog()
 
                 return True
         except Exception:
@@ -273,6 +277,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).delete()
                 db.commit()
+                invalidate_model_catalog()
 
                 return True
         except Exception:
@@ -314,6 +319,7 @@ class ModelsTable:
                         db.delete(model)
 
                 db.commit()
+                invalidate_model_catalog()
 
                 return [
                     ModelModel.model_validate(model) for model in db.query(Model).all()
@@ -1,10 +1,18 @@
+import hashlib
+import logging
+import threading
 import time
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
 
 
-from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
+from open_webui.env import (
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL,
+    DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL,
+    SRC_LOG_LEVELS,
+    USER_CACHE_TTL,
+)
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
 from open_webui.utils.misc import throttle
@@ -12,10 +20,13 @@ from open_webui.utils.misc import throttle
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, Date
-from sqlalchemy import or_
+from sqlalchemy import bindparam, or_, update
 
 import datetime
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
 ####################
 # User DB Schema
 ####################
@@ -150,7 +161,22 @@ class UserUpdateForm(BaseModel):
     password: Optional[str] = None
 
 
+USER_CACHE_MAX_SIZE = 10000
+
+
 class UsersTable:
+    def __init__(self):
+        # Authenticated users by id, and user ids by API key hash, see
+        # get_cached_user_by_id
+        self._user_cache: dict[str, tuple[float, UserModel]] = {}
+        self._api_key_cache: dict[str, tuple[float, str]] = {}
+        self._user_cache_version = 0
+        self._user_cache_lock = threading.Lock()
+
+        # user id -> last active timestamp, see touch_user_last_active_by_id
+        self._pending_last_active: dict[str, int] = {}
+        self._pending_last_active_lock = threading.Lock()
+
     def insert_new_user(
         self,
         id: str,
@@ -199,6 +225,64 @@ class UsersTable:
         except Exception:
             return None
 
+    def _cache_user(self, user: UserModel, version: int, api_key_hash=None):
+        if USER_CACHE_TTL <= 0:
+            return
+
+        expires_at = time.monotonic() + USER_CACHE_TTL
+        with self._user_cache_lock:
+            # Skip if the user was invalidated while being read
+            if version != self._user_cache_version:
+                return
+
+            if len(self._user_cache) >= USER_CACHE_MAX_SIZE:
+                self._user_cache.clear()
+                self._api_key_cache.clear()
+
+            self._user_cache[user.id] = (expires_at, user)
+            if api_key_hash:
+                self._api_key_cache[api_key_hash] = (expires_at, user.id)
+
+    def _invalidate_cached_user(self, id: str):
+        with self._user_cache_lock:
+            self._user_cache_version += 1
+            self._user_cache.pop(id, None)
+            for api_key_hash, (_, user_id) in list(self._api_key_cache.items()):
+                if user_id == id:
+                    del self._api_key_cache[api_key_hash]
+
+    def get_cached_user_by_id(self, id: str) -> Optional[UserModel]:
+        """
+        Like get_user_by_id, but reuses the user for USER_CACHE_TTL seconds.
+        For authentication, where every request needs the user.
+        """
+        entry = self._user_cache.get(id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1].model_copy()
+
+        version = self._user_cache_version
+        user = self.get_user_by_id(id)
+        if user:
+            self._cache_user(user, version)
+            return user.model_copy()
+        return None
+
+    def get_cached_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
+        api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+
+        entry = self._api_key_cache.get(api_key_hash)
+        if entry and entry[0] > time.monotonic():
+            user = self.get_cached_user_by_id(entry[1])
+            if user and user.api_key == api_key:
+                return user
+
+        version = self._user_cache_version
+        user = self.get_user_by_api_key(api_key)
+        if user:
+            self._cache_user(user, version, api_key_hash)
+            return user.model_copy()
+        return None
+
     def get_user_by_email(self, email: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -290,6 +374,21 @@ class UsersTable:
             users = db.query(User).filter(User.id.in_(user_ids)).all()
             return [UserModel.model_validate(user) for user in users]
 
+    def get_user_names_by_ids(self, user_ids: list[str]) -> dict[str, UserNameResponse]:
+        if not user_ids:
+            return {}
+
+        with get_db() as db:
+            users = (
+                db.query(User.id, User.name, User.role, User.profile_image_url)
+                .filter(User.id.in_(set(user_ids)))
+                .all()
+            )
+            return {
+                user.id: UserNameResponse.model_validate(user, from_attributes=True)
+                for user in users
+            }
+
     def get_num_users(self) -> Optional[int]:
         with get_db() as db:
             return db.query(User).count()
@@ -327,6 +426,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                self._invalidate_cached_user(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -341,6 +441,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                self._invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -361,6 +462,47 @@ class UsersTable:
         except Exception:
             return None
 
+    def touch_user_last_active_by_id(self, id: str):
+        """
+        Record that the user is active. The timestamp is written by the next
+        flush_user_last_active, so frequent requests cost at most one write
+        per user per DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL.
+        """
+        if DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL <= 0:
+            self.update_user_last_active_by_id(id)
+            return
+
+        with self._pending_last_active_lock:
+            self._pending_last_active[id] = int(time.time())
+
+    def flush_user_last_active(self) -> int:
+        with self._pending_last_active_lock:
+            pending = self._pending_last_active
+            self._pending_last_active = {}
+
+        if not pending:
+            return 0
+
+        try:
+            with get_db() as db:
+                # A core executemany, as the ORM's bulk update by primary key
+                # fails the whole batch if a user was deleted in the meantime
+                table = User.__table__
+                db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("_id"))
+                    .values(last_active_at=bindparam("_last_active_at")),
+                    [
+                        {"_id": id, "_last_active_at": last_active_at}
+                        for id, last_active_at in pending.items()
+                    ],
+                )
+                db.commit()
+            return len(pending)
+        except Exception as e:
+            log.error(f"Failed to write last active timestamps: {e}")
+            return 0
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -368,6 +510,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                self._invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -379,6 +522,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                self._invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -399,6 +543,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                self._invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -417,6 +562,10 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                    self._invalidate_cached_user(id)
+
+                with self._pending_last_active_lock:
+                    self._pending_last_active.pop(id, None)
 
                 return True
             else:
@@ -429,6 +578,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                self._invalidate_cached_user(id)
                 return True if result == 1 else False
         except Exception:
             return False
@@ -0,0 +1,287 @@
+import logging
+import queue
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from langchain_core.documents import Document
+
+from open_webui.config import (
+    RAG_INGEST_EMBEDDING_CONCURRENCY,
+    RAG_INGEST_INSERT_BATCH_SIZE,
+    RAG_INGEST_WORKERS,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class IngestionFile:
+    """A file to be ingested into ``collection_name``, and how far it got."""
+
+    def __init__(self, id: str, collection_name: str, source: Any = None):
+        self.id = id
+        self.collection_name = collection_name
+        self.source = source
+
+        self.status = "pending"
+        self.error: Optional[str] = None
+
+        self.docs: list[Document] = []
+        self.items: list[Optional[dict]] = []
+        self.embedded = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+
+class IngestionPipeline:
+    """
+    Ingests many files into the vector DB at once, in stages that overlap
+    across files: extract (and split) runs for several files in parallel,
+    embed packs the chunks of different files into full batches, and insert
+    writes the chunks of a collection together.
+
+    ``extract`` returns the chunks of a file, or None when there is nothing
+    left to embed for it. A file that fails at any stage is marked failed and
+    the rest carry on: failed embedding batches and inserts are retried file
+    by file, so only the files at fault fail. ``insert`` should therefore not
+    leave a failed insert partly written.
+    """
+
+    def __init__(
+        self,
+        extract: Callable[[IngestionFile], Optional[list[Document]]],
+        embed: Callable[[list[str]], list],
+        insert: Callable[[str, list[dict]], None],
+        embedding_batch_size: int,
+        workers: int = RAG_INGEST_WORKERS,
+        embedding_concurrency: int = RAG_INGEST_EMBEDDING_CONCURRENCY,
+        insert_batch_size: int = RAG_INGEST_INSERT_BATCH_SIZE,
+    ):
+        self.extract = extract
+        self.embed = embed
+        self.insert = insert
+
+        self.embedding_batch_size = max(1, embedding_batch_size)
+        self.workers = workers
+        self.embedding_concurrency = embedding_concurrency
+        self.insert_batch_size = insert_batch_size
+
+    def run(self, files: list[IngestionFile]) -> dict:
+        """Ingest ``files``, updating their status, and return throughput stats."""
+        started_at = time.monotonic()
+
+        events = queue.Queue()
+        in_flight = 0
+        extracting = 0
+        embedding = 0
+
+        # (file, chunk index) waiting for an embedding batch
+        pending: list[tuple[IngestionFile, int]] = []
+        # Embedded files waiting to be inserted, per collection
+        buffers: dict[str, list[IngestionFile]] = defaultdict(list)
+        buffered_chunks: dict[str, int] = defaultdict(int)
+
+        stats = {"embedding_requests": 0, "inserts": 0}
+
+        def fail(file: IngestionFile, error: Exception):
+            if file.done:
+                return
+            log.error(f"Failed to ingest file {file.id}: {error}")
+            file.status = "failed"
+            file.error = str(error)
+            file.items = []
+
+        def complete(file: IngestionFile):
+            file.status = "completed"
+            file.items = []
+
+        with (
+            ThreadPoolExecutor(
+                self.workers, thread_name_prefix="ingest-extract"
+            ) as extract_pool,
+            ThreadPoolExecutor(
+                self.embedding_concurrency, thread_name_prefix="ingest-embed"
+            ) as embed_pool,
+            # A single writer keeps inserts from contending for the vector DB
+            ThreadPoolExecutor(1, thread_name_prefix="ingest-insert") as insert_pool,
+        ):
+
+            def submit(pool, kind: str, payload, fn, *args):
+                nonlocal in_flight
+
+                def task():
+                    try:
+                        events.put((kind, payload, fn(*args), None))
+                    except Exception as e:
+                        events.put((kind, payload, None, e))
+
+                in_flight += 1
+                pool.submit(task)
+
+            def submit_embedding(batch: list[tuple[IngestionFile, int]], isolated):
+                nonlocal embedding
+                embedding += 1
+                stats["embedding_requests"] += 1
+                submit(
+                    embed_pool,
+                    "embed",
+                    (batch, isolated),
+                    self.embed,
+                    [file.docs[idx].page_content for file, idx in batch],
+                )
+
+            def submit_insert(collection_name, group: list[IngestionFile], isolated):
+                stats["inserts"] += 1
+                submit(
+                    insert_pool,
+                    "insert",
+                    (collection_name, group, isolated),
+                    self.insert,
+                    collection_name,
+                    [item for file in group for item in file.items],
+                )
+
+            def flush_embeddings(partial: bool):
+                nonlocal pending
+                pending = [(file, idx) for file, idx in pending if not file.done]
+                while pending and (
+                    partial or len(pending) >= self.embedding_batch_size
+                ):
+                    batch = pending[: self.embedding_batch_size]
+                    pending = pending[self.embedding_batch_size :]
+                    submit_embedding(batch, isolated=False)
+
+            def flush_inserts(collection_name: str):
+                group = [file for file in buffers.pop(collection_name) if not file.done]
+                buffered_chunks.pop(collection_name)
+                if group:
+                    submit_insert(collection_name, group, isolated=len(group) == 1)
+
+            def on_extracted(file: IngestionFile, docs, error):
+                nonlocal extracting
+                extracting -= 1
+
+                if error is not None:
+                    fail(file, error)
+                elif not docs:
+                    complete(file)
+                else:
+                    file.docs = docs
+                    file.items = [None] * len(docs)
+                    pending.extend((file, idx) for idx in range(len(docs)))
+                    flush_embeddings(partial=False)
+
+            def on_embedded(batch, isolated, vectors, error):
+                nonlocal embedding
+                embedding -= 1
+
+                if error is None and (not vectors or len(vectors) != len(batch)):
+                    error = ValueError(
+                        f"Expected {len(batch)} embeddings, got {len(vectors or [])}"
+                    )
+
+                if error is not None:
+                    by_file: dict[IngestionFile, list] = defaultdict(list)
+                    for file, idx in batch:
+                        by_file[file].append((file, idx))
+
+                    if not isolated and len(by_file) > 1:
+                        log.warning(
+                            f"Embedding batch of {len(by_file)} files failed, "
+                            f"retrying file by file: {error}"
+                        )
+                        for file_batch in by_file.values():
+                            submit_embedding(file_batch, isolated=True)
+                    else:
+                        for file, _ in batch:
+                            fail(file, error)
+                    return
+
+                for (file, idx), vector in zip(batch, vectors):
+                    if file.done:
+                        continue
+
+                    doc = file.docs[idx]
+                    file.items[idx] = {
+                        "id": str(uuid.uuid4()),
+                        "text": doc.page_content,
+                        "vector": vector,
+                        "metadata": doc.metadata,
+                    }
+                    file.embedded += 1
+
+                    if file.embedded == len(file.docs):
+                        # Inserted only once every chunk is embedded, so a
+                        # file is never left half written
+                        file.docs = []
+                        collection_name = file.collection_name
+                        buffers[collection_name].append(file)
+                        buffered_chunks[collection_name] += len(file.items)
+                        if buffered_chunks[collection_name] >= self.insert_batch_size:
+                            flush_inserts(collection_name)
+
+            def on_inserted(collection_name, group, isolated, error):
+                if error is None:
+                    for file in group:
+                        complete(file)
+                elif not isolated:
+                    log.warning(
+                        f"Inserting {len(group)} files into {collection_name} "
+                        f"failed, retrying file by file: {error}"
+                    )
+                    for file in group:
+                        submit_insert(collection_name, [file], isolated=True)
+                else:
+                    for file in group:
+                        fail(file, error)
+
+            for file in files:
+                extracting += 1
+                submit(extract_pool, "extract", file, self.extract, file)
+
+            while in_flight:
+                kind, payload, result, error = events.get()
+                in_flight -= 1
+
+                if kind == "extract":
+                    on_extracted(payload, result, error)
+                elif kind == "embed":
+                    on_embedded(*payload, result, error)
+                else:
+                    on_inserted(*payload, error)
+
+                # Partial batches are only sent once no more chunks can join them
+                if extracting == 0:
+                    flush_embeddings(partial=True)
+                    if embedding == 0:
+                        for collection_name in list(buffers):
+                            flush_inserts(collection_name)
+
+        elapsed = max(time.monotonic() - started_at, 1e-6)
+        completed = [file for file in files if file.status == "completed"]
+        chunks = sum(file.embedded for file in completed)
+
+        report = {
+            "files": len(files),
+            "completed": len(completed),
+            "failed": sum(1 for file in files if file.status == "failed"),
+            "chunks": chunks,
+            "embedding_requests": stats["embedding_requests"],
+            "inserts": stats["inserts"],
+            "seconds": round(elapsed, 3),
+            "files_per_second": round(len(completed) / elapsed, 2),
+            "chunks_per_second": round(chunks / elapsed, 2),
+        }
+        log.info(
+            f"Ingested {report['completed']}/{report['files']} files and "
+            f"{chunks} chunks in {elapsed:.2f}s "
+            f"({report['files_per_second']} files/s, "
+            f"{report['chunks_per_second']} chunks/s)"
+        )
+        return report
@@ -4,6 +4,8 @@ import ftfy
 import sys
 import json
 
+from typing import Iterator
+
 from azure.identity import DefaultAzureCredential
 from langchain_community.document_loaders import (
     AzureAIDocumentIntelligenceLoader,
@@ -21,6 +23,7 @@ from langchain_community.document_loaders import (
     UnstructuredXMLLoader,
     YoutubeLoader,
 )
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
 
 from open_webui.retrieval.loaders.external_document import ExternalDocumentLoader
@@ -28,8 +31,14 @@ from open_webui.retrieval.loaders.external_document import ExternalDocumentLoade
 from open_webui.retrieval.loaders.mistral import MistralLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
 from open_webui.retrieval.loaders.mineru import MinerULoader
+from open_webui.retrieval.loaders.pdf_parallel import ParallelPDFLoader
 
 
+from open_webui.config import (
+    PDF_PARALLEL_EXTRACTION_MAX_WORKERS,
+    PDF_PARALLEL_EXTRACTION_PAGES_PER_TASK,
+    PDF_PARALLEL_EXTRACTION_WORKER_MAX_MEMORY_MB,
+)
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
 
 logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
@@ -233,15 +242,22 @@ class Loader:
     def load(
         self, filename: str, file_content_type: str, file_path: str
     ) -> list[Document]:
+        return list(self.lazy_load(filename, file_content_type, file_path))
+
+    def lazy_load(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> Iterator[Document]:
+        """
+        Yield documents as the underlying loader produces them, so that callers
+        can start processing the first pages before extraction has finished.
+        """
         loader = self._get_loader(filename, file_content_type, file_path)
-        docs = loader.load()
+        docs = loader.lazy_load() if isinstance(loader, BaseLoader) else loader.load()
 
-        return [
-            Document(
+        for doc in docs:
+            yield Document(
                 page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
             )
-            for doc in docs
-        ]
 
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
@@ -403,7 +419,18 @@ class Loader:
                 api_key=self.kwargs.get("MISTRAL_OCR_API_KEY"), file_path=file_path
             )
         else:
-            if file_ext == "pdf":
+            if (
+                file_ext == "pdf"
+                and self.kwargs.get("PDF_PARALLEL_EXTRACTION")
+                and not self.kwargs.get("PDF_EXTRACT_IMAGES")
+            ):
+                loader = ParallelPDFLoader(
+                    file_path,
+                    max_workers=PDF_PARALLEL_EXTRACTION_MAX_WORKERS,
+                    pages_per_task=PDF_PARALLEL_EXTRACTION_PAGES_PER_TASK,
+                    max_memory_mb=PDF_PARALLEL_EXTRACTION_WORKER_MAX_MEMORY_MB,
+                )
+            elif file_ext == "pdf":
                 loader = PyPDFLoader(
                     file_path, extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES")
                 )
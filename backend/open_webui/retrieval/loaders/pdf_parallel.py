@@ -0,0 +1,177 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+DEFAULT_PAGES_PER_TASK = 8
+
+# Shared across requests so that worker start-up (interpreter spawn and pypdf
+# import) is only paid once per process, not once per uploaded document.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[Tuple[int, int]] = None
+_pool_lock = threading.Lock()
+
+# Per worker process: the last opened reader, so consecutive page ranges of the
+# same document don't re-parse the cross-reference table.
+_worker_reader = None
+_worker_reader_path = None
+
+
+def _init_worker(max_memory_mb: int):
+    if max_memory_mb and max_memory_mb > 0:
+        try:
+            import resource
+
+            limit = max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            log.warning(f"Unable to apply PDF worker memory limit: {e}")
+
+
+def _get_reader(file_path: str):
+    global _worker_reader, _worker_reader_path
+
+    if _worker_reader is None or _worker_reader_path != file_path:
+        from pypdf import PdfReader
+
+        _worker_reader = PdfReader(file_path)
+        _worker_reader_path = file_path
+    return _worker_reader
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    reader = _get_reader(file_path)
+    return [(reader.pages[idx].extract_text() or "") for idx in range(start, end)]
+
+
+def get_pdf_page_count(file_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+
+def _get_pool(max_workers: int, max_memory_mb: int) -> ProcessPoolExecutor:
+    global _pool, _pool_key
+
+    with _pool_lock:
+        key = (max_workers, max_memory_mb)
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+
+            # spawn rather than fork: the server process is multi-threaded
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(max_memory_mb,),
+            )
+            _pool_key = key
+        return _pool
+
+
+def _reset_pool():
+    global _pool, _pool_key
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_key = None
+
+
+def iter_pdf_pages(
+    file_path: str,
+    max_workers: Optional[int] = None,
+    pages_per_task: Optional[int] = None,
+    max_memory_mb: int = 0,
+) -> Iterator[Tuple[int, str, int]]:
+    """
+    Extract the text of a PDF page-parallel, yielding (page_index, text, total_pages)
+    in page order as soon as each page is available.
+
+    Page ranges are dispatched to a process pool; at most two ranges per worker
+    are in flight so finished-but-unconsumed pages stay bounded regardless of
+    the document size.
+    """
+    total_pages = get_pdf_page_count(file_path)
+    pages_per_task = max(1, pages_per_task or DEFAULT_PAGES_PER_TASK)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, os.cpu_count() or 1))
+
+    ranges = [
+        (start, min(start + pages_per_task, total_pages))
+        for start in range(0, total_pages, pages_per_task)
+    ]
+
+    # Not worth the IPC round-trip for short documents
+    if len(ranges) <= 1 or max_workers == 1:
+        for start, end in ranges:
+            for offset, text in enumerate(_extract_page_range(file_path, start, end)):
+                yield start + offset, text, total_pages
+        return
+
+    pool = _get_pool(max_workers, max_memory_mb)
+    pending = deque()
+    next_range = 0
+
+    try:
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < max_workers * 2:
+                start, end = ranges[next_range]
+                pending.append(
+                    (start, pool.submit(_extract_page_range, file_path, start, end))
+                )
+                next_range += 1
+
+            start, future = pending.popleft()
+            for offset, text in enumerate(future.result()):
+                yield start + offset, text, total_pages
+    except BrokenProcessPool:
+        log.error(f"PDF extraction worker died while processing {file_path}")
+        _reset_pool()
+        raise
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+class ParallelPDFLoader(BaseLoader):
+    def __init__(
+        self,
+        file_path: str,
+        max_workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        max_memory_mb: int = 0,
+    ):
+        self.file_path = file_path
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self.max_memory_mb = max_memory_mb
+
+    def lazy_load(self) -> Iterator[Document]:
+        for page, text, total_pages in iter_pdf_pages(
+            self.file_path,
+            max_workers=self.max_workers,
+            pages_per_task=self.pages_per_task,
+            max_memory_mb=self.max_memory_mb,
+        ):
+            yield Document(
+                page_content=text,
+                metadata={
+                    "source": self.file_path,
+                    "page": page,
+                    "total_pages": total_pages,
+                },
+            )
@@ -29,7 +29,8 @@ from open_webui.retrieval.vector.main import GetResult
 from open_webui.utils.access_control import has_access
 from open_webui.utils.misc import get_message_list
 
-from open_webui.retrieval.web.utils import get_web_loader
+from open_webui.retrieval.web.cache import get_loader_validators, get_web_page_cache
+from open_webui.retrieval.web.utils import get_web_loader, safe_validate_urls
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 
@@ -75,8 +76,20 @@ def get_loader(request, url: str):
 
 
 def get_content_from_url(request, url: str) -> str:
-    loader = get_loader(request, url)
-    docs = loader.load()
+    web_page_cache = get_web_page_cache()
+
+    docs = None
+    if is_youtube_url(url) or safe_validate_urls([url]):
+        docs = web_page_cache.lookup(
+            [url],
+            verify_ssl=request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION,
+        ).get(url)
+
+    if docs is None:
+        loader = get_loader(request, url)
+        docs = loader.load()
+        web_page_cache.put(url, docs, get_loader_validators(loader, url))
+
     content = " ".join([doc.page_content for doc in docs])
     return content, docs
 
@@ -133,10 +146,73 @@ def query_doc(
         raise e
 
 
+def query_docs(
+    collection_name: str, query_embeddings: list[list[float]], k: int
+) -> list[dict]:
+    """
+    Search one collection with several query embeddings.
+    Returns one result dict per query embedding.
+    """
+    try:
+        log.debug(f"query_docs:doc {collection_name} ({len(query_embeddings)} queries)")
+        if VECTOR_DB_CLIENT.supports_batched_search:
+            result = VECTOR_DB_CLIENT.search(
+                collection_name=collection_name,
+                vectors=query_embeddings,
+                limit=k,
+            )
+            return split_search_result(result)
+
+        results = []
+        for query_embedding in query_embeddings:
+            result = VECTOR_DB_CLIENT.search(
+                collection_name=collection_name,
+                vectors=[query_embedding],
+                limit=k,
+            )
+            results.extend(split_search_result(result))
+        return results
+    except Exception as e:
+        log.exception(f"Error querying doc {collection_name} with limit {k}: {e}")
+        raise e
+
+
+def split_search_result(result) -> list[dict]:
+    """Split a multi-query SearchResult into one single-query result dict per row."""
+    if result is None:
+        return []
+
+    result = result.model_dump()
+    return [
+        {
+            "ids": [result["ids"][idx]],
+            "distances": [result["distances"][idx]],
+            "documents": [result["documents"][idx]],
+            "metadatas": [result["metadatas"][idx]],
+        }
+        for idx in range(len(result["ids"] or []))
+    ]
+
+
 def get_doc(collection_name: str, user: UserModel = None):
     try:
         log.debug(f"get_doc:doc {collection_name}")
-        result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        ids, documents, metadatas = [], [], []
+        for batch in VECTOR_DB_CLIENT.iter_get(
+            collection_name=collection_name, fields=["documents", "metadatas"]
+        ):
+            ids.extend(batch.ids[0])
+            documents.extend(batch.documents[0])
+            metadatas.extend(batch.metadatas[0])
+
+        # The batches were already validated, skip re-validating the merged lists
+        result = (
+            GetResult.model_construct(
+                ids=[ids], documents=[documents], metadatas=[metadatas]
+            )
+            if ids
+            else None
+        )
 
         if result:
             log.info(f"query_doc:result {result.ids} {result.metadatas}")
@@ -311,20 +387,32 @@ def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
 
 
 def get_all_items_from_collections(collection_names: list[str]) -> dict:
-    results = []
+    combined_ids = []
+    combined_documents = []
+    combined_metadatas = []
 
     for collection_name in collection_names:
         if collection_name:
             try:
-                result = get_doc(collection_name=collection_name)
-                if result is not None:
-                    results.append(result.model_dump())
+                # Stream the collection page by page instead of materialising
+                # (and then copying) a full GetResult per collection
+                for batch in VECTOR_DB_CLIENT.iter_get(
+                    collection_name=collection_name,
+                    fields=["documents", "metadatas"],
+                ):
+                    combined_ids.extend(batch.ids[0])
+                    combined_documents.extend(batch.documents[0])
+                    combined_metadatas.extend(batch.metadatas[0])
             except Exception as e:
                 log.exception(f"Error when querying the collection: {e}")
         else:
             pass
 
-    return merge_get_results(results)
+    return {
+        "documents": [combined_documents],
+        "metadatas": [combined_metadatas],
+        "ids": [combined_ids],
+    }
 
 
 def query_collection(
@@ -336,20 +424,7 @@ def query_collection(
     results = []
     error = False
 
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
+    collection_names = [name for name in collection_names if name]
 
     # Generate all query embeddings (in one call)
     query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
@@ -357,21 +432,55 @@ def query_collection(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    if not collection_names or not query_embeddings:
+        return merge_and_sort_query_results([], k=k)
 
-    for result, err in task_results:
-        if err is not None:
+    if (
+        VECTOR_DB_CLIENT.supports_multi_collection_search
+        and VECTOR_DB_CLIENT.supports_batched_search
+    ):
+        # Every query against every collection in a single round-trip
+        try:
+            search_results = VECTOR_DB_CLIENT.search_collections(
+                collection_names=collection_names,
+                vectors=query_embeddings,
+                limit=k,
+            )
+            for result in search_results.values():
+                results.extend(split_search_result(result))
+        except Exception as e:
+            log.exception(f"Error when querying the collections: {e}")
             error = True
-        elif result is not None:
-            results.append(result)
+    else:
+
+        def process_query_collection(collection_name):
+            try:
+                return (
+                    query_docs(
+                        collection_name=collection_name,
+                        query_embeddings=query_embeddings,
+                        k=k,
+                    ),
+                    None,
+                )
+            except Exception as e:
+                log.exception(f"Error when querying the collection: {e}")
+                return [], e
+
+        # One task per collection; query_docs sends all query embeddings in one
+        # search call when the backend supports it
+        with ThreadPoolExecutor() as executor:
+            future_results = [
+                executor.submit(process_query_collection, collection_name)
+                for collection_name in collection_names
+            ]
+            task_results = [future.result() for future in future_results]
+
+        for result, err in task_results:
+            if err is not None:
+                error = True
+            else:
+                results.extend(result)
 
     if error and not results:
         log.warning("All collection queries failed. No results returned.")
@@ -397,9 +506,9 @@ def query_collection_with_hybrid_search(
     for collection_name in collection_names:
         try:
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
+                f"query_collection_with_hybrid_search:get_doc:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
+            collection_results[collection_name] = get_doc(
                 collection_name=collection_name
             )
         except Exception as e:
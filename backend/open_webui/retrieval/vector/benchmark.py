@@ -0,0 +1,253 @@
+"""
+Benchmark for the configured vector backend.
+
+    python -m open_webui.retrieval.vector.benchmark search \
+        --collections file-abc,file-def --queries 3 --dim 384 --runs 10
+
+Compares the round-trip count and latency of the search strategies used by
+retrieval.utils.query_collection:
+
+    per_pair          one search() per (query vector, collection) pair
+    per_collection    one search() per collection carrying all query vectors
+    multi_collection  one search_collections() call for everything
+
+    python -m open_webui.retrieval.vector.benchmark recall \
+        --collections file-abc --queries 50 --k 10 --ef-search 20,40,80,160
+
+Measures ANN recall@k and latency against exact search for each ef_search
+value. Query vectors are sampled from the collections themselves. Needs a
+backend with search_exact() (currently pgvector).
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+
+
+class RoundTripCounter:
+    """Counts calls into the vector client while the context is active."""
+
+    def __init__(self, client):
+        self.client = client
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _increment(self):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        self._search = self.client.search
+        self._search_collections = self.client.search_collections
+
+        def search(*args, **kwargs):
+            self._increment()
+            return self._search(*args, **kwargs)
+
+        def search_collections(*args, **kwargs):
+            if self.client.supports_multi_collection_search:
+                self._increment()
+                # native implementations don't go through search()
+                return self._search_collections(*args, **kwargs)
+            return type(self.client).search_collections(self.client, *args, **kwargs)
+
+        self.client.search = search
+        self.client.search_collections = search_collections
+        return self
+
+    def __exit__(self, *exc):
+        del self.client.search
+        del self.client.search_collections
+
+
+def _per_pair(client, collection_names, vectors, k):
+    with ThreadPoolExecutor() as executor:
+        futures = [
+            executor.submit(client.search, collection_name, [vector], k)
+            for vector in vectors
+            for collection_name in collection_names
+        ]
+        return [future.result() for future in futures]
+
+
+def _per_collection(client, collection_names, vectors, k):
+    if not client.supports_batched_search:
+        return _per_pair(client, collection_names, vectors, k)
+
+    with ThreadPoolExecutor() as executor:
+        futures = [
+            executor.submit(client.search, collection_name, vectors, k)
+            for collection_name in collection_names
+        ]
+        return [future.result() for future in futures]
+
+
+def _multi_collection(client, collection_names, vectors, k):
+    if not client.supports_batched_search:
+        return _per_pair(client, collection_names, vectors, k)
+    return client.search_collections(collection_names, vectors, k)
+
+
+SEARCH_STRATEGIES = {
+    "per_pair": _per_pair,
+    "per_collection": _per_collection,
+    "multi_collection": _multi_collection,
+}
+
+
+def run_search_benchmark(
+    collection_names: list[str], num_queries: int, dim: int, k: int, runs: int
+) -> dict:
+    results = {}
+    for name, strategy in SEARCH_STRATEGIES.items():
+        latencies = []
+        round_trips = 0
+        for _ in range(runs):
+            vectors = [
+                [random.uniform(-1, 1) for _ in range(dim)] for _ in range(num_queries)
+            ]
+            with RoundTripCounter(VECTOR_DB_CLIENT) as counter:
+                start = time.perf_counter()
+                strategy(VECTOR_DB_CLIENT, collection_names, vectors, k)
+                latencies.append(time.perf_counter() - start)
+            round_trips = counter.count
+
+        results[name] = {
+            "round_trips": round_trips,
+            "mean_ms": statistics.mean(latencies) * 1000,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "max_ms": max(latencies) * 1000,
+        }
+    return results
+
+
+def _recall(approximate, exact) -> float:
+    if not exact.ids[0]:
+        return 1.0
+    return len(set(approximate.ids[0]) & set(exact.ids[0])) / len(exact.ids[0])
+
+
+def _latency_stats(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+
+def run_recall_benchmark(
+    collection_names: list[str], num_queries: int, k: int, ef_search_values: list[int]
+) -> dict:
+    client = VECTOR_DB_CLIENT
+    if not hasattr(client, "search_exact"):
+        raise SystemExit(
+            f"{type(client).__name__} does not support exact search, recall "
+            "can't be measured"
+        )
+
+    queries = [
+        (collection_name, vector)
+        for collection_name in collection_names
+        for vector in client.sample_vectors(collection_name, num_queries)
+    ]
+    if not queries:
+        raise SystemExit("No vectors found in the given collections")
+
+    exact_results = []
+    exact_latencies = []
+    for collection_name, vector in queries:
+        start = time.perf_counter()
+        result = client.search_exact([collection_name], [vector], k)
+        exact_latencies.append(time.perf_counter() - start)
+        exact_results.append(result[collection_name])
+
+    results = {"exact": {"recall": 1.0, **_latency_stats(exact_latencies)}}
+    for ef_search in ef_search_values:
+        recalls = []
+        latencies = []
+        for (collection_name, vector), exact in zip(queries, exact_results):
+            start = time.perf_counter()
+            result = client.search_with_ef([collection_name], [vector], k, ef_search)
+            latencies.append(time.perf_counter() - start)
+            recalls.append(_recall(result[collection_name], exact))
+
+        results[f"ef_search={ef_search}"] = {
+            "recall": statistics.mean(recalls),
+            **_latency_stats(latencies),
+        }
+    return results
+
+
+def _print_table(results: dict, label: str = "strategy"):
+    columns = list(next(iter(results.values())).keys())
+    print(f"{label:<20}" + "".join(f"{column:>14}" for column in columns))
+    for name, row in results.items():
+        print(
+            f"{name:<20}"
+            + "".join(
+                f"{value:>14.2f}" if isinstance(value, float) else f"{value:>14}"
+                for value in row.values()
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = subparsers.add_parser(
+        "search", help="compare batched and per-pair search strategies"
+    )
+    search_parser.add_argument("--collections", required=True)
+    search_parser.add_argument("--queries", type=int, default=3)
+    search_parser.add_argument("--dim", type=int, required=True)
+    search_parser.add_argument("--k", type=int, default=4)
+    search_parser.add_argument("--runs", type=int, default=10)
+
+    recall_parser = subparsers.add_parser(
+        "recall", help="measure ANN recall and latency against exact search"
+    )
+    recall_parser.add_argument("--collections", required=True)
+    recall_parser.add_argument("--queries", type=int, default=50)
+    recall_parser.add_argument("--k", type=int, default=10)
+    recall_parser.add_argument("--ef-search", default="20,40,80,160")
+
+    args = parser.parse_args()
+
+    if args.command == "search":
+        collection_names = [
+            name.strip() for name in args.collections.split(",") if name.strip()
+        ]
+        print(
+            f"{type(VECTOR_DB_CLIENT).__name__}: batched_search="
+            f"{VECTOR_DB_CLIENT.supports_batched_search} multi_collection_search="
+            f"{VECTOR_DB_CLIENT.supports_multi_collection_search}"
+        )
+        _print_table(
+            run_search_benchmark(
+                collection_names, args.queries, args.dim, args.k, args.runs
+            )
+        )
+    elif args.command == "recall":
+        collection_names = [
+            name.strip() for name in args.collections.split(",") if name.strip()
+        ]
+        ef_search_values = [
+            int(value) for value in args.ef_search.split(",") if value.strip()
+        ]
+        _print_table(
+            run_recall_benchmark(
+                collection_names, args.queries, args.k, ef_search_values
+            ),
+            label="search",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,15 @@ import logging
 from chromadb import Settings
 from chromadb.utils.batch_utils import create_batches
 
-from typing import Optional
+from typing import Iterator, List, Optional
 
 from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
     VectorDBBase,
     VectorItem,
     SearchResult,
     GetResult,
+    include_field,
 )
 from open_webui.retrieval.vector.utils import process_metadata
 
@@ -31,6 +33,8 @@ log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class ChromaClient(VectorDBBase):
+    supports_batched_search = True
+
     def __init__(self):
         settings_dict = {
             "allow_reset": True,
@@ -84,9 +88,9 @@ class ChromaClient(VectorDBBase):
 
                 # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
                 # https://docs.trychroma.com/docs/collections/configure cosine equation
-                distances: list = result["distances"][0]
-                distances = [2 - dist for dist in distances]
-                distances = [[dist / 2 for dist in distances]]
+                distances = [
+                    [(2 - dist) / 2 for dist in row] for row in result["distances"]
+                ]
 
                 return SearchResult(
                     **{
@@ -137,6 +141,74 @@ class ChromaClient(VectorDBBase):
             )
         return None
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        # Page through the collection with offset/limit.
+        collection = self.client.get_collection(name=collection_name)
+        if not collection:
+            return
+
+        include = [
+            field
+            for field in ("documents", "metadatas")
+            if include_field(fields, field)
+        ]
+        offset = 0
+        while True:
+            result = collection.get(limit=batch_size, offset=offset, include=include)
+            if not result["ids"]:
+                return
+
+            yield GetResult(
+                ids=[result["ids"]],
+                documents=[result["documents"]] if "documents" in include else None,
+                metadatas=[result["metadatas"]] if "metadatas" in include else None,
+            )
+
+            if len(result["ids"]) < batch_size:
+                return
+            offset += batch_size
+
+    def iter_items(
+        self,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+    ) -> Iterator[list[VectorItem]]:
+        # Page through the matching items with offset/limit, embeddings included.
+        collection = self.client.get_collection(name=collection_name)
+        if not collection:
+            return
+
+        offset = 0
+        while True:
+            result = collection.get(
+                where=filter or None,
+                limit=batch_size,
+                offset=offset,
+                include=["documents", "metadatas", "embeddings"],
+            )
+            if not result["ids"]:
+                return
+
+            yield [
+                {
+                    "id": id,
+                    "text": result["documents"][idx],
+                    "vector": list(result["embeddings"][idx]),
+                    "metadata": result["metadatas"][idx] or {},
+                }
+                for idx, id in enumerate(result["ids"])
+            ]
+
+            if len(result["ids"]) < batch_size:
+                return
+            offset += batch_size
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection = self.client.get_or_create_collection(
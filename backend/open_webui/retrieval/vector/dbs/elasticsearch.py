@@ -1,14 +1,16 @@
 from elasticsearch import Elasticsearch, BadRequestError
-from typing import Optional
+from typing import Iterator, List, Optional
 import ssl
 from elasticsearch.helpers import bulk, scan
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
     VectorDBBase,
     VectorItem,
     SearchResult,
     GetResult,
+    include_field,
 )
 from open_webui.config import (
     ELASTICSEARCH_URL,
@@ -231,6 +233,57 @@ class ElasticsearchClient(VectorDBBase):
 
         return self._scan_result_to_get_result(results)
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        # Stream the collection with the scroll API, one batch at a time.
+        include_documents = include_field(fields, "documents")
+        include_metadatas = include_field(fields, "metadatas")
+        query = {
+            "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}},
+            "_source": [
+                key
+                for key, included in (
+                    ("text", include_documents),
+                    ("metadata", include_metadatas),
+                )
+                if included
+            ],
+        }
+
+        batch = []
+        for hit in scan(
+            self.client, index=f"{self.index_prefix}*", query=query, size=batch_size
+        ):
+            batch.append(hit)
+            if len(batch) >= batch_size:
+                yield self._hits_to_get_result(
+                    batch, include_documents, include_metadatas
+                )
+                batch = []
+        if batch:
+            yield self._hits_to_get_result(batch, include_documents, include_metadatas)
+
+    def _hits_to_get_result(
+        self, hits: list, include_documents: bool, include_metadatas: bool
+    ) -> GetResult:
+        return GetResult(
+            ids=[[hit["_id"] for hit in hits]],
+            documents=(
+                [[hit["_source"].get("text") for hit in hits]]
+                if include_documents
+                else None
+            ),
+            metadatas=(
+                [[hit["_source"].get("metadata") for hit in hits]]
+                if include_metadatas
+                else None
+            ),
+        )
+
     # Status: works
     def insert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
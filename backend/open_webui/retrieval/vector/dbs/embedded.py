@@ -0,0 +1,1356 @@
+"""
+Embedded on-disk vector store for single-node deployments.
+
+Layout under EMBEDDED_VECTOR_DB_PATH:
+
+    meta.sqlite3                      collections and chunks (id, row, text, metadata)
+    locks/<name>.write, <name>.index  per collection file locks
+    locks/maintenance                 held by the process running maintenance
+    collections/<dir>/gen-<n>/
+        seg-<k>.f32                   fixed-size, memory-mapped vector segments
+        seg-<k>.i8 + seg-<k>.scale    (int8 quantised variant)
+        hnsw-<rows>.npz + -l0.npy     HNSW graph snapshot covering the first <rows> rows
+
+Every creation of a collection gets a new <dir>, so processes still holding the
+segments of a deleted one never read those of its successor. Vectors are
+normalised and appended to the segments of the collection's current generation; SQLite is the commit point, so rows written past `num_rows` by an
+interrupted insert are simply overwritten later. Upserts and deletes only touch
+SQLite, leaving dead rows in the segments until a background compaction rewrites
+the live ones into a new generation.
+
+The HNSW graph is built in the background by the one process holding the
+maintenance lock (or by a separate maintenance process, see __main__) and
+persisted as snapshots; searches walk the latest
+snapshot and scan the rows appended since exactly. Searches run inside an SQLite
+read transaction, so the rows they see always match the generation they read.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+    include_field,
+)
+from open_webui.retrieval.vector.utils import process_metadata
+from open_webui.config import (
+    EMBEDDED_VECTOR_DB_PATH,
+    EMBEDDED_VECTOR_QUANTIZATION,
+    EMBEDDED_VECTOR_SEGMENT_ROWS,
+    EMBEDDED_VECTOR_HNSW_M,
+    EMBEDDED_VECTOR_HNSW_EF_CONSTRUCTION,
+    EMBEDDED_VECTOR_HNSW_EF_SEARCH,
+    EMBEDDED_VECTOR_HNSW_MIN_ROWS,
+    EMBEDDED_VECTOR_COMPACTION_RATIO,
+    EMBEDDED_VECTOR_MAINTENANCE_INTERVAL,
+    ENABLE_EMBEDDED_VECTOR_MAINTENANCE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collection (
+    name TEXT PRIMARY KEY,
+    dirname TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    quantization TEXT NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    num_rows INTEGER NOT NULL DEFAULT 0,
+    num_live INTEGER NOT NULL DEFAULT 0,
+    graph_rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS chunk (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    text TEXT,
+    metadata TEXT,
+    PRIMARY KEY (collection, id)
+);
+CREATE INDEX IF NOT EXISTS idx_chunk_collection_row ON chunk (collection, row);
+"""
+
+# Keep well below SQLite's bound parameter limit
+SQL_BATCH_SIZE = 500
+
+# Persist the graph every this many inserted nodes while building
+GRAPH_SNAPSHOT_INTERVAL = 5000
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def _quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _json_path(key: str) -> str:
+    return '$."' + key.replace('"', '\\"') + '"'
+
+
+def _score(similarity: float) -> float:
+    # cosine distance 2 (worst) -> 0 (best), re-ordered to a 0 -> 1 score like
+    # the other backends
+    return (1.0 + similarity) / 2.0
+
+
+_local_locks: Dict[str, threading.Lock] = {}
+_local_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """
+    Exclusive lock shared by threads and processes (each acquisition opens its
+    own file description). Yields False if `blocking` is off and the lock is
+    held elsewhere.
+    """
+    if fcntl is None:
+        # No inter-process locking available, serialise this process only
+        with _local_locks_guard:
+            lock = _local_locks.setdefault(path, threading.Lock())
+        acquired = lock.acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            acquired = True
+        except BlockingIOError:
+            acquired = False
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+class _Segments:
+    """The memory-mapped vector segments of one collection generation."""
+
+    def __init__(self, path: str, dim: int, quantization: str, segment_rows: int):
+        self.path = path
+        self.dim = dim
+        self.quantization = quantization
+        self.segment_rows = segment_rows
+        self._maps: Dict[int, Tuple[np.ndarray, Optional[np.ndarray]]] = {}
+        self._lock = threading.Lock()
+        self._pinned: Optional[Tuple[np.ndarray, Optional[np.ndarray]]] = None
+
+    def _files(self, segment: int) -> Tuple[str, Optional[str]]:
+        base = os.path.join(self.path, f"seg-{segment:06d}")
+        if self.quantization == "int8":
+            return f"{base}.i8", f"{base}.scale"
+        return f"{base}.f32", None
+
+    def _segment(self, segment: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        maps = self._maps.get(segment)
+        if maps is None:
+            with self._lock:
+                maps = self._maps.get(segment)
+                if maps is None:
+                    data_file, scale_file = self._files(segment)
+                    data = np.memmap(
+                        data_file,
+                        dtype=np.int8 if scale_file else np.float32,
+                        mode="r",
+                        shape=(self.segment_rows, self.dim),
+                    )
+                    scale = (
+                        np.memmap(
+                            scale_file,
+                            dtype=np.float32,
+                            mode="r",
+                            shape=(self.segment_rows,),
+                        )
+                        if scale_file
+                        else None
+                    )
+                    # Plain ndarray views skip np.memmap's per-index overhead
+                    maps = (
+                        data.view(np.ndarray),
+                        scale.view(np.ndarray) if scale is not None else None,
+                    )
+                    self._maps[segment] = maps
+        return maps
+
+    @staticmethod
+    def _decode(data: np.ndarray, scale: Optional[np.ndarray]) -> np.ndarray:
+        if scale is None:
+            return np.asarray(data)
+        return data.astype(np.float32) * scale[:, None]
+
+    def pin(self, end: int):
+        """
+        Copy the rows [0, end) into one contiguous array (still quantised, if
+        so) for the many small random reads of a graph build.
+        """
+        blocks = []
+        row = 0
+        while row < end:
+            segment, offset = divmod(row, self.segment_rows)
+            count = min(self.segment_rows - offset, end - row)
+            blocks.append(self._segment(segment))
+            row += count
+        data = np.concatenate([data for data, _ in blocks])[:end]
+        scale = (
+            np.concatenate([scale for _, scale in blocks])[:end]
+            if self.quantization == "int8"
+            else None
+        )
+        self._pinned = (data, scale)
+
+    def gather(self, rows: np.ndarray) -> np.ndarray:
+        if self._pinned is not None:
+            data, scale = self._pinned
+            return self._decode(data[rows], scale[rows] if scale is not None else None)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        segments = rows // self.segment_rows
+        first = int(segments.min())
+        if first == segments.max():
+            data, scale = self._segment(first)
+            offsets = rows - first * self.segment_rows
+            return self._decode(
+                data[offsets], scale[offsets] if scale is not None else None
+            )
+
+        offsets = rows % self.segment_rows
+
+        vectors = np.empty((len(rows), self.dim), dtype=np.float32)
+        for segment in np.unique(segments):
+            mask = segments == segment
+            data, scale = self._segment(int(segment))
+            selected = offsets[mask]
+            vectors[mask] = self._decode(
+                data[selected], scale[selected] if scale is not None else None
+            )
+        return vectors
+
+    def iter_blocks(self, start: int, end: int) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (first_row, vectors) for the rows [start, end), one block per segment."""
+        row = start
+        while row < end:
+            segment, offset = divmod(row, self.segment_rows)
+            count = min(self.segment_rows - offset, end - row)
+            data, scale = self._segment(segment)
+            yield row, self._decode(
+                data[offset : offset + count],
+                scale[offset : offset + count] if scale is not None else None,
+            )
+            row += count
+
+    def _write(self, file_path: str, row_bytes: int, offset: int, array: np.ndarray):
+        if not os.path.exists(file_path):
+            # Preallocated (sparse) so readers can map the whole segment
+            with open(file_path, "wb") as f:
+                f.truncate(self.segment_rows * row_bytes)
+        with open(file_path, "r+b") as f:
+            f.seek(offset * row_bytes)
+            f.write(np.ascontiguousarray(array).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, start_row: int, vectors: np.ndarray):
+        """Write normalised vectors to the rows [start_row, start_row + len(vectors))."""
+        os.makedirs(self.path, exist_ok=True)
+        if self.quantization == "int8":
+            data, scales = _quantize(vectors)
+            row_bytes = self.dim
+        else:
+            data, scales = vectors.astype(np.float32), None
+            row_bytes = self.dim * 4
+
+        written = 0
+        while written < len(vectors):
+            segment, offset = divmod(start_row + written, self.segment_rows)
+            count = min(self.segment_rows - offset, len(vectors) - written)
+            data_file, scale_file = self._files(segment)
+            self._write(data_file, row_bytes, offset, data[written : written + count])
+            if scale_file:
+                self._write(scale_file, 4, offset, scales[written : written + count])
+            written += count
+
+
+class _HNSWGraph:
+    """
+    HNSW graph over the rows [0, n) of a collection generation, ranking by inner
+    product of normalised vectors. Layer 0 is a fixed-width, -1 padded int32
+    adjacency matrix (memory-mapped when loaded from a snapshot for searching);
+    the sparse upper layers are dicts of node -> neighbours.
+    """
+
+    def __init__(
+        self,
+        m: int,
+        layer0: Optional[np.ndarray] = None,
+        levels: Optional[np.ndarray] = None,
+        upper: Optional[List[Dict[int, np.ndarray]]] = None,
+        entry: int = -1,
+        max_level: int = -1,
+    ):
+        self.m = m
+        self.m0 = 2 * m
+        self.ml = 1 / math.log(m)
+        self.layer0 = (
+            layer0 if layer0 is not None else np.full((0, self.m0), -1, np.int32)
+        )
+        self.levels = levels if levels is not None else np.zeros(0, np.int8)
+        self.upper = upper or []
+        self.entry = entry
+        self.max_level = max_level
+        self.n = len(self.levels)
+
+    ####################
+    # Search
+    ####################
+
+    def neighbors(self, node: int, level: int) -> np.ndarray:
+        if level == 0:
+            row = self.layer0[node]
+            return row[row >= 0]
+        return self.upper[level - 1].get(node, _EMPTY)
+
+    def search_layer(
+        self,
+        segments: _Segments,
+        query: np.ndarray,
+        entry_points: List[int],
+        ef: int,
+        level: int,
+    ) -> List[Tuple[float, int]]:
+        visited = set(entry_points)
+        similarities = (segments.gather(entry_points) @ query).tolist()
+        candidates = [(-s, node) for s, node in zip(similarities, entry_points)]
+        results = [(s, node) for s, node in zip(similarities, entry_points)]
+        heapq.heapify(candidates)
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            negative_similarity, node = heapq.heappop(candidates)
+            if -negative_similarity < results[0][0] and len(results) >= ef:
+                break
+
+            neighbors = [
+                n for n in self.neighbors(node, level).tolist() if n not in visited
+            ]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+
+            similarities = (segments.gather(neighbors) @ query).tolist()
+            for similarity, neighbor in zip(similarities, neighbors):
+                if len(results) < ef or similarity > results[0][0]:
+                    heapq.heappush(candidates, (-similarity, neighbor))
+                    heapq.heappush(results, (similarity, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def search(
+        self, segments: _Segments, query: np.ndarray, ef: int
+    ) -> List[Tuple[float, int]]:
+        if self.entry < 0:
+            return []
+
+        entry_points = [self.entry]
+        for level in range(self.max_level, 0, -1):
+            entry_points = [
+                self.search_layer(segments, query, entry_points, 1, level)[0][1]
+            ]
+        return self.search_layer(segments, query, entry_points, ef, 0)
+
+    ####################
+    # Construction
+    ####################
+
+    def _grow(self, size: int):
+        capacity = len(self.layer0)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 1024)
+
+        layer0 = np.full((capacity, self.m0), -1, np.int32)
+        layer0[: self.n] = self.layer0[: self.n]
+        self.layer0 = layer0
+
+        levels = np.zeros(capacity, np.int8)
+        levels[: self.n] = self.levels[: self.n]
+        self.levels = levels
+
+    def _select(
+        self,
+        segments: _Segments,
+        candidates: List[Tuple[float, int]],
+        m: int,
+    ) -> List[int]:
+        """
+        Neighbour selection heuristic: keep candidates (best first) that are
+        closer to the base than to any already selected neighbour, then fill up
+        with the best of the rest.
+        """
+        if len(candidates) <= m:
+            return [node for _, node in candidates]
+
+        nodes = [node for _, node in candidates]
+        vectors = segments.gather(nodes)
+        pairwise = vectors @ vectors.T
+
+        # closest[i]: similarity of candidate i to its nearest selected neighbour
+        closest = np.full(len(candidates), -np.inf, dtype=np.float32).tolist()
+        selected = []
+        for idx, (similarity, _) in enumerate(candidates):
+            if closest[idx] < similarity:
+                selected.append(idx)
+                if len(selected) >= m:
+                    break
+                closest = np.maximum(closest, pairwise[idx]).tolist()
+
+        if len(selected) < m:
+            chosen = set(selected)
+            for idx in range(len(candidates)):
+                if idx not in chosen:
+                    selected.append(idx)
+                    if len(selected) >= m:
+                        break
+
+        return [nodes[idx] for idx in selected]
+
+    def _set_neighbors(self, node: int, level: int, neighbors: List[int]):
+        if level == 0:
+            self.layer0[node] = -1
+            self.layer0[node, : len(neighbors)] = neighbors
+        else:
+            self.upper[level - 1][node] = np.asarray(neighbors, dtype=np.int32)
+
+    def _connect(self, segments: _Segments, node: int, new: int, level: int):
+        max_connections = self.m0 if level == 0 else self.m
+        current = self.neighbors(node, level)
+        if len(current) < max_connections:
+            self._set_neighbors(node, level, current.tolist() + [new])
+            return
+
+        nodes = np.append(current, new)
+        base = segments.gather([node])[0]
+        similarities = segments.gather(nodes) @ base
+        order = np.argsort(-similarities)
+        candidates = [(float(similarities[i]), int(nodes[i])) for i in order]
+        self._set_neighbors(
+            node, level, self._select(segments, candidates, max_connections)
+        )
+
+    def add(
+        self,
+        segments: _Segments,
+        node: int,
+        ef_construction: int,
+        rng: random.Random,
+    ):
+        """Insert row `node`, which must be the next row (n)."""
+        level = int(-math.log(1.0 - rng.random()) * self.ml)
+        self._grow(node + 1)
+        self.levels[node] = level
+        while len(self.upper) < level:
+            self.upper.append({})
+        for upper_level in range(1, level + 1):
+            self.upper[upper_level - 1][node] = _EMPTY
+        self.n = node + 1
+
+        if self.entry < 0:
+            self.entry = node
+            self.max_level = level
+            return
+
+        query = segments.gather([node])[0]
+        entry_points = [self.entry]
+        for upper_level in range(self.max_level, level, -1):
+            entry_points = [
+                self.search_layer(segments, query, entry_points, 1, upper_level)[0][1]
+            ]
+
+        for current_level in range(min(level, self.max_level), -1, -1):
+            candidates = [
+                (similarity, candidate)
+                for similarity, candidate in self.search_layer(
+                    segments, query, entry_points, ef_construction, current_level
+                )
+                if candidate != node
+            ]
+            neighbors = self._select(segments, candidates, self.m)
+            self._set_neighbors(node, current_level, neighbors)
+            for neighbor in neighbors:
+                self._connect(segments, neighbor, node, current_level)
+            entry_points = [candidate for _, candidate in candidates] or entry_points
+
+        if level > self.max_level:
+            self.max_level = level
+            self.entry = node
+
+    ####################
+    # Persistence
+    ####################
+
+    def save(self, prefix: str):
+        upper = {}
+        for level, nodes in enumerate(self.upper, start=1):
+            keys = np.fromiter(nodes.keys(), dtype=np.int32, count=len(nodes))
+            adjacency = np.full((len(nodes), self.m), -1, np.int32)
+            for idx, neighbors in enumerate(nodes.values()):
+                adjacency[idx, : len(neighbors)] = neighbors
+            upper[f"nodes_{level}"] = keys
+            upper[f"adjacency_{level}"] = adjacency
+
+        with open(f"{prefix}-l0.npy.tmp", "wb") as f:
+            np.save(f, self.layer0[: self.n])
+        with open(f"{prefix}.npz.tmp", "wb") as f:
+            np.savez(
+                f,
+                header=np.array([self.m, self.entry, self.max_level], np.int64),
+                levels=self.levels[: self.n],
+                **upper,
+            )
+        os.replace(f"{prefix}-l0.npy.tmp", f"{prefix}-l0.npy")
+        os.replace(f"{prefix}.npz.tmp", f"{prefix}.npz")
+
+    @classmethod
+    def load(cls, prefix: str, writable: bool = False) -> "_HNSWGraph":
+        layer0 = np.load(f"{prefix}-l0.npy", mmap_mode=None if writable else "r")
+        with np.load(f"{prefix}.npz") as data:
+            m, entry, max_level = data["header"].tolist()
+            levels = data["levels"].copy()
+            upper = []
+            for level in range(1, max_level + 1):
+                upper.append(
+                    {
+                        int(node): adjacency[adjacency >= 0]
+                        for node, adjacency in zip(
+                            data[f"nodes_{level}"], data[f"adjacency_{level}"]
+                        )
+                    }
+                )
+        return cls(m, layer0, levels, upper, entry, max_level)
+
+
+class EmbeddedVectorClient(VectorDBBase):
+    supports_batched_search = True
+
+    def __init__(self, maintenance: bool = ENABLE_EMBEDDED_VECTOR_MAINTENANCE):
+        self.path = EMBEDDED_VECTOR_DB_PATH
+        os.makedirs(os.path.join(self.path, "collections"), exist_ok=True)
+        os.makedirs(os.path.join(self.path, "locks"), exist_ok=True)
+
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
+        # collection name -> (cache key, value); only the latest generation
+        # and graph snapshot of a collection are kept open
+        self._segments: Dict[str, Tuple[Tuple, _Segments]] = {}
+        self._graphs: Dict[str, Tuple[Tuple, _HNSWGraph]] = {}
+
+        self._db().executescript(SCHEMA)
+
+        self._stop = threading.Event()
+        self._maintenance_thread = None
+        if maintenance:
+            self._maintenance_thread = threading.Thread(
+                target=self.maintain,
+                name="embedded-vector-maintenance",
+                daemon=True,
+            )
+            self._maintenance_thread.start()
+
+    ####################
+    # Storage helpers
+    ####################
+
+    def _db(self) -> sqlite3.Connection:
+        # One connection per thread, in autocommit mode with explicit
+        # transactions; WAL lets readers run alongside the writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                os.path.join(self.path, "meta.sqlite3"),
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _state(
+        self, conn: sqlite3.Connection, collection_name: str
+    ) -> Optional[sqlite3.Row]:
+        return conn.execute(
+            "SELECT * FROM collection WHERE name = ?", (collection_name,)
+        ).fetchone()
+
+    @staticmethod
+    def _lock_name(collection_name: str) -> str:
+        # Collection names aren't necessarily safe file names
+        return hashlib.sha256(collection_name.encode()).hexdigest()[:32]
+
+    def _dirname(self, collection_name: str) -> str:
+        # Unique per creation, so a collection deleted and created again
+        # never reuses the files of the previous one
+        return f"{self._lock_name(collection_name)}-{uuid.uuid4().hex}"
+
+    def _lock_path(self, collection_name: str, kind: str) -> str:
+        return os.path.join(
+            self.path, "locks", f"{self._lock_name(collection_name)}.{kind}"
+        )
+
+    def _collection_path(self, state: sqlite3.Row) -> str:
+        return os.path.join(self.path, "collections", state["dirname"])
+
+    def _generation_path(self, state: sqlite3.Row, generation: int) -> str:
+        return os.path.join(self._collection_path(state), f"gen-{generation:06d}")
+
+    def _graph_prefix(self, state: sqlite3.Row, graph_rows: int) -> str:
+        return os.path.join(
+            self._generation_path(state, state["generation"]),
+            f"hnsw-{graph_rows:010d}",
+        )
+
+    def _get_segments(self, state: sqlite3.Row) -> _Segments:
+        key = (state["dirname"], state["generation"])
+        with self._cache_lock:
+            cached = self._segments.get(state["name"])
+            if cached is None or cached[0] != key:
+                cached = (
+                    key,
+                    _Segments(
+                        self._generation_path(state, state["generation"]),
+                        state["dim"],
+                        state["quantization"],
+                        EMBEDDED_VECTOR_SEGMENT_ROWS,
+                    ),
+                )
+                self._segments[state["name"]] = cached
+            return cached[1]
+
+    def _get_graph(self, state: sqlite3.Row) -> Optional[_HNSWGraph]:
+        if not state["graph_rows"]:
+            return None
+
+        key = (state["dirname"], state["generation"], state["graph_rows"])
+        with self._cache_lock:
+            cached = self._graphs.get(state["name"])
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        try:
+            graph = _HNSWGraph.load(self._graph_prefix(state, state["graph_rows"]))
+        except FileNotFoundError:
+            # Replaced by a newer snapshot since our transaction started
+            return None
+
+        with self._cache_lock:
+            self._graphs[state["name"]] = (key, graph)
+        return graph
+
+    def _evict(self, collection_name: str):
+        with self._cache_lock:
+            self._segments.pop(collection_name, None)
+            self._graphs.pop(collection_name, None)
+
+    def _hydrate(
+        self, conn: sqlite3.Connection, collection_name: str, rows: List[int]
+    ) -> Dict[int, sqlite3.Row]:
+        chunks = {}
+        for start in range(0, len(rows), SQL_BATCH_SIZE):
+            batch = rows[start : start + SQL_BATCH_SIZE]
+            for chunk in conn.execute(
+                "SELECT row, id, text, metadata FROM chunk "
+                f"WHERE collection = ? AND row IN ({','.join('?' * len(batch))})",
+                (collection_name, *batch),
+            ):
+                chunks[chunk["row"]] = chunk
+        return chunks
+
+    ####################
+    # Collections
+    ####################
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self._state(self._db(), collection_name) is not None
+
+    def delete_collection(self, collection_name: str):
+        # Doesn't wait for a running graph build, which stops by itself once
+        # it notices the collection is gone
+        with _file_lock(self._lock_path(collection_name, "write")):
+            with self._transaction(write=True) as conn:
+                state = self._state(conn, collection_name)
+                if state is None:
+                    return
+                conn.execute(
+                    "DELETE FROM chunk WHERE collection = ?", (collection_name,)
+                )
+                conn.execute(
+                    "DELETE FROM collection WHERE name = ?", (collection_name,)
+                )
+
+            self._evict(collection_name)
+            shutil.rmtree(self._collection_path(state), ignore_errors=True)
+        log.info(f"Collection '{collection_name}' deleted.")
+
+    def reset(self):
+        # Resets the database. This will delete all collections and item entries.
+        names = [
+            row["name"] for row in self._db().execute("SELECT name FROM collection")
+        ]
+        for name in names:
+            self.delete_collection(name)
+
+    def close(self):
+        self._stop.set()
+
+    ####################
+    # Writes
+    ####################
+
+    def _write(self, collection_name: str, items: List[VectorItem], replace: bool):
+        if not items:
+            return
+
+        # The last occurrence of an id within a batch wins
+        items = list({item["id"]: item for item in items}.values())
+
+        with _file_lock(self._lock_path(collection_name, "write")):
+            with self._transaction(write=True) as conn:
+                state = self._state(conn, collection_name)
+                dim = len(items[0]["vector"])
+                if state is None:
+                    conn.execute(
+                        "INSERT INTO collection (name, dirname, dim, quantization) "
+                        "VALUES (?, ?, ?, ?)",
+                        (
+                            collection_name,
+                            self._dirname(collection_name),
+                            dim,
+                            EMBEDDED_VECTOR_QUANTIZATION,
+                        ),
+                    )
+                    state = self._state(conn, collection_name)
+                elif state["dim"] != dim:
+                    raise ValueError(
+                        f"Collection '{collection_name}' holds {state['dim']}-dimensional "
+                        f"vectors, got {dim}"
+                    )
+
+                if not replace:
+                    # insert() keeps existing entries, like ON CONFLICT DO NOTHING
+                    ids = [item["id"] for item in items]
+                    existing = set()
+                    for start in range(0, len(ids), SQL_BATCH_SIZE):
+                        batch = ids[start : start + SQL_BATCH_SIZE]
+                        existing.update(
+                            row["id"]
+                            for row in conn.execute(
+                                "SELECT id FROM chunk WHERE collection = ? "
+                                f"AND id IN ({','.join('?' * len(batch))})",
+                                (collection_name, *batch),
+                            )
+                        )
+                    items = [item for item in items if item["id"] not in existing]
+                    if not items:
+                        return
+
+                vectors = _normalize(
+                    np.asarray([item["vector"] for item in items], dtype=np.float32)
+                )
+                start_row = state["num_rows"]
+                self._get_segments(state).append(start_row, vectors)
+
+                conn.executemany(
+                    "INSERT INTO chunk (collection, id, row, text, metadata) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (collection, id) DO UPDATE SET "
+                    "row = excluded.row, text = excluded.text, metadata = excluded.metadata",
+                    [
+                        (
+                            collection_name,
+                            item["id"],
+                            start_row + idx,
+                            item["text"],
+                            json.dumps(process_metadata(item["metadata"] or {})),
+                        )
+                        for idx, item in enumerate(items)
+                    ],
+                )
+                conn.execute(
+                    "UPDATE collection SET num_rows = ?, "
+                    "num_live = (SELECT COUNT(*) FROM chunk WHERE collection = ?) "
+                    "WHERE name = ?",
+                    (start_row + len(items), collection_name, collection_name),
+                )
+
+    def insert(self, collection_name: str, items: List[VectorItem]):
+        self._write(collection_name, items, replace=False)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]):
+        self._write(collection_name, items, replace=True)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ):
+        if not ids and not filter:
+            return
+
+        # The vectors stay in the segments until the next compaction
+        with _file_lock(self._lock_path(collection_name, "write")):
+            with self._transaction(write=True) as conn:
+                if self._state(conn, collection_name) is None:
+                    return
+
+                if ids:
+                    for start in range(0, len(ids), SQL_BATCH_SIZE):
+                        batch = ids[start : start + SQL_BATCH_SIZE]
+                        conn.execute(
+                            "DELETE FROM chunk WHERE collection = ? "
+                            f"AND id IN ({','.join('?' * len(batch))})",
+                            (collection_name, *batch),
+                        )
+                else:
+                    where, params = self._filter_clause(collection_name, filter)
+                    conn.execute(f"DELETE FROM chunk WHERE {where}", params)
+
+                conn.execute(
+                    "UPDATE collection SET "
+                    "num_live = (SELECT COUNT(*) FROM chunk WHERE collection = ?) "
+                    "WHERE name = ?",
+                    (collection_name, collection_name),
+                )
+
+    ####################
+    # Reads
+    ####################
+
+    @staticmethod
+    def _filter_clause(
+        collection_name: str, filter: Optional[Dict]
+    ) -> Tuple[str, List[Any]]:
+        where = ["collection = ?"]
+        params: List[Any] = [collection_name]
+        for key, value in (filter or {}).items():
+            where.append("json_extract(metadata, ?) = ?")
+            params.extend([_json_path(key), value])
+        return " AND ".join(where), params
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        try:
+            conn = self._db()
+            if self._state(conn, collection_name) is None:
+                return None
+
+            where, params = self._filter_clause(collection_name, filter)
+            sql = f"SELECT id, text, metadata FROM chunk WHERE {where} ORDER BY row"
+            if limit:
+                sql += " LIMIT ?"
+                params.append(limit)
+
+            rows = conn.execute(sql, params).fetchall()
+            return GetResult(
+                ids=[[row["id"] for row in rows]],
+                documents=[[row["text"] for row in rows]],
+                metadatas=[[json.loads(row["metadata"]) for row in rows]],
+            )
+        except Exception as e:
+            log.exception(f"Error querying collection '{collection_name}': {e}")
+            return None
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self.query(collection_name, filter={})
+
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        # Keyset pagination on the (collection, id) primary key
+        conn = self._db()
+        if self._state(conn, collection_name) is None:
+            return
+
+        include_documents = include_field(fields, "documents")
+        include_metadatas = include_field(fields, "metadatas")
+        columns = ["id"]
+        if include_documents:
+            columns.append("text")
+        if include_metadatas:
+            columns.append("metadata")
+
+        last_id = None
+        while True:
+            if last_id is None:
+                rows = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM chunk WHERE collection = ? "
+                    "ORDER BY id LIMIT ?",
+                    (collection_name, batch_size),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM chunk WHERE collection = ? "
+                    "AND id > ? ORDER BY id LIMIT ?",
+                    (collection_name, last_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+
+            yield GetResult(
+                ids=[[row["id"] for row in rows]],
+                documents=(
+                    [[row["text"] for row in rows]] if include_documents else None
+                ),
+                metadatas=(
+                    [[json.loads(row["metadata"]) for row in rows]]
+                    if include_metadatas
+                    else None
+                ),
+            )
+
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def iter_items(
+        self,
+        collection_name: str,
+        filter: Optional[Dict] = None,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+    ) -> Iterator[List[VectorItem]]:
+        # Vectors come back normalised (and dequantised), which is all cosine
+        # search needs. Pages follow ids, as compaction renumbers rows.
+        last_id = ""
+        while True:
+            with self._transaction() as conn:
+                state = self._state(conn, collection_name)
+                if state is None:
+                    return
+
+                where, params = self._filter_clause(collection_name, filter)
+                rows = conn.execute(
+                    f"SELECT row, id, text, metadata FROM chunk WHERE {where} "
+                    "AND id > ? ORDER BY id LIMIT ?",
+                    (*params, last_id, batch_size),
+                ).fetchall()
+                if not rows:
+                    return
+
+                vectors = self._get_segments(state).gather(
+                    np.asarray([row["row"] for row in rows], dtype=np.int64)
+                )
+
+            yield [
+                {
+                    "id": row["id"],
+                    "text": row["text"],
+                    "vector": vector.tolist(),
+                    "metadata": json.loads(row["metadata"]),
+                }
+                for row, vector in zip(rows, vectors)
+            ]
+
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    ####################
+    # Search
+    ####################
+
+    @staticmethod
+    def _flat_search(
+        segments: _Segments, queries: np.ndarray, start: int, end: int, n: int
+    ) -> List[List[Tuple[float, int]]]:
+        """Exact top-n over the rows [start, end) for every query, in one pass."""
+        best = [
+            (np.empty(0, np.float32), np.empty(0, np.int64))
+            for _ in range(len(queries))
+        ]
+        if n <= 0 or end <= start:
+            return [[] for _ in queries]
+
+        for first_row, block in segments.iter_blocks(start, end):
+            similarities = block @ queries.T
+            rows = np.arange(first_row, first_row + len(block), dtype=np.int64)
+            for qid in range(len(queries)):
+                scores = np.concatenate([best[qid][0], similarities[:, qid]])
+                candidates = np.concatenate([best[qid][1], rows])
+                if len(scores) > n:
+                    top = np.argpartition(-scores, n - 1)[:n]
+                    scores, candidates = scores[top], candidates[top]
+                best[qid] = (scores, candidates)
+
+        return [
+            sorted(zip(scores.tolist(), candidates.tolist()), reverse=True)
+            for scores, candidates in best
+        ]
+
+    def search(
+        self, collection_name: str, vectors: List[List[float | int]], limit: int
+    ) -> Optional[SearchResult]:
+        try:
+            if not vectors:
+                return None
+
+            # The read transaction pins the generation and rows we search
+            with self._transaction() as conn:
+                state = self._state(conn, collection_name)
+                if state is None or state["num_live"] == 0:
+                    return None
+
+                queries = _normalize(np.asarray(vectors, dtype=np.float32))
+                if queries.shape[1] != state["dim"]:
+                    raise ValueError(
+                        f"Collection '{collection_name}' holds {state['dim']}-dimensional "
+                        f"vectors, got {queries.shape[1]}"
+                    )
+
+                limit = min(limit or state["num_live"], state["num_live"])
+                num_rows = state["num_rows"]
+                # Dead rows can push live ones out of a plain top-limit
+                num_dead = num_rows - state["num_live"]
+                segments = self._get_segments(state)
+                graph = self._get_graph(state)
+
+                if graph is not None:
+                    ef = max(EMBEDDED_VECTOR_HNSW_EF_SEARCH, limit)
+                    candidates = self._flat_search(
+                        segments, queries, graph.n, num_rows, limit + num_dead
+                    )
+                    for qid, query in enumerate(queries):
+                        candidates[qid] = sorted(
+                            candidates[qid] + graph.search(segments, query, ef),
+                            reverse=True,
+                        )
+                else:
+                    candidates = self._flat_search(
+                        segments, queries, 0, num_rows, limit + num_dead
+                    )
+
+                ids, distances, documents, metadatas = [], [], [], []
+                for qid, query_candidates in enumerate(candidates):
+                    hits = self._resolve(conn, collection_name, query_candidates, limit)
+                    if len(hits) < limit and graph is not None:
+                        # Too many dead rows near the query, fall back to exact
+                        query_candidates = self._flat_search(
+                            segments,
+                            queries[qid : qid + 1],
+                            0,
+                            num_rows,
+                            limit + num_dead,
+                        )[0]
+                        hits = self._resolve(
+                            conn, collection_name, query_candidates, limit
+                        )
+
+                    ids.append([chunk["id"] for _, chunk in hits])
+                    distances.append([_score(similarity) for similarity, _ in hits])
+                    documents.append([chunk["text"] for _, chunk in hits])
+                    metadatas.append(
+                        [json.loads(chunk["metadata"]) for _, chunk in hits]
+                    )
+
+                return SearchResult(
+                    ids=ids,
+                    distances=distances,
+                    documents=documents,
+                    metadatas=metadatas,
+                )
+        except Exception as e:
+            log.exception(f"Error searching collection '{collection_name}': {e}")
+            return None
+
+    def _resolve(
+        self,
+        conn: sqlite3.Connection,
+        collection_name: str,
+        candidates: List[Tuple[float, int]],
+        limit: int,
+    ) -> List[Tuple[float, sqlite3.Row]]:
+        chunks = self._hydrate(conn, collection_name, [row for _, row in candidates])
+        hits = []
+        seen = set()
+        for similarity, row in candidates:
+            if row in chunks and row not in seen:
+                seen.add(row)
+                hits.append((similarity, chunks[row]))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    ####################
+    # Maintenance
+    ####################
+
+    def maintain(self):
+        """
+        Run maintenance every EMBEDDED_VECTOR_MAINTENANCE_INTERVAL seconds
+        until closed. Only one process maintains the store at a time; the
+        others keep waiting for the lock, in case that one exits.
+        """
+        lock_path = os.path.join(self.path, "locks", "maintenance")
+        while not self._stop.wait(EMBEDDED_VECTOR_MAINTENANCE_INTERVAL):
+            with _file_lock(lock_path, blocking=False) as maintainer:
+                if not maintainer:
+                    continue
+
+                log.info("Running embedded vector DB maintenance in this process")
+                while True:
+                    try:
+                        self.run_maintenance()
+                    except Exception as e:
+                        log.exception(f"Embedded vector DB maintenance failed: {e}")
+                    if self._stop.wait(EMBEDDED_VECTOR_MAINTENANCE_INTERVAL):
+                        return
+
+    def run_maintenance(self):
+        """Compact collections with many dead rows and extend their graphs."""
+        names = [
+            row["name"] for row in self._db().execute("SELECT name FROM collection")
+        ]
+        for name in names:
+            if self._stop.is_set():
+                return
+
+            state = self._state(self._db(), name)
+            if state is None:
+                continue
+
+            num_dead = state["num_rows"] - state["num_live"]
+            if (
+                num_dead
+                and num_dead >= state["num_rows"] * EMBEDDED_VECTOR_COMPACTION_RATIO
+            ):
+                self.compact(name, blocking=False)
+
+            self.build_index(name, blocking=False)
+
+    def compact(self, collection_name: str, blocking: bool = True) -> bool:
+        """
+        Rewrite the live rows of a collection into a new generation, dropping
+        deleted and superseded vectors. The graph is rebuilt afterwards.
+        """
+        with _file_lock(self._lock_path(collection_name, "write"), blocking) as write:
+            if not write:
+                return False
+            with _file_lock(
+                self._lock_path(collection_name, "index"), blocking
+            ) as index:
+                if not index:
+                    return False
+
+                conn = self._db()
+                state = self._state(conn, collection_name)
+                if state is None:
+                    return False
+
+                live = conn.execute(
+                    "SELECT id, row FROM chunk WHERE collection = ? ORDER BY row",
+                    (collection_name,),
+                ).fetchall()
+
+                generation = state["generation"] + 1
+                old_segments = self._get_segments(state)
+                new_segments = _Segments(
+                    self._generation_path(state, generation),
+                    state["dim"],
+                    state["quantization"],
+                    EMBEDDED_VECTOR_SEGMENT_ROWS,
+                )
+                # Left over from an interrupted compaction
+                shutil.rmtree(new_segments.path, ignore_errors=True)
+
+                for start in range(0, len(live), EMBEDDED_VECTOR_SEGMENT_ROWS):
+                    batch = live[start : start + EMBEDDED_VECTOR_SEGMENT_ROWS]
+                    new_segments.append(
+                        start, old_segments.gather([row["row"] for row in batch])
+                    )
+
+                with self._transaction(write=True) as conn:
+                    conn.executemany(
+                        "UPDATE chunk SET row = ? WHERE collection = ? AND id = ?",
+                        [
+                            (new_row, collection_name, row["id"])
+                            for new_row, row in enumerate(live)
+                        ],
+                    )
+                    conn.execute(
+                        "UPDATE collection SET generation = ?, num_rows = ?, "
+                        "num_live = ?, graph_rows = 0 WHERE name = ?",
+                        (generation, len(live), len(live), collection_name),
+                    )
+
+                self._evict(collection_name)
+
+                # Keep the previous generation around for searches that are
+                # still reading it, drop anything older
+                for entry in os.listdir(self._collection_path(state)):
+                    if entry.startswith("gen-") and int(entry[4:]) < generation - 1:
+                        shutil.rmtree(
+                            os.path.join(self._collection_path(state), entry),
+                            ignore_errors=True,
+                        )
+
+        log.info(
+            f"Compacted collection '{collection_name}': "
+            f"{state['num_rows']} -> {len(live)} rows"
+        )
+        return True
+
+    def build_index(self, collection_name: str, blocking: bool = True) -> bool:
+        """Extend the collection's HNSW graph to cover every appended row."""
+        with _file_lock(self._lock_path(collection_name, "index"), blocking) as index:
+            if not index:
+                return False
+
+            state = self._state(self._db(), collection_name)
+            if (
+                state is None
+                or state["num_rows"] < EMBEDDED_VECTOR_HNSW_MIN_ROWS
+                or state["graph_rows"] >= state["num_rows"]
+            ):
+                return False
+
+            # A private, pinned copy rather than the shared reader segments
+            segments = _Segments(
+                self._generation_path(state, state["generation"]),
+                state["dim"],
+                state["quantization"],
+                EMBEDDED_VECTOR_SEGMENT_ROWS,
+            )
+            segments.pin(state["num_rows"])
+            if state["graph_rows"]:
+                graph = _HNSWGraph.load(
+                    self._graph_prefix(state, state["graph_rows"]), writable=True
+                )
+            else:
+                graph = _HNSWGraph(EMBEDDED_VECTOR_HNSW_M)
+
+            rng = random.Random(graph.n)
+            target = state["num_rows"]
+            for node in range(graph.n, target):
+                if self._stop.is_set():
+                    break
+                graph.add(segments, node, EMBEDDED_VECTOR_HNSW_EF_CONSTRUCTION, rng)
+                if (node + 1) % GRAPH_SNAPSHOT_INTERVAL == 0:
+                    if not self._save_graph(state, graph):
+                        return False
+
+            if graph.n > state["graph_rows"] and not self._save_graph(state, graph):
+                return False
+
+        log.info(
+            f"Indexed collection '{collection_name}': {graph.n}/{target} rows in graph"
+        )
+        return True
+
+    def _save_graph(self, state: sqlite3.Row, graph: _HNSWGraph) -> bool:
+        current = self._state(self._db(), state["name"])
+        if current is None or current["dirname"] != state["dirname"]:
+            log.info(f"Collection '{state['name']}' was deleted, stopping indexing")
+            return False
+
+        prefix = self._graph_prefix(state, graph.n)
+        graph.save(prefix)
+
+        with self._transaction(write=True) as conn:
+            updated = conn.execute(
+                "UPDATE collection SET graph_rows = ? "
+                "WHERE name = ? AND generation = ?",
+                (graph.n, state["name"], state["generation"]),
+            ).rowcount
+        if not updated:
+            return False
+
+        # Keep the previous snapshot for searches that are still loading it
+        generation_path = os.path.dirname(prefix)
+        snapshots = sorted(
+            entry
+            for entry in os.listdir(generation_path)
+            if entry.startswith("hnsw-") and entry.endswith(".npz")
+        )
+        for entry in snapshots[:-2]:
+            stale = os.path.join(generation_path, entry[: -len(".npz")])
+            for path in (f"{stale}.npz", f"{stale}-l0.npy"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return True
+
+
+if __name__ == "__main__":
+    # Maintenance outside the app's processes, for deployments that set
+    # ENABLE_EMBEDDED_VECTOR_MAINTENANCE=False
+    client = EmbeddedVectorClient(maintenance=False)
+    try:
+        client.maintain()
+    except KeyboardInterrupt:
+        client.close()
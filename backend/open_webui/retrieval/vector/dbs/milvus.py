@@ -4,14 +4,16 @@ from pymilvus import connections, Collection
 
 import json
 import logging
-from typing import Optional
+from typing import Iterator, List, Optional
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
     VectorDBBase,
     VectorItem,
     SearchResult,
     GetResult,
+    include_field,
 )
 from open_webui.config import (
     MILVUS_URI,
@@ -32,6 +34,8 @@ log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class MilvusClient(VectorDBBase):
+    supports_batched_search = True
+
     def __init__(self):
         self.collection_prefix = "open_webui"
         if MILVUS_TOKEN is None:
@@ -259,6 +263,99 @@ class MilvusClient(VectorDBBase):
         # This will use the paginated query logic.
         return self.query(collection_name=collection_name, filter={}, limit=-1)
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        # Stream the collection with the query iterator, one batch at a time.
+        connections.connect(uri=MILVUS_URI, token=MILVUS_TOKEN, db_name=MILVUS_DB)
+
+        collection_name = collection_name.replace("-", "_")
+        if not self.has_collection(collection_name):
+            return
+
+        include_documents = include_field(fields, "documents")
+        include_metadatas = include_field(fields, "metadatas")
+        output_fields = ["id"]
+        if include_documents:
+            output_fields.append("data")
+        if include_metadatas:
+            output_fields.append("metadata")
+
+        collection = Collection(f"{self.collection_prefix}_{collection_name}")
+        collection.load()
+
+        iterator = collection.query_iterator(
+            batch_size=batch_size, filter="", output_fields=output_fields
+        )
+        try:
+            while True:
+                result = iterator.next()
+                if not result:
+                    return
+                yield GetResult(
+                    ids=[[item.get("id") for item in result]],
+                    documents=(
+                        [[item.get("data", {}).get("text") for item in result]]
+                        if include_documents
+                        else None
+                    ),
+                    metadatas=(
+                        [[item.get("metadata") for item in result]]
+                        if include_metadatas
+                        else None
+                    ),
+                )
+        finally:
+            iterator.close()
+
+    def iter_items(
+        self,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+    ) -> Iterator[list[VectorItem]]:
+        # Stream the matching items with the query iterator, vectors included.
+        connections.connect(uri=MILVUS_URI, token=MILVUS_TOKEN, db_name=MILVUS_DB)
+
+        collection_name = collection_name.replace("-", "_")
+        if not self.has_collection(collection_name):
+            return
+
+        filter_string = " && ".join(
+            [
+                f'metadata["{key}"] == {json.dumps(value)}'
+                for key, value in (filter or {}).items()
+            ]
+        )
+
+        collection = Collection(f"{self.collection_prefix}_{collection_name}")
+        collection.load()
+
+        iterator = collection.query_iterator(
+            batch_size=batch_size,
+            filter=filter_string,
+            output_fields=["id", "vector", "data", "metadata"],
+        )
+        try:
+            while True:
+                result = iterator.next()
+                if not result:
+                    return
+                yield [
+                    {
+                        "id": item.get("id"),
+                        "text": item.get("data", {}).get("text"),
+                        "vector": list(item.get("vector")),
+                        "metadata": item.get("metadata") or {},
+                    }
+                    for item in result
+                ]
+        finally:
+            iterator.close()
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection_name = collection_name.replace("-", "_")
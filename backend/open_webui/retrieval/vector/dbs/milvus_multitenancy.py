@@ -35,6 +35,8 @@ RESOURCE_ID_FIELD = "resource_id"
 
 
 class MilvusClient(VectorDBBase):
+    supports_batched_search = True
+
     def __init__(self):
         # Milvus collection names can only contain numbers, letters, and underscores.
         self.collection_prefix = MILVUS_COLLECTION_PREFIX.replace("-", "_")
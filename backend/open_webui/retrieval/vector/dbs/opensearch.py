@@ -1,13 +1,15 @@
 from opensearchpy import OpenSearch
-from opensearchpy.helpers import bulk
-from typing import Optional
+from opensearchpy.helpers import bulk, scan
+from typing import Iterator, List, Optional
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
     VectorDBBase,
     VectorItem,
     SearchResult,
     GetResult,
+    include_field,
 )
 from open_webui.config import (
     OPENSEARCH_URI,
@@ -187,6 +189,64 @@ class OpenSearchClient(VectorDBBase):
         )
         return self._result_to_get_result(result)
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        # Stream the index with the scroll API instead of a single search,
+        # which is capped at the index's max_result_window.
+        if not self.has_collection(collection_name):
+            return
+
+        include_documents = include_field(fields, "documents")
+        include_metadatas = include_field(fields, "metadatas")
+        query = {
+            "query": {"match_all": {}},
+            "_source": [
+                key
+                for key, included in (
+                    ("text", include_documents),
+                    ("metadata", include_metadatas),
+                )
+                if included
+            ],
+        }
+
+        batch = []
+        for hit in scan(
+            self.client,
+            index=self._get_index_name(collection_name),
+            query=query,
+            size=batch_size,
+        ):
+            batch.append(hit)
+            if len(batch) >= batch_size:
+                yield self._hits_to_get_result(
+                    batch, include_documents, include_metadatas
+                )
+                batch = []
+        if batch:
+            yield self._hits_to_get_result(batch, include_documents, include_metadatas)
+
+    def _hits_to_get_result(
+        self, hits: list, include_documents: bool, include_metadatas: bool
+    ) -> GetResult:
+        return GetResult(
+            ids=[[hit["_id"] for hit in hits]],
+            documents=(
+                [[hit["_source"].get("text") for hit in hits]]
+                if include_documents
+                else None
+            ),
+            metadatas=(
+                [[hit["_source"].get("metadata") for hit in hits]]
+                if include_metadatas
+                else None
+            ),
+        )
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
             collection_name=collection_name, dimension=len(items[0]["vector"])
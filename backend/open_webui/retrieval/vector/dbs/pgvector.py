@@ -1,4 +1,5 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
+import hashlib
 import logging
 import json
 from sqlalchemy import (
@@ -15,6 +16,7 @@ from sqlalchemy import (
     text,
     Text,
     Table,
+    union_all,
     values,
 )
 from sqlalchemy.sql import true
@@ -29,10 +31,12 @@ from sqlalchemy.exc import NoSuchTableError
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
     VectorDBBase,
     VectorItem,
     SearchResult,
     GetResult,
+    include_field,
 )
 from open_webui.config import (
     PGVECTOR_DB_URL,
@@ -44,6 +48,13 @@ from open_webui.config import (
     PGVECTOR_POOL_MAX_OVERFLOW,
     PGVECTOR_POOL_TIMEOUT,
     PGVECTOR_POOL_RECYCLE,
+    PGVECTOR_INDEX_METHOD,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_EF_SEARCH,
+    PGVECTOR_HNSW_ITERATIVE_SCAN,
+    PGVECTOR_IVFFLAT_LISTS,
+    PGVECTOR_IVFFLAT_PROBES,
 )
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -54,6 +65,21 @@ Base = declarative_base()
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+VECTOR_INDEX_NAME = "idx_document_chunk_vector"
+# pgvector can't build HNSW indexes on vector columns wider than this
+HNSW_MAX_DIMENSIONS = 2000
+# Largest hnsw.ef_search pgvector accepts
+HNSW_MAX_EF_SEARCH = 1000
+
+if PGVECTOR_INDEX_METHOD == "hnsw" and VECTOR_LENGTH > HNSW_MAX_DIMENSIONS:
+    log.warning(
+        f"HNSW indexes support at most {HNSW_MAX_DIMENSIONS} dimensions, "
+        f"falling back to ivfflat for VECTOR_LENGTH {VECTOR_LENGTH}"
+    )
+    INDEX_METHOD = "ivfflat"
+else:
+    INDEX_METHOD = PGVECTOR_INDEX_METHOD
+
 
 def pgcrypto_encrypt(val, key):
     return func.pgp_sym_encrypt(val, literal(key))
@@ -79,6 +105,9 @@ class DocumentChunk(Base):
 
 
 class PgvectorClient(VectorDBBase):
+    supports_batched_search = True
+    supports_multi_collection_search = True
+
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
@@ -151,6 +180,8 @@ class PgvectorClient(VectorDBBase):
             # Check vector length consistency
             self.check_vector_length()
 
+            self.iterative_scan = self.get_iterative_scan()
+
             # Create the tables if they do not exist
             # Base.metadata.create_all requires a bind (engine or connection)
             # Get the connection from the session
@@ -158,18 +189,37 @@ class PgvectorClient(VectorDBBase):
             Base.metadata.create_all(bind=connection)
 
             # Create an index on the vector column if it doesn't exist
-            self.session.execute(
+            existing_method = self.session.execute(
                 text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
-                    "ON document_chunk USING ivfflat (vector vector_cosine_ops) WITH (lists = 100);"
+                    "SELECT am.amname FROM pg_class c "
+                    "JOIN pg_am am ON am.oid = c.relam "
+                    "WHERE c.relname = :name AND c.relkind = 'i'"
+                ),
+                {"name": VECTOR_INDEX_NAME},
+            ).scalar()
+            if existing_method is None:
+                self.session.execute(
+                    text(self._vector_index_sql(VECTOR_INDEX_NAME, if_not_exists=True))
+                )
+            elif existing_method != INDEX_METHOD:
+                log.warning(
+                    f"{VECTOR_INDEX_NAME} is an {existing_method} index but "
+                    f"PGVECTOR_INDEX_METHOD is {INDEX_METHOD}; rebuild it with "
+                    "POST /api/v1/retrieval/index/rebuild to switch."
                 )
-            )
             self.session.execute(
                 text(
                     "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
                     "ON document_chunk (collection_name);"
                 )
             )
+            # Keyset pagination for iter_get walks (collection_name, id)
+            self.session.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name_id "
+                    "ON document_chunk (collection_name, id);"
+                )
+            )
             self.session.commit()
             log.info("Initialization complete.")
         except Exception as e:
@@ -177,6 +227,30 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during initialization: {e}")
             raise
 
+    def get_iterative_scan(self) -> str:
+        """
+        The hnsw.iterative_scan mode searches use: PGVECTOR_HNSW_ITERATIVE_SCAN,
+        or "off" if the installed pgvector is older than 0.8 and lacks it.
+        """
+        if PGVECTOR_HNSW_ITERATIVE_SCAN == "off":
+            return "off"
+
+        version = self.session.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar()
+        try:
+            supported = tuple(int(part) for part in version.split(".")[:2]) >= (0, 8)
+        except (AttributeError, ValueError):
+            supported = False
+
+        if not supported:
+            log.info(
+                f"pgvector {version} doesn't support iterative index scans, "
+                "ignoring PGVECTOR_HNSW_ITERATIVE_SCAN"
+            )
+            return "off"
+        return PGVECTOR_HNSW_ITERATIVE_SCAN
+
     def check_vector_length(self) -> None:
         """
         Check if the VECTOR_LENGTH matches the existing vector column dimension in the database.
@@ -355,22 +429,63 @@ class PgvectorClient(VectorDBBase):
             if not vectors:
                 return None
 
-            # Adjust query vectors to VECTOR_LENGTH
-            vectors = [self.adjust_vector_length(vector) for vector in vectors]
-            num_queries = len(vectors)
+            return self._search([collection_name], vectors, limit)[collection_name]
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during search: {e}")
+            return None
+
+    def search_collections(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+    ) -> Dict[str, Optional[SearchResult]]:
+        try:
+            if not vectors or not collection_names:
+                return {collection_name: None for collection_name in collection_names}
+
+            return self._search(collection_names, vectors, limit)
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during multi-collection search: {e}")
+            return {collection_name: None for collection_name in collection_names}
 
-            def vector_expr(vector):
-                return cast(array(vector), Vector(VECTOR_LENGTH))
+    def _search(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
+    ) -> Dict[str, SearchResult]:
+        """
+        Answer every (collection, query vector) pair with a single statement:
+        per collection, the query vectors in a VALUES list joined laterally to a
+        top-k subquery, combined with UNION ALL.
 
+        The collection name is a literal in each branch rather than a join
+        column, so the planner can use a partial index for that collection, or
+        an exact scan when the collection is small enough.
+        """
+        # Adjust query vectors to VECTOR_LENGTH
+        vectors = [self.adjust_vector_length(vector) for vector in vectors]
+        num_queries = len(vectors)
+
+        def vector_expr(vector):
+            return cast(array(vector), Vector(VECTOR_LENGTH))
+
+        branches = []
+        for cid, collection_name in enumerate(collection_names):
             # Create the values for query vectors
             qid_col = column("qid", Integer)
             q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
             query_vectors = (
                 values(qid_col, q_vector_col)
                 .data(
-                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
+                    [(qid, vector_expr(vector)) for qid, vector in enumerate(vectors)]
                 )
-                .alias("query_vectors")
+                .alias(f"query_vectors_{cid}")
             )
 
             result_fields = [
@@ -399,18 +514,18 @@ class PgvectorClient(VectorDBBase):
             # Build the lateral subquery for each query vector
             subq = (
                 select(*result_fields)
-                .where(DocumentChunk.collection_name == collection_name)
+                .where(DocumentChunk.collection_name == literal(collection_name))
                 .order_by(
                     (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
                 )
             )
             if limit is not None:
                 subq = subq.limit(limit)
-            subq = subq.lateral("result")
+            subq = subq.lateral(f"result_{cid}")
 
-            # Build the main query by joining query_vectors and the lateral subquery
-            stmt = (
+            branches.append(
                 select(
+                    literal(cid, Integer).label("cid"),
                     query_vectors.c.qid,
                     subq.c.id,
                     subq.c.text,
@@ -419,42 +534,71 @@ class PgvectorClient(VectorDBBase):
                 )
                 .select_from(query_vectors)
                 .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
             )
 
-            result_proxy = self.session.execute(stmt)
-            results = result_proxy.all()
+        combined = union_all(*branches).subquery("results")
+        stmt = select(combined).order_by(
+            combined.c.cid, combined.c.qid, combined.c.distance
+        )
 
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
+        # SET LOCAL only lasts until the rollback below
+        for setting in self._search_settings(limit, ef_search, exact):
+            self.session.execute(text(setting))
 
-            if not results:
-                return SearchResult(
-                    ids=ids,
-                    distances=distances,
-                    documents=documents,
-                    metadatas=metadatas,
-                )
+        result_proxy = self.session.execute(stmt)
+        results = result_proxy.all()
 
-            for row in results:
-                qid = int(row.qid)
-                ids[qid].append(row.id)
-                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
-                # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
+        ids = [[[] for _ in range(num_queries)] for _ in collection_names]
+        distances = [[[] for _ in range(num_queries)] for _ in collection_names]
+        documents = [[[] for _ in range(num_queries)] for _ in collection_names]
+        metadatas = [[[] for _ in range(num_queries)] for _ in collection_names]
 
-            self.session.rollback()  # read-only transaction
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
+        for row in results:
+            cid = int(row.cid)
+            qid = int(row.qid)
+            ids[cid][qid].append(row.id)
+            # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+            # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
+            distances[cid][qid].append((2.0 - row.distance) / 2.0)
+            documents[cid][qid].append(row.text)
+            metadatas[cid][qid].append(row.vmetadata)
+
+        self.session.rollback()  # read-only transaction
+        return {
+            collection_name: SearchResult(
+                ids=ids[cid],
+                distances=distances[cid],
+                documents=documents[cid],
+                metadatas=metadatas[cid],
             )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during search: {e}")
-            return None
+            for cid, collection_name in enumerate(collection_names)
+        }
+
+    def _search_settings(
+        self,
+        limit: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[str]:
+        if exact:
+            # Force a sequential scan and sort, the ground truth for recall
+            return ["SET LOCAL enable_indexscan = off"]
+
+        if INDEX_METHOD == "hnsw":
+            # The index can't return more than ef_search rows per scan, past
+            # the largest ef_search only iterative scans return more
+            ef_search = min(
+                max(ef_search or PGVECTOR_HNSW_EF_SEARCH, limit or 0),
+                HNSW_MAX_EF_SEARCH,
+            )
+            settings = [f"SET LOCAL hnsw.ef_search = {int(ef_search)}"]
+            if self.iterative_scan != "off":
+                settings.append(
+                    f"SET LOCAL hnsw.iterative_scan = {self.iterative_scan}"
+                )
+            return settings
+
+        return [f"SET LOCAL ivfflat.probes = {int(PGVECTOR_IVFFLAT_PROBES)}"]
 
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
@@ -560,6 +704,118 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during get: {e}")
             return None
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        include_documents = include_field(fields, "documents")
+        include_metadatas = include_field(fields, "metadatas")
+
+        columns = [DocumentChunk.id]
+        if include_documents:
+            columns.append(
+                pgcrypto_decrypt(DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text).label(
+                    "text"
+                )
+                if PGVECTOR_PGCRYPTO
+                else DocumentChunk.text
+            )
+        if include_metadatas:
+            columns.append(
+                pgcrypto_decrypt(
+                    DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                ).label("vmetadata")
+                if PGVECTOR_PGCRYPTO
+                else DocumentChunk.vmetadata
+            )
+
+        # Keyset pagination: each page continues after the last id seen, so
+        # every page is an index range scan regardless of its depth
+        last_id = None
+        while True:
+            try:
+                stmt = select(*columns).where(
+                    DocumentChunk.collection_name == collection_name
+                )
+                if last_id is not None:
+                    stmt = stmt.where(DocumentChunk.id > last_id)
+                stmt = stmt.order_by(DocumentChunk.id).limit(batch_size)
+
+                rows = self.session.execute(stmt).all()
+                self.session.rollback()  # read-only transaction
+            except Exception as e:
+                self.session.rollback()
+                log.exception(f"Error during iter_get: {e}")
+                raise
+
+            if not rows:
+                return
+
+            yield GetResult(
+                ids=[[row.id for row in rows]],
+                documents=[[row.text for row in rows]] if include_documents else None,
+                metadatas=(
+                    [[row.vmetadata for row in rows]] if include_metadatas else None
+                ),
+            )
+
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1].id
+
+    def copy(
+        self,
+        source_collection_name: str,
+        target_collection_name: str,
+        filter: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        # A single INSERT ... SELECT, so the vectors never leave the database
+        try:
+            params = {
+                "source": source_collection_name,
+                "target": target_collection_name,
+                "metadata": json.dumps(process_metadata(dict(metadata or {}))),
+            }
+            if PGVECTOR_PGCRYPTO:
+                params["key"] = PGVECTOR_PGCRYPTO_KEY
+                vmetadata = "pgp_sym_decrypt(vmetadata, :key)::jsonb"
+                new_vmetadata = f"pgp_sym_encrypt(({vmetadata} || CAST(:metadata AS jsonb))::text, :key)"
+            else:
+                vmetadata = "vmetadata"
+                new_vmetadata = "vmetadata || CAST(:metadata AS jsonb)"
+
+            where = ["collection_name = :source"]
+            for idx, (key, value) in enumerate((filter or {}).items()):
+                where.append(f"{vmetadata} ->> :filter_key_{idx} = :filter_value_{idx}")
+                params[f"filter_key_{idx}"] = key
+                params[f"filter_value_{idx}"] = str(value)
+
+            result = self.session.execute(
+                text(
+                    f"""
+                    INSERT INTO document_chunk
+                    (id, vector, collection_name, text, vmetadata)
+                    SELECT gen_random_uuid()::text, vector, :target, text, {new_vmetadata}
+                    FROM document_chunk
+                    WHERE {' AND '.join(where)}
+                    """
+                ),
+                params,
+            )
+            self.session.commit()
+            log.info(
+                f"Copied {result.rowcount} items from collection "
+                f"'{source_collection_name}' to '{target_collection_name}'."
+            )
+            return result.rowcount
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during copy: {e}")
+            raise
+
     def delete(
         self,
         collection_name: str,
@@ -633,4 +889,195 @@ class PgvectorClient(VectorDBBase):
 
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
+        if self._index_exists(self._collection_index_name(collection_name)):
+            self.drop_collection_index(collection_name)
         log.info(f"Collection '{collection_name}' deleted.")
+
+    ############################
+    # Index management
+    ############################
+
+    def _vector_index_sql(
+        self,
+        index_name: str,
+        collection_name: Optional[str] = None,
+        concurrently: bool = False,
+        if_not_exists: bool = False,
+    ) -> str:
+        if INDEX_METHOD == "hnsw":
+            options = (
+                f"m = {int(PGVECTOR_HNSW_M)}, "
+                f"ef_construction = {int(PGVECTOR_HNSW_EF_CONSTRUCTION)}"
+            )
+        else:
+            options = f"lists = {int(PGVECTOR_IVFFLAT_LISTS)}"
+
+        sql = (
+            "CREATE INDEX "
+            + ("CONCURRENTLY " if concurrently else "")
+            + ("IF NOT EXISTS " if if_not_exists else "")
+            + f"{index_name} ON document_chunk "
+            + f"USING {INDEX_METHOD} (vector vector_cosine_ops) WITH ({options})"
+        )
+        if collection_name is not None:
+            # DDL can't take bind parameters, quote the literal ourselves
+            quoted = "'" + collection_name.replace("'", "''") + "'"
+            sql += f" WHERE collection_name = {quoted}"
+        return sql
+
+    def _collection_index_name(self, collection_name: str) -> str:
+        # Collection names can be longer than the 63 character identifier limit
+        digest = hashlib.sha256(collection_name.encode()).hexdigest()[:16]
+        return f"{VECTOR_INDEX_NAME}_c_{digest}"
+
+    def _index_exists(self, index_name: str) -> bool:
+        try:
+            return (
+                self.session.execute(
+                    text(
+                        "SELECT 1 FROM pg_class WHERE relname = :name AND relkind = 'i'"
+                    ),
+                    {"name": index_name},
+                ).scalar()
+                is not None
+            )
+        finally:
+            self.session.rollback()
+
+    def _execute_autocommit(self, statements: List[str]) -> None:
+        # CREATE/DROP INDEX CONCURRENTLY can't run inside a transaction block
+        engine = self.session.get_bind()
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            for statement in statements:
+                log.info(f"Executing: {statement}")
+                connection.execute(text(statement))
+
+    def _build_index_concurrently(
+        self, index_name: str, collection_name: Optional[str] = None
+    ) -> None:
+        """
+        Build the index under a temporary name without blocking writes, then
+        swap it in for the existing one.
+        """
+        build_name = f"{index_name}_rebuild"
+        old_name = f"{index_name}_old"
+        self._execute_autocommit(
+            [
+                # Left behind (and invalid) if a previous build was interrupted
+                f"DROP INDEX CONCURRENTLY IF EXISTS {build_name}",
+                f"DROP INDEX CONCURRENTLY IF EXISTS {old_name}",
+                self._vector_index_sql(
+                    build_name, collection_name=collection_name, concurrently=True
+                ),
+                # Renames are catalog-only, so searches always have an index
+                f"ALTER INDEX IF EXISTS {index_name} RENAME TO {old_name}",
+                f"ALTER INDEX {build_name} RENAME TO {index_name}",
+                f"DROP INDEX CONCURRENTLY IF EXISTS {old_name}",
+            ]
+        )
+
+    def get_index_name(self, collection_name: Optional[str] = None) -> str:
+        """The name of the shared vector index, or of collection_name's own."""
+        if collection_name is None:
+            return VECTOR_INDEX_NAME
+        return self._collection_index_name(collection_name)
+
+    def rebuild_index(self, collection_name: Optional[str] = None) -> str:
+        """
+        Rebuild the shared vector index with the configured method and
+        parameters, or build (or rebuild) a partial index covering only
+        collection_name. Returns the index name.
+
+        This can take hours on a large table, so run it in the background.
+        """
+        index_name = self.get_index_name(collection_name)
+        self._build_index_concurrently(index_name, collection_name=collection_name)
+        log.info(f"Rebuilt vector index {index_name}")
+        return index_name
+
+    def drop_collection_index(self, collection_name: str) -> None:
+        index_name = self._collection_index_name(collection_name)
+        self._execute_autocommit([f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"])
+        log.info(f"Dropped vector index {index_name}")
+
+    def get_index_status(self) -> List[Dict[str, Any]]:
+        try:
+            rows = self.session.execute(
+                text(
+                    "SELECT c.relname AS name, am.amname AS method, "
+                    "i.indisvalid AS valid, pg_relation_size(c.oid) AS size_bytes, "
+                    "pg_get_indexdef(c.oid) AS definition "
+                    "FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid "
+                    "JOIN pg_am am ON am.oid = c.relam "
+                    "WHERE i.indrelid = 'document_chunk'::regclass "
+                    "AND am.amname IN ('hnsw', 'ivfflat') "
+                    "ORDER BY c.relname"
+                )
+            ).all()
+            return [dict(row._mapping) for row in rows]
+        finally:
+            self.session.rollback()
+
+    def get_index_build_progress(self) -> List[Dict[str, Any]]:
+        """Index builds running on document_chunk, from any process."""
+        try:
+            rows = self.session.execute(
+                text(
+                    "SELECT c.relname AS name, p.phase, "
+                    "p.blocks_done, p.blocks_total, "
+                    "p.tuples_done, p.tuples_total "
+                    "FROM pg_stat_progress_create_index p "
+                    "LEFT JOIN pg_class c ON c.oid = p.index_relid "
+                    "WHERE p.relid = 'document_chunk'::regclass"
+                )
+            ).all()
+            return [dict(row._mapping) for row in rows]
+        except Exception as e:
+            # The view is only there from PostgreSQL 12
+            log.debug(f"Failed to read index build progress: {e}")
+            return []
+        finally:
+            self.session.rollback()
+
+    ############################
+    # Benchmarking
+    ############################
+
+    def search_exact(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+    ) -> Dict[str, SearchResult]:
+        try:
+            return self._search(collection_names, vectors, limit, exact=True)
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def search_with_ef(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> Dict[str, SearchResult]:
+        try:
+            return self._search(collection_names, vectors, limit, ef_search=ef_search)
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def sample_vectors(self, collection_name: str, n: int) -> List[List[float]]:
+        try:
+            rows = self.session.execute(
+                select(DocumentChunk.vector)
+                .where(DocumentChunk.collection_name == collection_name)
+                .order_by(func.random())
+                .limit(n)
+            ).all()
+            return [list(map(float, row.vector)) for row in rows]
+        finally:
+            self.session.rollback()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterator, List, Optional
 import logging
 from urllib.parse import urlparse
 
@@ -7,10 +7,12 @@ from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
 from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
     VectorDBBase,
     VectorItem,
     SearchResult,
     GetResult,
+    include_field,
 )
 from open_webui.config import (
     QDRANT_URI,
@@ -31,6 +33,8 @@ log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class QdrantClient(VectorDBBase):
+    supports_batched_search = True
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
@@ -153,18 +157,33 @@ class QdrantClient(VectorDBBase):
         if limit is None:
             limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
 
-        query_response = self.client.query_points(
+        # One request for all query vectors
+        query_responses = self.client.query_batch_points(
             collection_name=f"{self.collection_prefix}_{collection_name}",
-            query=vectors[0],
-            limit=limit,
+            requests=[
+                models.QueryRequest(query=vector, limit=limit, with_payload=True)
+                for vector in vectors
+            ],
         )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
+        return self._responses_to_search_result(query_responses)
+
+    def _responses_to_search_result(self, query_responses) -> SearchResult:
+        ids, documents, metadatas, distances = [], [], [], []
+        for query_response in query_responses:
+            get_result = self._result_to_get_result(query_response.points)
+            ids.extend(get_result.ids)
+            documents.extend(get_result.documents)
+            metadatas.extend(get_result.metadatas)
             # qdrant distance is [-1, 1], normalize to [0, 1]
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            distances.append(
+                [(point.score + 1.0) / 2.0 for point in query_response.points]
+            )
+
+        return SearchResult(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            distances=distances,
         )
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
@@ -201,6 +220,97 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points[0])
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        # Page through the collection with the scroll API.
+        if not self.has_collection(collection_name):
+            return
+
+        include_documents = include_field(fields, "documents")
+        include_metadatas = include_field(fields, "metadatas")
+        payload_keys = [
+            key
+            for key, included in (
+                ("text", include_documents),
+                ("metadata", include_metadatas),
+            )
+            if included
+        ]
+
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                limit=batch_size,
+                offset=offset,
+                with_payload=payload_keys or False,
+                with_vectors=False,
+            )
+            if points:
+                yield GetResult(
+                    ids=[[point.id for point in points]],
+                    documents=(
+                        [[point.payload.get("text") for point in points]]
+                        if include_documents
+                        else None
+                    ),
+                    metadatas=(
+                        [[point.payload.get("metadata") for point in points]]
+                        if include_metadatas
+                        else None
+                    ),
+                )
+            if offset is None:
+                return
+
+    def iter_items(
+        self,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+    ) -> Iterator[list[VectorItem]]:
+        # Page through the matching points with the scroll API, vectors included.
+        if not self.has_collection(collection_name):
+            return
+
+        scroll_filter = None
+        if filter:
+            scroll_filter = models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key=f"metadata.{key}", match=models.MatchValue(value=value)
+                    )
+                    for key, value in filter.items()
+                ]
+            )
+
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                yield [
+                    {
+                        "id": str(point.id),
+                        "text": point.payload.get("text"),
+                        "vector": point.vector,
+                        "metadata": point.payload.get("metadata") or {},
+                    }
+                    for point in points
+                ]
+            if offset is None:
+                return
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Iterator
 from urllib.parse import urlparse
 
 import grpc
@@ -15,10 +15,12 @@ from open_webui.config import (
 )
 from open_webui.env import SRC_LOG_LEVELS
 from open_webui.retrieval.vector.main import (
+    DEFAULT_GET_BATCH_SIZE,
     GetResult,
     SearchResult,
     VectorDBBase,
     VectorItem,
+    include_field,
 )
 from qdrant_client import QdrantClient as Qclient
 from qdrant_client.http.exceptions import UnexpectedResponse
@@ -46,6 +48,8 @@ def _metadata_filter(key: str, value: Any) -> models.FieldCondition:
 
 
 class QdrantClient(VectorDBBase):
+    supports_batched_search = True
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
@@ -269,18 +273,35 @@ class QdrantClient(VectorDBBase):
             return None
 
         tenant_filter = _tenant_filter(tenant_id)
-        query_response = self.client.query_points(
+        # One request for all query vectors
+        query_responses = self.client.query_batch_points(
             collection_name=mt_collection,
-            query=vectors[0],
-            limit=limit,
-            query_filter=models.Filter(must=[tenant_filter]),
+            requests=[
+                models.QueryRequest(
+                    query=vector,
+                    limit=limit,
+                    filter=models.Filter(must=[tenant_filter]),
+                    with_payload=True,
+                )
+                for vector in vectors
+            ],
         )
-        get_result = self._result_to_get_result(query_response.points)
+
+        ids, documents, metadatas, distances = [], [], [], []
+        for query_response in query_responses:
+            get_result = self._result_to_get_result(query_response.points)
+            ids.extend(get_result.ids)
+            documents.extend(get_result.documents)
+            metadatas.extend(get_result.metadatas)
+            distances.append(
+                [(point.score + 1.0) / 2.0 for point in query_response.points]
+            )
+
         return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            distances=distances,
         )
 
     def query(
@@ -325,6 +346,57 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points[0])
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        # Page through the collection with the scroll API.
+        if not self.client:
+            return
+        mt_collection, tenant_id = self._get_collection_and_tenant_id(collection_name)
+        if not self.client.collection_exists(collection_name=mt_collection):
+            return
+
+        include_documents = include_field(fields, "documents")
+        include_metadatas = include_field(fields, "metadatas")
+        payload_keys = [
+            key
+            for key, included in (
+                ("text", include_documents),
+                ("metadata", include_metadatas),
+            )
+            if included
+        ]
+
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=mt_collection,
+                scroll_filter=models.Filter(must=[_tenant_filter(tenant_id)]),
+                limit=batch_size,
+                offset=offset,
+                with_payload=payload_keys or False,
+                with_vectors=False,
+            )
+            if points:
+                yield GetResult(
+                    ids=[[point.id for point in points]],
+                    documents=(
+                        [[point.payload.get("text") for point in points]]
+                        if include_documents
+                        else None
+                    ),
+                    metadatas=(
+                        [[point.payload.get("metadata") for point in points]]
+                        if include_metadatas
+                        else None
+                    ),
+                )
+            if offset is None:
+                return
+
     def upsert(self, collection_name: str, items: List[VectorItem]):
         """
         Upsert items with tenant ID.
@@ -20,6 +20,8 @@ class S3VectorClient(VectorDBBase):
     AWS S3 Vector integration for reInvent Knowledge.
     """
 
+    supports_batched_search = True
+
     def __init__(self):
         self.bucket_name = S3_VECTOR_BUCKET_NAME
         self.region = S3_VECTOR_REGION
@@ -67,6 +67,12 @@ class Vector:
                 from open_webui.retrieval.vector.dbs.oracle23ai import Oracle23aiClient
 
                 return Oracle23aiClient()
+            case VectorType.EMBEDDED:
+                from open_webui.retrieval.vector.dbs.embedded import (
+                    EmbeddedVectorClient,
+                )
+
+                return EmbeddedVectorClient()
             case _:
                 raise ValueError(f"Unsupported vector type: {vector_type}")
 
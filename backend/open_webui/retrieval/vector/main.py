@@ -1,6 +1,9 @@
+import uuid
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+DEFAULT_GET_BATCH_SIZE = 1000
 
 
 class VectorItem(BaseModel):
@@ -20,6 +23,10 @@ class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
 
 
+def include_field(fields: Optional[List[str]], field: str) -> bool:
+    return fields is None or field in fields
+
+
 class VectorDBBase(ABC):
     """
     Abstract base class for all vector database backends.
@@ -31,6 +38,14 @@ class VectorDBBase(ABC):
     implement all abstract methods.
     """
 
+    # True if `search` answers every vector in `vectors` with its own result
+    # row in a single call, rather than only looking at `vectors[0]`.
+    supports_batched_search: bool = False
+
+    # True if `search_collections` is served natively in one round-trip
+    # instead of falling back to one `search` call per collection.
+    supports_multi_collection_search: bool = False
+
     @abstractmethod
     def has_collection(self, collection_name: str) -> bool:
         """Check if the collection exists in the vector DB."""
@@ -58,6 +73,18 @@ class VectorDBBase(ABC):
         """Search for similar vectors in a collection."""
         pass
 
+    def search_collections(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """Search several collections with the same query vectors."""
+        return {
+            collection_name: self.search(collection_name, vectors, limit)
+            for collection_name in collection_names
+        }
+
     @abstractmethod
     def query(
         self, collection_name: str, filter: Dict, limit: Optional[int] = None
@@ -70,6 +97,87 @@ class VectorDBBase(ABC):
         """Retrieve all vectors from a collection."""
         pass
 
+    def iter_get(
+        self,
+        collection_name: str,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[GetResult]:
+        """
+        Stream all items of a collection as GetResults of at most `batch_size` items.
+
+        `fields` selects which of "documents" and "metadatas" to fetch (ids are
+        always returned); fields that are not requested are None. Backends
+        without native pagination fall back to slicing the result of `get`.
+        """
+        result = self.get(collection_name)
+        if not result or not result.ids:
+            return
+
+        ids = result.ids[0]
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            yield GetResult(
+                ids=[ids[start:end]],
+                documents=(
+                    [result.documents[0][start:end]]
+                    if include_field(fields, "documents")
+                    else None
+                ),
+                metadatas=(
+                    [result.metadatas[0][start:end]]
+                    if include_field(fields, "metadatas")
+                    else None
+                ),
+            )
+
+    def iter_items(
+        self,
+        collection_name: str,
+        filter: Optional[Dict] = None,
+        batch_size: int = DEFAULT_GET_BATCH_SIZE,
+    ) -> Iterator[List[VectorItem]]:
+        """
+        Stream the items of a collection matching `filter`, vectors included,
+        as lists of at most `batch_size` items.
+
+        Backends that can't read stored vectors back raise NotImplementedError.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support reading vectors back"
+        )
+
+    def copy(
+        self,
+        source_collection_name: str,
+        target_collection_name: str,
+        filter: Optional[Dict] = None,
+        metadata: Optional[Dict] = None,
+    ) -> int:
+        """
+        Copy the items of one collection matching `filter` into another with
+        their vectors, so they don't have to be embedded again. Copies get new
+        ids and `metadata` merged into theirs. Returns the number of items
+        copied; raises NotImplementedError if the backend can't copy vectors.
+        """
+        copied = 0
+        for items in self.iter_items(source_collection_name, filter):
+            if not items:
+                continue
+            self.insert(
+                target_collection_name,
+                [
+                    {
+                        **item,
+                        "id": str(uuid.uuid4()),
+                        "metadata": {**item["metadata"], **(metadata or {})},
+                    }
+                    for item in items
+                ],
+            )
+            copied += len(items)
+        return copied
+
     @abstractmethod
     def delete(
         self,
@@ -0,0 +1,411 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import requests
+from langchain_core.documents import Document
+
+from open_webui.config import (
+    CACHE_DIR,
+    ENABLE_WEB_FETCH_CACHE,
+    WEB_FETCH_CACHE_MAX_SIZE,
+    WEB_FETCH_CACHE_TTL,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref_src"}
+# Seconds to wait for a server to say whether a page changed
+REVALIDATE_TIMEOUT = 10
+# Stale pages checked at once
+REVALIDATE_CONCURRENCY = 8
+
+
+def normalize_url(url: str) -> str:
+    """
+    The form of ``url`` pages are cached under: lowercase scheme and host,
+    no default port, fragment or tracking parameters, and sorted query
+    parameters.
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    netloc = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        netloc = (
+            f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+        )
+
+    query = urllib.parse.urlencode(
+        sorted(
+            (key, value)
+            for key, value in urllib.parse.parse_qsl(
+                parts.query, keep_blank_values=True
+            )
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+        )
+    )
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def get_loader_validators(loader, url: str) -> Optional[dict]:
+    """The ETag and Last-Modified a web loader got for ``url``, if it keeps them."""
+    normalized_url = normalize_url(url)
+    for loader_url, validators in getattr(loader, "validators", {}).items():
+        if normalize_url(loader_url) == normalized_url:
+            return validators
+    return None
+
+
+def get_embedding_key(metadata: dict) -> Optional[str]:
+    embedding_config = metadata.get("embedding_config")
+    if isinstance(embedding_config, str):
+        try:
+            embedding_config = json.loads(embedding_config)
+        except ValueError:
+            return None
+    if not isinstance(embedding_config, dict):
+        return None
+    return f"{embedding_config.get('engine', '')}:{embedding_config.get('model', '')}"
+
+
+class WebPageCache:
+    """
+    Fetched web pages on disk, one JSON file per normalised URL, holding the
+    extracted documents, the page's ETag and Last-Modified, and the vectors
+    of its chunks.
+
+    A page is used as is for ``ttl`` seconds after it was fetched or last
+    found unchanged. After that, the server is asked whether it changed,
+    if it sent validators, and the page is only fetched again if it did. A
+    page fetched again with the same text keeps its vectors, so it isn't
+    embedded again either.
+
+    The least recently used pages are removed first once the cache is over
+    ``max_size`` bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Path = CACHE_DIR / "web",
+        ttl: int = WEB_FETCH_CACHE_TTL,
+        max_size: int = WEB_FETCH_CACHE_MAX_SIZE * 1024 * 1024,
+        enabled: bool = ENABLE_WEB_FETCH_CACHE,
+    ):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.enabled = enabled
+
+        # file name -> (size, last used), least recently used first
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.changed = 0
+        self.vector_hits = 0
+        self.vector_misses = 0
+        self.evictions = 0
+
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def _load(self):
+        with os.scandir(self.directory) as it:
+            files = [
+                (entry.name, entry.stat())
+                for entry in it
+                if entry.is_file() and entry.name.endswith(".json")
+            ]
+
+        with self._lock:
+            for name, stat in sorted(files, key=lambda file: file[1].st_mtime):
+                self._entries[name] = (stat.st_size, stat.st_mtime)
+                self._size += stat.st_size
+            self._evict()
+
+    def _name(self, url: str) -> str:
+        return f"{hashlib.sha256(normalize_url(url).encode()).hexdigest()}.json"
+
+    def _read(self, name: str) -> Optional[dict]:
+        try:
+            with open(self.directory / name, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning(f"Failed to read cached web page {name}: {e}")
+            return None
+
+    def _write(self, name: str, page: dict):
+        data = json.dumps(page, default=str).encode("utf-8")
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.directory / name)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._size -= entry[0]
+        self._entries[name] = (len(data), time.time())
+        self._size += len(data)
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > 1 and self._size > self.max_size:
+            name, (size, _) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.remove(self.directory / name)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning(f"Failed to remove cached web page {name}: {e}")
+
+    def _use(self, name: str):
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+
+        now = time.time()
+        self._entries[name] = (entry[0], now)
+        self._entries.move_to_end(name)
+        # So the order survives restarts
+        try:
+            os.utime(self.directory / name, (now, now))
+        except OSError:
+            pass
+
+    def lookup(
+        self, urls: list[str], verify_ssl: bool = True, trust_env: bool = False
+    ) -> dict[str, list[Document]]:
+        """
+        The documents of those ``urls`` that are cached and still current,
+        asking the server about the stale ones. Missing urls need fetching.
+        """
+        if not self.enabled:
+            return {}
+
+        pages = {}
+        stale = {}
+        now = time.time()
+        for url in dict.fromkeys(urls):
+            page = self._read(self._name(url))
+            if page is None:
+                continue
+            if now - page.get("validated_at", 0) < self.ttl:
+                pages[url] = page
+            elif page.get("etag") or page.get("last_modified"):
+                stale[url] = page
+
+        if stale:
+            with ThreadPoolExecutor(
+                min(REVALIDATE_CONCURRENCY, len(stale))
+            ) as executor:
+                unchanged = executor.map(
+                    lambda page: self.revalidate(page, verify_ssl, trust_env),
+                    stale.values(),
+                )
+                for (url, page), is_unchanged in zip(stale.items(), unchanged):
+                    if is_unchanged:
+                        pages[url] = page
+
+        with self._lock:
+            self.hits += len(pages)
+            self.misses += len(set(urls)) - len(pages)
+            self.revalidated += sum(1 for url in pages if url in stale)
+            self.changed += sum(1 for url in stale if url not in pages)
+
+            for url, page in pages.items():
+                name = self._name(url)
+                if url in stale:
+                    page["validated_at"] = now
+                    self._write(name, page)
+                else:
+                    self._use(name)
+
+        return {
+            url: [Document(**doc) for doc in page["docs"]]
+            for url, page in pages.items()
+        }
+
+    def revalidate(self, page: dict, verify_ssl: bool, trust_env: bool) -> bool:
+        """Whether the server says ``page`` hasn't changed since it was fetched."""
+        headers = {}
+        if page.get("etag"):
+            headers["If-None-Match"] = page["etag"]
+        if page.get("last_modified"):
+            headers["If-Modified-Since"] = page["last_modified"]
+
+        try:
+            with requests.Session() as session:
+                session.trust_env = trust_env
+                with session.get(
+                    page["url"],
+                    headers=headers,
+                    verify=verify_ssl,
+                    allow_redirects=False,
+                    timeout=REVALIDATE_TIMEOUT,
+                    stream=True,
+                ) as response:
+                    return response.status_code == 304
+        except Exception as e:
+            log.debug(f"Failed to revalidate {page['url']}: {e}")
+            return False
+
+    def put(self, url: str, docs: list[Document], validators: Optional[dict] = None):
+        """Store the documents fetched from ``url``, with the page's validators."""
+        if not self.enabled or not any(doc.page_content.strip() for doc in docs):
+            return
+
+        name = self._name(url)
+        now = time.time()
+        content_hash = hashlib.sha256(
+            "\n".join(doc.page_content for doc in docs).encode()
+        ).hexdigest()
+
+        with self._lock:
+            previous = self._read(name)
+            self._write(
+                name,
+                {
+                    "url": url,
+                    "fetched_at": now,
+                    "validated_at": now,
+                    "etag": (validators or {}).get("etag"),
+                    "last_modified": (validators or {}).get("last_modified"),
+                    "content_hash": content_hash,
+                    "docs": [
+                        {"page_content": doc.page_content, "metadata": doc.metadata}
+                        for doc in docs
+                    ],
+                    # Unchanged text splits into the same chunks
+                    "vectors": (
+                        previous.get("vectors", {})
+                        if previous and previous.get("content_hash") == content_hash
+                        else {}
+                    ),
+                },
+            )
+
+    def get_vectors(self, metadatas: list[dict]) -> list[Optional[list]]:
+        """
+        The cached vectors of chunks of cached pages, by the ``source`` and
+        ``chunk_hash`` in their metadata, or None for the ones not cached.
+        """
+        if not self.enabled:
+            return [None] * len(metadatas)
+
+        pages = {}
+        vectors = []
+        for metadata in metadatas:
+            source = metadata.get("source")
+            if source and source not in pages:
+                pages[source] = self._read(self._name(source))
+
+            page = pages.get(source)
+            vector = None
+            if page is not None:
+                vector = (
+                    page.get("vectors", {})
+                    .get(get_embedding_key(metadata), {})
+                    .get(metadata.get("chunk_hash"))
+                )
+            vectors.append(vector)
+
+        with self._lock:
+            hits = sum(1 for vector in vectors if vector is not None)
+            self.vector_hits += hits
+            self.vector_misses += len(vectors) - hits
+        return vectors
+
+    def set_vectors(self, metadatas: list[dict], vectors: list[list]):
+        """Keep the vectors of chunks of cached pages, see get_vectors."""
+        if not self.enabled:
+            return
+
+        by_source: dict[str, dict[str, dict[str, list]]] = {}
+        for metadata, vector in zip(metadatas, vectors):
+            source = metadata.get("source")
+            embedding_key = get_embedding_key(metadata)
+            if source and embedding_key and metadata.get("chunk_hash"):
+                by_source.setdefault(source, {}).setdefault(embedding_key, {})[
+                    metadata["chunk_hash"]
+                ] = vector
+
+        with self._lock:
+            for source, source_vectors in by_source.items():
+                name = self._name(source)
+                page = self._read(name)
+                if page is None:
+                    continue
+
+                # Only the vectors of the current embedding model are kept
+                for embedding_key, chunk_vectors in source_vectors.items():
+                    page["vectors"] = {
+                        embedding_key: {
+                            **page.get("vectors", {}).get(embedding_key, {}),
+                            **chunk_vectors,
+                        }
+                    }
+                self._write(name, page)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            requests_count = self.hits + self.misses
+            vector_requests = self.vector_hits + self.vector_misses
+            return {
+                "enabled": self.enabled,
+                "ttl": self.ttl,
+                "max_size": self.max_size,
+                "size": self._size,
+                "pages": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests_count if requests_count else 0,
+                "revalidated": self.revalidated,
+                "changed": self.changed,
+                "vector_hits": self.vector_hits,
+                "vector_misses": self.vector_misses,
+                "vector_hit_ratio": (
+                    self.vector_hits / vector_requests if vector_requests else 0
+                ),
+                "evictions": self.evictions,
+            }
+
+
+_web_page_cache: Optional[WebPageCache] = None
+
+
+def get_web_page_cache() -> WebPageCache:
+    global _web_page_cache
+
+    if _web_page_cache is None:
+        _web_page_cache = WebPageCache()
+    return _web_page_cache
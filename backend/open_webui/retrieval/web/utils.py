@@ -26,6 +26,7 @@ from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from open_webui.retrieval.loaders.tavily import TavilyLoader
 from open_webui.retrieval.loaders.external_web import ExternalWebLoader
+from open_webui.retrieval.web.cache import get_loader_validators, get_web_page_cache
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
     ENABLE_RAG_LOCAL_WEB_FETCH,
@@ -502,6 +503,20 @@ class SafeWebBaseLoader(WebBaseLoader):
         super().__init__(*args, **kwargs)
         self.trust_env = trust_env
 
+        # url -> ETag and Last-Modified of the page, for the web page cache
+        self.validators: dict[str, dict] = {}
+        self.session.hooks["response"].append(self._record_validators)
+
+    def _record_validators(self, response, *args, **kwargs):
+        url = response.history[0].url if response.history else response.url
+        self._set_validators(url, response.headers)
+
+    def _set_validators(self, url: str, headers):
+        self.validators[url] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+
     async def _fetch(
         self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
     ) -> str:
@@ -522,6 +537,7 @@ class SafeWebBaseLoader(WebBaseLoader):
                     ) as response:
                         if self.raise_for_status:
                             response.raise_for_status()
+                        self._set_validators(url, response.headers)
                         return await response.text()
                 except aiohttp.ClientConnectionError as e:
                     if i == retries - 1:
@@ -650,3 +666,49 @@ def get_web_loader(
             f"Invalid WEB_LOADER_ENGINE: {WEB_LOADER_ENGINE.value}. "
             "Please set it to 'safe_web', 'playwright', 'firecrawl', or 'tavily'."
         )
+
+
+async def load_web_pages(
+    urls: Sequence[str],
+    verify_ssl: bool = True,
+    requests_per_second: int = 2,
+    trust_env: bool = False,
+) -> list[Document]:
+    """
+    Load ``urls`` like get_web_loader(...).aload() does, but take the pages
+    that are still current from the web page cache and only fetch the rest.
+    """
+    web_page_cache = get_web_page_cache()
+
+    safe_urls = safe_validate_urls(list(urls))
+    cached = await asyncio.to_thread(
+        web_page_cache.lookup, safe_urls, verify_ssl, trust_env
+    )
+
+    loaded: dict[str, list[Document]] = defaultdict(list)
+    missing = [url for url in safe_urls if url not in cached]
+    if missing:
+        loader = get_web_loader(
+            missing,
+            verify_ssl=verify_ssl,
+            requests_per_second=requests_per_second,
+            trust_env=trust_env,
+        )
+        for doc in await loader.aload():
+            loaded[doc.metadata.get("source")].append(doc)
+
+        def store():
+            for url in missing:
+                if url in loaded:
+                    web_page_cache.put(
+                        url, loaded[url], get_loader_validators(loader, url)
+                    )
+
+        await asyncio.to_thread(store)
+
+    docs = []
+    for url in safe_urls:
+        docs.extend(cached[url] if url in cached else loaded.pop(url, []))
+    # Documents whose source isn't one of the urls, e.g. after a redirect
+    docs.extend(doc for url_docs in loaded.values() for doc in url_docs)
+    return docs
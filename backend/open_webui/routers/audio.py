@@ -1,14 +1,20 @@
+import asyncio
 import hashlib
+import io
 import json
 import logging
 import os
+import re
+import shutil
 import uuid
 import html
+from collections import deque
+from contextlib import closing
 from functools import lru_cache
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from typing import Iterator, Optional
 
 from fnmatch import fnmatch
 import aiohttp
@@ -28,17 +34,23 @@ from fastapi import (
     status,
     APIRouter,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.whisper_pool import WhisperQueueFullError, get_whisper_pool
+from open_webui.utils.audio_stream import SpeechSegment, decode_audio, segment_speech
+from open_webui.utils.speech_cache import get_speech_cache
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
     CACHE_DIR,
     WHISPER_LANGUAGE,
+    WHISPER_CPU_THREADS,
+    WHISPER_REPLICAS,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -59,13 +71,14 @@ MAX_FILE_SIZE_MB = 20
 MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to bytes
 AZURE_MAX_FILE_SIZE_MB = 200
 AZURE_MAX_FILE_SIZE = AZURE_MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to bytes
+# Speech segments transcribed at once by a streaming transcription
+STREAM_SEGMENTS_IN_FLIGHT = 2
+# Sentences synthesised at once by a streaming speech request
+TTS_STREAM_SENTENCES_IN_FLIGHT = 3
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
 
-SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
-SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-
 
 ##########################################
 #
@@ -131,6 +144,9 @@ def set_faster_whisper_model(model: str, auto_update: bool = False):
             "compute_type": "int8",
             "download_root": WHISPER_MODEL_DIR,
             "local_files_only": not auto_update,
+            # Replicas for the whisper pool's workers to run in parallel
+            "num_workers": WHISPER_REPLICAS,
+            "cpu_threads": WHISPER_CPU_THREADS,
         }
 
         try:
@@ -309,43 +325,54 @@ def load_speech_pipeline(request):
         )
 
 
-@router.post("/speech")
-async def speech(request: Request, user=Depends(get_verified_user)):
-    body = await request.body()
-    name = hashlib.sha256(
-        body
-        + str(request.app.state.config.TTS_ENGINE).encode("utf-8")
-        + str(request.app.state.config.TTS_MODEL).encode("utf-8")
-    ).hexdigest()
+def synthesize_transformers_speech(request: Request, text: str) -> bytes:
+    import torch
+    import soundfile as sf
 
-    file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-    file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
+    load_speech_pipeline(request)
 
-    # Check if the file already exists in the cache
-    if file_path.is_file():
-        return FileResponse(file_path)
+    embeddings_dataset = request.app.state.speech_speaker_embeddings_dataset
 
-    payload = None
+    speaker_index = 6799
     try:
-        payload = json.loads(body.decode("utf-8"))
-    except Exception as e:
-        log.exception(e)
-        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+        speaker_index = embeddings_dataset["filename"].index(
+            request.app.state.config.TTS_MODEL
+        )
+    except Exception:
+        pass
+
+    speaker_embedding = torch.tensor(
+        embeddings_dataset[speaker_index]["xvector"]
+    ).unsqueeze(0)
+
+    speech = request.app.state.speech_synthesiser(
+        text,
+        forward_params={"speaker_embeddings": speaker_embedding},
+    )
 
+    buffer = io.BytesIO()
+    sf.write(buffer, speech["audio"], samplerate=speech["sampling_rate"], format="MP3")
+    return buffer.getvalue()
+
+
+async def synthesize_speech(request: Request, payload: dict, user) -> Optional[bytes]:
+    """
+    Synthesise ``payload["input"]`` with the configured TTS engine, returning
+    the audio, or None when no server-side engine is configured.
+    """
     r = None
     if request.app.state.config.TTS_ENGINE == "openai":
-        payload["model"] = request.app.state.config.TTS_MODEL
+        payload = {
+            **payload,
+            "model": request.app.state.config.TTS_MODEL,
+            **(request.app.state.config.TTS_OPENAI_PARAMS or {}),
+        }
 
         try:
             timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
             async with aiohttp.ClientSession(
                 timeout=timeout, trust_env=True
             ) as session:
-                payload = {
-                    **payload,
-                    **(request.app.state.config.TTS_OPENAI_PARAMS or {}),
-                }
-
                 r = await session.post(
                     url=f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
                     json=payload,
@@ -367,14 +394,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                 )
 
                 r.raise_for_status()
-
-                async with aiofiles.open(file_path, "wb") as f:
-                    await f.write(await r.read())
-
-                async with aiofiles.open(file_body_path, "w") as f:
-                    await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
+                return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -427,14 +447,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -454,12 +467,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "azure":
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         region = request.app.state.config.TTS_AZURE_SPEECH_REGION or "eastus"
         base_url = request.app.state.config.TTS_AZURE_SPEECH_BASE_URL
         language = request.app.state.config.TTS_VOICE
@@ -486,14 +493,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-                    return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -513,46 +513,172 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "transformers":
-        payload = None
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
+        return await run_in_threadpool(
+            synthesize_transformers_speech, request, payload["input"]
+        )
 
-        import torch
-        import soundfile as sf
+    return None
 
-        load_speech_pipeline(request)
 
-        embeddings_dataset = request.app.state.speech_speaker_embeddings_dataset
+def parse_speech_payload(body: bytes) -> dict:
+    try:
+        return json.loads(body.decode("utf-8"))
+    except Exception as e:
+        log.exception(e)
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
-        speaker_index = 6799
-        try:
-            speaker_index = embeddings_dataset["filename"].index(
-                request.app.state.config.TTS_MODEL
-            )
-        except Exception:
-            pass
 
-        speaker_embedding = torch.tensor(
-            embeddings_dataset[speaker_index]["xvector"]
-        ).unsqueeze(0)
+@router.post("/speech")
+async def speech(request: Request, user=Depends(get_verified_user)):
+    body = await request.body()
+    name = hashlib.sha256(
+        body
+        + str(request.app.state.config.TTS_ENGINE).encode("utf-8")
+        + str(request.app.state.config.TTS_MODEL).encode("utf-8")
+    ).hexdigest()
+
+    speech_cache = get_speech_cache()
+
+    # Check if the file already exists in the cache
+    file_path = speech_cache.get(f"{name}.mp3")
+    if file_path:
+        return FileResponse(file_path)
+
+    payload = parse_speech_payload(body)
+    audio = await synthesize_speech(request, payload, user)
+    if audio is None:
+        return None
+
+    file_path = await run_in_threadpool(speech_cache.put, f"{name}.mp3", audio)
+    return FileResponse(file_path)
+
 
-        speech = request.app.state.speech_synthesiser(
-            payload["input"],
-            forward_params={"speaker_embeddings": speaker_embedding},
+def split_speech_text(request: Request, text: str) -> list[str]:
+    """Split text to synthesise the way TTS_SPLIT_ON splits it in the browser."""
+    if request.app.state.config.TTS_SPLIT_ON == "punctuation":
+        parts = re.split(r"(?<=[.!?;:。！？；：])\s+|\n+", text)
+    elif request.app.state.config.TTS_SPLIT_ON == "paragraphs":
+        parts = re.split(r"\n\s*\n", text)
+    else:
+        parts = [text]
+
+    return [part.strip() for part in parts if part.strip()]
+
+
+def get_speech_format(request: Request, payload: dict) -> str:
+    """The audio format the configured TTS engine returns for ``payload``."""
+    if request.app.state.config.TTS_ENGINE == "openai":
+        # TTS_OPENAI_PARAMS take precedence, see synthesize_speech
+        return (request.app.state.config.TTS_OPENAI_PARAMS or {}).get(
+            "response_format", payload.get("response_format", "mp3")
         )
+    elif request.app.state.config.TTS_ENGINE == "azure":
+        output_format = request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
+        return "mp3" if "mp3" in output_format.lower() else output_format
+    return "mp3"
 
-        sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
 
-        async with aiofiles.open(file_body_path, "w") as f:
-            await f.write(json.dumps(payload))
+@router.post("/speech/stream")
+async def speech_stream(request: Request, user=Depends(get_verified_user)):
+    """
+    Like /speech, but the text is synthesised sentence by sentence, a few at
+    a time, and the audio is streamed back in order as soon as the next
+    sentence is ready. Sentences are cached on their own, so phrases that
+    come up again are not synthesised again.
 
-        return FileResponse(file_path)
+    Only mp3 is streamed, as mp3 files played back to back are still a valid
+    stream, unlike formats with a header such as wav or flac.
+    """
+    payload = parse_speech_payload(await request.body())
+    sentences = split_speech_text(request, payload.get("input", ""))
+
+    if request.app.state.config.TTS_ENGINE not in [
+        "openai",
+        "elevenlabs",
+        "azure",
+        "transformers",
+    ]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("No server-side TTS engine is configured"),
+        )
+    if get_speech_format(request, payload) != "mp3":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT(
+                "Only mp3 speech can be streamed, use /speech for other formats"
+            ),
+        )
+    if not sentences:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.EMPTY_CONTENT,
+        )
+
+    speech_cache = get_speech_cache()
+
+    async def synthesize_sentence(sentence: str) -> bytes:
+        sentence_payload = {**payload, "input": sentence}
+        name = hashlib.sha256(
+            json.dumps(sentence_payload, sort_keys=True).encode("utf-8")
+            + str(request.app.state.config.TTS_ENGINE).encode("utf-8")
+            + str(request.app.state.config.TTS_MODEL).encode("utf-8")
+            + str(request.app.state.config.TTS_VOICE).encode("utf-8")
+        ).hexdigest()
+
+        file_path = speech_cache.get(f"{name}.mp3")
+        if file_path:
+            async with aiofiles.open(file_path, "rb") as f:
+                return await f.read()
 
+        audio = await synthesize_speech(request, sentence_payload, user)
+        await run_in_threadpool(speech_cache.put, f"{name}.mp3", audio)
+        return audio
 
-def transcription_handler(request, file_path, metadata):
+    tasks: list[Optional[asyncio.Task]] = [None] * len(sentences)
+
+    def start(idx: int):
+        if idx < len(sentences):
+            tasks[idx] = asyncio.create_task(synthesize_sentence(sentences[idx]))
+
+    def cancel():
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+
+    for idx in range(TTS_STREAM_SENTENCES_IN_FLIGHT):
+        start(idx)
+
+    # Errors in the first sentence still get a proper status code
+    try:
+        first = await tasks[0]
+    except BaseException:
+        cancel()
+        raise
+
+    async def stream_audio():
+        try:
+            yield first
+            start(TTS_STREAM_SENTENCES_IN_FLIGHT)
+
+            for idx in range(1, len(sentences)):
+                audio = await tasks[idx]
+                start(idx + TTS_STREAM_SENTENCES_IN_FLIGHT)
+                yield audio
+        except Exception as e:
+            log.exception(e)
+        finally:
+            cancel()
+
+    return StreamingResponse(stream_audio(), media_type="audio/mpeg")
+
+
+@router.get("/speech/cache")
+async def get_speech_cache_stats(user=Depends(get_admin_user)):
+    return get_speech_cache().get_stats()
+
+
+def transcription_handler(request, file_path, metadata, user=None):
     filename = os.path.basename(file_path)
     file_dir = os.path.dirname(file_path)
     id = filename.split(".")[0]
@@ -571,8 +697,10 @@ def transcription_handler(request, file_path, metadata):
             )
 
         model = request.app.state.faster_whisper_model
-        segments, info = model.transcribe(
+        transcript, info = get_whisper_pool().transcribe(
+            model,
             file_path,
+            user_id=user.id if user else None,
             beam_size=5,
             vad_filter=request.app.state.config.WHISPER_VAD_FILTER,
             language=languages[0],
@@ -582,7 +710,6 @@ def transcription_handler(request, file_path, metadata):
             % (info.language, info.language_probability)
         )
 
-        transcript = "".join([segment.text for segment in list(segments)])
         data = {"text": transcript.strip()}
 
         # save the transcript to a json file
@@ -829,7 +956,9 @@ def transcription_handler(request, file_path, metadata):
             )
 
 
-def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
+def transcribe(
+    request: Request, file_path: str, metadata: Optional[dict] = None, user=None
+):
     log.info(f"transcribe: {file_path} {metadata}")
 
     if is_audio_conversion_required(file_path):
@@ -856,13 +985,17 @@ def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None
         with ThreadPoolExecutor() as executor:
             # Submit tasks for each chunk_path
             futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
+                executor.submit(
+                    transcription_handler, request, chunk_path, metadata, user
+                )
                 for chunk_path in chunk_paths
             ]
             # Gather results as they complete
             for future in futures:
                 try:
                     results.append(future.result())
+                except WhisperQueueFullError:
+                    raise
                 except Exception as transcribe_exc:
                     raise HTTPException(
                         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -944,28 +1077,32 @@ def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
     return chunks
 
 
-@router.post("/transcriptions")
-def transcription(
-    request: Request,
-    file: UploadFile = File(...),
-    language: Optional[str] = Form(None),
-    user=Depends(get_verified_user),
-):
-    log.info(f"file.content_type: {file.content_type}")
-
+def is_stt_supported_content_type(request: Request, content_type: str) -> bool:
     stt_supported_content_types = getattr(
         request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
     )
 
-    if not any(
-        fnmatch(file.content_type, content_type)
-        for content_type in (
+    return any(
+        fnmatch(content_type, supported_content_type)
+        for supported_content_type in (
             stt_supported_content_types
             if stt_supported_content_types
             and any(t.strip() for t in stt_supported_content_types)
             else ["audio/*", "video/webm"]
         )
-    ):
+    )
+
+
+@router.post("/transcriptions")
+def transcription(
+    request: Request,
+    file: UploadFile = File(...),
+    language: Optional[str] = Form(None),
+    user=Depends(get_verified_user),
+):
+    log.info(f"file.content_type: {file.content_type}")
+
+    if not is_stt_supported_content_type(request, file.content_type):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ERROR_MESSAGES.FILE_NOT_SUPPORTED,
@@ -991,13 +1128,18 @@ def transcription(
             if language:
                 metadata = {"language": language}
 
-            result = transcribe(request, file_path, metadata)
+            result = transcribe(request, file_path, metadata, user=user)
 
             return {
                 **result,
                 "filename": os.path.basename(file_path),
             }
 
+        except WhisperQueueFullError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+            )
         except Exception as e:
             log.exception(e)
 
@@ -1006,6 +1148,8 @@ def transcription(
                 detail=ERROR_MESSAGES.DEFAULT(e),
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
         log.exception(e)
 
@@ -1015,6 +1159,133 @@ def transcription(
         )
 
 
+def transcribe_segment(
+    request: Request,
+    segment: SpeechSegment,
+    file_path: str,
+    metadata: Optional[dict] = None,
+    user=None,
+) -> str:
+    base, _ = os.path.splitext(file_path)
+    segment_path = segment.write_wav(f"{base}_segment_{segment.index}.wav")
+    try:
+        return transcription_handler(request, segment_path, metadata, user)["text"]
+    finally:
+        # transcription_handler leaves a transcript next to the segment
+        for path in [segment_path, f"{base}_segment_{segment.index}.json"]:
+            if os.path.isfile(path):
+                os.remove(path)
+
+
+def stream_transcription(
+    request: Request, file_path: str, metadata: Optional[dict] = None, user=None
+) -> Iterator[str]:
+    """
+    Transcribe a recording one speech segment at a time, as it is decoded,
+    yielding a server-sent event per segment and then one with the whole
+    transcript. Decoding waits while enough segments are being transcribed,
+    so memory use doesn't grow with the length of the recording.
+    """
+    texts = []
+
+    def event(data: dict) -> str:
+        return f"data: {json.dumps(data)}\n\n"
+
+    def segment_event(segment: SpeechSegment, future) -> str:
+        text = future.result().strip()
+        if text:
+            texts.append(text)
+        return event(
+            {
+                "index": segment.index,
+                "start": round(segment.start, 2),
+                "end": round(segment.end, 2),
+                "text": text,
+            }
+        )
+
+    try:
+        with (
+            ThreadPoolExecutor(STREAM_SEGMENTS_IN_FLIGHT) as executor,
+            closing(decode_audio(file_path)) as frames,
+        ):
+            pending = deque()
+            for segment in segment_speech(frames):
+                pending.append(
+                    (
+                        segment,
+                        executor.submit(
+                            transcribe_segment,
+                            request,
+                            segment,
+                            file_path,
+                            metadata,
+                            user,
+                        ),
+                    )
+                )
+
+                # In order, as soon as the oldest segment is done
+                while pending and (
+                    len(pending) >= STREAM_SEGMENTS_IN_FLIGHT or pending[0][1].done()
+                ):
+                    yield segment_event(*pending.popleft())
+
+            while pending:
+                yield segment_event(*pending.popleft())
+
+        data = {"text": " ".join(texts)}
+
+        # save the transcript to a json file
+        with open(f"{os.path.splitext(file_path)[0]}.json", "w") as f:
+            json.dump(data, f)
+
+        yield event({**data, "filename": os.path.basename(file_path), "done": True})
+    except Exception as e:
+        log.exception(e)
+        yield event({"error": str(e)})
+
+
+@router.post("/transcriptions/stream")
+def transcription_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    language: Optional[str] = Form(None),
+    user=Depends(get_verified_user),
+):
+    """
+    Like /transcriptions, but the transcript is streamed back segment by
+    segment as server-sent events.
+    """
+    if not is_stt_supported_content_type(request, file.content_type):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.FILE_NOT_SUPPORTED,
+        )
+
+    ext = file.filename.split(".")[-1]
+    id = uuid.uuid4()
+
+    file_dir = f"{CACHE_DIR}/audio/transcriptions"
+    os.makedirs(file_dir, exist_ok=True)
+    file_path = f"{file_dir}/{id}.{ext}"
+
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(file.file, f)
+
+    metadata = {"language": language} if language else None
+
+    return StreamingResponse(
+        stream_transcription(request, file_path, metadata, user=user),
+        media_type="text/event-stream",
+    )
+
+
+@router.get("/transcriptions/stats")
+async def get_transcription_stats(user=Depends(get_admin_user)):
+    return get_whisper_pool().get_stats()
+
+
 def get_available_models(request: Request) -> list[dict]:
     available_models = []
     if request.app.state.config.TTS_ENGINE == "openai":
@@ -16,6 +16,9 @@ from open_webui.routers.retrieval import (
     ProcessFileForm,
     process_files_batch,
     BatchProcessFilesForm,
+    get_collection_embedding,
+    is_same_embedding,
+    reindex_file,
 )
 from open_webui.storage.provider import Storage
 
@@ -193,6 +196,19 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
 
     deleted_knowledge_bases = []
 
+    embedding_config = {
+        "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+        "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+    }
+    dimension = None
+
+    def get_dimension() -> int:
+        # Only known by embedding something, so done once for all knowledge bases
+        nonlocal dimension
+        if dimension is None:
+            dimension = len(request.app.state.EMBEDDING_FUNCTION("hello world"))
+        return dimension
+
     for knowledge_base in knowledge_bases:
         # -- Robust error handling for missing or invalid data
         if not knowledge_base.data or not isinstance(knowledge_base.data, dict):
@@ -213,23 +229,47 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
             files = Files.get_files_by_ids(file_ids)
             try:
                 if VECTOR_DB_CLIENT.has_collection(collection_name=knowledge_base.id):
-                    VECTOR_DB_CLIENT.delete_collection(
-                        collection_name=knowledge_base.id
-                    )
+                    # Chunks of files still in the knowledge base are diffed
+                    # against their content below, the rest are dropped. A
+                    # collection of another model is embedded from scratch.
+                    try:
+                        if not is_same_embedding(
+                            get_collection_embedding(knowledge_base.id),
+                            embedding_config,
+                            get_dimension(),
+                        ):
+                            log.info(
+                                f"{knowledge_base.id} was embedded with another model, rebuilding it"
+                            )
+                            VECTOR_DB_CLIENT.delete_collection(
+                                collection_name=knowledge_base.id
+                            )
+                        else:
+                            stale_ids = [
+                                item["id"]
+                                for items in VECTOR_DB_CLIENT.iter_items(
+                                    knowledge_base.id
+                                )
+                                for item in items
+                                if (item["metadata"] or {}).get("file_id")
+                                not in file_ids
+                            ]
+                            if stale_ids:
+                                VECTOR_DB_CLIENT.delete(
+                                    collection_name=knowledge_base.id, ids=stale_ids
+                                )
+                    except NotImplementedError:
+                        VECTOR_DB_CLIENT.delete_collection(
+                            collection_name=knowledge_base.id
+                        )
             except Exception as e:
-                log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
+                log.error(f"Error cleaning collection {knowledge_base.id}: {str(e)}")
                 continue  # Skip, don't raise
 
             failed_files = []
             for file in files:
                 try:
-                    process_file(
-                        request,
-                        ProcessFileForm(
-                            file_id=file.id, collection_name=knowledge_base.id
-                        ),
-                        user=user,
-                    )
+                    reindex_file(request, file, knowledge_base.id, user=user)
                 except Exception as e:
                     log.error(
                         f"Error processing file {file.filename} (ID: {file.id}): {str(e)}"
@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -37,7 +32,6 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, validator
-from starlette.background import BackgroundTask
 
 
 from open_webui.models.models import Models
@@ -50,7 +44,9 @@ from open_webui.utils.payload import (
     apply_system_prompt_to_body,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_permission_context, has_access
+from open_webui.utils.http_client import get_upstream_session
+from open_webui.utils.ollama_routing import get_ollama_router
 
 
 from open_webui.config import (
@@ -81,40 +77,56 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = get_upstream_session(url)
+        async with session.get(
+            url,
+            timeout=timeout,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
 
 
-async def cleanup_response(
-    response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
-):
+async def cleanup_response(response: Optional[aiohttp.ClientResponse]):
+    # Release rather than close, so that a fully read connection goes back to
+    # the shared upstream pool
     if response:
-        response.close()
-    if session:
-        await session.close()
+        response.release()
+
+
+async def stream_node_response(response: aiohttp.ClientResponse, url: str):
+    """
+    Yield the body of a streaming response from an Ollama node. The node's
+    request is finished however the stream ends, including when the client
+    disconnects and the response's background tasks never run.
+    """
+    success = True
+    try:
+        async for data in response.content:
+            yield data
+    except aiohttp.ClientError:
+        success = False
+        raise
+    finally:
+        get_ollama_router().finish(url, success=success)
+        await cleanup_response(response)
 
 
 async def send_post_request(
@@ -128,13 +140,15 @@ async def send_post_request(
 ):
 
     r = None
+    routing = get_ollama_router()
+    started_at = routing.start(url)
+    success = False
+    streaming = False
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
+        session = get_upstream_session(url)
         r = await session.post(
             url,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             data=payload,
             headers={
                 "Content-Type": "application/json",
@@ -157,11 +171,13 @@ async def send_post_request(
             },
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
         )
+        routing.record_response(url, started_at)
+        success = r.status < 500
 
         if r.ok is False:
             try:
                 res = await r.json()
-                await cleanup_response(r, session)
+                await cleanup_response(r)
                 if "error" in res:
                     raise HTTPException(status_code=r.status, detail=res["error"])
             except HTTPException as e:
@@ -180,13 +196,12 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            # The node stays busy until the stream has been consumed
+            streaming = True
             return StreamingResponse(
-                r.content,
+                stream_node_response(r, url),
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
             )
         else:
             res = await r.json()
@@ -202,8 +217,35 @@ async def send_post_request(
             detail=detail if e else "reInvent: Server Connection Error",
         )
     finally:
+        if not streaming:
+            routing.finish(url, success=success)
         if not stream:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
+
+
+def select_url_idx(request: Request, model: str, chat_id: Optional[str] = None) -> int:
+    """Pick one of the Ollama connections serving ``model`` (see OllamaRouter)."""
+    configs = request.app.state.config.OLLAMA_API_CONFIGS
+
+    candidates = []
+    for url_idx in request.app.state.OLLAMA_MODELS[model].get("urls", []):
+        url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
+        api_config = configs.get(str(url_idx), configs.get(url, {}))  # Legacy support
+
+        # Models are listed under their prefixed id, the node itself knows
+        # them without the prefix
+        prefix_id = api_config.get("prefix_id", None)
+        upstream_model = model.removeprefix(f"{prefix_id}.") if prefix_id else model
+        candidates.append(
+            (url_idx, url, get_api_key(url_idx, url, configs), upstream_model)
+        )
+
+    if not candidates:
+        raise HTTPException(
+            status_code=400,
+            detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
+        )
+    return get_ollama_router().select(candidates, chat_id=chat_id)
 
 
 def get_api_key(idx, url, configs):
@@ -323,6 +365,21 @@ async def update_config(
     }
 
 
+@router.get("/routing")
+async def get_routing_stats(request: Request, user=Depends(get_admin_user)):
+    """Load, latency and health of each Ollama connection as seen by the router."""
+    routing = get_ollama_router()
+    now = time.monotonic()
+
+    return {
+        "policy": routing.policy,
+        "urls": [
+            {"url_idx": url_idx, **routing.get_node(url).get_stats(now)}
+            for url_idx, url in enumerate(request.app.state.config.OLLAMA_BASE_URLS)
+        ],
+    }
+
+
 def merge_ollama_models_lists(model_lists):
     merged_models = {}
 
@@ -443,12 +500,13 @@ async def get_all_models(request: Request, user: UserModel = None):
 
 async def get_filtered_models(models, user):
     # Filter models based on user access control
+    context = get_permission_context(user.id)
     filtered_models = []
     for model in models.get("models", []):
         model_info = Models.get_model_by_id(model["model"])
         if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
+            if user.id == model_info.user_id or context.has_access(
+                type="read", access_control=model_info.access_control
             ):
                 filtered_models.append(model)
     return filtered_models
@@ -967,7 +1025,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = select_url_idx(request, model)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1045,7 +1103,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1132,7 +1190,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1225,7 +1283,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1284,7 +1342,12 @@ class GenerateChatCompletionForm(BaseModel):
     )
 
 
-async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] = None):
+async def get_ollama_url(
+    request: Request,
+    model: str,
+    url_idx: Optional[int] = None,
+    chat_id: Optional[str] = None,
+):
     if url_idx is None:
         models = request.app.state.OLLAMA_MODELS
         if model not in models:
@@ -1292,7 +1355,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = select_url_idx(request, model, chat_id=chat_id)
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1362,7 +1425,12 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request,
+        payload["model"],
+        url_idx,
+        chat_id=metadata.get("chat_id") if metadata else None,
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1468,7 +1536,12 @@ async def generate_openai_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request,
+        payload["model"],
+        url_idx,
+        chat_id=metadata.get("chat_id") if metadata else None,
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1551,7 +1624,12 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request,
+        payload["model"],
+        url_idx,
+        chat_id=metadata.get("chat_id") if metadata else None,
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
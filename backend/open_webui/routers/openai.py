@@ -23,7 +23,7 @@ from starlette.background import BackgroundTask
 
 from open_webui.models.models import Models
 from open_webui.config import (
-    CACHE_DIR,
+    OPENAI_API_MAX_ATTEMPTS,
 )
 from open_webui.env import (
     MODELS_CACHE_TTL,
@@ -49,7 +49,10 @@ from open_webui.utils.misc import (
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.usage_tracking import track_usage
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_permission_context, has_access
+from open_webui.utils.http_client import get_upstream_session
+from open_webui.utils.openai_routing import get_openai_router
+from open_webui.utils.speech_cache import get_speech_cache
 
 
 log = logging.getLogger(__name__)
@@ -129,39 +132,44 @@ async def stream_wrapper_with_usage_tracking(
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = get_upstream_session(url)
+        async with session.get(
+            url,
+            timeout=timeout,
+            headers={
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
 
 
-async def cleanup_response(
-    response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
-):
+async def cleanup_response(response: Optional[aiohttp.ClientResponse]):
+    # Release rather than close, so that a fully read connection goes back to
+    # the shared upstream pool
     if response:
-        response.close()
-    if session:
-        await session.close()
+        response.release()
+
+
+async def cleanup_routed_response(
+    response: Optional[aiohttp.ClientResponse], url: str
+):
+    get_openai_router().finish(url)
+    await cleanup_response(response)
 
 
 def openai_reasoning_model_handler(payload):
@@ -345,6 +353,16 @@ async def update_config(
     }
 
 
+@router.get("/routing")
+async def get_routing_stats(request: Request, user=Depends(get_admin_user)):
+    """Circuit state, load and latency of each OpenAI connection."""
+    return {
+        "urls": get_openai_router().get_stats(
+            request.app.state.config.OPENAI_API_BASE_URLS
+        )
+    }
+
+
 @router.post("/audio/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
     idx = None
@@ -356,13 +374,11 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         body = await request.body()
         name = hashlib.sha256(body).hexdigest()
 
-        SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
-        SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-        file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
+        speech_cache = get_speech_cache()
 
         # Check if the file already exists in the cache
-        if file_path.is_file():
+        file_path = speech_cache.get(f"{name}.mp3")
+        if file_path:
             return FileResponse(file_path)
 
         url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
@@ -388,13 +404,10 @@ async def speech(request: Request, user=Depends(get_verified_user)):
 
             r.raise_for_status()
 
-            # Save the streaming content to a file
-            with open(file_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-            with open(file_body_path, "w") as f:
-                json.dump(json.loads(body.decode("utf-8")), f)
+            # Save the streaming content to the cache
+            file_path = speech_cache.put(
+                f"{name}.mp3", b"".join(r.iter_content(chunk_size=8192))
+            )
 
             # Return the saved file
             return FileResponse(file_path)
@@ -535,12 +548,13 @@ async def get_all_models_responses(request: Request, user: UserModel) -> list:
 
 async def get_filtered_models(models, user):
     # Filter models based on user access control
+    context = get_permission_context(user.id)
     filtered_models = []
     for model in models.get("data", []):
         model_info = Models.get_model_by_id(model["id"])
         if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
+            if user.id == model_info.user_id or context.has_access(
+                type="read", access_control=model_info.access_control
             ):
                 filtered_models.append(model)
     return filtered_models
@@ -607,6 +621,13 @@ async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
     models = {"data": merge_models_lists(map(extract_data, responses))}
     log.debug(f"models: {models}")
 
+    # Every connection serving a model id, so requests can fail over
+    url_idxs = {}
+    for model in models["data"]:
+        url_idxs.setdefault(model["id"], []).append(model["urlIdx"])
+    for model in models["data"]:
+        model["urlIdxs"] = url_idxs[model["id"]]
+
     request.app.state.OPENAI_MODELS = {model["id"]: model for model in models["data"]}
     return models
 
@@ -632,67 +653,67 @@ async def get_models(
         )
 
         r = None
-        async with aiohttp.ClientSession(
-            trust_env=True,
-            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
-        ) as session:
-            try:
-                headers, cookies = await get_headers_and_cookies(
-                    request, url, key, api_config, user=user
-                )
-
-                if api_config.get("azure", False):
-                    models = {
-                        "data": api_config.get("model_ids", []) or [],
-                        "object": "list",
-                    }
-                else:
-                    async with session.get(
-                        f"{url}/models",
-                        headers=headers,
-                        cookies=cookies,
-                        ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                    ) as r:
-                        if r.status != 200:
-                            # Extract response error details if available
-                            error_detail = f"HTTP Error: {r.status}"
-                            res = await r.json()
-                            if "error" in res:
-                                error_detail = f"External Error: {res['error']}"
-                            raise Exception(error_detail)
+        session = get_upstream_session(url)
+        try:
+            headers, cookies = await get_headers_and_cookies(
+                request, url, key, api_config, user=user
+            )
 
-                        response_data = await r.json()
+            if api_config.get("azure", False):
+                models = {
+                    "data": api_config.get("model_ids", []) or [],
+                    "object": "list",
+                }
+            else:
+                async with session.get(
+                    f"{url}/models",
+                    timeout=aiohttp.ClientTimeout(
+                        total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST
+                    ),
+                    headers=headers,
+                    cookies=cookies,
+                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                ) as r:
+                    if r.status != 200:
+                        # Extract response error details if available
+                        error_detail = f"HTTP Error: {r.status}"
+                        res = await r.json()
+                        if "error" in res:
+                            error_detail = f"External Error: {res['error']}"
+                        raise Exception(error_detail)
+
+                    response_data = await r.json()
+
+                    # Check if we're calling OpenAI API based on the URL
+                    if "api.openai.com" in url:
+                        # Filter models according to the specified conditions
+                        response_data["data"] = [
+                            model
+                            for model in response_data.get("data", [])
+                            if not any(
+                                name in model["id"]
+                                for name in [
+                                    "babbage",
+                                    "dall-e",
+                                    "davinci",
+                                    "embedding",
+                                    "tts",
+                                    "whisper",
+                                ]
+                            )
+                        ]
 
-                        # Check if we're calling OpenAI API based on the URL
-                        if "api.openai.com" in url:
-                            # Filter models according to the specified conditions
-                            response_data["data"] = [
-                                model
-                                for model in response_data.get("data", [])
-                                if not any(
-                                    name in model["id"]
-                                    for name in [
-                                        "babbage",
-                                        "dall-e",
-                                        "davinci",
-                                        "embedding",
-                                        "tts",
-                                        "whisper",
-                                    ]
-                                )
-                            ]
-
-                        models = response_data
-            except aiohttp.ClientError as e:
-                # ClientError covers all aiohttp requests issues
-                log.exception(f"Client error: {str(e)}")
-                raise HTTPException(
-                    status_code=500, detail="reInvent: Server Connection Error"
-                )
-            except Exception as e:
-                log.exception(f"Unexpected error: {e}")
-                error_detail = f"Unexpected error: {str(e)}"
-                raise HTTPException(status_code=500, detail=error_detail)
+                    models = response_data
+        except aiohttp.ClientError as e:
+            # ClientError covers all aiohttp requests issues
+            log.exception(f"Client error: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail="reInvent: Server Connection Error"
+            )
+        except Exception as e:
+            log.exception(f"Unexpected error: {e}")
+            error_detail = f"Unexpected error: {str(e)}"
+            raise HTTPException(status_code=500, detail=error_detail)
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
         models["data"] = await get_filtered_models(models, user)
@@ -865,74 +886,40 @@ def convert_to_azure_payload(url, payload: dict, api_version: str):
     return url, payload
 
 
-@router.post("/chat/completions")
-async def generate_chat_completion(
-    request: Request,
-    form_data: dict,
-    user=Depends(get_verified_user),
-    bypass_filter: Optional[bool] = False,
-):
-    if BYPASS_MODEL_ACCESS_CONTROL:
-        bypass_filter = True
-
-    idx = 0
-
-    payload = {**form_data}
-    metadata = payload.pop("metadata", None)
-
-    model_id = form_data.get("model")
-    model_info = Models.get_model_by_id(model_id)
+def get_api_config(request: Request, idx: int) -> dict:
+    return request.app.state.config.OPENAI_API_CONFIGS.get(
+        str(idx),
+        request.app.state.config.OPENAI_API_CONFIGS.get(
+            request.app.state.config.OPENAI_API_BASE_URLS[idx], {}
+        ),  # Legacy support
+    )
 
-    # Check model info and override the payload
-    if model_info:
-        if model_info.base_model_id:
-            payload["model"] = model_info.base_model_id
-            model_id = model_info.base_model_id
 
-        params = model_info.params.model_dump()
+def get_api_config_weight(api_config: dict) -> float:
+    try:
+        return max(0.0, float(api_config.get("weight", 1)))
+    except (TypeError, ValueError):
+        return 1.0
 
-        if params:
-            system = params.pop("system", None)
 
-            payload = apply_model_params_to_body_openai(params, payload)
-            payload = apply_system_prompt_to_body(system, payload, metadata, user)
-
-        # Check if user has access to the model
-        if not bypass_filter and user.role == "user":
-            if not (
-                user.id == model_info.user_id
-                or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                )
-            ):
-                raise HTTPException(
-                    status_code=403,
-                    detail="Model not found",
-                )
-    elif not bypass_filter:
-        if user.role != "admin":
-            raise HTTPException(
-                status_code=403,
-                detail="Model not found",
-            )
+async def get_chat_completion_request(
+    request: Request,
+    idx: int,
+    payload: dict,
+    model: dict,
+    metadata: Optional[dict],
+    user: UserModel,
+) -> tuple[str, str, dict, dict]:
+    """
+    Build the chat completion request for the connection at ``idx``.
 
-    await get_all_models(request, user=user)
-    model = request.app.state.OPENAI_MODELS.get(model_id)
-    if model:
-        idx = model["urlIdx"]
-    else:
-        raise HTTPException(
-            status_code=404,
-            detail="Model not found",
-        )
+    Returns:
+        tuple: The request URL, the JSON body, headers and cookies.
+    """
+    payload = {**payload}
 
     # Get the API config for the model
-    api_config = request.app.state.config.OPENAI_API_CONFIGS.get(
-        str(idx),
-        request.app.state.config.OPENAI_API_CONFIGS.get(
-            request.app.state.config.OPENAI_API_BASE_URLS[idx], {}
-        ),  # Legacy support
-    )
+    api_config = get_api_config(request, idx)
 
     prefix_id = api_config.get("prefix_id", None)
     if prefix_id:
@@ -986,83 +973,199 @@ async def generate_chat_completion(
     else:
         request_url = f"{url}/chat/completions"
 
-    payload = json.dumps(payload)
+    return request_url, json.dumps(payload), headers, cookies
 
-    r = None
-    session = None
-    streaming = False
-    response = None
 
-    try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
+@router.post("/chat/completions")
+async def generate_chat_completion(
+    request: Request,
+    form_data: dict,
+    user=Depends(get_verified_user),
+    bypass_filter: Optional[bool] = False,
+):
+    if BYPASS_MODEL_ACCESS_CONTROL:
+        bypass_filter = True
+
+    payload = {**form_data}
+    metadata = payload.pop("metadata", None)
+
+    model_id = form_data.get("model")
+    model_info = Models.get_model_by_id(model_id)
+
+    # Check model info and override the payload
+    if model_info:
+        if model_info.base_model_id:
+            payload["model"] = model_info.base_model_id
+            model_id = model_info.base_model_id
+
+        params = model_info.params.model_dump()
+
+        if params:
+            system = params.pop("system", None)
+
+            payload = apply_model_params_to_body_openai(params, payload)
+            payload = apply_system_prompt_to_body(system, payload, metadata, user)
+
+        # Check if user has access to the model
+        if not bypass_filter and user.role == "user":
+            if not (
+                user.id == model_info.user_id
+                or has_access(
+                    user.id, type="read", access_control=model_info.access_control
+                )
+            ):
+                raise HTTPException(
+                    status_code=403,
+                    detail="Model not found",
+                )
+    elif not bypass_filter:
+        if user.role != "admin":
+            raise HTTPException(
+                status_code=403,
+                detail="Model not found",
+            )
+
+    await get_all_models(request, user=user)
+    model = request.app.state.OPENAI_MODELS.get(model_id)
+    if model:
+        url_idxs = model.get("urlIdxs", [model["urlIdx"]])
+    else:
+        raise HTTPException(
+            status_code=404,
+            detail="Model not found",
         )
 
-        r = await session.request(
-            method="POST",
-            url=request_url,
-            data=payload,
-            headers=headers,
-            cookies=cookies,
-            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+    # Connections serving this model id, in the order to try them
+    routing = get_openai_router()
+    attempts = routing.plan(
+        [
+            (
+                idx,
+                request.app.state.config.OPENAI_API_BASE_URLS[idx],
+                get_api_config_weight(get_api_config(request, idx)),
+            )
+            for idx in url_idxs
+        ],
+        OPENAI_API_MAX_ATTEMPTS,
+    )
+    # A lone connection gets one more try if the connection itself fails,
+    # e.g. on a kept-alive connection the server has already closed
+    if len(attempts) == 1 and OPENAI_API_MAX_ATTEMPTS > 1:
+        attempts.append(attempts[0])
+
+    for attempt, idx in enumerate(attempts):
+        url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
+        is_last_attempt = attempt == len(attempts) - 1
+        # Error responses are only worth retrying on another connection
+        can_fail_over = not is_last_attempt and attempts[attempt + 1] != idx
+
+        request_url, data, headers, cookies = await get_chat_completion_request(
+            request, idx, payload, model, metadata, user
         )
 
-        # Check if response is SSE
-        if "text/event-stream" in r.headers.get("Content-Type", ""):
-            streaming = True
-            # Wrap the stream to track usage
-            wrapped_stream = stream_wrapper_with_usage_tracking(
-                r.content,
-                user_email=user.email,
-                model_id=form_data.get("model", model_id),
-                session_id=metadata.get("chat_id") if metadata else None
+        r = None
+        streaming = False
+        started_at = routing.start(url)
+
+        try:
+            session = get_upstream_session(request_url)
+            r = await session.request(
+                method="POST",
+                url=request_url,
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+                data=data,
+                headers=headers,
+                cookies=cookies,
+                ssl=AIOHTTP_CLIENT_SESSION_SSL,
             )
-            return StreamingResponse(
-                wrapped_stream,
-                status_code=r.status,
-                headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            # Nothing has reached the client yet, so the request can be retried
+            routing.failed(url, f"{type(e).__name__}: {e}")
+            routing.finish(url)
+            if is_last_attempt:
+                log.exception(e)
+                raise HTTPException(
+                    status_code=500,
+                    detail="reInvent: Server Connection Error",
+                )
+            log.warning(f"Connection to {url} failed, retrying: {e}")
+            continue
+        except Exception as e:
+            routing.finish(url)
+            log.exception(e)
+            raise HTTPException(
+                status_code=500,
+                detail="reInvent: Server Connection Error",
             )
-        else:
-            try:
-                response = await r.json()
-            except Exception as e:
-                log.error(e)
-                response = await r.text()
 
-            if r.status >= 400:
-                if isinstance(response, (dict, list)):
-                    return JSONResponse(status_code=r.status, content=response)
-                else:
-                    return PlainTextResponse(status_code=r.status, content=response)
+        if r.status == 429 or r.status >= 500:
+            routing.failed(url, f"HTTP {r.status}")
+            if can_fail_over:
+                log.warning(f"{url} returned {r.status}, failing over")
+                routing.finish(url)
+                await cleanup_response(r)
+                continue
+        else:
+            routing.succeeded(url, started_at)
 
-            # Track usage for non-streaming responses
-            if isinstance(response, dict) and "usage" in response:
+        try:
+            # Check if response is SSE
+            if "text/event-stream" in r.headers.get("Content-Type", ""):
+                streaming = True
+                # Wrap the stream to track usage
+                wrapped_stream = stream_wrapper_with_usage_tracking(
+                    r.content,
+                    user_email=user.email,
+                    model_id=form_data.get("model", model_id),
+                    session_id=metadata.get("chat_id") if metadata else None
+                )
+                return StreamingResponse(
+                    wrapped_stream,
+                    status_code=r.status,
+                    headers=dict(r.headers),
+                    background=BackgroundTask(
+                        cleanup_routed_response, response=r, url=url
+                    ),
+                )
+            else:
                 try:
-                    usage_data = response["usage"]
-                    track_usage(
-                        user_email=user.email,
-                        model=payload.get("model", model_id) if isinstance(payload, dict) else model_id,
-                        input_tokens=usage_data.get("prompt_tokens", 0),
-                        output_tokens=usage_data.get("completion_tokens", 0),
-                        session_id=metadata.get("chat_id") if metadata else None
-                    )
+                    response = await r.json()
                 except Exception as e:
-                    log.error(f"Error tracking usage: {e}")
+                    log.error(e)
+                    response = await r.text()
 
-            return response
-    except Exception as e:
-        log.exception(e)
+                if r.status >= 400:
+                    if isinstance(response, (dict, list)):
+                        return JSONResponse(status_code=r.status, content=response)
+                    else:
+                        return PlainTextResponse(status_code=r.status, content=response)
 
-        raise HTTPException(
-            status_code=r.status if r else 500,
-            detail="reInvent: Server Connection Error",
-        )
-    finally:
-        if not streaming:
-            await cleanup_response(r, session)
+                # Track usage for non-streaming responses
+                if isinstance(response, dict) and "usage" in response:
+                    try:
+                        usage_data = response["usage"]
+                        track_usage(
+                            user_email=user.email,
+                            model=model_id,
+                            input_tokens=usage_data.get("prompt_tokens", 0),
+                            output_tokens=usage_data.get("completion_tokens", 0),
+                            session_id=metadata.get("chat_id") if metadata else None
+                        )
+                    except Exception as e:
+                        log.error(f"Error tracking usage: {e}")
+
+                return response
+        except Exception as e:
+            log.exception(e)
+
+            raise HTTPException(
+                status_code=r.status if r else 500,
+                detail="reInvent: Server Connection Error",
+            )
+        finally:
+            if not streaming:
+                routing.finish(url)
+                await cleanup_response(r)
 
 
 async def embeddings(request: Request, form_data: dict, user):
@@ -1102,7 +1205,7 @@ async def embeddings(request: Request, form_data: dict, user):
         request, url, key, api_config, user=user
     )
     try:
-        session = aiohttp.ClientSession(trust_env=True)
+        session = get_upstream_session(url)
         r = await session.request(
             method="POST",
             url=f"{url}/embeddings",
@@ -1117,9 +1220,7 @@ async def embeddings(request: Request, form_data: dict, user):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -1144,7 +1245,7 @@ async def embeddings(request: Request, form_data: dict, user):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
 
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
@@ -1192,7 +1293,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         else:
             request_url = f"{url}/{path}"
 
-        session = aiohttp.ClientSession(trust_env=True)
+        session = get_upstream_session(request_url)
         r = await session.request(
             method=request.method,
             url=request_url,
@@ -1209,9 +1310,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -1237,4 +1336,4 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
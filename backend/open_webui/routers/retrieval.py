@@ -4,14 +4,17 @@ import mimetypes
 import os
 import shutil
 import asyncio
+import threading
+import time
 
 import re
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Any, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
+    BackgroundTasks,
     Depends,
     FastAPI,
     File,
@@ -38,6 +41,7 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.ingest import IngestionFile, IngestionPipeline
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -45,7 +49,8 @@ from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
 from open_webui.retrieval.web.main import SearchResult
-from open_webui.retrieval.web.utils import get_web_loader
+from open_webui.retrieval.web.cache import get_web_page_cache, normalize_url
+from open_webui.retrieval.web.utils import load_web_pages
 from open_webui.retrieval.web.ollama import search_ollama_cloud
 from open_webui.retrieval.web.perplexity_search import search_perplexity_search
 from open_webui.retrieval.web.brave import search_brave
@@ -73,6 +78,7 @@ from open_webui.retrieval.web.external import search_external
 from open_webui.retrieval.utils import (
     get_content_from_url,
     get_embedding_function,
+    get_doc,
     get_reranking_function,
     get_model_path,
     query_collection,
@@ -80,7 +86,7 @@ from open_webui.retrieval.utils import (
     query_doc,
     query_doc_with_hybrid_search,
 )
-from open_webui.retrieval.vector.utils import filter_metadata
+from open_webui.retrieval.vector.utils import filter_metadata, process_metadata
 from open_webui.utils.misc import (
     calculate_sha256_string,
 )
@@ -436,6 +442,7 @@ async def get_rag_config(request: Request, user=Depends(get_admin_user)):
         # Content extraction settings
         "CONTENT_EXTRACTION_ENGINE": request.app.state.config.CONTENT_EXTRACTION_ENGINE,
         "PDF_EXTRACT_IMAGES": request.app.state.config.PDF_EXTRACT_IMAGES,
+        "PDF_PARALLEL_EXTRACTION": request.app.state.config.PDF_PARALLEL_EXTRACTION,
         "DATALAB_MARKER_API_KEY": request.app.state.config.DATALAB_MARKER_API_KEY,
         "DATALAB_MARKER_API_BASE_URL": request.app.state.config.DATALAB_MARKER_API_BASE_URL,
         "DATALAB_MARKER_ADDITIONAL_CONFIG": request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
@@ -618,6 +625,7 @@ class ConfigForm(BaseModel):
     # Content extraction settings
     CONTENT_EXTRACTION_ENGINE: Optional[str] = None
     PDF_EXTRACT_IMAGES: Optional[bool] = None
+    PDF_PARALLEL_EXTRACTION: Optional[bool] = None
 
     DATALAB_MARKER_API_KEY: Optional[str] = None
     DATALAB_MARKER_API_BASE_URL: Optional[str] = None
@@ -744,6 +752,11 @@ async def update_rag_config(
         if form_data.PDF_EXTRACT_IMAGES is not None
         else request.app.state.config.PDF_EXTRACT_IMAGES
     )
+    request.app.state.config.PDF_PARALLEL_EXTRACTION = (
+        form_data.PDF_PARALLEL_EXTRACTION
+        if form_data.PDF_PARALLEL_EXTRACTION is not None
+        else request.app.state.config.PDF_PARALLEL_EXTRACTION
+    )
     request.app.state.config.DATALAB_MARKER_API_KEY = (
         form_data.DATALAB_MARKER_API_KEY
         if form_data.DATALAB_MARKER_API_KEY is not None
@@ -1154,6 +1167,7 @@ async def update_rag_config(
         # Content extraction settings
         "CONTENT_EXTRACTION_ENGINE": request.app.state.config.CONTENT_EXTRACTION_ENGINE,
         "PDF_EXTRACT_IMAGES": request.app.state.config.PDF_EXTRACT_IMAGES,
+        "PDF_PARALLEL_EXTRACTION": request.app.state.config.PDF_PARALLEL_EXTRACTION,
         "DATALAB_MARKER_API_KEY": request.app.state.config.DATALAB_MARKER_API_KEY,
         "DATALAB_MARKER_API_BASE_URL": request.app.state.config.DATALAB_MARKER_API_BASE_URL,
         "DATALAB_MARKER_ADDITIONAL_CONFIG": request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
@@ -1271,6 +1285,121 @@ async def update_rag_config(
 ####################################
 
 
+def get_loader(request: Request) -> Loader:
+    return Loader(
+        engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
+        DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
+        DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
+        DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
+        DATALAB_MARKER_SKIP_CACHE=request.app.state.config.DATALAB_MARKER_SKIP_CACHE,
+        DATALAB_MARKER_FORCE_OCR=request.app.state.config.DATALAB_MARKER_FORCE_OCR,
+        DATALAB_MARKER_PAGINATE=request.app.state.config.DATALAB_MARKER_PAGINATE,
+        DATALAB_MARKER_STRIP_EXISTING_OCR=request.app.state.config.DATALAB_MARKER_STRIP_EXISTING_OCR,
+        DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION=request.app.state.config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
+        DATALAB_MARKER_FORMAT_LINES=request.app.state.config.DATALAB_MARKER_FORMAT_LINES,
+        DATALAB_MARKER_USE_LLM=request.app.state.config.DATALAB_MARKER_USE_LLM,
+        DATALAB_MARKER_OUTPUT_FORMAT=request.app.state.config.DATALAB_MARKER_OUTPUT_FORMAT,
+        EXTERNAL_DOCUMENT_LOADER_URL=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_URL,
+        EXTERNAL_DOCUMENT_LOADER_API_KEY=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
+        TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
+        DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
+        DOCLING_PARAMS={
+            "do_ocr": request.app.state.config.DOCLING_DO_OCR,
+            "force_ocr": request.app.state.config.DOCLING_FORCE_OCR,
+            "ocr_engine": request.app.state.config.DOCLING_OCR_ENGINE,
+            "ocr_lang": request.app.state.config.DOCLING_OCR_LANG,
+            "pdf_backend": request.app.state.config.DOCLING_PDF_BACKEND,
+            "table_mode": request.app.state.config.DOCLING_TABLE_MODE,
+            "pipeline": request.app.state.config.DOCLING_PIPELINE,
+            "do_picture_description": request.app.state.config.DOCLING_DO_PICTURE_DESCRIPTION,
+            "picture_description_mode": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_MODE,
+            "picture_description_local": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_LOCAL,
+            "picture_description_api": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_API,
+            **request.app.state.config.DOCLING_PARAMS,
+        },
+        PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
+        PDF_PARALLEL_EXTRACTION=request.app.state.config.PDF_PARALLEL_EXTRACTION,
+        DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
+        DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
+        MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
+        MINERU_API_MODE=request.app.state.config.MINERU_API_MODE,
+        MINERU_API_URL=request.app.state.config.MINERU_API_URL,
+        MINERU_API_KEY=request.app.state.config.MINERU_API_KEY,
+        MINERU_PARAMS=request.app.state.config.MINERU_PARAMS,
+    )
+
+
+def split_docs(request: Request, docs: list[Document]) -> list[Document]:
+    if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        docs = text_splitter.split_documents(docs)
+    elif request.app.state.config.TEXT_SPLITTER == "token":
+        log.info(
+            f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+        )
+
+        tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
+        text_splitter = TokenTextSplitter(
+            encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        docs = text_splitter.split_documents(docs)
+    elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
+        log.info("Using markdown header text splitter")
+
+        # Define headers to split on - covering most common markdown header levels
+        headers_to_split_on = [
+            ("#", "Header 1"),
+            ("##", "Header 2"),
+            ("###", "Header 3"),
+            ("####", "Header 4"),
+            ("#####", "Header 5"),
+            ("######", "Header 6"),
+        ]
+
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=headers_to_split_on,
+            strip_headers=False,  # Keep headers in content for context
+        )
+
+        md_split_docs = []
+        for doc in docs:
+            md_header_splits = markdown_splitter.split_text(doc.page_content)
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=request.app.state.config.CHUNK_SIZE,
+                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+                add_start_index=True,
+            )
+            md_header_splits = text_splitter.split_documents(md_header_splits)
+
+            # Convert back to Document objects, preserving original metadata
+            for split_chunk in md_header_splits:
+                headings_list = []
+                # Extract header values in order based on headers_to_split_on
+                for _, header_meta_key_name in headers_to_split_on:
+                    if header_meta_key_name in split_chunk.metadata:
+                        headings_list.append(split_chunk.metadata[header_meta_key_name])
+
+                md_split_docs.append(
+                    Document(
+                        page_content=split_chunk.page_content,
+                        metadata={**doc.metadata, "headings": headings_list},
+                    )
+                )
+
+        docs = md_split_docs
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+    return docs
+
+
 def save_docs_to_vector_db(
     request: Request,
     docs,
@@ -1280,7 +1409,18 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user=None,
+    incremental: bool = False,
+    embedding_cache=None,
 ) -> bool:
+    """
+    Split, embed and insert ``docs`` into ``collection_name``.
+
+    With ``incremental``, the chunks already stored for ``metadata["file_id"]``
+    are diffed against the new ones instead, see update_docs_in_vector_db.
+    Chunks whose vectors ``embedding_cache`` has (see WebPageCache) aren't
+    embedded again, and the vectors of the others are added to it.
+    """
+
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
 
@@ -1310,79 +1450,19 @@ def save_docs_to_vector_db(
 
         if result is not None:
             existing_doc_ids = result.ids[0]
+            if incremental:
+                # The file's own chunks are about to be updated
+                existing_doc_ids = [
+                    id
+                    for id, existing_metadata in zip(result.ids[0], result.metadatas[0])
+                    if existing_metadata.get("file_id") != metadata.get("file_id")
+                ]
             if existing_doc_ids:
                 log.info(f"Document with hash {metadata['hash']} already exists")
                 raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
     if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
-            log.info("Using markdown header text splitter")
-
-            # Define headers to split on - covering most common markdown header levels
-            headers_to_split_on = [
-                ("#", "Header 1"),
-                ("##", "Header 2"),
-                ("###", "Header 3"),
-                ("####", "Header 4"),
-                ("#####", "Header 5"),
-                ("######", "Header 6"),
-            ]
-
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=headers_to_split_on,
-                strip_headers=False,  # Keep headers in content for context
-            )
-
-            md_split_docs = []
-            for doc in docs:
-                md_header_splits = markdown_splitter.split_text(doc.page_content)
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=request.app.state.config.CHUNK_SIZE,
-                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                    add_start_index=True,
-                )
-                md_header_splits = text_splitter.split_documents(md_header_splits)
-
-                # Convert back to Document objects, preserving original metadata
-                for split_chunk in md_header_splits:
-                    headings_list = []
-                    # Extract header values in order based on headers_to_split_on
-                    for _, header_meta_key_name in headers_to_split_on:
-                        if header_meta_key_name in split_chunk.metadata:
-                            headings_list.append(
-                                split_chunk.metadata[header_meta_key_name]
-                            )
-
-                    md_split_docs.append(
-                        Document(
-                            page_content=split_chunk.page_content,
-                            metadata={**doc.metadata, "headings": headings_list},
-                        )
-                    )
-
-            docs = md_split_docs
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+        docs = split_docs(request, docs)
 
     if len(docs) == 0:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
@@ -1396,11 +1476,33 @@ def save_docs_to_vector_db(
                 "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
                 "model": request.app.state.config.RAG_EMBEDDING_MODEL,
             },
+            "chunk_hash": calculate_sha256_string(doc.page_content),
         }
         for doc in docs
     ]
 
     try:
+        if incremental and metadata and "file_id" in metadata:
+            try:
+                return update_docs_in_vector_db(
+                    request,
+                    collection_name,
+                    metadata["file_id"],
+                    texts,
+                    metadatas,
+                    user=user,
+                )
+            except NotImplementedError:
+                log.info(
+                    f"{collection_name} can't be diffed, replacing all chunks of file {metadata['file_id']}"
+                )
+                if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+                    VECTOR_DB_CLIENT.delete(
+                        collection_name=collection_name,
+                        filter={"file_id": metadata["file_id"]},
+                    )
+                add = True
+
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
             log.info(f"collection {collection_name} already exists")
 
@@ -1413,43 +1515,63 @@ def save_docs_to_vector_db(
                 )
                 return True
 
-        log.info(f"generating embeddings for {collection_name}")
-        embedding_function = get_embedding_function(
-            request.app.state.config.RAG_EMBEDDING_ENGINE,
-            request.app.state.config.RAG_EMBEDDING_MODEL,
-            request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_BASE_URL
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
-                )
-            ),
-            (
-                request.app.state.config.RAG_OPENAI_API_KEY
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_API_KEY
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
-                )
-            ),
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-            azure_api_version=(
-                request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
-                else None
-            ),
+        embeddings = (
+            embedding_cache.get_vectors(metadatas)
+            if embedding_cache is not None
+            else [None] * len(texts)
         )
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            log.info(f"generating embeddings for {collection_name}")
+            embedding_function = get_embedding_function(
+                request.app.state.config.RAG_EMBEDDING_ENGINE,
+                request.app.state.config.RAG_EMBEDDING_MODEL,
+                request.app.state.ef,
+                (
+                    request.app.state.config.RAG_OPENAI_API_BASE_URL
+                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+                    else (
+                        request.app.state.config.RAG_OLLAMA_BASE_URL
+                        if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                        else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
+                    )
+                ),
+                (
+                    request.app.state.config.RAG_OPENAI_API_KEY
+                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+                    else (
+                        request.app.state.config.RAG_OLLAMA_API_KEY
+                        if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                        else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
+                    )
+                ),
+                request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+                azure_api_version=(
+                    request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
+                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
+                    else None
+                ),
+            )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
-        log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
+            new_embeddings = embedding_function(
+                [texts[idx].replace("\n", " ") for idx in missing],
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=user,
+            )
+            log.info(
+                f"embeddings generated {len(new_embeddings)} for {len(missing)} items"
+            )
+
+            for idx, embedding in zip(missing, new_embeddings):
+                embeddings[idx] = embedding
+            if embedding_cache is not None and len(new_embeddings) == len(missing):
+                embedding_cache.set_vectors(
+                    [metadatas[idx] for idx in missing], new_embeddings
+                )
+
+        if len(missing) < len(texts):
+            log.info(f"reused {len(texts) - len(missing)} cached embeddings")
 
         items = [
             {
@@ -1474,6 +1596,234 @@ def save_docs_to_vector_db(
         raise e
 
 
+def get_collection_embedding(collection_name: str) -> Optional[tuple[Any, int]]:
+    """
+    The embedding config and vector dimension `collection_name` was embedded
+    with, read from its first item, or None if it's empty. Collections are
+    rebuilt rather than diffed when these change, so one item speaks for all.
+
+    Raises NotImplementedError if the vector DB can't read vectors back.
+    """
+    if not VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        return None
+
+    for items in VECTOR_DB_CLIENT.iter_items(collection_name, batch_size=1):
+        for item in items:
+            return (
+                (item["metadata"] or {}).get("embedding_config"),
+                len(item["vector"] or []),
+            )
+    return None
+
+
+def is_same_embedding(
+    collection_embedding: Optional[tuple[Any, int]],
+    embedding_config: dict,
+    dimension: Optional[int] = None,
+) -> bool:
+    """Whether vectors of `embedding_config` can go into a collection embedded with `collection_embedding`."""
+    if collection_embedding is None:
+        return True
+
+    stored_config, stored_dimension = collection_embedding
+    # Stored as a string by backends that flatten nested metadata
+    if stored_config not in [embedding_config, str(embedding_config)]:
+        return False
+    return dimension is None or dimension == stored_dimension
+
+
+def normalize_metadata(metadata: dict) -> dict:
+    """Metadata as the vector DBs that flatten it store it, for comparisons."""
+    return process_metadata(filter_metadata(metadata or {}))
+
+
+def update_docs_in_vector_db(
+    request: Request,
+    collection_name: str,
+    file_id: str,
+    texts: list[str],
+    metadatas: list[dict],
+    user=None,
+) -> bool:
+    """
+    Bring the chunks of a file in `collection_name` in line with `texts`,
+    matching them up by the `chunk_hash` in their metadata: unchanged chunks
+    keep their vectors, new ones are embedded, and the ones left over are
+    deleted.
+
+    If the collection was embedded with another engine, model or dimension,
+    it is deleted and the file's chunks are all embedded into a new one, as
+    vectors of different models can't be searched together.
+
+    Raises NotImplementedError if the vector DB can't read vectors back.
+    """
+    embedding_config = metadatas[0]["embedding_config"]
+
+    def embed(chunks: list[tuple[str, dict]]) -> list[dict]:
+        if not chunks:
+            return []
+
+        embeddings = request.app.state.EMBEDDING_FUNCTION(
+            [text.replace("\n", " ") for text, _ in chunks],
+            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+            user=user,
+        )
+        if not embeddings or len(embeddings) != len(chunks):
+            raise ValueError(ERROR_MESSAGES.DEFAULT("Failed to generate embeddings"))
+
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "text": text,
+                "vector": embeddings[idx],
+                "metadata": metadata,
+            }
+            for idx, (text, metadata) in enumerate(chunks)
+        ]
+
+    def rebuild(new_items: list[dict]) -> bool:
+        log.info(
+            f"{collection_name} was embedded with another model, rebuilding it "
+            f"with file {file_id}"
+        )
+        VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+        VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=new_items)
+        return True
+
+    collection_embedding = get_collection_embedding(collection_name)
+    if not is_same_embedding(collection_embedding, embedding_config):
+        return rebuild(embed(list(zip(texts, metadatas))))
+
+    existing: dict[str, list[dict]] = {}
+    removed_ids = []
+    if collection_embedding is not None:
+        for items in VECTOR_DB_CLIENT.iter_items(
+            collection_name, filter={"file_id": file_id}
+        ):
+            for item in items:
+                item_metadata = item["metadata"] or {}
+                if item_metadata.get("chunk_hash"):
+                    existing.setdefault(item_metadata["chunk_hash"], []).append(item)
+                else:
+                    removed_ids.append(item["id"])
+
+    kept_chunks = []
+    updated_items = []
+    new_chunks = []
+    for text, metadata in zip(texts, metadatas):
+        matches = existing.get(metadata["chunk_hash"])
+        if not matches:
+            new_chunks.append((text, metadata))
+            continue
+
+        item = matches.pop()
+        kept_chunks.append((text, metadata))
+        # Compared as stored, as some vector DBs flatten nested metadata
+        if normalize_metadata(item["metadata"]) != normalize_metadata(metadata):
+            # Moved within the file, or the file's hash changed
+            updated_items.append({**item, "metadata": metadata})
+
+    removed_ids.extend(item["id"] for items in existing.values() for item in items)
+
+    new_items = embed(new_chunks)
+    if new_items and not is_same_embedding(
+        collection_embedding, embedding_config, len(new_items[0]["vector"])
+    ):
+        # Same model, but its vectors changed size
+        return rebuild(new_items + embed(kept_chunks))
+
+    # Removed chunks go last, so a failed update never leaves the file with fewer
+    if updated_items:
+        VECTOR_DB_CLIENT.upsert(collection_name=collection_name, items=updated_items)
+    if new_items:
+        VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=new_items)
+    if removed_ids:
+        VECTOR_DB_CLIENT.delete(collection_name=collection_name, ids=removed_ids)
+
+    log.info(
+        f"updated file {file_id} in {collection_name}: "
+        f"{len(kept_chunks) - len(updated_items)} chunks kept, "
+        f"{len(updated_items)} updated, {len(new_items)} embedded, {len(removed_ids)} removed"
+    )
+    return True
+
+
+def copy_file_vectors_to_collection(
+    request: Request,
+    file,
+    collection_name: str,
+    hash: str,
+    check_duplicate: bool = True,
+) -> bool:
+    """
+    Copy the chunks of an already processed file from its own collection
+    into `collection_name`, vectors included, instead of embedding them again.
+    With `check_duplicate`, content already in the collection is rejected.
+
+    Returns False when they can't be reused: the file has no chunks, they were
+    embedded with another engine or model, or the vector DB can't copy them.
+    """
+    source_collection_name = f"file-{file.id}"
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=source_collection_name,
+        filter={"file_id": file.id},
+        limit=1,
+    )
+    if result is None or len(result.ids[0]) == 0:
+        return False
+
+    embedding_config = {
+        "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+        "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+    }
+    # Stored as a string by backends that flatten nested metadata
+    if result.metadatas[0][0].get("embedding_config") not in [
+        embedding_config,
+        str(embedding_config),
+    ]:
+        log.info(f"{source_collection_name} was embedded with another model")
+        return False
+
+    # Same duplicate check as save_docs_to_vector_db
+    existing = VECTOR_DB_CLIENT.query(
+        collection_name=collection_name, filter={"hash": hash}
+    )
+    existing_ids = set(existing.ids[0]) if existing is not None else set()
+    if check_duplicate and existing_ids:
+        log.info(f"Document with hash {hash} already exists")
+        raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+
+    try:
+        copied = VECTOR_DB_CLIENT.copy(
+            source_collection_name,
+            collection_name,
+            filter={"file_id": file.id},
+            metadata={"file_id": file.id, "name": file.filename, "hash": hash},
+        )
+    except NotImplementedError:
+        return False
+    except Exception:
+        # Drop whatever got copied before the failure
+        try:
+            copied = VECTOR_DB_CLIENT.query(
+                collection_name=collection_name,
+                filter={"file_id": file.id, "hash": hash},
+            )
+            copied_ids = [
+                id for id in (copied.ids[0] if copied else []) if id not in existing_ids
+            ]
+            if copied_ids:
+                VECTOR_DB_CLIENT.delete(collection_name=collection_name, ids=copied_ids)
+        except Exception as e:
+            log.debug(f"Failed to clean up a failed copy: {e}")
+        raise
+
+    log.info(
+        f"copied {copied} items from {source_collection_name} to {collection_name}"
+    )
+    return copied > 0
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1499,18 +1849,18 @@ def process_file(
             if collection_name is None:
                 collection_name = f"file-{file.id}"
 
+            # Whether the chunks (and vectors) of the file's own collection
+            # can be copied rather than embedded again
+            copy_vectors = False
+            # Whether only the chunks that changed are embedded again
+            incremental = False
+            # Whether the documents still need splitting into chunks
+            split = True
+
             if form_data.content:
                 # Update the content in the file
                 # Usage: /files/{file_id}/data/content/update, /files/ (audio file upload pipeline)
-
-                try:
-                    # /files/{file_id}/data/content/update
-                    VECTOR_DB_CLIENT.delete_collection(
-                        collection_name=f"file-{file.id}"
-                    )
-                except:
-                    # Audio file upload pipeline
-                    pass
+                incremental = True
 
                 docs = [
                     Document(
@@ -1535,6 +1885,7 @@ def process_file(
                 )
 
                 if result is not None and len(result.ids[0]) > 0:
+                    copy_vectors = True
                     docs = [
                         Document(
                             page_content=result.documents[0][idx],
@@ -1563,52 +1914,19 @@ def process_file(
                 file_path = file.path
                 if file_path:
                     file_path = Storage.get_file(file_path)
-                    loader = Loader(
-                        engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
-                        DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
-                        DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
-                        DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
-                        DATALAB_MARKER_SKIP_CACHE=request.app.state.config.DATALAB_MARKER_SKIP_CACHE,
-                        DATALAB_MARKER_FORCE_OCR=request.app.state.config.DATALAB_MARKER_FORCE_OCR,
-                        DATALAB_MARKER_PAGINATE=request.app.state.config.DATALAB_MARKER_PAGINATE,
-                        DATALAB_MARKER_STRIP_EXISTING_OCR=request.app.state.config.DATALAB_MARKER_STRIP_EXISTING_OCR,
-                        DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION=request.app.state.config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
-                        DATALAB_MARKER_FORMAT_LINES=request.app.state.config.DATALAB_MARKER_FORMAT_LINES,
-                        DATALAB_MARKER_USE_LLM=request.app.state.config.DATALAB_MARKER_USE_LLM,
-                        DATALAB_MARKER_OUTPUT_FORMAT=request.app.state.config.DATALAB_MARKER_OUTPUT_FORMAT,
-                        EXTERNAL_DOCUMENT_LOADER_URL=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_URL,
-                        EXTERNAL_DOCUMENT_LOADER_API_KEY=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
-                        TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
-                        DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
-                        DOCLING_PARAMS={
-                            "do_ocr": request.app.state.config.DOCLING_DO_OCR,
-                            "force_ocr": request.app.state.config.DOCLING_FORCE_OCR,
-                            "ocr_engine": request.app.state.config.DOCLING_OCR_ENGINE,
-                            "ocr_lang": request.app.state.config.DOCLING_OCR_LANG,
-                            "pdf_backend": request.app.state.config.DOCLING_PDF_BACKEND,
-                            "table_mode": request.app.state.config.DOCLING_TABLE_MODE,
-                            "pipeline": request.app.state.config.DOCLING_PIPELINE,
-                            "do_picture_description": request.app.state.config.DOCLING_DO_PICTURE_DESCRIPTION,
-                            "picture_description_mode": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_MODE,
-                            "picture_description_local": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_LOCAL,
-                            "picture_description_api": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_API,
-                            **request.app.state.config.DOCLING_PARAMS,
-                        },
-                        PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
-                        DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
-                        DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
-                        MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
-                        MINERU_API_MODE=request.app.state.config.MINERU_API_MODE,
-                        MINERU_API_URL=request.app.state.config.MINERU_API_URL,
-                        MINERU_API_KEY=request.app.state.config.MINERU_API_KEY,
-                        MINERU_PARAMS=request.app.state.config.MINERU_PARAMS,
-                    )
-                    docs = loader.load(
+                    loader = get_loader(request)
+
+                    # Split the documents as the loader yields them, so only
+                    # their chunks are held rather than every loaded page
+                    # (unless they aren't embedded at all)
+                    split = request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
+                    contents = []
+                    docs = []
+                    for doc in loader.lazy_load(
                         file.filename, file.meta.get("content_type"), file_path
-                    )
-
-                    docs = [
-                        Document(
+                    ):
+                        contents.append(doc.page_content)
+                        doc = Document(
                             page_content=doc.page_content,
                             metadata={
                                 **filter_metadata(doc.metadata),
@@ -1618,8 +1936,8 @@ def process_file(
                                 "source": file.filename,
                             },
                         )
-                        for doc in docs
-                    ]
+                        docs.extend([doc] if split else split_docs(request, [doc]))
+                    text_content = " ".join(contents)
                 else:
                     docs = [
                         Document(
@@ -1633,7 +1951,7 @@ def process_file(
                             },
                         )
                     ]
-                text_content = " ".join([doc.page_content for doc in docs])
+                    text_content = " ".join([doc.page_content for doc in docs])
 
             log.debug(f"text_content: {text_content}")
             Files.update_file_data_by_id(
@@ -1653,19 +1971,28 @@ def process_file(
                 }
             else:
                 try:
-                    result = save_docs_to_vector_db(
-                        request,
-                        docs=docs,
-                        collection_name=collection_name,
-                        metadata={
-                            "file_id": file.id,
-                            "name": file.filename,
-                            "hash": hash,
-                        },
-                        add=(True if form_data.collection_name else False),
-                        user=user,
-                    )
-                    log.info(f"added {len(docs)} items to collection {collection_name}")
+                    if copy_vectors and copy_file_vectors_to_collection(
+                        request, file, collection_name, hash
+                    ):
+                        result = True
+                    else:
+                        result = save_docs_to_vector_db(
+                            request,
+                            docs=docs,
+                            collection_name=collection_name,
+                            metadata={
+                                "file_id": file.id,
+                                "name": file.filename,
+                                "hash": hash,
+                            },
+                            split=split,
+                            add=(True if form_data.collection_name else False),
+                            user=user,
+                            incremental=incremental,
+                        )
+                        log.info(
+                            f"added {len(docs)} items to collection {collection_name}"
+                        )
 
                     if result:
                         Files.update_file_metadata_by_id(
@@ -1715,6 +2042,62 @@ def process_file(
         )
 
 
+def reindex_file(request: Request, file: FileModel, collection_name: str, user=None):
+    """
+    Split the content of a file into `collection_name` again, with the current
+    splitter settings, embedding only the chunks that changed. Files without
+    extracted content are loaded from storage again.
+    """
+    metadata = {
+        "name": file.filename,
+        "created_by": file.user_id,
+        "file_id": file.id,
+        "source": file.filename,
+    }
+
+    text_content = (file.data or {}).get("content", "")
+    if text_content:
+        docs = [
+            Document(
+                page_content=text_content.replace("<br/>", "\n"),
+                metadata={**file.meta, **metadata},
+            )
+        ]
+    elif file.path:
+        docs = get_loader(request).load(
+            file.filename,
+            file.meta.get("content_type"),
+            Storage.get_file(file.path),
+        )
+        docs = [
+            Document(
+                page_content=doc.page_content,
+                metadata={**filter_metadata(doc.metadata), **metadata},
+            )
+            for doc in docs
+        ]
+        text_content = " ".join([doc.page_content for doc in docs])
+
+        Files.update_file_hash_by_id(file.id, calculate_sha256_string(text_content))
+        Files.update_file_data_by_id(file.id, {"content": text_content})
+    else:
+        docs = []
+
+    return save_docs_to_vector_db(
+        request,
+        docs=docs,
+        collection_name=collection_name,
+        metadata={
+            "file_id": file.id,
+            "name": file.filename,
+            "hash": calculate_sha256_string(text_content),
+        },
+        add=True,
+        user=user,
+        incremental=True,
+    )
+
+
 class ProcessTextForm(BaseModel):
     name: str
     content: str
@@ -1774,6 +2157,7 @@ def process_web(
                 collection_name,
                 overwrite=True,
                 user=user,
+                embedding_cache=get_web_page_cache(),
             )
         else:
             collection_name = None
@@ -2099,7 +2483,11 @@ async def process_web_search(
                         result_items.append(item)
                         urls.append(item.link)
 
-        urls = list(dict.fromkeys(urls))
+        # The same page may come up under slightly different urls
+        unique_urls = {}
+        for url in urls:
+            unique_urls.setdefault(normalize_url(url), url)
+        urls = list(unique_urls.values())
         log.debug(f"urls: {urls}")
 
     except Exception as e:
@@ -2136,13 +2524,12 @@ async def process_web_search(
                 if hasattr(result, "snippet") and result.snippet is not None
             ]
         else:
-            loader = get_web_loader(
+            docs = await load_web_pages(
                 urls,
                 verify_ssl=request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION,
                 requests_per_second=request.app.state.config.WEB_LOADER_CONCURRENT_REQUESTS,
                 trust_env=request.app.state.config.WEB_SEARCH_TRUST_ENV,
             )
-            docs = await loader.aload()
 
         urls = [
             doc.metadata.get("source") for doc in docs if doc.metadata.get("source")
@@ -2182,6 +2569,7 @@ async def process_web_search(
                     collection_name,
                     overwrite=True,
                     user=user,
+                    embedding_cache=get_web_page_cache(),
                 )
             except Exception as e:
                 log.debug(f"error saving docs: {e}")
@@ -2221,7 +2609,7 @@ def query_doc_handler(
             form_data.hybrid is None or form_data.hybrid
         ):
             collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
+            collection_results[form_data.collection_name] = get_doc(
                 collection_name=form_data.collection_name
             )
             return query_doc_with_hybrid_search(
@@ -2370,6 +2758,118 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
         return {"status": False}
 
 
+@router.get("/web/cache")
+def get_web_cache_stats(user=Depends(get_admin_user)):
+    return get_web_page_cache().get_stats()
+
+
+class RebuildIndexForm(BaseModel):
+    collection_name: Optional[str] = None
+
+
+# Index builds started by this process: index name -> state, see
+# rebuild_vector_index
+VECTOR_INDEX_BUILDS: dict[str, dict] = {}
+VECTOR_INDEX_BUILDS_LOCK = threading.Lock()
+
+
+def run_vector_index_build(index_name: str, collection_name: Optional[str]):
+    try:
+        VECTOR_DB_CLIENT.rebuild_index(collection_name=collection_name)
+        state = {"status": "completed", "error": None}
+    except Exception as e:
+        log.exception(f"Failed to rebuild vector index {index_name}: {e}")
+        state = {"status": "failed", "error": str(e)}
+
+    with VECTOR_INDEX_BUILDS_LOCK:
+        VECTOR_INDEX_BUILDS[index_name].update(state, finished_at=int(time.time()))
+
+
+@router.get("/index/status")
+def get_vector_index_status(user=Depends(get_admin_user)):
+    """
+    The vector indexes, the builds started by this process, and the progress
+    of any build running in the database. Invalid indexes are left over from
+    failed concurrent builds; the next rebuild of the same index drops them.
+    """
+    if not hasattr(VECTOR_DB_CLIENT, "get_index_status"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT(
+                "Index management is not supported by the configured vector database."
+            ),
+        )
+
+    indexes = VECTOR_DB_CLIENT.get_index_status()
+    with VECTOR_INDEX_BUILDS_LOCK:
+        builds = {name: dict(build) for name, build in VECTOR_INDEX_BUILDS.items()}
+
+    return {
+        "indexes": indexes,
+        "invalid": [index["name"] for index in indexes if not index["valid"]],
+        "builds": builds,
+        "progress": (
+            VECTOR_DB_CLIENT.get_index_build_progress()
+            if hasattr(VECTOR_DB_CLIENT, "get_index_build_progress")
+            else []
+        ),
+    }
+
+
+@router.post("/index/rebuild", status_code=status.HTTP_202_ACCEPTED)
+def rebuild_vector_index(
+    form_data: RebuildIndexForm,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_admin_user),
+):
+    """
+    Rebuild the shared ANN index without blocking writes, or build a partial
+    index dedicated to one large collection when collection_name is given.
+
+    The build can take hours, so it runs in the background; follow it with
+    /index/status.
+    """
+    if not hasattr(VECTOR_DB_CLIENT, "rebuild_index"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT(
+                "Index management is not supported by the configured vector database."
+            ),
+        )
+
+    if form_data.collection_name and not VECTOR_DB_CLIENT.has_collection(
+        collection_name=form_data.collection_name
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    collection_name = form_data.collection_name or None
+    index_name = VECTOR_DB_CLIENT.get_index_name(collection_name)
+
+    with VECTOR_INDEX_BUILDS_LOCK:
+        build = VECTOR_INDEX_BUILDS.get(index_name)
+        if build is not None and build["status"] == "running":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=ERROR_MESSAGES.DEFAULT(
+                    f"Index {index_name} is already being rebuilt."
+                ),
+            )
+
+        VECTOR_INDEX_BUILDS[index_name] = {
+            "collection_name": collection_name,
+            "status": "running",
+            "error": None,
+            "started_at": int(time.time()),
+            "finished_at": None,
+        }
+
+    background_tasks.add_task(run_vector_index_build, index_name, collection_name)
+    return {"status": True, "index": index_name}
+
+
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
@@ -2424,6 +2924,7 @@ class BatchProcessFilesResult(BaseModel):
 class BatchProcessFilesResponse(BaseModel):
     results: List[BatchProcessFilesResult]
     errors: List[BatchProcessFilesResult]
+    stats: Optional[dict] = None
 
 
 @router.post("/process/files/batch")
@@ -2434,69 +2935,130 @@ def process_files_batch(
 ) -> BatchProcessFilesResponse:
     """
     Process a batch of files and save them to the vector database.
+
+    The files share embedding requests and vector DB inserts, and a file that
+    fails does not fail the rest of the batch.
     """
-    results: List[BatchProcessFilesResult] = []
-    errors: List[BatchProcessFilesResult] = []
     collection_name = form_data.collection_name
+    embedding_config = {
+        "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+        "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+    }
 
-    # Prepare all documents first
-    all_docs: List[Document] = []
-    for file in form_data.files:
-        try:
-            text_content = file.data.get("content", "")
+    def extract(ingestion_file: IngestionFile) -> Optional[List[Document]]:
+        file = ingestion_file.source
+        metadata = {
+            "name": file.filename,
+            "created_by": file.user_id,
+            "file_id": file.id,
+            "source": file.filename,
+        }
 
-            docs: List[Document] = [
+        text_content = file.data.get("content", "")
+        if text_content:
+            docs = [
                 Document(
                     page_content=text_content.replace("<br/>", "\n"),
-                    metadata={
-                        **file.meta,
-                        "name": file.filename,
-                        "created_by": file.user_id,
-                        "file_id": file.id,
-                        "source": file.filename,
-                    },
+                    metadata={**file.meta, **metadata},
                 )
             ]
+        elif file.path:
+            docs = get_loader(request).load(
+                file.filename,
+                file.meta.get("content_type"),
+                Storage.get_file(file.path),
+            )
+            docs = [
+                Document(
+                    page_content=doc.page_content,
+                    metadata={**filter_metadata(doc.metadata), **metadata},
+                )
+                for doc in docs
+            ]
+            text_content = " ".join([doc.page_content for doc in docs])
+        else:
+            docs = []
 
-            hash = calculate_sha256_string(text_content)
-            Files.update_file_hash_by_id(file.id, hash)
-            Files.update_file_data_by_id(file.id, {"content": text_content})
-
-            all_docs.extend(docs)
-            results.append(BatchProcessFilesResult(file_id=file.id, status="prepared"))
+        hash = calculate_sha256_string(text_content)
+        Files.update_file_hash_by_id(file.id, hash)
+        Files.update_file_data_by_id(file.id, {"content": text_content})
 
-        except Exception as e:
-            log.error(f"process_files_batch: Error processing file {file.id}: {str(e)}")
-            errors.append(
-                BatchProcessFilesResult(file_id=file.id, status="failed", error=str(e))
+        # Files already in the collection are added again, as they always were
+        if copy_file_vectors_to_collection(
+            request, file, collection_name, hash, check_duplicate=False
+        ):
+            return None
+
+        docs = split_docs(request, docs)
+        if len(docs) == 0:
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+
+        return [
+            Document(
+                page_content=doc.page_content,
+                metadata={
+                    **doc.metadata,
+                    "file_id": file.id,
+                    "name": file.filename,
+                    "hash": hash,
+                    "embedding_config": embedding_config,
+                    "chunk_hash": calculate_sha256_string(doc.page_content),
+                },
             )
+            for doc in docs
+        ]
 
-    # Save all documents in one batch
-    if all_docs:
-        try:
-            save_docs_to_vector_db(
-                request=request,
-                docs=all_docs,
-                collection_name=collection_name,
-                add=True,
-                user=user,
-            )
+    def embed(texts: List[str]) -> list:
+        return request.app.state.EMBEDDING_FUNCTION(
+            [text.replace("\n", " ") for text in texts],
+            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+            user=user,
+        )
 
-            # Update all files with collection name
-            for result in results:
-                Files.update_file_metadata_by_id(
-                    result.file_id, {"collection_name": collection_name}
+    def insert(collection_name: str, items: List[dict]):
+        try:
+            VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=items)
+        except Exception:
+            # The files are retried one by one, so drop whatever got written
+            try:
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name,
+                    ids=[item["id"] for item in items],
                 )
-                result.status = "completed"
+            except Exception as e:
+                log.debug(f"Failed to clean up a failed insert: {e}")
+            raise
 
-        except Exception as e:
-            log.error(
-                f"process_files_batch: Error saving documents to vector DB: {str(e)}"
+    ingestion_files = [
+        IngestionFile(file.id, collection_name, source=file) for file in form_data.files
+    ]
+    pipeline = IngestionPipeline(
+        extract=extract,
+        embed=embed,
+        insert=insert,
+        embedding_batch_size=request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+    )
+    stats = pipeline.run(ingestion_files)
+
+    results: List[BatchProcessFilesResult] = []
+    errors: List[BatchProcessFilesResult] = []
+    for ingestion_file in ingestion_files:
+        if ingestion_file.status == "completed":
+            Files.update_file_metadata_by_id(
+                ingestion_file.id, {"collection_name": collection_name}
             )
-            for result in results:
-                result.status = "failed"
-                errors.append(
-                    BatchProcessFilesResult(file_id=result.file_id, error=str(e))
+            Files.update_file_data_by_id(ingestion_file.id, {"status": "completed"})
+            results.append(
+                BatchProcessFilesResult(file_id=ingestion_file.id, status="completed")
+            )
+        else:
+            Files.update_file_data_by_id(ingestion_file.id, {"status": "failed"})
+            errors.append(
+                BatchProcessFilesResult(
+                    file_id=ingestion_file.id,
+                    status="failed",
+                    error=ingestion_file.error,
                 )
+            )
 
-    return BatchProcessFilesResponse(results=results, errors=errors)
+    return BatchProcessFilesResponse(results=results, errors=errors, stats=stats)
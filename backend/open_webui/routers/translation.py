@@ -3,12 +3,22 @@ import os
 import uuid
 import tempfile
 import mimetypes
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
+from starlette.concurrency import run_in_threadpool
+
+from open_webui.config import (
+    PDF_PARALLEL_EXTRACTION_MAX_WORKERS,
+    PDF_PARALLEL_EXTRACTION_PAGES_PER_TASK,
+    PDF_PARALLEL_EXTRACTION_WORKER_MAX_MEMORY_MB,
+)
+from open_webui.retrieval.loaders.pdf_parallel import iter_pdf_pages
 from open_webui.utils.auth import get_verified_user
 from open_webui.utils.access_control import has_permission
 from open_webui.utils import libretranslate
@@ -28,9 +38,71 @@ MAX_FILE_SIZE = int(os.environ.get("TRANSLATION_FILE_MAX_SIZE", 5242880))  # 5MB
 ALLOWED_FILE_EXTENSIONS = [".pdf", ".txt", ".doc", ".docx"]
 
 
-def extract_text_from_file(file_path: str, file_ext: str) -> str:
+def iter_pdf_page_texts(file_path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) for every non-empty page of a PDF, in order,
+    extracting page ranges in parallel worker processes.
+    """
+    for page_idx, text, _ in iter_pdf_pages(
+        file_path,
+        max_workers=PDF_PARALLEL_EXTRACTION_MAX_WORKERS,
+        pages_per_task=PDF_PARALLEL_EXTRACTION_PAGES_PER_TASK,
+        max_memory_mb=PDF_PARALLEL_EXTRACTION_WORKER_MAX_MEMORY_MB,
+    ):
+        if text.strip():
+            yield page_idx + 1, text
+
+
+def translate_pdf_streaming(
+    file_path: str,
+    source_lang: str,
+    target_lang: str
+) -> dict:
+    """
+    Translate a PDF page by page while extraction is still running.
+    Each page is handed to the translator as soon as it has been extracted,
+    and results are reassembled in page order.
+    """
+    # Pages waiting for their translation, oldest first; at most two per
+    # worker, so extraction doesn't run arbitrarily far ahead of translation
+    max_pending = 2 * PDF_PARALLEL_EXTRACTION_MAX_WORKERS
+    pending = deque()
+    translated_pages = []
+    detected_language = None
+
+    def collect(page_num, future):
+        nonlocal detected_language
+        result = future.result()
+        translated_pages.append(f"## Page {page_num}\n\n{result['translatedText']}\n")
+        if not detected_language and result.get('detectedLanguage'):
+            detected_language = result['detectedLanguage']
+
+    with ThreadPoolExecutor(max_workers=PDF_PARALLEL_EXTRACTION_MAX_WORKERS) as executor:
+        for page_num, text in iter_pdf_page_texts(file_path):
+            if len(pending) >= max_pending:
+                collect(*pending.popleft())
+            pending.append(
+                (
+                    page_num,
+                    executor.submit(
+                        libretranslate.translate_text, text, source_lang, target_lang
+                    ),
+                )
+            )
+
+        while pending:
+            collect(*pending.popleft())
+
+    return {
+        "translatedText": "\n".join(translated_pages),
+        "detectedLanguage": detected_language,
+    }
+
+
+def extract_text_from_file(file_path: str, file_ext: str, parallel: bool = False) -> str:
     """
     Extract text content from uploaded file and convert to markdown-like format.
+    With parallel=True, PDF pages are extracted in a process pool.
     """
     try:
         if file_ext == ".txt":
@@ -38,6 +110,12 @@ def extract_text_from_file(file_path: str, file_ext: str) -> str:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 return f.read()
 
+        elif file_ext == ".pdf" and parallel:
+            return "\n".join(
+                f"## Page {page_num}\n\n{text}\n"
+                for page_num, text in iter_pdf_page_texts(file_path)
+            )
+
         elif file_ext == ".pdf":
             # PDF extraction using PyPDF2
             try:
@@ -485,7 +563,12 @@ async def upload_file(
 
         # Extract text content based on file type
         try:
-            extracted_text = extract_text_from_file(file_path, file_ext)
+            extracted_text = await run_in_threadpool(
+                extract_text_from_file,
+                file_path,
+                file_ext,
+                request.app.state.config.PDF_PARALLEL_EXTRACTION,
+            )
         except Exception as e:
             log.error(f"Text extraction failed: {e}")
             # Clean up the file
@@ -592,6 +675,33 @@ async def translate_file(
                 preservedFormat=True
             )
 
+        # PDF (parallel extraction): translate pages as they are extracted
+        elif file_ext == ".pdf" and request.app.state.config.PDF_PARALLEL_EXTRACTION:
+            log.info(f"Using page-streamed translation for PDF: {form_data.fileId}")
+
+            translation_result = await run_in_threadpool(
+                translate_pdf_streaming,
+                source_file_path,
+                form_data.source,
+                form_data.target
+            )
+
+            if not translation_result['translatedText'].strip():
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="No text content found in file"
+                )
+
+            original_filename = matching_files[0].replace(form_data.fileId, "").lstrip("_").lstrip(file_ext) or "document"
+
+            return TranslateFileResponse(
+                translatedText=translation_result['translatedText'],
+                translatedFileId=None,
+                detectedLanguage=translation_result['detectedLanguage'],
+                filename=original_filename,
+                preservedFormat=False
+            )
+
         # TXT/PDF: Extract text and translate
         else:
             log.info(f"Using text-based translation for {file_ext}: {form_data.fileId}")
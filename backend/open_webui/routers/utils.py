@@ -13,7 +13,10 @@ from starlette.responses import FileResponse
 from open_webui.utils.misc import get_gravatar_url
 from open_webui.utils.pdf_generator import PDFGenerator
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.code_interpreter import (
+    execute_code_jupyter,
+    get_jupyter_kernel_pool_stats,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 
@@ -72,6 +75,11 @@ async def execute_code(
         )
 
 
+@router.get("/code/kernels")
+async def get_code_kernel_stats(user=Depends(get_admin_user)):
+    return get_jupyter_kernel_pool_stats()
+
+
 class MarkdownForm(BaseModel):
     md: str
 
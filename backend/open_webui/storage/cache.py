@@ -0,0 +1,205 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.config import CACHE_DIR, STORAGE_CACHE_MAX_SIZE, UPLOAD_DIR
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Seconds a copy that was just handed out is kept, so that callers have time
+# to open it before it can be evicted (removing an open file doesn't affect
+# its readers)
+LEASE_SECONDS = 300
+
+
+class StorageCache:
+    """
+    Local copies of the files of a cloud storage provider, kept in a directory
+    of their own.
+
+    Each copy is recorded with the ETag of the object it was uploaded or
+    downloaded as, so an unchanged object is served from disk instead of being
+    downloaded again. The total size is bounded by removing the least recently
+    used copies, skipping those handed out in the last LEASE_SECONDS; a
+    max_size of 0 turns the cache off, and copies are then downloaded to
+    UPLOAD_DIR on every use.
+    """
+
+    def __init__(
+        self,
+        max_size: int = STORAGE_CACHE_MAX_SIZE * 1024 * 1024,
+        directory: str = str(CACHE_DIR / "storage"),
+    ):
+        self.max_size = max_size
+        self.directory = directory
+
+        # local path -> (etag, size), least recently used first
+        self._entries: OrderedDict[str, tuple[Optional[str], int]] = OrderedDict()
+        # local path -> time until which it isn't evicted
+        self._leases: dict[str, float] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_downloaded = 0
+
+        if self.max_size > 0:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load()
+
+    def _load(self):
+        # Copies left from before a restart count towards the size limit,
+        # but are downloaded again on first use as their ETag is unknown
+        with os.scandir(self.directory) as it:
+            files = [
+                entry
+                for entry in it
+                if entry.is_file() and not entry.name.endswith(".part")
+            ]
+
+        with self._lock:
+            for entry in sorted(files, key=lambda entry: entry.stat().st_mtime):
+                size = entry.stat().st_size
+                self._entries[entry.path] = (None, size)
+                self._size += size
+            self._evict()
+
+    def local_path(self, filename: str) -> str:
+        """Where the local copy of the stored file ``filename`` is kept."""
+        directory = self.directory if self.max_size > 0 else str(UPLOAD_DIR)
+        return os.path.join(directory, os.path.basename(filename))
+
+    def get(self, local_path: str, etag: Optional[str]) -> bool:
+        """Whether ``local_path`` is a copy of the object currently at ``etag``."""
+        with self._lock:
+            entry = self._entries.get(local_path)
+            if (
+                self.max_size > 0
+                and entry is not None
+                and etag is not None
+                and entry[0] == etag
+                and os.path.isfile(local_path)
+            ):
+                self._entries.move_to_end(local_path)
+                self._lease(local_path)
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            return False
+
+    def put(self, local_path: str, etag: Optional[str]):
+        """Record ``local_path`` as a copy of the object at ``etag``."""
+        if self.max_size <= 0:
+            return
+
+        size = os.path.getsize(local_path)
+        with self._lock:
+            self._forget(local_path)
+            self._entries[local_path] = (etag, size)
+            self._size += size
+            self._lease(local_path)
+            self._evict()
+
+    def adopt(self, file_path: str, etag: Optional[str]):
+        """Keep the uploaded file ``file_path`` as the copy of the object at ``etag``."""
+        if self.max_size <= 0:
+            return
+
+        local_path = self.local_path(file_path)
+        shutil.move(file_path, local_path)
+        self.put(local_path, etag)
+
+    def download(
+        self, local_path: str, etag: Optional[str], download: Callable[[str], None]
+    ) -> str:
+        """
+        Fill ``local_path`` by calling ``download`` with a temporary path, so
+        that readers never see a partially written file.
+        """
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(local_path), prefix=".", suffix=".part"
+        )
+        os.close(fd)
+        try:
+            download(tmp_path)
+            os.replace(tmp_path, local_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self.bytes_downloaded += os.path.getsize(local_path)
+        self.put(local_path, etag)
+        return local_path
+
+    def discard(self, local_path: str):
+        """Remove the copy at ``local_path``, as its object was deleted."""
+        with self._lock:
+            self._forget(local_path)
+        self._remove(local_path)
+
+    def clear(self):
+        with self._lock:
+            local_paths = list(self._entries)
+            self._entries.clear()
+            self._leases.clear()
+            self._size = 0
+        for local_path in local_paths:
+            self._remove(local_path)
+
+    def _lease(self, local_path: str):
+        self._leases[local_path] = time.monotonic() + LEASE_SECONDS
+
+    def _forget(self, local_path: str):
+        entry = self._entries.pop(local_path, None)
+        if entry is not None:
+            self._size -= entry[1]
+        self._leases.pop(local_path, None)
+
+    def _remove(self, local_path: str):
+        try:
+            os.remove(local_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning(f"Failed to remove cached file {local_path}: {e}")
+
+    def _evict(self):
+        now = time.monotonic()
+        for local_path in list(self._entries):
+            if self._size <= self.max_size:
+                break
+            # Copies that were just handed out may not have been opened yet
+            if self._leases.get(local_path, 0) > now:
+                continue
+
+            self._size -= self._entries.pop(local_path)[1]
+            self._leases.pop(local_path, None)
+            self.evictions += 1
+            self._remove(local_path)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "enabled": self.max_size > 0,
+                "max_size": self.max_size,
+                "size": self._size,
+                "files": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0,
+                "evictions": self.evictions,
+                "bytes_downloaded": self.bytes_downloaded,
+            }
@@ -4,9 +4,10 @@ import json
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple, Dict
+from typing import BinaryIO, Iterator, Tuple, Dict, Optional
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -25,6 +26,8 @@ from open_webui.config import (
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
     STORAGE_PROVIDER,
+    STORAGE_TRANSFER_CHUNK_SIZE,
+    STORAGE_TRANSFER_CONCURRENCY,
     UPLOAD_DIR,
 )
 from google.cloud import storage
@@ -34,13 +37,19 @@ from azure.identity import DefaultAzureCredential
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import ResourceNotFoundError
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.storage.cache import StorageCache
 
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+TRANSFER_CHUNK_SIZE = STORAGE_TRANSFER_CHUNK_SIZE * 1024 * 1024
+
 
 class StorageProvider(ABC):
+    # Local copies of remote files, for the cloud providers
+    cache: Optional[StorageCache] = None
+
     @abstractmethod
     def get_file(self, file_path: str) -> str:
         pass
@@ -48,7 +57,8 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
+        """Store the file, returning its size in bytes and its path."""
         pass
 
     @abstractmethod
@@ -59,19 +69,50 @@ class StorageProvider(ABC):
     def delete_file(self, file_path: str) -> None:
         pass
 
+    def get_file_stat(self, file_path: str) -> Tuple[int, str]:
+        """Size in bytes and ETag of a stored file, without downloading it."""
+        stat_result = os.stat(self.get_file(file_path))
+        return (
+            stat_result.st_size,
+            f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"',
+        )
+
+    def get_local_file(self, file_path: str, etag: str) -> Optional[str]:
+        """Local copy of a stored file at ``etag``, if there is one."""
+        if self.cache is None:
+            return self.get_file(file_path)
+
+        local_file_path = self.cache.local_path(file_path.split("/")[-1])
+        if self.cache.get(local_file_path, etag):
+            return local_file_path
+        return None
+
+    def get_file_range(self, file_path: str, start: int, end: int) -> Iterator[bytes]:
+        """Bytes ``start`` to ``end`` (inclusive) of a stored file, in chunks."""
+        with open(self.get_file(file_path), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(TRANSFER_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[int, str]:
         file_path = f"{UPLOAD_DIR}/{filename}"
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            shutil.copyfileobj(file, f, TRANSFER_CHUNK_SIZE)
+            size = f.tell()
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -140,6 +181,14 @@ class S3StorageProvider(StorageProvider):
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
 
+        # Multipart uploads and ranged downloads, streamed from and to disk
+        self.transfer_config = TransferConfig(
+            multipart_threshold=TRANSFER_CHUNK_SIZE,
+            multipart_chunksize=TRANSFER_CHUNK_SIZE,
+            max_concurrency=STORAGE_TRANSFER_CONCURRENCY,
+        )
+        self.cache = StorageCache()
+
     @staticmethod
     def sanitize_tag_value(s: str) -> str:
         """Only include S3 allowed characters."""
@@ -147,12 +196,14 @@ class S3StorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+            self.s3_client.upload_file(
+                file_path, self.bucket_name, s3_key, Config=self.transfer_config
+            )
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -168,10 +219,12 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+
+            etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)[
+                "ETag"
+            ]
+            self.cache.adopt(file_path, etag)
+            return size, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -180,11 +233,48 @@ class S3StorageProvider(StorageProvider):
         try:
             s3_key = self._extract_s3_key(file_path)
             local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+
+            etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)[
+                "ETag"
+            ]
+            if self.cache.get(local_file_path, etag):
+                return local_file_path
+
+            return self.cache.download(
+                local_file_path,
+                etag,
+                lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path, Config=self.transfer_config
+                ),
+            )
+        except ClientError as e:
+            raise RuntimeError(f"Error downloading file from S3: {e}")
+
+    def get_file_stat(self, file_path: str) -> Tuple[int, str]:
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.bucket_name, Key=self._extract_s3_key(file_path)
+            )
+            return response["ContentLength"], response["ETag"]
+        except ClientError as e:
+            raise RuntimeError(f"Error getting file from S3: {e}")
+
+    def get_file_range(self, file_path: str, start: int, end: int) -> Iterator[bytes]:
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=self._extract_s3_key(file_path),
+                Range=f"bytes={start}-{end}",
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(TRANSFER_CHUNK_SIZE)
+        finally:
+            body.close()
+
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from S3 storage."""
         try:
@@ -194,7 +284,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
         # Always delete from local storage
-        LocalStorageProvider.delete_file(file_path)
+        self.cache.discard(self._get_local_file_path(s3_key))
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from S3 storage."""
@@ -213,6 +303,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
@@ -220,7 +311,7 @@ class S3StorageProvider(StorageProvider):
         return "/".join(full_file_path.split("//")[1].split("/")[1:])
 
     def _get_local_file_path(self, s3_key: str) -> str:
-        return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
+        return self.cache.local_path(s3_key.split("/")[-1])
 
 
 class GCSStorageProvider(StorageProvider):
@@ -237,16 +328,19 @@ class GCSStorageProvider(StorageProvider):
             # if running on a Compute Engine instance, credentials would be from Google Metadata server
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
+        self.cache = StorageCache()
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
-            blob = self.bucket.blob(filename)
+            # Resumable upload, in chunks
+            blob = self.bucket.blob(filename, chunk_size=TRANSFER_CHUNK_SIZE)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            self.cache.adopt(file_path, blob.etag)
+            return size, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -254,11 +348,38 @@ class GCSStorageProvider(StorageProvider):
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
+            local_file_path = self.cache.local_path(filename)
             blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
+            if blob is None:
+                raise NotFound(f"{filename} not found in bucket {self.bucket_name}")
 
-            return local_file_path
+            if self.cache.get(local_file_path, blob.etag):
+                return local_file_path
+
+            # Downloaded with ranged requests, in chunks
+            blob.chunk_size = TRANSFER_CHUNK_SIZE
+            return self.cache.download(
+                local_file_path, blob.etag, blob.download_to_filename
+            )
+        except NotFound as e:
+            raise RuntimeError(f"Error downloading file from GCS: {e}")
+
+    def get_file_stat(self, file_path: str) -> Tuple[int, str]:
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        blob = self.bucket.get_blob(filename)
+        if blob is None:
+            raise RuntimeError(f"Error getting file from GCS: {filename} not found")
+        return blob.size, blob.etag
+
+    def get_file_range(self, file_path: str, start: int, end: int) -> Iterator[bytes]:
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        blob = self.bucket.blob(filename)
+        try:
+            for chunk_start in range(start, end + 1, TRANSFER_CHUNK_SIZE):
+                yield blob.download_as_bytes(
+                    start=chunk_start,
+                    end=min(chunk_start + TRANSFER_CHUNK_SIZE - 1, end),
+                )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -272,7 +393,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
         # Always delete from local storage
-        LocalStorageProvider.delete_file(file_path)
+        self.cache.discard(self.cache.local_path(filename))
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from GCS storage."""
@@ -286,6 +407,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -298,27 +420,49 @@ class AzureStorageProvider(StorageProvider):
         if storage_key:
             # Configure using the Azure Storage Account Endpoint and Key
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=storage_key
+                account_url=self.endpoint,
+                credential=storage_key,
+                **self.get_transfer_options(),
             )
         else:
             # Configure using the Azure Storage Account Endpoint and DefaultAzureCredential
             # If the key is not configured, then the DefaultAzureCredential will be used to support Managed Identity authentication
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=DefaultAzureCredential()
+                account_url=self.endpoint,
+                credential=DefaultAzureCredential(),
+                **self.get_transfer_options(),
             )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        self.cache = StorageCache()
+
+    @staticmethod
+    def get_transfer_options() -> dict:
+        """Block uploads and ranged downloads, in chunks."""
+        return {
+            "max_single_put_size": TRANSFER_CHUNK_SIZE,
+            "max_block_size": TRANSFER_CHUNK_SIZE,
+            "max_single_get_size": TRANSFER_CHUNK_SIZE,
+            "max_chunk_get_size": TRANSFER_CHUNK_SIZE,
+        }
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            with open(file_path, "rb") as data:
+                result = blob_client.upload_blob(
+                    data,
+                    length=size,
+                    overwrite=True,
+                    max_concurrency=STORAGE_TRANSFER_CONCURRENCY,
+                )
+            self.cache.adopt(file_path, result.get("etag"))
+            return size, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -326,11 +470,41 @@ class AzureStorageProvider(StorageProvider):
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
+            local_file_path = self.cache.local_path(filename)
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            etag = blob_client.get_blob_properties().etag
+            if self.cache.get(local_file_path, etag):
+                return local_file_path
+
+            def download(path: str):
+                with open(path, "wb") as download_file:
+                    blob_client.download_blob(
+                        max_concurrency=STORAGE_TRANSFER_CONCURRENCY
+                    ).readinto(download_file)
+
+            return self.cache.download(local_file_path, etag, download)
+        except ResourceNotFoundError as e:
+            raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
+
+    def get_file_stat(self, file_path: str) -> Tuple[int, str]:
+        try:
+            blob_client = self.container_client.get_blob_client(
+                file_path.split("/")[-1]
+            )
+            properties = blob_client.get_blob_properties()
+            return properties.size, properties.etag
+        except ResourceNotFoundError as e:
+            raise RuntimeError(f"Error getting file from Azure Blob Storage: {e}")
+
+    def get_file_range(self, file_path: str, start: int, end: int) -> Iterator[bytes]:
+        try:
+            blob_client = self.container_client.get_blob_client(
+                file_path.split("/")[-1]
+            )
+            yield from blob_client.download_blob(
+                offset=start, length=end - start + 1
+            ).chunks()
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -344,7 +518,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
         # Always delete from local storage
-        LocalStorageProvider.delete_file(file_path)
+        self.cache.discard(self.cache.local_path(filename))
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from Azure Blob Storage."""
@@ -356,6 +530,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
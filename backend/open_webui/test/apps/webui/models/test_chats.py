@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+
+from open_webui.models.chats import ChatForm, Chats, ChatTable
+
+
+@pytest.fixture(params=["index", "substring"])
+def user_id(request, monkeypatch):
+    if request.param == "substring":
+        monkeypatch.setattr(ChatTable, "_search_index", "")
+
+    user_id = str(uuid.uuid4())
+    for title, content in [
+        ("Cooking pasta", "Boil the water first"),
+        ("Templates", "How do c++ templates work?"),
+        ("Frameworks", "Is node.js single threaded?"),
+        ("Notes", "node and js are separate words here"),
+    ]:
+        Chats.insert_new_chat(
+            user_id,
+            ChatForm(
+                chat={
+                    "title": title,
+                    "messages": [{"role": "user", "content": content}],
+                }
+            ),
+        )
+    yield user_id
+    Chats.delete_chats_by_user_id(user_id)
+
+
+def search(user_id, search_text):
+    return sorted(
+        chat.title
+        for chat in Chats.get_chats_by_user_id_and_search_text(user_id, search_text)
+    )
+
+
+class TestSearchChats:
+    def test_words(self, user_id):
+        assert search(user_id, "pasta") == ["Cooking pasta"]
+        assert search(user_id, "templ") == ["Templates"]
+        assert search(user_id, "boil the water") == ["Cooking pasta"]
+
+    def test_words_with_symbols(self, user_id):
+        assert search(user_id, "c++") == ["Templates"]
+        assert search(user_id, "C++ templates") == ["Templates"]
+        assert search(user_id, "node.js") == ["Frameworks"]
+
+    def test_symbols_only(self, user_id):
+        assert search(user_id, "++") == ["Templates"]
+        assert search(user_id, "?") == ["Frameworks", "Templates"]
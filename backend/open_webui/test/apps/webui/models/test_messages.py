@@ -0,0 +1,120 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from open_webui.internal.db import engine, get_db
+from open_webui.models.messages import Message, MessageForm, Messages
+from open_webui.models.users import Users
+
+
+@pytest.fixture
+def users():
+    ids = [str(uuid.uuid4()) for _ in range(2)]
+    for idx, user_id in enumerate(ids):
+        Users.insert_new_user(user_id, f"User {idx}", f"{user_id}@openwebui.com")
+    yield ids
+    for user_id in ids:
+        Users.delete_user_by_id(user_id)
+
+
+@pytest.fixture
+def channel_id():
+    channel_id = str(uuid.uuid4())
+    yield channel_id
+    with get_db() as db:
+        for message in db.query(Message).filter_by(channel_id=channel_id).all():
+            Messages.delete_message_by_id(message.id)
+
+
+def post(channel_id, user_id, content, **kwargs):
+    return Messages.insert_new_message(
+        MessageForm(content=content, **kwargs), channel_id, user_id
+    )
+
+
+class count_queries:
+    def __enter__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+class TestGetMessageResponses:
+    def test_hydrates_page(self, users, channel_id):
+        first = post(channel_id, users[0], "first")
+        second = post(channel_id, users[1], "second", reply_to_id=first.id)
+        post(channel_id, users[1], "reply 1", parent_id=first.id)
+        last_reply = post(channel_id, users[0], "reply 2", parent_id=first.id)
+        Messages.add_reaction_to_message(first.id, users[0], "👍")
+        Messages.add_reaction_to_message(first.id, users[1], "👍")
+        Messages.add_reaction_to_message(first.id, users[1], "🎉")
+
+        responses = {
+            response.id: response
+            for response in Messages.get_messages_by_channel_id(channel_id)
+        }
+        assert set(responses) == {first.id, second.id}
+
+        response = responses[first.id]
+        assert response.user.name == "User 0"
+        assert response.reply_to_message is None
+        assert response.reply_count == 2
+        assert response.latest_reply_at == last_reply.created_at
+        assert [
+            (reaction.name, reaction.user_ids, reaction.count)
+            for reaction in response.reactions
+        ] == [("👍", users, 2), ("🎉", [users[1]], 1)]
+
+        response = responses[second.id]
+        assert response.user.name == "User 1"
+        assert response.reply_to_message.id == first.id
+        assert response.reply_to_message.user.name == "User 0"
+        assert response.reply_count == 0
+        assert response.latest_reply_at is None
+        assert response.reactions == []
+
+    def test_query_count_independent_of_page_size(self, users, channel_id):
+        def count_page_queries(channel_id):
+            with get_db() as db:
+                messages = db.query(Message).filter_by(channel_id=channel_id).all()
+                with count_queries() as counter:
+                    Messages._get_message_responses(db, messages)
+            return counter.count
+
+        previous = None
+        for idx in range(10):
+            message = post(
+                channel_id, users[idx % 2], f"message {idx}", reply_to_id=previous
+            )
+            Messages.add_reaction_to_message(message.id, users[0], "👍")
+            post(channel_id, users[1], "reply", parent_id=message.id)
+            previous = message.id
+
+            if idx == 1:
+                small = count_page_queries(channel_id)
+        assert count_page_queries(channel_id) == small
+
+    def test_without_reply_stats(self, users, channel_id):
+        parent = post(channel_id, users[0], "parent")
+        post(channel_id, users[1], "reply", parent_id=parent.id)
+
+        replies = Messages.get_thread_replies_by_message_id(parent.id)
+        assert [reply.content for reply in replies] == ["reply"]
+        assert replies[0].reply_count == 0
+
+    def test_missing_user(self, channel_id):
+        post(channel_id, str(uuid.uuid4()), "from a deleted user")
+
+        (response,) = Messages.get_messages_by_channel_id(channel_id)
+        assert response.user is None
+
+    def test_empty(self):
+        with get_db() as db:
+            assert Messages._get_message_responses(db, []) == []
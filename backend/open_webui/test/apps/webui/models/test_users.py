@@ -0,0 +1,57 @@
+import uuid
+
+import pytest
+
+from open_webui.internal.db import get_db
+from open_webui.models import users as users_module
+from open_webui.models.users import User, Users
+
+
+@pytest.fixture
+def user_ids(monkeypatch):
+    monkeypatch.setattr(users_module, "DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL", 60)
+    monkeypatch.setattr(Users, "_pending_last_active", {})
+
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    for idx, user_id in enumerate(ids):
+        Users.insert_new_user(user_id, f"User {idx}", f"{user_id}@openwebui.com")
+    yield ids
+    for user_id in ids:
+        Users.delete_user_by_id(user_id)
+
+
+def last_active_at(user_id):
+    with get_db() as db:
+        return db.query(User.last_active_at).filter_by(id=user_id).scalar()
+
+
+class TestFlushUserLastActive:
+    def test_flush(self, user_ids):
+        for user_id in user_ids[:2]:
+            Users.touch_user_last_active_by_id(user_id)
+        Users._pending_last_active[user_ids[0]] = 1
+
+        assert Users.flush_user_last_active() == 2
+        assert last_active_at(user_ids[0]) == 1
+        assert Users._pending_last_active == {}
+        assert Users.flush_user_last_active() == 0
+
+    def test_user_deleted_before_flush(self, user_ids):
+        for user_id in user_ids:
+            Users._pending_last_active[user_id] = 1
+
+        # Deleted behind the users table's back, as if by another process
+        with get_db() as db:
+            db.query(User).filter_by(id=user_ids[0]).delete()
+            db.commit()
+
+        assert Users.flush_user_last_active() == 3
+        assert last_active_at(user_ids[1]) == 1
+        assert last_active_at(user_ids[2]) == 1
+
+    def test_delete_drops_pending(self, user_ids):
+        Users.touch_user_last_active_by_id(user_ids[0])
+        Users.touch_user_last_active_by_id(user_ids[1])
+
+        assert Users.delete_user_by_id(user_ids[0])
+        assert list(Users._pending_last_active) == [user_ids[1]]
@@ -0,0 +1,231 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from open_webui.retrieval.vector.dbs import embedded
+
+
+DIM = 16
+
+
+@pytest.fixture
+def db_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_DB_PATH", str(tmp_path))
+    monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_SEGMENT_ROWS", 64)
+    monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_HNSW_MIN_ROWS", 100)
+    monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_HNSW_M", 8)
+    monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_HNSW_EF_CONSTRUCTION", 64)
+    monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_HNSW_EF_SEARCH", 64)
+    return tmp_path
+
+
+@pytest.fixture
+def client(db_path):
+    client = embedded.EmbeddedVectorClient(maintenance=False)
+    yield client
+    client.close()
+
+
+def make_items(vectors, prefix="id"):
+    return [
+        {
+            "id": f"{prefix}-{idx}",
+            "text": f"text {idx}",
+            "vector": vector.tolist(),
+            "metadata": {"idx": idx, "file_id": f"file-{idx % 3}"},
+        }
+        for idx, vector in enumerate(vectors)
+    ]
+
+
+def brute_force(vectors, query, k):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = query / np.linalg.norm(query)
+    return [f"id-{idx}" for idx in np.argsort(-(vectors @ query))[:k]]
+
+
+class TestWrites:
+    def test_insert_and_search(self, client):
+        vectors = np.random.default_rng(0).normal(size=(10, DIM))
+        client.insert("c", make_items(vectors))
+
+        assert client.has_collection("c")
+        result = client.search("c", [vectors[3].tolist()], limit=1)
+        assert result.ids == [["id-3"]]
+        assert result.documents == [["text 3"]]
+        assert result.distances[0][0] == pytest.approx(1.0)
+
+    def test_insert_keeps_existing(self, client):
+        vectors = np.random.default_rng(0).normal(size=(2, DIM))
+        client.insert("c", make_items(vectors))
+        items = make_items(vectors[::-1])
+        items[0]["text"] = "changed"
+        client.insert("c", items)
+
+        result = client.query("c", filter={"idx": 0})
+        assert result.documents == [["text 0"]]
+
+    def test_upsert_replaces(self, client):
+        vectors = np.random.default_rng(0).normal(size=(3, DIM))
+        client.insert("c", make_items(vectors))
+        client.upsert(
+            "c",
+            [
+                {
+                    "id": "id-0",
+                    "text": "moved",
+                    "vector": vectors[2].tolist(),
+                    "metadata": {"idx": 0},
+                }
+            ],
+        )
+
+        result = client.search("c", [vectors[2].tolist()], limit=2)
+        assert sorted(result.ids[0]) == ["id-0", "id-2"]
+        result = client.search("c", [vectors[0].tolist()], limit=3)
+        assert len(result.ids[0]) == 3
+        assert client.query("c", filter={"idx": 0}).documents == [["moved"]]
+
+    def test_delete(self, client):
+        vectors = np.random.default_rng(0).normal(size=(6, DIM))
+        client.insert("c", make_items(vectors))
+
+        client.delete("c", ids=["id-0"])
+        client.delete("c", filter={"file_id": "file-1"})
+
+        remaining = client.get("c").ids[0]
+        assert remaining == ["id-2", "id-3", "id-5"]
+        result = client.search("c", [vectors[0].tolist()], limit=10)
+        assert sorted(result.ids[0]) == remaining
+
+    def test_dimension_mismatch(self, client):
+        client.insert("c", make_items(np.ones((1, DIM))))
+        with pytest.raises(ValueError):
+            client.insert("c", make_items(np.ones((1, DIM + 1)), prefix="other"))
+
+
+class TestMaintenance:
+    def test_compaction_drops_dead_rows(self, client):
+        vectors = np.random.default_rng(1).normal(size=(100, DIM))
+        client.insert("c", make_items(vectors))
+        client.delete("c", ids=[f"id-{idx}" for idx in range(0, 100, 2)])
+
+        assert client.compact("c")
+
+        state = client._state(client._db(), "c")
+        assert state["generation"] == 1
+        assert state["num_rows"] == state["num_live"] == 50
+        for idx in (1, 51, 99):
+            result = client.search("c", [vectors[idx].tolist()], limit=1)
+            assert result.ids == [[f"id-{idx}"]]
+
+    def test_graph_recall(self, client):
+        rng = np.random.default_rng(2)
+        vectors = rng.normal(size=(400, DIM))
+        client.insert("c", make_items(vectors))
+
+        assert client.build_index("c")
+        assert client._state(client._db(), "c")["graph_rows"] == 400
+
+        # Rows appended after the graph are searched exactly
+        extra = rng.normal(size=(5, DIM))
+        client.insert("c", make_items(extra, prefix="extra"))
+        result = client.search("c", [extra[0].tolist()], limit=1)
+        assert result.ids == [["extra-0"]]
+
+        k = 10
+        queries = rng.normal(size=(20, DIM))
+        result = client.search("c", queries.tolist(), limit=k)
+        found = 0
+        for query, ids in zip(queries, result.ids):
+            expected = brute_force(vectors, query, k)
+            found += len(set(expected) & set(ids))
+        assert found / (k * len(queries)) >= 0.9
+
+    def test_only_one_maintainer(self, db_path, monkeypatch):
+        monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_MAINTENANCE_INTERVAL", 0.01)
+        runs = {"first": 0, "second": 0}
+
+        clients = {
+            name: embedded.EmbeddedVectorClient(maintenance=False) for name in runs
+        }
+        for name, client in clients.items():
+            client.run_maintenance = lambda name=name: runs.__setitem__(
+                name, runs[name] + 1
+            )
+
+        threads = [
+            threading.Thread(target=client.maintain) for client in clients.values()
+        ]
+        for thread in threads:
+            thread.start()
+        while sum(runs.values()) < 10:
+            time.sleep(0.01)
+        for client in clients.values():
+            client.close()
+        for thread in threads:
+            thread.join()
+
+        assert min(runs.values()) == 0
+
+
+class TestCrossProcess:
+    def test_recreated_collection_gets_new_files(self, db_path):
+        # Two clients stand in for two processes, each with its own caches
+        reader = embedded.EmbeddedVectorClient(maintenance=False)
+        writer = embedded.EmbeddedVectorClient(maintenance=False)
+        old = np.random.default_rng(3).normal(size=(5, DIM))
+        new = np.random.default_rng(4).normal(size=(5, DIM))
+
+        writer.insert("c", make_items(old))
+        assert reader.search("c", [old[0].tolist()], limit=1).ids == [["id-0"]]
+        old_dirname = reader._state(reader._db(), "c")["dirname"]
+
+        writer.delete_collection("c")
+        writer.insert("c", make_items(new))
+
+        assert reader._state(reader._db(), "c")["dirname"] != old_dirname
+        for idx in range(5):
+            result = reader.search("c", [new[idx].tolist()], limit=1)
+            assert result.ids == [[f"id-{idx}"]]
+            assert result.distances[0][0] == pytest.approx(1.0)
+
+        reader.close()
+        writer.close()
+
+    def test_other_process_writes(self, db_path):
+        client = embedded.EmbeddedVectorClient(maintenance=False)
+        vectors = np.random.default_rng(5).normal(size=(3, DIM))
+        client.insert("c", make_items(vectors))
+        assert client.search("c", [vectors[0].tolist()], limit=3)
+
+        script = f"""
+import numpy as np
+from open_webui.retrieval.vector.dbs import embedded
+embedded.EMBEDDED_VECTOR_DB_PATH = {str(db_path)!r}
+embedded.EMBEDDED_VECTOR_SEGMENT_ROWS = 64
+client = embedded.EmbeddedVectorClient(maintenance=False)
+client.delete("c", ids=["id-0"])
+client.insert("c", [{{
+    "id": "child",
+    "text": "from the child",
+    "vector": np.ones({DIM}).tolist(),
+    "metadata": {{}},
+}}])
+"""
+        subprocess.run(
+            [sys.executable, "-c", script],
+            check=True,
+            env=os.environ,
+            capture_output=True,
+        )
+
+        result = client.search("c", [np.ones(DIM).tolist()], limit=3)
+        assert result.ids[0][0] == "child"
+        assert "id-0" not in result.ids[0]
+        client.close()
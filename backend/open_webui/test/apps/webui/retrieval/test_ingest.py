@@ -0,0 +1,283 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.models.files import FileModel
+from open_webui.retrieval.ingest import IngestionFile, IngestionPipeline
+from open_webui.retrieval.vector.dbs import embedded
+from open_webui.routers import retrieval
+
+
+def make_files(chunks, collection_name="c"):
+    return [
+        IngestionFile(f"file-{idx}", collection_name, source=texts)
+        for idx, texts in enumerate(chunks)
+    ]
+
+
+def extract(file):
+    if isinstance(file.source, Exception):
+        raise file.source
+    return [
+        Document(page_content=text, metadata={"file_id": file.id})
+        for text in file.source
+    ]
+
+
+class Recorder:
+    def __init__(self, fail_embedding="bad", fail_insert=None):
+        self.fail_embedding = fail_embedding
+        self.fail_insert = fail_insert
+        self.embedding_batches = []
+        self.inserts = []
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        with self._lock:
+            self.embedding_batches.append(texts)
+        if any(self.fail_embedding in text for text in texts):
+            raise RuntimeError("embedding failed")
+        return [[float(len(text))] for text in texts]
+
+    def insert(self, collection_name, items):
+        with self._lock:
+            self.inserts.append((collection_name, items))
+        file_ids = {item["metadata"]["file_id"] for item in items}
+        if self.fail_insert in file_ids:
+            raise RuntimeError("insert failed")
+
+    def pipeline(self, **kwargs):
+        kwargs.setdefault("embedding_batch_size", 4)
+        kwargs.setdefault("insert_batch_size", 1000)
+        return IngestionPipeline(
+            extract=extract,
+            embed=self.embed,
+            insert=self.insert,
+            workers=2,
+            embedding_concurrency=2,
+            **kwargs,
+        )
+
+
+def statuses(files):
+    return {file.id: file.status for file in files}
+
+
+class TestBatching:
+    def test_packs_chunks_of_files_into_batches(self):
+        recorder = Recorder()
+        files = make_files([[f"{idx}-{n}" for n in range(3)] for idx in range(3)])
+
+        stats = recorder.pipeline().run(files)
+
+        assert all(file.status == "completed" for file in files)
+        # 9 chunks in batches of 4, only the last one partial
+        assert sorted(len(batch) for batch in recorder.embedding_batches) == [1, 4, 4]
+        assert stats["embedding_requests"] == 3
+        assert stats["chunks"] == 9
+
+        # One insert for the whole collection, with every chunk once
+        assert stats["inserts"] == 1
+        ((collection_name, items),) = recorder.inserts
+        assert collection_name == "c"
+        assert sorted(item["text"] for item in items) == sorted(
+            f"{idx}-{n}" for idx in range(3) for n in range(3)
+        )
+        for item in items:
+            assert item["vector"] == [float(len(item["text"]))]
+
+    def test_inserts_per_collection(self):
+        recorder = Recorder()
+        files = make_files([["a"], ["b"]], "first") + make_files([["c"]], "second")
+
+        stats = recorder.pipeline().run(files)
+
+        assert stats["completed"] == 3
+        assert sorted(
+            (collection_name, len(items)) for collection_name, items in recorder.inserts
+        ) == [("first", 2), ("second", 1)]
+
+    def test_insert_batch_size(self):
+        recorder = Recorder()
+        files = make_files([["a", "b"] for _ in range(4)])
+
+        stats = recorder.pipeline(insert_batch_size=2).run(files)
+
+        assert stats["completed"] == 4
+        assert stats["inserts"] == 4
+        assert all(len(items) == 2 for _, items in recorder.inserts)
+
+    def test_nothing_to_embed(self):
+        recorder = Recorder()
+        files = make_files([[]])
+
+        stats = recorder.pipeline().run(files)
+
+        assert statuses(files) == {"file-0": "completed"}
+        assert stats["embedding_requests"] == 0
+        assert recorder.inserts == []
+
+
+class TestFailures:
+    def test_extract_failure(self):
+        recorder = Recorder()
+        files = make_files([["a"], ValueError("unreadable"), ["b"]])
+
+        stats = recorder.pipeline().run(files)
+
+        assert statuses(files) == {
+            "file-0": "completed",
+            "file-1": "failed",
+            "file-2": "completed",
+        }
+        assert files[1].error == "unreadable"
+        assert stats["failed"] == 1
+
+    def test_embedding_failure_retried_per_file(self):
+        recorder = Recorder()
+        files = make_files([["a", "b"], ["bad"], ["c"]])
+
+        stats = recorder.pipeline(embedding_batch_size=10).run(files)
+
+        assert statuses(files) == {
+            "file-0": "completed",
+            "file-1": "failed",
+            "file-2": "completed",
+        }
+        assert files[1].error == "embedding failed"
+        # The shared batch, then one per file
+        assert stats["embedding_requests"] == 4
+        ((_, items),) = recorder.inserts
+        assert sorted(item["text"] for item in items) == ["a", "b", "c"]
+
+    def test_wrong_number_of_embeddings(self):
+        recorder = Recorder()
+        recorder.embed = lambda texts: [[0.0]]
+        files = make_files([["a", "b"]])
+
+        recorder.pipeline().run(files)
+
+        assert files[0].status == "failed"
+        assert "Expected 2 embeddings" in files[0].error
+
+    def test_insert_failure_retried_per_file(self):
+        recorder = Recorder(fail_insert="file-1")
+        files = make_files([["a"], ["b"], ["c"]])
+
+        stats = recorder.pipeline().run(files)
+
+        assert statuses(files) == {
+            "file-0": "completed",
+            "file-1": "failed",
+            "file-2": "completed",
+        }
+        assert files[1].error == "insert failed"
+        # The shared insert, then one per file
+        assert stats["inserts"] == 4
+        assert sorted(len(items) for _, items in recorder.inserts) == [1, 1, 1, 3]
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_failed_files_are_not_inserted(self, workers):
+        recorder = Recorder()
+        files = make_files([["bad", "x"], ["y"]])
+
+        IngestionPipeline(
+            extract=extract,
+            embed=recorder.embed,
+            insert=recorder.insert,
+            embedding_batch_size=1,
+            workers=workers,
+        ).run(files)
+
+        assert statuses(files) == {"file-0": "failed", "file-1": "completed"}
+        inserted = [item["text"] for _, items in recorder.inserts for item in items]
+        assert inserted == ["y"]
+
+
+@pytest.fixture
+def vector_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(embedded, "EMBEDDED_VECTOR_DB_PATH", str(tmp_path))
+    client = embedded.EmbeddedVectorClient(maintenance=False)
+    monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", client)
+    yield client
+    client.close()
+
+
+def make_request():
+    return SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(
+                    RAG_EMBEDDING_ENGINE="",
+                    RAG_EMBEDDING_MODEL="model",
+                    RAG_EMBEDDING_BATCH_SIZE=4,
+                    TEXT_SPLITTER="character",
+                    CHUNK_SIZE=1000,
+                    CHUNK_OVERLAP=0,
+                ),
+                EMBEDDING_FUNCTION=lambda texts, prefix=None, user=None: [
+                    [float(len(text)), 1.0] for text in texts
+                ],
+            )
+        )
+    )
+
+
+def make_file(id, content):
+    return FileModel(
+        id=id,
+        user_id="user",
+        filename=f"{id}.txt",
+        data={"content": content},
+        meta={},
+        created_at=0,
+        updated_at=0,
+    )
+
+
+def process_batch(files, collection_name="knowledge"):
+    return retrieval.process_files_batch(
+        make_request(),
+        retrieval.BatchProcessFilesForm(files=files, collection_name=collection_name),
+        user=None,
+    )
+
+
+class TestProcessFilesBatch:
+    def test_files_already_in_collection_are_added_again(self, vector_db):
+        # Same content twice in one batch, and again in a later batch
+        response = process_batch([make_file("a", "same"), make_file("b", "same")])
+        assert [result.status for result in response.results] == ["completed"] * 2
+
+        response = process_batch([make_file("a", "same")])
+        assert [result.status for result in response.results] == ["completed"]
+        assert response.errors == []
+
+        file_ids = [
+            metadata["file_id"] for metadata in vector_db.get("knowledge").metadatas[0]
+        ]
+        assert sorted(file_ids) == ["a", "a", "b"]
+
+    def test_copied_files_are_added_again(self, vector_db):
+        vector_db.insert(
+            "file-a",
+            [
+                {
+                    "id": "chunk",
+                    "text": "same",
+                    "vector": [4.0, 1.0],
+                    "metadata": {
+                        "file_id": "a",
+                        "embedding_config": {"engine": "", "model": "model"},
+                    },
+                }
+            ],
+        )
+
+        for _ in range(2):
+            response = process_batch([make_file("a", "same")])
+            assert [result.status for result in response.results] == ["completed"]
+
+        assert len(vector_db.get("knowledge").ids[0]) == 2
@@ -0,0 +1,162 @@
+import os
+import time
+
+from langchain_core.documents import Document
+
+from open_webui.retrieval.web.cache import WebPageCache, normalize_url
+
+
+def make_cache(tmp_path, **kwargs):
+    kwargs.setdefault("ttl", 3600)
+    kwargs.setdefault("max_size", 1024 * 1024)
+    return WebPageCache(directory=tmp_path, enabled=True, **kwargs)
+
+
+def docs(text):
+    return [Document(page_content=text, metadata={"source": "page"})]
+
+
+def chunk(url, chunk_hash, model="model"):
+    return {
+        "source": url,
+        "chunk_hash": chunk_hash,
+        "embedding_config": {"engine": "openai", "model": model},
+    }
+
+
+class TestNormalizeUrl:
+    def test_normalize_url(self):
+        assert (
+            normalize_url("HTTPS://Example.com:443/a?b=2&utm_source=x&a=1#top")
+            == "https://example.com/a?a=1&b=2"
+        )
+        assert normalize_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+class TestWebPageCache:
+    def test_lookup(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put("https://example.com/a", docs("page a"), {"etag": '"1"'})
+
+        pages = cache.lookup(
+            ["https://example.com/a?utm_source=feed", "https://example.com/b"]
+        )
+
+        assert [
+            doc.page_content for doc in pages["https://example.com/a?utm_source=feed"]
+        ] == ["page a"]
+        assert "https://example.com/b" not in pages
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_empty_pages_not_cached(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put("https://example.com/a", docs("  "))
+        assert cache.get_stats()["pages"] == 0
+
+    def test_disabled(self, tmp_path):
+        cache = WebPageCache(directory=tmp_path / "web", enabled=False)
+        cache.put("https://example.com/a", docs("page a"))
+
+        assert cache.lookup(["https://example.com/a"]) == {}
+        assert not (tmp_path / "web").exists()
+
+    def test_stale_pages_revalidated(self, tmp_path, monkeypatch):
+        cache = make_cache(tmp_path, ttl=0)
+        cache.put("https://example.com/same", docs("same"), {"etag": '"1"'})
+        cache.put("https://example.com/changed", docs("changed"), {"etag": '"1"'})
+        cache.put("https://example.com/no-validators", docs("no validators"))
+
+        checked = []
+
+        def revalidate(page, verify_ssl, trust_env):
+            checked.append(page["url"])
+            return page["url"].endswith("/same")
+
+        monkeypatch.setattr(cache, "revalidate", revalidate)
+        pages = cache.lookup(
+            [
+                "https://example.com/same",
+                "https://example.com/changed",
+                "https://example.com/no-validators",
+            ]
+        )
+
+        assert list(pages) == ["https://example.com/same"]
+        assert sorted(checked) == [
+            "https://example.com/changed",
+            "https://example.com/same",
+        ]
+        stats = cache.get_stats()
+        assert (stats["revalidated"], stats["changed"]) == (1, 1)
+
+    def test_vectors_kept_while_text_is_unchanged(self, tmp_path):
+        cache = make_cache(tmp_path)
+        url = "https://example.com/a"
+        cache.put(url, docs("page a"))
+        cache.set_vectors([chunk(url, "h1")], [[1.0, 2.0]])
+
+        assert cache.get_vectors([chunk(url, "h1"), chunk(url, "h2")]) == [
+            [1.0, 2.0],
+            None,
+        ]
+        # Another model's vectors don't count
+        assert cache.get_vectors([chunk(url, "h1", model="other")]) == [None]
+
+        cache.put(url, docs("page a"))
+        assert cache.get_vectors([chunk(url, "h1")]) == [[1.0, 2.0]]
+
+        cache.put(url, docs("page a, edited"))
+        assert cache.get_vectors([chunk(url, "h1")]) == [None]
+
+
+class TestEviction:
+    def page_size(self, tmp_path):
+        cache = make_cache(tmp_path / "measure")
+        cache.put("https://example.com/x", docs("x" * 100))
+        return cache.get_stats()["size"]
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        size = self.page_size(tmp_path)
+        cache = make_cache(tmp_path / "web", max_size=int(size * 2.5))
+        urls = [f"https://example.com/{name}" for name in "abc"]
+
+        cache.put(urls[0], docs("a" * 100))
+        cache.put(urls[1], docs("b" * 100))
+        assert cache.lookup([urls[0]])
+        cache.put(urls[2], docs("c" * 100))
+
+        assert set(cache.lookup(urls)) == {urls[0], urls[2]}
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["pages"] == 2
+        assert stats["size"] <= cache.max_size
+        assert len(os.listdir(tmp_path / "web")) == 2
+
+    def test_keeps_page_larger_than_limit(self, tmp_path):
+        cache = make_cache(tmp_path, max_size=10)
+        cache.put("https://example.com/a", docs("a" * 100))
+        cache.put("https://example.com/b", docs("b" * 100))
+
+        assert list(cache.lookup(["https://example.com/b"])) == [
+            "https://example.com/b"
+        ]
+        assert cache.get_stats()["pages"] == 1
+
+    def test_load_keeps_usage_order(self, tmp_path):
+        size = self.page_size(tmp_path)
+        directory = tmp_path / "web"
+        cache = make_cache(directory)
+        urls = [f"https://example.com/{name}" for name in "abc"]
+        for url in urls:
+            cache.put(url, docs(url[-1] * 100))
+
+        now = time.time()
+        for idx, url in enumerate([urls[1], urls[0], urls[2]]):
+            path = directory / cache._name(url)
+            os.utime(path, (now - 100 + idx, now - 100 + idx))
+
+        cache = make_cache(directory, max_size=int(size * 2.5))
+
+        assert set(cache.lookup(urls)) == {urls[0], urls[2]}
+        assert cache.get_stats()["evictions"] == 1
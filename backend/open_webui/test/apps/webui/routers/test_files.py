@@ -0,0 +1,150 @@
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from open_webui.routers import files
+from open_webui.routers.files import get_byte_range, get_file_content_response
+from open_webui.storage.provider import LocalStorageProvider
+
+CONTENT = bytes(range(100))
+
+
+class StreamedStorageProvider(LocalStorageProvider):
+    """Local storage without local copies, so files are streamed like from the cloud."""
+
+    def get_local_file(self, file_path, etag):
+        return None
+
+
+def make_client(monkeypatch, tmp_path, storage):
+    monkeypatch.setattr(files, "Storage", storage)
+    (tmp_path / "file.bin").write_bytes(CONTENT)
+    (tmp_path / "empty.bin").write_bytes(b"")
+
+    app = FastAPI()
+
+    @app.get("/{name}")
+    def get_content(name: str, request: Request):
+        return get_file_content_response(request, str(tmp_path / name), {})
+
+    return TestClient(app)
+
+
+@pytest.fixture(params=[LocalStorageProvider, StreamedStorageProvider])
+def client(request, monkeypatch, tmp_path):
+    return make_client(monkeypatch, tmp_path, request.param())
+
+
+class TestGetByteRange:
+    def test_ranges(self):
+        assert get_byte_range("bytes=0-9", 100) == (0, 9)
+        assert get_byte_range("bytes=90-", 100) == (90, 99)
+        assert get_byte_range("bytes=-10", 100) == (90, 99)
+        # Past the end is cut to the size
+        assert get_byte_range("bytes=90-200", 100) == (90, 99)
+        assert get_byte_range("bytes=-200", 100) == (0, 99)
+
+    def test_whole_file(self):
+        assert get_byte_range("bytes=0-9,20-29", 100) is None
+        assert get_byte_range("items=0-9", 100) is None
+        assert get_byte_range("bytes=a-b", 100) is None
+
+    def test_unsatisfiable(self):
+        for range_header, size in [
+            ("bytes=100-", 100),
+            ("bytes=20-10", 100),
+            ("bytes=0-", 0),
+            ("bytes=-10", 0),
+        ]:
+            with pytest.raises(HTTPException) as exc_info:
+                get_byte_range(range_header, size)
+            assert exc_info.value.status_code == 416
+            assert exc_info.value.headers["Content-Range"] == f"bytes */{size}"
+
+
+class TestGetFileContentResponse:
+    def test_whole_file(self, client):
+        response = client.get("/file.bin")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-length"] == "100"
+        assert response.headers["etag"]
+
+    def test_missing_file(self, client):
+        assert client.get("/missing.bin").status_code == 404
+
+    def test_range(self, client):
+        response = client.get("/file.bin", headers={"Range": "bytes=10-19"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[10:20]
+        assert response.headers["content-range"] == "bytes 10-19/100"
+        assert response.headers["content-length"] == "10"
+
+    def test_suffix_range(self, client):
+        response = client.get("/file.bin", headers={"Range": "bytes=-5"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[-5:]
+        assert response.headers["content-range"] == "bytes 95-99/100"
+
+    def test_open_ended_range(self, client):
+        response = client.get("/file.bin", headers={"Range": "bytes=90-"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[90:]
+        assert response.headers["content-range"] == "bytes 90-99/100"
+
+    def test_unsatisfiable_range(self, client):
+        response = client.get("/file.bin", headers={"Range": "bytes=100-"})
+
+        assert response.status_code == 416
+        # Starlette leaves out the unit
+        assert response.headers["content-range"].endswith("*/100")
+
+    def test_empty_file(self, client):
+        response = client.get("/empty.bin")
+        assert response.status_code == 200
+        assert response.content == b""
+
+        response = client.get("/empty.bin", headers={"Range": "bytes=0-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"].endswith("*/0")
+
+    def test_multiple_ranges(self, monkeypatch, tmp_path):
+        # Only when streamed, local copies are sent as multipart by Starlette
+        client = make_client(monkeypatch, tmp_path, StreamedStorageProvider())
+
+        response = client.get("/file.bin", headers={"Range": "bytes=0-9,20-29"})
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert "content-range" not in response.headers
+
+    def test_if_none_match(self, client):
+        etag = client.get("/file.bin").headers["etag"]
+
+        response = client.get("/file.bin", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        response = client.get("/file.bin", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+    def test_if_range(self, client):
+        etag = client.get("/file.bin").headers["etag"]
+
+        response = client.get(
+            "/file.bin", headers={"Range": "bytes=0-9", "If-Range": etag}
+        )
+        assert response.status_code == 206
+        assert response.content == CONTENT[:10]
+
+        # The file changed since the client got the first part
+        response = client.get(
+            "/file.bin", headers={"Range": "bytes=0-9", "If-Range": '"other"'}
+        )
+        assert response.status_code == 200
+        assert response.content == CONTENT
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+from open_webui.storage import cache as cache_module
+from open_webui.storage.cache import StorageCache
+
+
+@pytest.fixture
+def directories(monkeypatch, tmp_path):
+    upload_dir = tmp_path / "uploads"
+    cache_dir = tmp_path / "cache"
+    upload_dir.mkdir()
+    monkeypatch.setattr(cache_module, "UPLOAD_DIR", str(upload_dir))
+    return upload_dir, cache_dir
+
+
+def write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return str(path)
+
+
+def download(size):
+    return lambda path: write(path, size)
+
+
+class TestStorageCache:
+    def test_copies_kept_apart_from_uploads(self, directories):
+        upload_dir, cache_dir = directories
+        uploaded = write(upload_dir / "other.txt", 10)
+        cache = StorageCache(max_size=100, directory=str(cache_dir))
+
+        local_path = cache.local_path("s3://bucket/prefix/file.txt")
+        assert local_path == str(cache_dir / "file.txt")
+        cache.download(local_path, "etag", download(10))
+
+        assert cache.get(local_path, "etag")
+        assert not cache.get(local_path, "other-etag")
+        assert os.path.isfile(uploaded)
+        assert cache.get_stats()["files"] == 1
+
+    def test_disabled_uses_upload_dir(self, directories):
+        upload_dir, cache_dir = directories
+        cache = StorageCache(max_size=0, directory=str(cache_dir))
+
+        local_path = cache.local_path("file.txt")
+        assert local_path == str(upload_dir / "file.txt")
+        cache.download(local_path, "etag", download(10))
+        assert not cache.get(local_path, "etag")
+        assert not cache_dir.exists()
+
+    def test_evicts_least_recently_used(self, directories, monkeypatch):
+        _, cache_dir = directories
+        monkeypatch.setattr(cache_module, "LEASE_SECONDS", 0)
+        cache = StorageCache(max_size=25, directory=str(cache_dir))
+
+        paths = [cache.local_path(f"{name}.txt") for name in "abc"]
+        cache.download(paths[0], "a", download(10))
+        cache.download(paths[1], "b", download(10))
+        assert cache.get(paths[0], "a")
+        cache.download(paths[2], "c", download(10))
+
+        assert [os.path.exists(path) for path in paths] == [True, False, True]
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["size"] == 20
+
+    def test_leased_copies_are_not_evicted(self, directories):
+        _, cache_dir = directories
+        cache = StorageCache(max_size=15, directory=str(cache_dir))
+
+        first = cache.download(cache.local_path("a.txt"), "a", download(10))
+        second = cache.download(cache.local_path("b.txt"), "b", download(10))
+
+        # Both were just handed out, so might be about to be read
+        assert os.path.exists(first) and os.path.exists(second)
+        assert cache.get_stats()["size"] == 20
+
+    def test_adopt_and_discard(self, directories):
+        upload_dir, cache_dir = directories
+        cache = StorageCache(max_size=100, directory=str(cache_dir))
+
+        uploaded = write(upload_dir / "file.txt", 10)
+        cache.adopt(uploaded, "etag")
+        local_path = cache.local_path("file.txt")
+        assert not os.path.exists(uploaded)
+        assert cache.get(local_path, "etag")
+
+        cache.discard(local_path)
+        assert not os.path.exists(local_path)
+        assert not cache.get(local_path, "etag")
+        assert cache.get_stats()["size"] == 0
+
+    def test_clear(self, directories):
+        _, cache_dir = directories
+        cache = StorageCache(max_size=100, directory=str(cache_dir))
+        paths = [
+            cache.download(cache.local_path(f"{name}.txt"), name, download(10))
+            for name in "ab"
+        ]
+
+        cache.clear()
+        assert not any(os.path.exists(path) for path in paths)
+        assert cache.get_stats()["files"] == 0
+
+    def test_load_existing_copies(self, directories, monkeypatch):
+        _, cache_dir = directories
+        monkeypatch.setattr(cache_module, "LEASE_SECONDS", 0)
+        cache_dir.mkdir()
+        for name in "abc":
+            write(cache_dir / f"{name}.txt", 10)
+        write(cache_dir / ".tmp.part", 10)
+
+        cache = StorageCache(max_size=25, directory=str(cache_dir))
+        stats = cache.get_stats()
+        assert stats["files"] == 2
+        assert stats["size"] == 20
+        # Their ETags are unknown until downloaded again
+        assert not cache.get(cache.local_path("c.txt"), "c")
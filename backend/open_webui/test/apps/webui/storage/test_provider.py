@@ -5,17 +5,21 @@ import pytest
 from botocore.exceptions import ClientError
 from moto import mock_aws
 from open_webui.storage import provider
+from open_webui.storage.cache import StorageCache
 from gcp_storage_emulator.server import create_server
 from google.cloud import storage
 from azure.storage.blob import BlobServiceClient, ContainerClient, BlobClient
 from unittest.mock import MagicMock
 
 
-def mock_upload_dir(monkeypatch, tmp_path):
+def mock_upload_dir(monkeypatch, tmp_path, storage=None):
     """Fixture to monkey-patch the UPLOAD_DIR and create a temporary directory."""
     directory = tmp_path / "uploads"
     directory.mkdir()
     monkeypatch.setattr(provider, "UPLOAD_DIR", str(directory))
+    if storage is not None and storage.cache is not None:
+        # Local copies of cloud files are kept there too
+        monkeypatch.setattr(storage, "cache", StorageCache(directory=str(directory)))
     return directory
 
 
@@ -66,10 +70,10 @@ class TestLocalStorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
+        size, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -111,12 +115,12 @@ class TestS3StorageProvider:
         super().__init__()
 
     def test_upload_file(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         # S3 checks
         with pytest.raises(Exception):
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename)
@@ -124,15 +128,15 @@ class TestS3StorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert s3_file_path == "s3://" + self.Storage.bucket_name + "/" + self.filename
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
     def test_get_file(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(s3_file_path)
@@ -140,9 +144,9 @@ class TestS3StorageProvider:
         assert (upload_dir / self.filename).exists()
 
     def test_delete_file(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         assert (upload_dir / self.filename).exists()
@@ -155,7 +159,7 @@ class TestS3StorageProvider:
         assert error["Message"] == "Not Found"
 
     def test_delete_all_files(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         # create 2 files
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
         self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
@@ -224,12 +228,12 @@ class TestGCSStorageProvider:
         server.stop()
 
     def test_upload_file(self, monkeypatch, tmp_path, setup):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         # catch error if bucket does not exist
         with pytest.raises(Exception):
             self.Storage.bucket = monkeypatch(self.Storage, "bucket", None)
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.Storage.bucket.get_blob(self.filename)
@@ -237,15 +241,15 @@ class TestGCSStorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert gcs_file_path == "gs://" + self.Storage.bucket_name + "/" + self.filename
         # test error if file is empty
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
     def test_get_file(self, monkeypatch, tmp_path, setup):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
+        size, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(gcs_file_path)
@@ -253,8 +257,8 @@ class TestGCSStorageProvider:
         assert (upload_dir / self.filename).exists()
 
     def test_delete_file(self, monkeypatch, tmp_path, setup):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
+        size, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         # ensure that local directory has the uploaded file as well
@@ -266,7 +270,7 @@ class TestGCSStorageProvider:
         assert self.Storage.bucket.get_blob(self.filename) == None
 
     def test_delete_all_files(self, monkeypatch, tmp_path, setup):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         # create 2 files
         self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         object = self.Storage.bucket.get_blob(self.filename)
@@ -336,7 +340,7 @@ class TestAzureStorageProvider:
         self.Storage.container_client = mock_container_client
 
     def test_upload_file(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
 
         # Simulate an error when container does not exist
         self.Storage.container_client.get_blob_client.side_effect = Exception(
@@ -348,16 +352,17 @@ class TestAzureStorageProvider:
         # Reset side effect and create container
         self.Storage.container_client.get_blob_client.side_effect = None
         self.Storage.create_container()
-        contents, azure_file_path = self.Storage.upload_file(
+        size, azure_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
-        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
-        )
-        assert contents == self.file_content
+        upload_blob = self.Storage.container_client.get_blob_client().upload_blob
+        upload_blob.assert_called_once()
+        assert upload_blob.call_args.kwargs["length"] == len(self.file_content)
+        assert upload_blob.call_args.kwargs["overwrite"] is True
+        assert size == len(self.file_content)
         assert (
             azure_file_path
             == f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
@@ -369,7 +374,7 @@ class TestAzureStorageProvider:
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
     def test_get_file(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         self.Storage.create_container()
 
         # Mock upload behavior
@@ -387,7 +392,7 @@ class TestAzureStorageProvider:
         assert (upload_dir / self.filename).read_bytes() == self.file_content
 
     def test_delete_file(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         self.Storage.create_container()
 
         # Mock file upload
@@ -402,7 +407,7 @@ class TestAzureStorageProvider:
         assert not (upload_dir / self.filename).exists()
 
     def test_delete_all_files(self, monkeypatch, tmp_path):
-        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path, self.Storage)
         self.Storage.create_container()
 
         # Mock file uploads
@@ -0,0 +1,84 @@
+import wave
+
+import numpy as np
+import pytest
+
+from open_webui.utils.audio_stream import (
+    FRAME_MS,
+    MAX_SEGMENT_MS,
+    SAMPLE_RATE,
+    segment_speech,
+)
+
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+FRAME_SECONDS = FRAME_MS / 1000
+
+
+def speech(count):
+    t = np.arange(FRAME_SAMPLES) / SAMPLE_RATE
+    frame = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16).tobytes()
+    return [frame] * count
+
+
+def silence(count):
+    return [bytes(FRAME_SAMPLES * 2)] * count
+
+
+def frame_count(segment):
+    return len(segment.audio) // (FRAME_SAMPLES * 2)
+
+
+class TestSegmentSpeech:
+    def test_cuts_at_pauses_with_padding(self):
+        frames = silence(10) + speech(20) + silence(34) + speech(20) + silence(20)
+
+        segments = list(segment_speech(iter(frames)))
+
+        assert [segment.index for segment in segments] == [0, 1]
+        # Each keeps 200ms of silence before and after its speech
+        assert segments[0].start == pytest.approx(4 * FRAME_SECONDS)
+        assert frame_count(segments[0]) == 6 + 20 + 6
+        assert segments[1].start == pytest.approx(58 * FRAME_SECONDS)
+        assert frame_count(segments[1]) == 6 + 20 + 6
+
+    def test_short_pauses_dont_cut(self):
+        frames = speech(20) + silence(10) + speech(20) + silence(20)
+
+        (segment,) = segment_speech(iter(frames))
+        assert segment.start == 0
+        assert frame_count(segment) == 20 + 10 + 20 + 6
+
+    def test_drops_noise(self):
+        frames = silence(10) + speech(3) + silence(30)
+        assert list(segment_speech(iter(frames))) == []
+
+    def test_only_silence(self):
+        assert list(segment_speech(iter(silence(100)))) == []
+
+    def test_long_speech_cut_at_quietest_point(self):
+        max_frames = MAX_SEGMENT_MS // FRAME_MS
+        frames = speech(max_frames + 100)
+        # A breath shortly before the limit
+        quiet = max_frames - 50
+        frames[quiet] = silence(1)[0]
+
+        segments = list(segment_speech(iter(frames)))
+
+        assert len(segments) == 2
+        assert frame_count(segments[0]) == quiet + 1
+        assert segments[1].start == pytest.approx(segments[0].end)
+        assert sum(frame_count(segment) for segment in segments) == len(frames)
+        assert all(frame_count(segment) <= max_frames for segment in segments)
+
+    def test_speech_until_the_end(self, tmp_path):
+        frames = silence(3) + speech(10)
+
+        (segment,) = segment_speech(iter(frames))
+        assert segment.start == 0
+        assert segment.end == pytest.approx(13 * FRAME_SECONDS)
+
+        file_path = segment.write_wav(str(tmp_path / "segment.wav"))
+        with wave.open(file_path, "rb") as f:
+            assert f.getframerate() == SAMPLE_RATE
+            assert f.getnchannels() == 1
+            assert f.getnframes() == 13 * FRAME_SAMPLES
@@ -0,0 +1,197 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils.code_interpreter import (
+    JupyterKernel,
+    JupyterKernelPool,
+    KernelUnavailableError,
+    ResultModel,
+)
+
+
+class FakeKernelPool(JupyterKernelPool):
+    """A pool whose kernels run in memory instead of on a Jupyter server."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("warm_kernels", 0)
+        kwargs.setdefault("max_kernels", 4)
+        kwargs.setdefault("idle_timeout", 300)
+        super().__init__("http://jupyter", **kwargs)
+        self.shut_down = []
+        self.gone = set()
+        # Code that waits for its event to be set before finishing
+        self.holds: dict[str, asyncio.Event] = {}
+        self.running: dict[str, asyncio.Event] = {}
+
+    def hold(self, code):
+        self.holds[code] = asyncio.Event()
+        self.running[code] = asyncio.Event()
+        return self.holds[code]
+
+    async def _start_kernel(self) -> JupyterKernel:
+        # Let other executions run while the kernel starts
+        await asyncio.sleep(0)
+        self.kernels_started += 1
+        return JupyterKernel(f"k{self.kernels_started}")
+
+    async def _shutdown_kernel(self, kernel: JupyterKernel):
+        self.shut_down.append(kernel.id)
+
+    async def _interrupt_kernel(self, kernel: JupyterKernel):
+        pass
+
+    async def _execute_in_kernel(self, kernel: JupyterKernel, code: str, timeout: int):
+        if kernel.id in self.gone:
+            raise KernelUnavailableError(f"{kernel.id} is gone")
+        if code in self.holds:
+            self.running[code].set()
+            await self.holds[code].wait()
+        return ResultModel(stdout=kernel.id), False
+
+
+async def run(pool, code="1", session_id=None, timeout=5):
+    return (await pool.execute(code, session_id=session_id, timeout=timeout)).stdout
+
+
+class TestJupyterKernelPool:
+    @pytest.mark.asyncio
+    async def test_chat_keeps_its_kernel(self):
+        pool = FakeKernelPool()
+        try:
+            first = await run(pool, session_id="chat-a")
+            assert await run(pool, session_id="chat-a") == first
+            assert await run(pool, session_id="chat-b") != first
+
+            # Without a session the kernel is shut down after use
+            kernel_id = await run(pool)
+            await asyncio.sleep(0)
+            assert pool.shut_down == [kernel_id]
+
+            stats = pool.get_stats()
+            assert stats["affinity_hits"] == 1
+            assert stats["sessions"] == 2
+            assert stats["kernels"] == 2
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_warm_kernel_is_taken(self):
+        pool = FakeKernelPool(warm_kernels=1)
+        try:
+            await run(pool, session_id="chat-a")
+            await asyncio.sleep(0.01)
+            (warm,) = pool._warm
+
+            assert await run(pool, session_id="chat-b") == warm.id
+            assert pool.get_stats()["warm_starts"] == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_waits_for_busy_kernel_then_evicts_it(self):
+        pool = FakeKernelPool(max_kernels=1)
+        try:
+            release = pool.hold("slow")
+            slow = asyncio.create_task(run(pool, "slow", session_id="chat-a"))
+            await pool.running["slow"].wait()
+
+            waiting = asyncio.create_task(run(pool, session_id="chat-b"))
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+
+            release.set()
+            first = await slow
+            second = await waiting
+
+            assert second != first
+            assert pool.shut_down == [first]
+            assert list(pool._sessions) == ["chat-b"]
+            assert pool.get_stats()["kernels_evicted"] == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_busy_until_timeout(self):
+        pool = FakeKernelPool(max_kernels=1)
+        try:
+            release = pool.hold("slow")
+            slow = asyncio.create_task(run(pool, "slow", session_id="chat-a"))
+            await pool.running["slow"].wait()
+
+            result = await pool.execute("1", session_id="chat-b", timeout=0.05)
+            assert "busy" in result.stderr
+            assert pool.get_stats()["failed"] == 1
+
+            release.set()
+            await slow
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_steps_of_a_chat_started_together_share_a_kernel(self):
+        pool = FakeKernelPool()
+        try:
+            results = await asyncio.gather(
+                run(pool, "a = 1", session_id="chat-a"),
+                run(pool, "b = 2", session_id="chat-a"),
+            )
+
+            assert results[0] == results[1]
+            assert list(pool._sessions) == ["chat-a"]
+            # The other kernel started is kept warm for the next chat
+            (warm,) = pool._warm
+            assert warm.id != results[0]
+            assert warm.users == 0
+            assert pool._sessions["chat-a"].users == 0
+            assert pool.shut_down == []
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_gone_kernel_is_replaced(self):
+        pool = FakeKernelPool()
+        try:
+            first = await run(pool, session_id="chat-a")
+            pool.gone.add(first)
+
+            second = await run(pool, session_id="chat-a")
+
+            assert second != first
+            assert pool._sessions["chat-a"].id == second
+            assert pool.get_stats()["failed"] == 0
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_reaps_idle_kernels(self):
+        pool = FakeKernelPool(warm_kernels=1, idle_timeout=0.05)
+        try:
+            kernel_id = await run(pool, session_id="chat-a")
+            await asyncio.sleep(0.3)
+
+            assert kernel_id in pool.shut_down
+            assert len(pool.shut_down) == 2
+            stats = pool.get_stats()
+            assert (stats["kernels"], stats["sessions"], stats["warm"]) == (0, 0, 0)
+            assert stats["kernels_reaped"] == 2
+            # Nothing left to reap
+            assert pool._reaper.done()
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_busy_kernel_is_not_reaped(self):
+        pool = FakeKernelPool(idle_timeout=0.05)
+        try:
+            release = pool.hold("slow")
+            slow = asyncio.create_task(run(pool, "slow", session_id="chat-a"))
+            await pool.running["slow"].wait()
+            await asyncio.sleep(0.2)
+
+            release.set()
+            kernel_id = await slow
+            assert pool._sessions["chat-a"].id == kernel_id
+            assert pool.shut_down == []
+        finally:
+            await pool.close()
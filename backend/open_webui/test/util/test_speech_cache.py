@@ -0,0 +1,84 @@
+import os
+import time
+
+from open_webui.utils.speech_cache import SpeechCache
+
+
+def make_cache(tmp_path, max_size=25, max_age=0):
+    return SpeechCache(directory=tmp_path, max_size=max_size, max_age=max_age)
+
+
+class TestSpeechCache:
+    def test_put_and_get(self, tmp_path):
+        cache = make_cache(tmp_path)
+
+        assert cache.get("a.mp3") is None
+        path = cache.put("a.mp3", b"x" * 10)
+        assert path.read_bytes() == b"x" * 10
+        assert cache.get("a.mp3") == path
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["size"] == 10
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = make_cache(tmp_path)
+
+        cache.put("a.mp3", b"x" * 10)
+        cache.put("b.mp3", b"x" * 10)
+        assert cache.get("a.mp3")
+        cache.put("c.mp3", b"x" * 10)
+
+        assert cache.get("b.mp3") is None
+        assert not (tmp_path / "b.mp3").exists()
+        assert cache.get("a.mp3") and cache.get("c.mp3")
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["size"] == 20
+
+    def test_replacing_updates_size(self, tmp_path):
+        cache = make_cache(tmp_path)
+
+        cache.put("a.mp3", b"x" * 10)
+        cache.put("a.mp3", b"x" * 5)
+
+        assert cache.get_stats()["size"] == 5
+        assert cache.get_stats()["files"] == 1
+
+    def test_keeps_file_larger_than_limit(self, tmp_path):
+        cache = make_cache(tmp_path)
+
+        cache.put("a.mp3", b"x" * 10)
+        path = cache.put("big.mp3", b"x" * 100)
+
+        # Still served, as it was just synthesised
+        assert path.exists()
+        assert not (tmp_path / "a.mp3").exists()
+        assert cache.get_stats()["files"] == 1
+
+    def test_expires_unused_files(self, tmp_path):
+        cache = make_cache(tmp_path, max_size=1000, max_age=60)
+
+        cache.put("old.mp3", b"x" * 10)
+        cache.put("new.mp3", b"x" * 10)
+        size, _ = cache._entries["old.mp3"]
+        cache._entries["old.mp3"] = (size, time.time() - 120)
+
+        assert cache.get("old.mp3") is None
+        assert not (tmp_path / "old.mp3").exists()
+        assert cache.get("new.mp3")
+
+    def test_load_keeps_usage_order(self, tmp_path):
+        now = time.time()
+        for idx, name in enumerate(["c.mp3", "a.mp3", "b.mp3"]):
+            (tmp_path / name).write_bytes(b"x" * 10)
+            os.utime(tmp_path / name, (now - 100 + idx, now - 100 + idx))
+        (tmp_path / ".tmp.part").write_bytes(b"x" * 10)
+
+        cache = make_cache(tmp_path)
+
+        # The least recently used file is evicted on load
+        assert not (tmp_path / "c.mp3").exists()
+        assert cache.get("a.mp3") and cache.get("b.mp3")
+        assert cache.get_stats()["size"] == 20
@@ -0,0 +1,111 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.utils.whisper_pool import WhisperPool, WhisperQueueFullError
+
+
+class Blocker:
+    """A job that holds its worker until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        self.release.wait(5)
+        return "blocker", None
+
+
+def block(pool, user_id="blocker"):
+    blocker = Blocker()
+    future = pool.submit(blocker, user_id)
+    assert blocker.started.wait(5)
+    return blocker, future
+
+
+class TestWhisperPool:
+    def test_users_take_turns(self):
+        pool = WhisperPool(workers=1, max_queue_size=10)
+        blocker, _ = block(pool)
+
+        order = []
+
+        def job(name):
+            def run():
+                order.append(name)
+                return name, None
+
+            return run
+
+        futures = [pool.submit(job(f"a{idx}"), "a") for idx in range(3)]
+        futures += [pool.submit(job(f"b{idx}"), "b") for idx in range(2)]
+        futures += [pool.submit(job("c0"), "c")]
+        assert pool.get_stats()["users_waiting"] == 3
+
+        blocker.release.set()
+        for future in futures:
+            future.result(5)
+
+        assert order == ["a0", "b0", "c0", "a1", "b1", "a2"]
+        assert pool.get_stats()["completed"] == 7
+
+    def test_queue_full(self):
+        pool = WhisperPool(workers=1, max_queue_size=2)
+        blocker, _ = block(pool)
+
+        futures = [pool.submit(lambda: ("ok", None), "a") for _ in range(2)]
+        with pytest.raises(WhisperQueueFullError):
+            pool.submit(lambda: ("ok", None), "b")
+        assert pool.get_stats()["rejected"] == 1
+
+        blocker.release.set()
+        assert [future.result(5)[0] for future in futures] == ["ok", "ok"]
+
+    def test_failure_doesnt_stop_worker(self):
+        pool = WhisperPool(workers=1, max_queue_size=10)
+
+        def fail():
+            raise RuntimeError("bad audio")
+
+        with pytest.raises(RuntimeError):
+            pool.submit(fail, "a").result(5)
+        assert pool.submit(lambda: ("ok", None), "a").result(5)[0] == "ok"
+
+        stats = pool.get_stats()
+        assert stats["failed"] == 1
+        assert stats["completed"] == 1
+        assert stats["running"] == 0
+
+    def test_cancelled_jobs_are_skipped(self):
+        pool = WhisperPool(workers=1, max_queue_size=10)
+        blocker, _ = block(pool)
+
+        ran = []
+        cancelled = pool.submit(lambda: ran.append("cancelled"), "a")
+        assert cancelled.cancel()
+        future = pool.submit(lambda: ("ok", None), "a")
+
+        blocker.release.set()
+        assert future.result(5)[0] == "ok"
+        assert ran == []
+        assert pool.get_stats()["queued"] == 0
+
+    def test_transcribe(self):
+        class Model:
+            def transcribe(self, file_path, **kwargs):
+                segments = [
+                    SimpleNamespace(text=" hello"),
+                    SimpleNamespace(text=" there"),
+                ]
+                return iter(segments), SimpleNamespace(duration=2.0)
+
+        pool = WhisperPool(workers=2, max_queue_size=10)
+        text, info = pool.transcribe(Model(), "audio.wav", user_id="a", beam_size=5)
+
+        assert text == " hello there"
+        stats = pool.get_stats()
+        assert stats["audio_seconds"] == 2.0
+        assert stats["real_time_factor"] is not None
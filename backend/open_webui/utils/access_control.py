@@ -1,10 +1,26 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional, Set, Union, List, Dict, Any
 from open_webui.models.users import Users, UserModel
 from open_webui.models.groups import Groups
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
-import json
+from open_webui.env import PERMISSION_CACHE_TTL
+
+PERMISSION_CACHE_MAX_SIZE = 10000
+
+# Contexts resolved while handling the current request, see permission_context_scope()
+_request_contexts: ContextVar[Optional[dict]] = ContextVar(
+    "permission_contexts", default=None
+)
+
+# user_id -> (expires_at, Groups.version, context)
+_context_cache: dict[str, tuple] = {}
+_context_cache_lock = threading.Lock()
 
 
 def fill_missing_permissions(
@@ -25,47 +41,185 @@ def fill_missing_permissions(
     return permissions
 
 
-def get_permissions(
-    user_id: str,
-    default_permissions: Dict[str, Any],
+def combine_permissions(
+    permissions: Dict[str, Any], group_permissions: Dict[str, Any]
 ) -> Dict[str, Any]:
+    """Combine permissions from multiple groups by taking the most permissive value."""
+    for key, value in group_permissions.items():
+        if isinstance(value, dict):
+            if key not in permissions:
+                permissions[key] = {}
+            permissions[key] = combine_permissions(permissions[key], value)
+        else:
+            if key not in permissions:
+                permissions[key] = value
+            else:
+                permissions[key] = (
+                    permissions[key] or value
+                )  # Use the most permissive value (True > False)
+    return permissions
+
+
+def lookup_permission(
+    permissions: Dict[str, Any],
+    keys: List[str],
+    default_permissions: Optional[Dict[str, Any]] = None,
+) -> bool:
     """
-    Get all permissions for a user by combining the permissions of all groups the user is a member of.
-    If a permission is defined in multiple groups, the most permissive value is used (True > False).
-    Permissions are nested in a dict with the permission key as the key and a boolean as the value.
+    Traverse permissions using a list of keys (from a dot-split permission key).
+    Keys missing from permissions are looked up in default_permissions, which is
+    equivalent to reading from fill_missing_permissions(permissions, default_permissions)
+    without copying or modifying either dict.
+    """
+    for key in keys:
+        if not isinstance(permissions, dict):
+            return False
+        if key in permissions:
+            permissions = permissions[key]
+            default_permissions = (
+                default_permissions.get(key)
+                if isinstance(default_permissions, dict)
+                else None
+            )
+        elif isinstance(default_permissions, dict) and key in default_permissions:
+            permissions = default_permissions[key]
+            default_permissions = None
+        else:
+            return False  # If any part of the hierarchy is missing, deny access
+
+    return bool(permissions)  # Return the boolean at the final level
+
+
+class PermissionContext:
     """
+    A user's group ids and the permissions merged across those groups,
+    resolved once and shared by every access check that needs them.
+    """
+
+    def __init__(
+        self, user_id: str, group_ids: Set[str], group_permissions: Dict[str, Any]
+    ):
+        self.user_id = user_id
+        self.group_ids = frozenset(group_ids)
+        self.group_permissions = group_permissions
+
+    @classmethod
+    def resolve(cls, user_id: str) -> "PermissionContext":
+        group_ids = set()
+        group_permissions = {}
+        for group in Groups.get_groups_by_member_id(user_id):
+            group_ids.add(group.id)
+            group_permissions = combine_permissions(
+                group_permissions, group.permissions or {}
+            )
+        return cls(user_id, group_ids, group_permissions)
+
+    def get_permissions(self, default_permissions: Dict[str, Any]) -> Dict[str, Any]:
+        # Deep copy default permissions to avoid modifying the original dict
+        permissions = json.loads(json.dumps(default_permissions))
+
+        # Combine permissions from all user groups
+        permissions = combine_permissions(permissions, self.group_permissions)
+
+        # Ensure all fields from default_permissions are present and filled in
+        return fill_missing_permissions(permissions, default_permissions)
+
+    def has_permission(
+        self, permission_key: str, default_permissions: Dict[str, Any] = {}
+    ) -> bool:
+        permission_hierarchy = permission_key.split(".")
+
+        if lookup_permission(self.group_permissions, permission_hierarchy):
+            return True
 
-    def combine_permissions(
-        permissions: Dict[str, Any], group_permissions: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Combine permissions from multiple groups by taking the most permissive value."""
-        for key, value in group_permissions.items():
-            if isinstance(value, dict):
-                if key not in permissions:
-                    permissions[key] = {}
-                permissions[key] = combine_permissions(permissions[key], value)
+        # Check default permissions afterward if the group permissions don't allow it
+        return lookup_permission(
+            default_permissions, permission_hierarchy, DEFAULT_USER_PERMISSIONS
+        )
+
+    def has_access(
+        self,
+        type: str = "write",
+        access_control: Optional[dict] = None,
+        strict: bool = True,
+    ) -> bool:
+        if access_control is None:
+            if strict:
+                return type == "read"
             else:
-                if key not in permissions:
-                    permissions[key] = value
-                else:
-                    permissions[key] = (
-                        permissions[key] or value
-                    )  # Use the most permissive value (True > False)
-        return permissions
+                return True
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+        permission_access = access_control.get(type, {})
+        permitted_group_ids = permission_access.get("group_ids", [])
+        permitted_user_ids = permission_access.get("user_ids", [])
 
-    # Deep copy default permissions to avoid modifying the original dict
-    permissions = json.loads(json.dumps(default_permissions))
+        return self.user_id in permitted_user_ids or not self.group_ids.isdisjoint(
+            permitted_group_ids
+        )
 
-    # Combine permissions from all user groups
-    for group in user_groups:
-        permissions = combine_permissions(permissions, group.permissions or {})
 
-    # Ensure all fields from default_permissions are present and filled in
-    permissions = fill_missing_permissions(permissions, default_permissions)
+@contextmanager
+def permission_context_scope():
+    """
+    Reuse resolved permission contexts for everything run inside the block,
+    regardless of the cache TTL. Entered once per HTTP request by main.py.
+    """
+    token = _request_contexts.set({})
+    try:
+        yield
+    finally:
+        _request_contexts.reset(token)
+
+
+def get_permission_context(user_id: str) -> PermissionContext:
+    # Any group change in this process bumps the version and invalidates
+    # both the per-request and the per-user entries
+    version = Groups.version
+
+    contexts = _request_contexts.get()
+    if contexts is not None:
+        entry = contexts.get(user_id)
+        if entry and entry[0] == version:
+            return entry[1]
+
+    now = time.monotonic()
+    entry = _context_cache.get(user_id)
+    if entry and entry[0] > now and entry[1] == version:
+        context = entry[2]
+    else:
+        context = PermissionContext.resolve(user_id)
+        if PERMISSION_CACHE_TTL > 0:
+            with _context_cache_lock:
+                if len(_context_cache) >= PERMISSION_CACHE_MAX_SIZE:
+                    for key in [
+                        key
+                        for key, (expires_at, _, _) in _context_cache.items()
+                        if expires_at <= now
+                    ]:
+                        del _context_cache[key]
+                    if len(_context_cache) >= PERMISSION_CACHE_MAX_SIZE:
+                        _context_cache.clear()
+                _context_cache[user_id] = (
+                    now + PERMISSION_CACHE_TTL,
+                    version,
+                    context,
+                )
+
+    if contexts is not None:
+        contexts[user_id] = (version, context)
+    return context
 
-    return permissions
+
+def get_permissions(
+    user_id: str,
+    default_permissions: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Get all permissions for a user by combining the permissions of all groups the user is a member of.
+    If a permission is defined in multiple groups, the most permissive value is used (True > False).
+    Permissions are nested in a dict with the permission key as the key and a boolean as the value.
+    """
+    return get_permission_context(user_id).get_permissions(default_permissions)
 
 
 def has_permission(
@@ -79,30 +233,9 @@ def has_permission(
 
     Permission keys can be hierarchical and separated by dots ('.').
     """
-
-    def get_permission(permissions: Dict[str, Any], keys: List[str]) -> bool:
-        """Traverse permissions dict using a list of keys (from dot-split permission_key)."""
-        for key in keys:
-            if key not in permissions:
-                return False  # If any part of the hierarchy is missing, deny access
-            permissions = permissions[key]  # Traverse one level deeper
-
-        return bool(permissions)  # Return the boolean at the final level
-
-    permission_hierarchy = permission_key.split(".")
-
-    # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
-
-    for group in user_groups:
-        if get_permission(group.permissions or {}, permission_hierarchy):
-            return True
-
-    # Check default permissions afterward if the group permissions don't allow it
-    default_permissions = fill_missing_permissions(
-        default_permissions, DEFAULT_USER_PERMISSIONS
+    return get_permission_context(user_id).has_permission(
+        permission_key, default_permissions
     )
-    return get_permission(default_permissions, permission_hierarchy)
 
 
 def has_access(
@@ -119,8 +252,7 @@ def has_access(
             return True
 
     if user_group_ids is None:
-        user_groups = Groups.get_groups_by_member_id(user_id)
-        user_group_ids = {group.id for group in user_groups}
+        user_group_ids = get_permission_context(user_id).group_ids
 
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
@@ -0,0 +1,187 @@
+import logging
+import subprocess
+import wave
+from typing import Iterator, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+# Frames quieter than this count as silence
+SILENCE_THRESHOLD_DBFS = -40
+# A pause this long ends a segment
+MIN_SILENCE_MS = 500
+# Silence kept around the speech of a segment
+PADDING_MS = 200
+# Segments with less speech than this are noise, and dropped
+MIN_SPEECH_MS = 150
+# Whisper's window; longer segments are cut at their quietest point
+MAX_SEGMENT_MS = 30000
+# How far back from the limit to look for that quietest point
+CUT_WINDOW_MS = 5000
+
+
+class SpeechSegment:
+    """A stretch of 16-bit mono PCM audio that contains speech."""
+
+    def __init__(self, index: int, start: float, audio: bytes, sample_rate: int):
+        self.index = index
+        self.start = start
+        self.audio = audio
+        self.sample_rate = sample_rate
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self.audio) / 2 / self.sample_rate
+
+    def write_wav(self, file_path: str) -> str:
+        with wave.open(file_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(self.audio)
+        return file_path
+
+
+def decode_audio(
+    file_path: str, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS
+) -> Iterator[bytes]:
+    """
+    Decode any audio file ffmpeg can read into frames of 16-bit mono PCM,
+    without holding more than a frame of it in memory.
+    """
+    frame_bytes = sample_rate * frame_ms // 1000 * 2
+    process = subprocess.Popen(
+        [
+            AudioSegment.converter,
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-i",
+            file_path,
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(sample_rate),
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    try:
+        while True:
+            frame = process.stdout.read(frame_bytes)
+            if not frame:
+                break
+            yield frame
+
+        if process.wait() != 0:
+            error = process.stderr.read().decode(errors="replace").strip()
+            raise ValueError(f"Failed to decode audio: {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def get_frame_level(frame: bytes) -> float:
+    samples = np.frombuffer(frame[: len(frame) // 2 * 2], dtype=np.int16)
+    if samples.size == 0:
+        return -np.inf
+    rms = np.sqrt(np.mean(samples.astype(np.float64) ** 2))
+    return 20 * np.log10(rms / 32768) if rms > 0 else -np.inf
+
+
+def segment_speech(
+    frames: Iterator[bytes],
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = FRAME_MS,
+    threshold: float = SILENCE_THRESHOLD_DBFS,
+) -> Iterator[SpeechSegment]:
+    """
+    Group decoded frames into speech segments as they arrive, cutting at
+    pauses, so that each segment can be transcribed while the rest of the
+    recording is still being decoded.
+    """
+    min_silence = MIN_SILENCE_MS // frame_ms
+    padding = PADDING_MS // frame_ms
+    min_speech = max(1, MIN_SPEECH_MS // frame_ms)
+    max_frames = MAX_SEGMENT_MS // frame_ms
+    cut_window = CUT_WINDOW_MS // frame_ms
+
+    # Frames of the segment being built, and the position of the first one
+    buffer: list[bytes] = []
+    levels: list[float] = []
+    start = 0
+    speech = 0
+    silence = 0
+    index = 0
+
+    def emit(count: int) -> Optional[SpeechSegment]:
+        nonlocal buffer, levels, start, speech, silence, index
+
+        segment_frames, buffer = buffer[:count], buffer[count:]
+        segment_levels, levels = levels[:count], levels[count:]
+        segment_start = start
+        start += count
+
+        speech = sum(1 for level in levels if level > threshold)
+        silence = 0
+
+        if sum(1 for level in segment_levels if level > threshold) < min_speech:
+            return None
+
+        segment = SpeechSegment(
+            index,
+            segment_start * frame_ms / 1000,
+            b"".join(segment_frames),
+            sample_rate,
+        )
+        index += 1
+        return segment
+
+    for frame in frames:
+        level = get_frame_level(frame)
+        buffer.append(frame)
+        levels.append(level)
+
+        if level > threshold:
+            speech += 1
+            silence = 0
+        else:
+            silence += 1
+
+        segment = None
+        if speech == 0:
+            # Only keep the silence that leads into the next speech
+            excess = len(buffer) - padding
+            if excess > 0:
+                del buffer[:excess]
+                del levels[:excess]
+                start += excess
+        elif silence >= min_silence:
+            segment = emit(len(buffer) - silence + padding)
+        elif len(buffer) >= max_frames:
+            window = levels[-cut_window:]
+            segment = emit(len(buffer) - len(window) + int(np.argmin(window)) + 1)
+
+        if segment is not None:
+            yield segment
+
+    if speech > 0:
+        segment = emit(len(buffer) - max(0, silence - padding))
+        if segment is not None:
+            yield segment
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 import jwt
@@ -26,6 +27,7 @@ from open_webui.models.users import Users
 from open_webui.constants import ERROR_MESSAGES
 
 from open_webui.env import (
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL,
     OFFLINE_MODE,
     LICENSE_BLOB,
     pk,
@@ -275,7 +277,7 @@ def get_current_user(
             )
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = Users.get_cached_user_by_id(data["id"])
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -300,12 +302,9 @@ def get_current_user(
                     current_span.set_attribute("client.user.role", user.role)
                     current_span.set_attribute("client.auth.type", "jwt")
 
-                # Refresh the user's last active timestamp asynchronously
-                # to prevent blocking the request
-                if background_tasks:
-                    background_tasks.add_task(
-                        Users.update_user_last_active_by_id, user.id
-                    )
+                # Refresh the user's last active timestamp, written in
+                # batches by periodic_user_last_active_flush
+                Users.touch_user_last_active_by_id(user.id)
             return user
         else:
             raise HTTPException(
@@ -328,7 +327,7 @@ def get_current_user(
 
 
 def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    user = Users.get_cached_user_by_api_key(api_key)
 
     if user is None:
         raise HTTPException(
@@ -344,11 +343,25 @@ def get_current_user_by_api_key(api_key: str):
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
-        Users.update_user_last_active_by_id(user.id)
+        Users.touch_user_last_active_by_id(user.id)
 
     return user
 
 
+async def periodic_user_last_active_flush():
+    """Write the last-active timestamps queued by authentication."""
+    if DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL <= 0:
+        return
+
+    try:
+        while True:
+            await asyncio.sleep(DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL)
+            await asyncio.to_thread(Users.flush_user_last_active)
+    finally:
+        # Don't lose the last batch on shutdown
+        Users.flush_user_last_active()
+
+
 def get_verified_user(user=Depends(get_current_user)):
     if user.role not in {"user", "admin"}:
         raise HTTPException(
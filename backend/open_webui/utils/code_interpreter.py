@@ -1,19 +1,32 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
+from collections import OrderedDict, deque
 from typing import Optional
 
 import aiohttp
 import websockets
 from pydantic import BaseModel
 
+from open_webui.config import (
+    CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TIMEOUT,
+    CODE_INTERPRETER_JUPYTER_MAX_KERNELS,
+    CODE_INTERPRETER_JUPYTER_WARM_KERNELS,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 logger = logging.getLogger(__name__)
 logger.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+# Longest pause between two checks for idle kernels
+REAP_INTERVAL = 60
+
+
 class ResultModel(BaseModel):
     """
     Execute Code Result Model
@@ -24,94 +37,369 @@ class ResultModel(BaseModel):
     result: Optional[str] = ""
 
 
-class JupyterCodeExecuter:
+class KernelUnavailableError(Exception):
+    pass
+
+
+class JupyterKernel:
+    def __init__(self, id: str):
+        self.id = id
+        self.session_id: Optional[str] = None
+        # Executions that have acquired the kernel, running or waiting on lock
+        self.users = 0
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class JupyterKernelPool:
     """
-    Execute code in jupyter notebook
+    Kernels on one Jupyter server, kept running between executions.
+
+    A few kernels are started ahead of time, so code doesn't wait for one to
+    start. Each chat keeps the kernel it first ran code in, so variables and
+    imports carry over from one step to the next, until it has been idle for
+    ``idle_timeout`` seconds. Executions without a session get a warm kernel
+    that is shut down after use.
+
+    At most ``max_kernels`` kernels run at once. When all are taken, the
+    least recently used idle chat kernel is given up, and failing that,
+    executions wait for a kernel to be released.
     """
 
     def __init__(
         self,
         base_url: str,
-        code: str,
         token: str = "",
         password: str = "",
-        timeout: int = 60,
+        warm_kernels: int = CODE_INTERPRETER_JUPYTER_WARM_KERNELS,
+        max_kernels: int = CODE_INTERPRETER_JUPYTER_MAX_KERNELS,
+        idle_timeout: int = CODE_INTERPRETER_JUPYTER_KERNEL_IDLE_TIMEOUT,
     ):
         """
         :param base_url: Jupyter server URL (e.g., "http://localhost:8888")
-        :param code: Code to execute
         :param token: Jupyter authentication token (optional)
         :param password: Jupyter password (optional)
-        :param timeout: WebSocket timeout in seconds (default: 60s)
+        :param warm_kernels: Idle kernels kept started
+        :param max_kernels: Kernels running at once
+        :param idle_timeout: Seconds an unused chat kernel is kept
         """
         self.base_url = base_url
-        self.code = code
-        self.token = token
-        self.password = password
-        self.timeout = timeout
-        self.kernel_id = ""
         if self.base_url[-1] != "/":
             self.base_url += "/"
-        self.session = aiohttp.ClientSession(trust_env=True, base_url=self.base_url)
+        self.token = token
+        self.password = password
+        self.warm_kernels = min(warm_kernels, max_kernels)
+        self.max_kernels = max_kernels
+        self.idle_timeout = idle_timeout
+
+        self.session: Optional[aiohttp.ClientSession] = None
         self.params = {}
-        self.result = ResultModel()
+        self._session_lock = asyncio.Lock()
+
+        self._kernels: dict[str, JupyterKernel] = {}
+        self._warm: deque[JupyterKernel] = deque()
+        # session id -> kernel, least recently used first
+        self._sessions: OrderedDict[str, JupyterKernel] = OrderedDict()
+        self._starting = 0
+        self._condition = asyncio.Condition()
+
+        self._warming: Optional[asyncio.Task] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.last_used = time.monotonic()
 
-    async def __aenter__(self):
-        return self
+        self.executions = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.affinity_hits = 0
+        self.warm_starts = 0
+        self.cold_starts = 0
+        self.kernels_started = 0
+        self.kernels_evicted = 0
+        self.kernels_reaped = 0
+
+        self.acquire_seconds: Optional[float] = None
+        self.execution_seconds: Optional[float] = None
+        self.max_execution_seconds = 0.0
+
+    async def execute(
+        self, code: str, session_id: Optional[str] = None, timeout: int = 60
+    ) -> ResultModel:
+        """
+        Run ``code`` in the kernel of ``session_id``, or in a fresh kernel if
+        there is no session, and return its output.
+        """
+        self.last_used = time.monotonic()
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.kernel_id:
+        started_at = time.monotonic()
+        # A kernel that is gone (e.g. the server restarted) is replaced once
+        for attempt in range(2):
             try:
-                async with self.session.delete(
-                    f"api/kernels/{self.kernel_id}", params=self.params
-                ) as response:
-                    response.raise_for_status()
+                kernel = await self._acquire(session_id, timeout)
             except Exception as err:
-                logger.exception("close kernel failed, %s", err)
-        await self.session.close()
+                logger.exception("acquire kernel failed, %s", err)
+                self.failed += 1
+                return ResultModel(stderr=f"Error: {err}")
 
-    async def run(self) -> ResultModel:
-        try:
-            await self.sign_in()
-            await self.init_kernel()
-            await self.execute_code()
-        except Exception as err:
-            logger.exception("execute code failed, %s", err)
-            self.result.stderr = f"Error: {err}"
-        return self.result
+            # Replace the warm kernel that may just have been taken
+            self._start_background_tasks()
+
+            acquired_at = time.monotonic()
+            discard = False
+            try:
+                async with kernel.lock:
+                    result, timed_out = await self._execute_in_kernel(
+                        kernel, code, timeout
+                    )
+                if timed_out:
+                    self.timeouts += 1
+                    await self._interrupt_kernel(kernel)
+            except KernelUnavailableError as err:
+                discard = True
+                if attempt == 0:
+                    logger.warning(f"Jupyter kernel {kernel.id} is gone: {err}")
+                    continue
+                logger.exception("execute code failed, %s", err)
+                self.failed += 1
+                result = ResultModel(stderr=f"Error: {err}")
+            except Exception as err:
+                logger.exception("execute code failed, %s", err)
+                # Its state is unknown, so the next step starts over
+                discard = True
+                self.failed += 1
+                result = ResultModel(stderr=f"Error: {err}")
+            finally:
+                await self._release(kernel, discard)
+
+            self._record(acquired_at - started_at, time.monotonic() - acquired_at)
+            return result
+
+    async def _acquire(self, session_id: Optional[str], timeout: int) -> JupyterKernel:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        async with self._condition:
+            while True:
+                kernel = self._sessions.get(session_id) if session_id else None
+                if kernel is not None:
+                    self._sessions.move_to_end(session_id)
+                    self.affinity_hits += 1
+                    kernel.users += 1
+                    return kernel
+
+                if self._warm:
+                    kernel = self._warm.popleft()
+                    kernel.users += 1
+                    self.warm_starts += 1
+                    break
+
+                if self._count() < self.max_kernels or self._evict():
+                    self._starting += 1
+                    self.cold_starts += 1
+                    break
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"All {self.max_kernels} Jupyter kernels are busy, try again later"
+                    )
+                try:
+                    await asyncio.wait_for(self._condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+        if kernel is None:
+            try:
+                kernel = await self._start_kernel()
+            finally:
+                async with self._condition:
+                    self._starting -= 1
+                    if kernel is not None:
+                        kernel.users += 1
+                        self._kernels[kernel.id] = kernel
+                    self._condition.notify_all()
+
+        if session_id:
+            async with self._condition:
+                bound = self._sessions.get(session_id)
+                if bound is not None:
+                    # Another step of the chat got a kernel first, use that one
+                    kernel.users -= 1
+                    self._warm.append(kernel)
+                    bound.users += 1
+                    self._condition.notify_all()
+                    return bound
+
+                kernel.session_id = session_id
+                self._sessions[session_id] = kernel
+
+        return kernel
+
+    async def _release(self, kernel: JupyterKernel, discard: bool = False):
+        async with self._condition:
+            kernel.users -= 1
+            kernel.last_used = time.monotonic()
+
+            if (discard or kernel.session_id is None) and kernel.users == 0:
+                self._remove(kernel)
+                self._spawn(self._shutdown_kernel(kernel))
+            self._condition.notify_all()
+
+    def _count(self) -> int:
+        return len(self._kernels) + self._starting
+
+    def _remove(self, kernel: JupyterKernel):
+        self._kernels.pop(kernel.id, None)
+        if kernel.session_id and self._sessions.get(kernel.session_id) is kernel:
+            del self._sessions[kernel.session_id]
+        if kernel in self._warm:
+            self._warm.remove(kernel)
+
+    def _evict(self) -> bool:
+        """Give up the least recently used idle chat kernel, to make room."""
+        for kernel in self._sessions.values():
+            if kernel.users == 0:
+                self._remove(kernel)
+                self.kernels_evicted += 1
+                self._spawn(self._shutdown_kernel(kernel))
+                return True
+        return False
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _start_background_tasks(self):
+        if self._warming is None or self._warming.done():
+            self._warming = self._spawn(self._warm_up())
+        if self._reaper is None or self._reaper.done():
+            self._reaper = self._spawn(self._reap())
+
+    async def _warm_up(self):
+        while True:
+            async with self._condition:
+                if (
+                    len(self._warm) >= self.warm_kernels
+                    or self._count() >= self.max_kernels
+                ):
+                    return
+                self._starting += 1
+
+            kernel = None
+            try:
+                kernel = await self._start_kernel()
+            except Exception as err:
+                logger.warning(f"Failed to start a warm Jupyter kernel: {err}")
+                return
+            finally:
+                async with self._condition:
+                    self._starting -= 1
+                    if kernel is not None:
+                        self._kernels[kernel.id] = kernel
+                        self._warm.append(kernel)
+                    self._condition.notify_all()
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(min(REAP_INTERVAL, self.idle_timeout))
+
+            now = time.monotonic()
+            async with self._condition:
+                expired = [
+                    kernel
+                    for kernel in self._sessions.values()
+                    if kernel.users == 0 and now - kernel.last_used >= self.idle_timeout
+                ]
+                # Nobody has run code in a while, so give the warm kernels back too
+                if now - self.last_used >= self.idle_timeout:
+                    expired.extend(self._warm)
+
+                for kernel in expired:
+                    self._remove(kernel)
+                self.kernels_reaped += len(expired)
 
-    async def sign_in(self) -> None:
+            for kernel in expired:
+                await self._shutdown_kernel(kernel)
+
+            # Started again by the next execution
+            if not self._kernels and not self._starting:
+                return
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        async with self._session_lock:
+            if self.session is None or self.session.closed:
+                session = aiohttp.ClientSession(trust_env=True, base_url=self.base_url)
+                try:
+                    await self.sign_in(session)
+                except BaseException:
+                    await session.close()
+                    raise
+                self.session = session
+            return self.session
+
+    async def sign_in(self, session: aiohttp.ClientSession) -> None:
         # password authentication
         if self.password and not self.token:
-            async with self.session.get("login") as response:
+            async with session.get("login") as response:
                 response.raise_for_status()
                 xsrf_token = response.cookies["_xsrf"].value
                 if not xsrf_token:
                     raise ValueError("_xsrf token not found")
-                self.session.cookie_jar.update_cookies(response.cookies)
-                self.session.headers.update({"X-XSRFToken": xsrf_token})
-            async with self.session.post(
+                session.cookie_jar.update_cookies(response.cookies)
+                session.headers.update({"X-XSRFToken": xsrf_token})
+            async with session.post(
                 "login",
                 data={"_xsrf": xsrf_token, "password": self.password},
                 allow_redirects=False,
             ) as response:
                 response.raise_for_status()
-                self.session.cookie_jar.update_cookies(response.cookies)
+                session.cookie_jar.update_cookies(response.cookies)
 
         # token authentication
         if self.token:
             self.params.update({"token": self.token})
 
-    async def init_kernel(self) -> None:
-        async with self.session.post(url="api/kernels", params=self.params) as response:
-            response.raise_for_status()
-            kernel_data = await response.json()
-            self.kernel_id = kernel_data["id"]
+    async def _start_kernel(self) -> JupyterKernel:
+        for attempt in range(2):
+            session = await self._get_session()
+            async with session.post(url="api/kernels", params=self.params) as response:
+                if response.status in (401, 403) and attempt == 0:
+                    # The login has expired, sign in again
+                    await session.close()
+                    continue
+                response.raise_for_status()
+                kernel_data = await response.json()
+
+            self.kernels_started += 1
+            return JupyterKernel(kernel_data["id"])
 
-    def init_ws(self) -> (str, dict):
+    async def _shutdown_kernel(self, kernel: JupyterKernel):
+        try:
+            session = await self._get_session()
+            async with session.delete(
+                f"api/kernels/{kernel.id}", params=self.params
+            ) as response:
+                if response.status != 404:
+                    response.raise_for_status()
+        except Exception as err:
+            logger.exception("close kernel failed, %s", err)
+
+    async def _interrupt_kernel(self, kernel: JupyterKernel):
+        try:
+            session = await self._get_session()
+            async with session.post(
+                f"api/kernels/{kernel.id}/interrupt", params=self.params
+            ) as response:
+                response.raise_for_status()
+        except Exception as err:
+            logger.exception("interrupt kernel failed, %s", err)
+
+    def init_ws(self, kernel: JupyterKernel) -> (str, dict):
         ws_base = self.base_url.replace("http", "ws", 1)
         ws_params = "?" + "&".join([f"{key}={val}" for key, val in self.params.items()])
-        websocket_url = f"{ws_base}api/kernels/{self.kernel_id}/channels{ws_params if len(ws_params) > 1 else ''}"
+        websocket_url = f"{ws_base}api/kernels/{kernel.id}/channels{ws_params if len(ws_params) > 1 else ''}"
         ws_headers = {}
         if self.password and not self.token:
             ws_headers = {
@@ -125,16 +413,22 @@ class JupyterCodeExecuter:
             }
         return websocket_url, ws_headers
 
-    async def execute_code(self) -> None:
-        # initialize ws
-        websocket_url, ws_headers = self.init_ws()
-        # execute
-        async with websockets.connect(
-            websocket_url, additional_headers=ws_headers
-        ) as ws:
-            await self.execute_in_jupyter(ws)
+    async def _execute_in_kernel(
+        self, kernel: JupyterKernel, code: str, timeout: int
+    ) -> tuple[ResultModel, bool]:
+        await self._get_session()
+        websocket_url, ws_headers = self.init_ws(kernel)
+        try:
+            ws = await websockets.connect(websocket_url, additional_headers=ws_headers)
+        except Exception as err:
+            raise KernelUnavailableError(err) from err
 
-    async def execute_in_jupyter(self, ws) -> None:
+        async with ws:
+            return await self.execute_in_jupyter(ws, code, timeout)
+
+    async def execute_in_jupyter(
+        self, ws, code: str, timeout: int
+    ) -> tuple[ResultModel, bool]:
         # send message
         msg_id = uuid.uuid4().hex
         await ws.send(
@@ -151,7 +445,7 @@ class JupyterCodeExecuter:
                     "parent_header": {},
                     "metadata": {},
                     "content": {
-                        "code": self.code,
+                        "code": code,
                         "silent": False,
                         "store_history": True,
                         "user_expressions": {},
@@ -164,10 +458,11 @@ class JupyterCodeExecuter:
         )
         # parse message
         stdout, stderr, result = "", "", []
+        timed_out = False
         while True:
             try:
                 # wait for message
-                message = await asyncio.wait_for(ws.recv(), self.timeout)
+                message = await asyncio.wait_for(ws.recv(), timeout)
                 message_data = json.loads(message)
                 # msg id not match, skip
                 if message_data.get("parent_header", {}).get("msg_id") != msg_id:
@@ -194,17 +489,125 @@ class JupyterCodeExecuter:
 
             except asyncio.TimeoutError:
                 stderr += "\nExecution timed out."
+                timed_out = True
                 break
-        self.result.stdout = stdout.strip()
-        self.result.stderr = stderr.strip()
-        self.result.result = "\n".join(result).strip() if result else ""
+
+        return (
+            ResultModel(
+                stdout=stdout.strip(),
+                stderr=stderr.strip(),
+                result="\n".join(result).strip() if result else "",
+            ),
+            timed_out,
+        )
+
+    def _record(self, acquire_seconds: float, execution_seconds: float):
+        self.executions += 1
+        self.acquire_seconds = (
+            acquire_seconds
+            if self.acquire_seconds is None
+            else EWMA_ALPHA * acquire_seconds + (1 - EWMA_ALPHA) * self.acquire_seconds
+        )
+        self.execution_seconds = (
+            execution_seconds
+            if self.execution_seconds is None
+            else EWMA_ALPHA * execution_seconds
+            + (1 - EWMA_ALPHA) * self.execution_seconds
+        )
+        self.max_execution_seconds = max(self.max_execution_seconds, execution_seconds)
+
+        logger.debug(
+            f"Executed code in {execution_seconds:.2f}s "
+            f"after waiting {acquire_seconds:.2f}s for a kernel"
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "warm_kernels": self.warm_kernels,
+            "max_kernels": self.max_kernels,
+            "idle_timeout": self.idle_timeout,
+            "kernels": len(self._kernels),
+            "starting": self._starting,
+            "warm": len(self._warm),
+            "sessions": len(self._sessions),
+            "busy": sum(1 for kernel in self._kernels.values() if kernel.users),
+            "executions": self.executions,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "affinity_hits": self.affinity_hits,
+            "warm_starts": self.warm_starts,
+            "cold_starts": self.cold_starts,
+            "kernels_started": self.kernels_started,
+            "kernels_evicted": self.kernels_evicted,
+            "kernels_reaped": self.kernels_reaped,
+            "acquire_seconds": (
+                round(self.acquire_seconds, 3)
+                if self.acquire_seconds is not None
+                else None
+            ),
+            "execution_seconds": (
+                round(self.execution_seconds, 3)
+                if self.execution_seconds is not None
+                else None
+            ),
+            "max_execution_seconds": round(self.max_execution_seconds, 3),
+        }
+
+    async def close(self):
+        for task in [self._warming, self._reaper]:
+            if task is not None:
+                task.cancel()
+
+        async with self._condition:
+            kernels = list(self._kernels.values())
+            for kernel in kernels:
+                self._remove(kernel)
+
+        await asyncio.gather(
+            *[self._shutdown_kernel(kernel) for kernel in kernels],
+            return_exceptions=True,
+        )
+        if self.session is not None:
+            await self.session.close()
+
+
+# One pool per Jupyter server and credentials
+_jupyter_kernel_pools: dict[tuple[str, str, str], JupyterKernelPool] = {}
+
+
+def get_jupyter_kernel_pool(
+    base_url: str, token: str = "", password: str = ""
+) -> JupyterKernelPool:
+    key = (base_url, token, password)
+    if key not in _jupyter_kernel_pools:
+        _jupyter_kernel_pools[key] = JupyterKernelPool(base_url, token, password)
+    return _jupyter_kernel_pools[key]
+
+
+def get_jupyter_kernel_pool_stats() -> list[dict]:
+    return [pool.get_stats() for pool in _jupyter_kernel_pools.values()]
+
+
+async def close_jupyter_kernel_pools():
+    pools = list(_jupyter_kernel_pools.values())
+    _jupyter_kernel_pools.clear()
+    for pool in pools:
+        await pool.close()
 
 
 async def execute_code_jupyter(
-    base_url: str, code: str, token: str = "", password: str = "", timeout: int = 60
+    base_url: str,
+    code: str,
+    token: str = "",
+    password: str = "",
+    timeout: int = 60,
+    session_id: Optional[str] = None,
 ) -> dict:
-    async with JupyterCodeExecuter(
-        base_url, code, token, password, timeout
-    ) as executor:
-        result = await executor.run()
-        return result.model_dump()
+    """
+    Execute code on a Jupyter server. Code with the same ``session_id`` runs
+    in the same kernel, so state carries over between calls.
+    """
+    pool = get_jupyter_kernel_pool(base_url, token or "", password or "")
+    result = await pool.execute(code, session_id=session_id, timeout=timeout)
+    return result.model_dump()
@@ -0,0 +1,139 @@
+import logging
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class UpstreamClientPool:
+    """
+    Long-lived aiohttp sessions for outbound LLM requests, one per upstream
+    origin, so TCP and TLS connections are kept alive and reused across
+    requests instead of being set up for every call.
+
+    Sessions never store cookies: they are shared between users, so callers
+    pass cookies per request.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._stats: dict[str, dict] = {}
+
+    @staticmethod
+    def get_origin(url: str) -> str:
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        origin = self.get_origin(url)
+        session = self._sessions.get(origin)
+        if session is None or session.closed:
+            session = self._create_session(origin)
+            self._sessions[origin] = session
+        return session
+
+    def _create_session(self, origin: str) -> aiohttp.ClientSession:
+        stats = self._stats.setdefault(
+            origin,
+            {"requests": 0, "connections_created": 0, "connections_reused": 0},
+        )
+
+        async def on_request_start(session, context, params):
+            stats["requests"] += 1
+
+        async def on_connection_create_end(session, context, params):
+            stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats["connections_reused"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(
+            limit=0,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+
+        log.debug(f"Creating upstream client session for {origin}")
+        return aiohttp.ClientSession(
+            connector=connector,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trust_env=True,
+            trace_configs=[trace_config],
+        )
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for origin, counters in self._stats.items():
+            session = self._sessions.get(origin)
+            connections = (
+                counters["connections_created"] + counters["connections_reused"]
+            )
+            stats[origin] = {
+                **counters,
+                "reuse_ratio": (
+                    counters["connections_reused"] / connections if connections else 0
+                ),
+                "open": bool(session and not session.closed),
+            }
+        return stats
+
+    async def close(self):
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+
+
+_upstream_clients: Optional[UpstreamClientPool] = None
+
+
+def init_upstream_clients() -> UpstreamClientPool:
+    global _upstream_clients
+
+    _upstream_clients = UpstreamClientPool()
+    return _upstream_clients
+
+
+def get_upstream_clients() -> UpstreamClientPool:
+    # Created in main.lifespan; lazily here for scripts and tests
+    if _upstream_clients is None:
+        return init_upstream_clients()
+    return _upstream_clients
+
+
+def get_upstream_session(url: str) -> aiohttp.ClientSession:
+    return get_upstream_clients().get_session(url)
+
+
+async def close_upstream_clients():
+    global _upstream_clients
+
+    if _upstream_clients is not None:
+        await _upstream_clients.close()
+        _upstream_clients = None
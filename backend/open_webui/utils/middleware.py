@@ -2904,6 +2904,12 @@ async def process_chat_response(
                                             else None
                                         ),
                                         request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT,
+                                        # Keep the chat's kernel, so later steps see its state
+                                        session_id=(
+                                            f"{user.id}:{metadata['chat_id']}"
+                                            if metadata.get("chat_id")
+                                            else None
+                                        ),
                                     )
                                 else:
                                     output = {
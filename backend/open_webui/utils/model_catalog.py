@@ -0,0 +1,196 @@
+import json
+import logging
+import threading
+from typing import Optional
+
+from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL
+from open_webui.env import (
+    BYPASS_MODEL_ACCESS_CONTROL,
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.models.users import UserModel
+from open_webui.utils.access_control import get_permission_context
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+MODEL_CATALOG_VERSION_KEY = f"{REDIS_KEY_PREFIX}:models:catalog_version"
+
+_local_version = 0
+_local_version_lock = threading.Lock()
+
+
+def invalidate_model_catalog():
+    """
+    Mark the model catalogue stale. Call after any change to custom models or
+    functions; other workers pick the change up through Redis.
+    """
+    global _local_version
+
+    with _local_version_lock:
+        _local_version += 1
+
+    if REDIS_URL:
+        try:
+            redis = get_redis_connection(
+                redis_url=REDIS_URL,
+                redis_sentinels=get_sentinels_from_env(
+                    REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+                ),
+                redis_cluster=REDIS_CLUSTER,
+            )
+            redis.incr(MODEL_CATALOG_VERSION_KEY)
+        except Exception as e:
+            log.warning(f"Failed to publish model catalogue invalidation: {e}")
+
+
+async def get_model_catalog_key(request) -> tuple:
+    """
+    Everything other than the base model list that the catalogue is built from.
+    Config values are synced across workers by AppConfig, so they are compared
+    by value; table changes are tracked by the invalidation version.
+    """
+    shared_version = None
+    redis = getattr(request.app.state, "redis", None)
+    if redis is not None:
+        try:
+            shared_version = await redis.get(MODEL_CATALOG_VERSION_KEY)
+        except Exception as e:
+            log.debug(f"Failed to read model catalogue version: {e}")
+
+    config = request.app.state.config
+    return (
+        _local_version,
+        shared_version,
+        config.ENABLE_EVALUATION_ARENA_MODELS,
+        json.dumps(config.EVALUATION_ARENA_MODELS, sort_keys=True, default=str),
+        tuple(config.MODEL_ORDER_LIST or []),
+    )
+
+
+class ModelCatalog:
+    """
+    The merged model list and everything derived from it that does not depend
+    on the requesting user. Per-user views are a single pass over the
+    precomputed access index.
+    """
+
+    def __init__(
+        self,
+        key: tuple,
+        base_models: list[dict],
+        models: list[dict],
+        model_infos: dict,
+        model_order_list: Optional[list[str]] = None,
+    ):
+        self.key = key
+        self.base_models = base_models
+        self.base_models_fingerprint = self._get_base_models_fingerprint(base_models)
+        self.models = models
+        self.listed_models = self._get_listed_models(models, model_order_list)
+
+        # (listed, owner user_id, access_control) per listed model
+        self.access_index = [
+            self._get_access_entry(model, model_infos) for model in self.listed_models
+        ]
+
+    @staticmethod
+    def _get_base_models_fingerprint(base_models: list[dict]) -> list[dict]:
+        # Ollama models are stamped with the fetch time, which says nothing
+        # about whether the list changed
+        return [
+            {key: value for key, value in model.items() if key != "created"}
+            for model in base_models
+        ]
+
+    def is_current(self, key: tuple, base_models: list[dict]) -> bool:
+        return self.key == key and (
+            self.base_models is base_models
+            or self.base_models_fingerprint
+            == self._get_base_models_fingerprint(base_models)
+        )
+
+    @staticmethod
+    def _get_listed_models(
+        models: list[dict], model_order_list: Optional[list[str]]
+    ) -> list[dict]:
+        listed_models = []
+        for model in models:
+            # Filter out filter pipelines
+            if "pipeline" in model and model["pipeline"].get("type", None) == "filter":
+                continue
+
+            try:
+                model_tags = [
+                    tag.get("name")
+                    for tag in model.get("info", {}).get("meta", {}).get("tags", [])
+                ]
+                tags = [tag.get("name") for tag in model.get("tags", [])]
+
+                tags = list(set(model_tags + tags))
+                model["tags"] = [{"name": tag} for tag in tags]
+            except Exception as e:
+                log.debug(f"Error processing model tags: {e}")
+                model["tags"] = []
+
+            listed_models.append(model)
+
+        if model_order_list:
+            model_order_dict = {
+                model_id: i for i, model_id in enumerate(model_order_list)
+            }
+            # Sort models by order list priority, with fallback for those not in the list
+            listed_models.sort(
+                key=lambda model: (
+                    model_order_dict.get(model.get("id", ""), float("inf")),
+                    (model.get("name", "") or ""),
+                )
+            )
+
+        return listed_models
+
+    @staticmethod
+    def _get_access_entry(model: dict, model_infos: dict) -> tuple:
+        if model.get("arena"):
+            return (
+                True,
+                None,
+                model.get("info", {}).get("meta", {}).get("access_control", {}),
+            )
+
+        model_info = model_infos.get(model["id"])
+        if model_info is None:
+            # Base models without a model entry are only visible when access
+            # control is bypassed
+            return (False, None, None)
+        return (True, model_info.user_id, model_info.access_control)
+
+    def get_models(self, user: UserModel) -> list[dict]:
+        if not (
+            (
+                user.role == "user"
+                or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
+            )
+            and not BYPASS_MODEL_ACCESS_CONTROL
+        ):
+            return list(self.listed_models)
+
+        context = get_permission_context(user.id)
+        return [
+            model
+            for model, (listed, owner_id, access_control) in zip(
+                self.listed_models, self.access_index
+            )
+            if listed
+            and (
+                user.id == owner_id
+                or context.has_access(type="read", access_control=access_control)
+            )
+        ]
@@ -11,14 +11,15 @@ from open_webui.functions import get_function_models
 
 
 from open_webui.models.functions import Functions
-from open_webui.models.models import Models
+from open_webui.models.models import Models, ModelModel
 
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
 )
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_permission_context
+from open_webui.utils.model_catalog import ModelCatalog, get_model_catalog_key
 
 
 from open_webui.config import (
@@ -78,6 +79,13 @@ async def get_all_base_models(request: Request, user: UserModel = None):
 
 
 async def get_all_models(request, refresh: bool = False, user: UserModel = None):
+    catalog = await get_model_catalog(request, refresh=refresh, user=user)
+    return catalog.models
+
+
+async def get_model_catalog(
+    request, refresh: bool = False, user: UserModel = None
+) -> ModelCatalog:
     if (
         request.app.state.MODELS
         and request.app.state.BASE_MODELS
@@ -88,6 +96,30 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
         base_models = await get_all_base_models(request, user=user)
         request.app.state.BASE_MODELS = base_models
 
+    # Only rebuild when the base models, custom models, functions or the
+    # relevant config changed
+    key = await get_model_catalog_key(request)
+    catalog = getattr(request.app.state, "MODEL_CATALOG", None)
+    if not refresh and catalog is not None and catalog.is_current(key, base_models):
+        return catalog
+
+    custom_models = Models.get_all_models()
+    models = build_models(request, base_models, custom_models)
+
+    catalog = ModelCatalog(
+        key,
+        base_models,
+        models,
+        {model.id: model for model in custom_models},
+        request.app.state.config.MODEL_ORDER_LIST,
+    )
+
+    request.app.state.MODELS = {model["id"]: model for model in models}
+    request.app.state.MODEL_CATALOG = catalog
+    return catalog
+
+
+def build_models(request, base_models: list[dict], custom_models: list[ModelModel]):
     # deep copy the base models to avoid modifying the original list
     models = [model.copy() for model in base_models]
 
@@ -146,7 +178,6 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
         for function in Functions.get_functions_by_type("filter", active_only=True)
     ]
 
-    custom_models = Models.get_all_models()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
             # Applied directly to a base model
@@ -307,16 +338,14 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
                     get_filter_items_from_module(filter_function, function_module)
                 )
 
-    log.debug(f"get_all_models() returned {len(models)} models")
-
-    request.app.state.MODELS = {model["id"]: model for model in models}
+    log.debug(f"build_models() returned {len(models)} models")
     return models
 
 
 def check_model_access(user, model):
+    context = get_permission_context(user.id)
     if model.get("arena"):
-        if not has_access(
-            user.id,
+        if not context.has_access(
             type="read",
             access_control=model.get("info", {})
             .get("meta", {})
@@ -329,9 +358,7 @@ def check_model_access(user, model):
             raise Exception("Model not found")
         elif not (
             user.id == model_info.user_id
-            or has_access(
-                user.id, type="read", access_control=model_info.access_control
-            )
+            or context.has_access(type="read", access_control=model_info.access_control)
         ):
             raise Exception("Model not found")
 
@@ -342,11 +369,12 @@ def get_filtered_models(models, user):
         user.role == "user"
         or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
     ) and not BYPASS_MODEL_ACCESS_CONTROL:
+        context = get_permission_context(user.id)
+        model_infos = {model.id: model for model in Models.get_all_models()}
         filtered_models = []
         for model in models:
             if model.get("arena"):
-                if has_access(
-                    user.id,
+                if context.has_access(
                     type="read",
                     access_control=model.get("info", {})
                     .get("meta", {})
@@ -355,13 +383,12 @@ def get_filtered_models(models, user):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
+            model_info = model_infos.get(model["id"])
             if model_info:
                 if (
                     (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
                     or user.id == model_info.user_id
-                    or has_access(
-                        user.id,
+                    or context.has_access(
                         type="read",
                         access_control=model_info.access_control,
                     )
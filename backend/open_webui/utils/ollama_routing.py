@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import aiohttp
+
+from open_webui.config import (
+    OLLAMA_ROUTING_EJECT_FAILURES,
+    OLLAMA_ROUTING_EJECT_SECONDS,
+    OLLAMA_ROUTING_POLICY,
+    OLLAMA_ROUTING_PS_INTERVAL,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.http_client import UpstreamClientPool, get_upstream_session
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
+
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+# Loading a model onto a node that does not have it in memory is weighed as
+# this many requests already queued there
+NON_RESIDENT_PENALTY = 2
+
+# Chats remembered by the sticky policy
+MAX_STICKY_CHATS = 10000
+
+
+class OllamaNode:
+    """Load and health of a single Ollama base URL."""
+
+    def __init__(self, origin: str):
+        self.origin = origin
+
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.latency: Optional[float] = None
+
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+        self.resident_models: set[str] = set()
+        self.resident_models_checked_at = 0.0
+        self._refreshing = False
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def record_latency(self, latency: float):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = (
+                LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency
+            )
+
+    def get_stats(self, now: float) -> dict:
+        return {
+            "origin": self.origin,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency": round(self.latency, 4) if self.latency is not None else None,
+            "ejected": self.is_ejected(now),
+            "ejected_for": max(0.0, round(self.ejected_until - now, 1)),
+            "resident_models": sorted(self.resident_models),
+        }
+
+
+class OllamaRouter:
+    """
+    Picks which Ollama base URL serves a request when a model is available on
+    several of them.
+
+    Nodes that failed repeatedly are skipped for a while; of the rest, the one
+    with the fewest in-flight requests and the lowest recent latency wins, with
+    nodes that would first have to load the model counted as busier. The sticky policy
+    keeps a chat on the node that served its previous turn, so the node's
+    prompt cache is reused.
+    """
+
+    def __init__(
+        self,
+        policy: str = OLLAMA_ROUTING_POLICY,
+        eject_failures: int = OLLAMA_ROUTING_EJECT_FAILURES,
+        eject_seconds: float = OLLAMA_ROUTING_EJECT_SECONDS,
+        ps_interval: float = OLLAMA_ROUTING_PS_INTERVAL,
+    ):
+        self.policy = policy
+        self.eject_failures = eject_failures
+        self.eject_seconds = eject_seconds
+        self.ps_interval = ps_interval
+
+        self._nodes: dict[str, OllamaNode] = {}
+        self._sticky_chats: OrderedDict[str, str] = OrderedDict()
+        # The loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def get_origin(url: str) -> str:
+        return UpstreamClientPool.get_origin(url)
+
+    def get_node(self, url: str) -> OllamaNode:
+        # Nodes are keyed by origin, so that requests to any endpoint of a
+        # base URL count towards the same node
+        origin = self.get_origin(url)
+        node = self._nodes.get(origin)
+        if node is None:
+            node = OllamaNode(origin)
+            self._nodes[origin] = node
+        return node
+
+    def select(
+        self,
+        candidates: list[tuple[int, str, Optional[str], str]],
+        chat_id: Optional[str] = None,
+    ) -> int:
+        """
+        Return the url_idx to use out of ``candidates``, a list of
+        (url_idx, base url, key, model name on that node) tuples.
+        """
+        if len(candidates) == 1:
+            return candidates[0][0]
+
+        if self.policy == "random":
+            return random.choice(candidates)[0]
+
+        now = time.monotonic()
+        for _, url, key, _ in candidates:
+            self._refresh_resident_models(self.get_node(url), url, key, now)
+
+        # If every node is ejected, fail open rather than refuse the request
+        healthy = [
+            candidate
+            for candidate in candidates
+            if not self.get_node(candidate[1]).is_ejected(now)
+        ] or candidates
+
+        if self.policy == "sticky" and chat_id:
+            sticky_origin = self._sticky_chats.get(chat_id)
+            for candidate in healthy:
+                if self.get_origin(candidate[1]) == sticky_origin:
+                    self._sticky_chats.move_to_end(chat_id)
+                    return candidate[0]
+
+        def load(candidate):
+            _, url, _, model = candidate
+            node = self.get_node(url)
+            in_flight = node.in_flight
+            if model not in node.resident_models:
+                in_flight += NON_RESIDENT_PENALTY
+            # Untried nodes rank as fastest so they get sampled
+            return (in_flight, node.latency or 0.0)
+
+        best_load = min(load(candidate) for candidate in healthy)
+        url_idx, url, _, _ = random.choice(
+            [candidate for candidate in healthy if load(candidate) == best_load]
+        )
+
+        if self.policy == "sticky" and chat_id:
+            self._sticky_chats[chat_id] = self.get_origin(url)
+            self._sticky_chats.move_to_end(chat_id)
+            while len(self._sticky_chats) > MAX_STICKY_CHATS:
+                self._sticky_chats.popitem(last=False)
+
+        return url_idx
+
+    def start(self, url: str) -> float:
+        node = self.get_node(url)
+        node.in_flight += 1
+        node.requests += 1
+        return time.monotonic()
+
+    def record_response(self, url: str, started_at: float):
+        """Record the time until the node started responding."""
+        self.get_node(url).record_latency(time.monotonic() - started_at)
+
+    def finish(self, url: str, success: bool):
+        """
+        Record the end of a request begun with ``start``. Failures are
+        connection errors and 5xx responses; enough of them in a row eject the
+        node for a while.
+        """
+        node = self.get_node(url)
+        node.in_flight = max(0, node.in_flight - 1)
+
+        if success:
+            node.consecutive_failures = 0
+            return
+
+        node.failures += 1
+        node.consecutive_failures += 1
+        if node.consecutive_failures >= self.eject_failures:
+            log.warning(
+                f"Ejecting Ollama node {node.origin} for {self.eject_seconds}s "
+                f"after {node.consecutive_failures} consecutive failures"
+            )
+            node.ejected_until = time.monotonic() + self.eject_seconds
+            node.consecutive_failures = 0
+
+    def _refresh_resident_models(
+        self, node: OllamaNode, url: str, key: Optional[str], now: float
+    ):
+        if node._refreshing or now - node.resident_models_checked_at < self.ps_interval:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        node._refreshing = True
+        task = loop.create_task(self._fetch_resident_models(node, url, key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch_resident_models(
+        self, node: OllamaNode, url: str, key: Optional[str]
+    ):
+        try:
+            headers = {"Authorization": f"Bearer {key}"} if key else {}
+            session = get_upstream_session(url)
+            async with session.get(
+                f"{url}/api/ps",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=5),
+            ) as r:
+                r.raise_for_status()
+                data = await r.json()
+
+            node.resident_models = {
+                model.get("model") or model.get("name")
+                for model in data.get("models", [])
+                if model.get("model") or model.get("name")
+            }
+        except Exception as e:
+            log.debug(f"Failed to fetch loaded models from {url}: {e}")
+        finally:
+            node.resident_models_checked_at = time.monotonic()
+            node._refreshing = False
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "policy": self.policy,
+            "nodes": [node.get_stats(now) for node in self._nodes.values()],
+        }
+
+
+_ollama_router: Optional[OllamaRouter] = None
+
+
+def get_ollama_router() -> OllamaRouter:
+    global _ollama_router
+
+    if _ollama_router is None:
+        _ollama_router = OllamaRouter()
+    return _ollama_router
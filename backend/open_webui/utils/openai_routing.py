@@ -0,0 +1,189 @@
+import logging
+import random
+import time
+from typing import Optional
+
+from open_webui.config import (
+    OPENAI_API_CIRCUIT_BREAKER_COOLDOWN,
+    OPENAI_API_CIRCUIT_BREAKER_FAILURES,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OPENAI"])
+
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class OpenAIEndpoint:
+    """
+    Health of a single OpenAI-compatible base URL, with a circuit breaker:
+    closed while requests succeed, open (skipped) for a cooldown after enough
+    consecutive failures, then half open until a single trial request either
+    closes it again or reopens it.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.trial_in_flight = False
+
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def is_available(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            return now >= self.opened_until
+        return not self.trial_in_flight
+
+    def get_stats(self, now: float) -> dict:
+        return {
+            "url": self.url,
+            "state": self.state,
+            "available": self.is_available(now),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "latency": round(self.latency, 4) if self.latency is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class OpenAIRouter:
+    """
+    Orders the OpenAI connections that serve the same model id for a request:
+    available endpoints by weighted random choice, then fallbacks (weight 0)
+    in configuration order. Endpoints with an open circuit are skipped unless
+    nothing else is left.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = OPENAI_API_CIRCUIT_BREAKER_FAILURES,
+        cooldown: float = OPENAI_API_CIRCUIT_BREAKER_COOLDOWN,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._endpoints: dict[str, OpenAIEndpoint] = {}
+
+    def get_endpoint(self, url: str) -> OpenAIEndpoint:
+        endpoint = self._endpoints.get(url)
+        if endpoint is None:
+            endpoint = OpenAIEndpoint(url)
+            self._endpoints[url] = endpoint
+        return endpoint
+
+    def plan(
+        self, candidates: list[tuple[int, str, float]], max_attempts: int
+    ) -> list[int]:
+        """
+        Return the url_idx values to try, in order, out of ``candidates``, a
+        list of (url_idx, url, weight) tuples.
+        """
+        now = time.monotonic()
+
+        available = [
+            candidate
+            for candidate in candidates
+            if self.get_endpoint(candidate[1]).is_available(now)
+        ]
+        if not available:
+            # Fail open, starting with the endpoint that has been down longest
+            available = sorted(
+                candidates,
+                key=lambda candidate: self.get_endpoint(candidate[1]).opened_until,
+            )
+            return [url_idx for url_idx, _, _ in available[:max_attempts]]
+
+        # Weighted random order without replacement
+        weighted = sorted(
+            [candidate for candidate in available if candidate[2] > 0],
+            key=lambda candidate: random.random() ** (1 / candidate[2]),
+            reverse=True,
+        )
+        fallbacks = [candidate for candidate in available if candidate[2] <= 0]
+
+        return [url_idx for url_idx, _, _ in (weighted + fallbacks)[:max_attempts]]
+
+    def start(self, url: str) -> float:
+        endpoint = self.get_endpoint(url)
+        if endpoint.state == "open" and time.monotonic() >= endpoint.opened_until:
+            endpoint.state = "half_open"
+        if endpoint.state == "half_open":
+            endpoint.trial_in_flight = True
+
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+        return time.monotonic()
+
+    def succeeded(self, url: str, started_at: float):
+        """Record a usable response, timed to its headers."""
+        endpoint = self.get_endpoint(url)
+
+        latency = time.monotonic() - started_at
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency = (
+                LATENCY_EWMA_ALPHA * latency
+                + (1 - LATENCY_EWMA_ALPHA) * endpoint.latency
+            )
+
+        if endpoint.state != "closed":
+            log.info(f"Closing circuit for {url}")
+        endpoint.state = "closed"
+        endpoint.consecutive_failures = 0
+        endpoint.trial_in_flight = False
+
+    def failed(self, url: str, error: str):
+        endpoint = self.get_endpoint(url)
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        endpoint.last_error = error
+        endpoint.trial_in_flight = False
+
+        if (
+            endpoint.state == "half_open"
+            or endpoint.consecutive_failures >= self.failure_threshold
+        ):
+            if endpoint.state != "open":
+                log.warning(
+                    f"Opening circuit for {url} for {self.cooldown}s after "
+                    f"{endpoint.consecutive_failures} consecutive failures ({error})"
+                )
+            endpoint.state = "open"
+            endpoint.opened_until = time.monotonic() + self.cooldown
+
+    def finish(self, url: str):
+        endpoint = self.get_endpoint(url)
+        endpoint.in_flight = max(0, endpoint.in_flight - 1)
+
+    def get_stats(self, urls: list[str]) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"url_idx": url_idx, **self.get_endpoint(url).get_stats(now)}
+            for url_idx, url in enumerate(urls)
+        ]
+
+
+_openai_router: Optional[OpenAIRouter] = None
+
+
+def get_openai_router() -> OpenAIRouter:
+    global _openai_router
+
+    if _openai_router is None:
+        _openai_router = OpenAIRouter()
+    return _openai_router
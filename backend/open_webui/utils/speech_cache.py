@@ -0,0 +1,156 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from open_webui.config import (
+    AUDIO_TTS_CACHE_MAX_AGE,
+    AUDIO_TTS_CACHE_MAX_SIZE,
+    CACHE_DIR,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+
+class SpeechCache:
+    """
+    Synthesised speech on disk, one file per key, bounded in total size and
+    in how long a file may go unused.
+
+    The least recently used files are removed first. A file's mtime is
+    updated whenever it is used, so that order survives restarts. The most
+    recently used file is always kept, as it is about to be served.
+    """
+
+    def __init__(
+        self,
+        directory: Path = CACHE_DIR / "audio" / "speech",
+        max_size: int = AUDIO_TTS_CACHE_MAX_SIZE * 1024 * 1024,
+        max_age: int = AUDIO_TTS_CACHE_MAX_AGE,
+    ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.max_age = max_age
+
+        # file name -> (size, last used), least recently used first
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        with os.scandir(self.directory) as it:
+            files = [
+                (entry.name, entry.stat())
+                for entry in it
+                if entry.is_file() and not entry.name.startswith(".")
+            ]
+
+        with self._lock:
+            for name, stat in sorted(files, key=lambda file: file[1].st_mtime):
+                self._entries[name] = (stat.st_size, stat.st_mtime)
+                self._size += stat.st_size
+            self._evict()
+
+    def get(self, name: str) -> Optional[Path]:
+        """The path of ``name`` if it is cached, marking it as used."""
+        path = self.directory / name
+        with self._lock:
+            self._evict()
+
+            entry = self._entries.get(name)
+            if entry is None or not path.is_file():
+                self.misses += 1
+                return None
+
+            now = time.time()
+            self._entries[name] = (entry[0], now)
+            self._entries.move_to_end(name)
+            self.hits += 1
+
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return path
+
+    def put(self, name: str, data: bytes) -> Path:
+        """Store ``data`` as ``name``, returning its path."""
+        path = self.directory / name
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                self._size -= entry[0]
+            self._entries[name] = (len(data), time.time())
+            self._size += len(data)
+            self._evict()
+
+        return path
+
+    def _evict(self):
+        expire_before = time.time() - self.max_age if self.max_age > 0 else None
+
+        while len(self._entries) > 1:
+            name, (size, used_at) = next(iter(self._entries.items()))
+            if self._size <= self.max_size and (
+                expire_before is None or used_at >= expire_before
+            ):
+                break
+
+            del self._entries[name]
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.remove(self.directory / name)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning(f"Failed to remove cached speech {name}: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "max_size": self.max_size,
+                "max_age": self.max_age,
+                "size": self._size,
+                "files": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0,
+                "evictions": self.evictions,
+            }
+
+
+_speech_cache: Optional[SpeechCache] = None
+
+
+def get_speech_cache() -> SpeechCache:
+    global _speech_cache
+
+    if _speech_cache is None:
+        _speech_cache = SpeechCache()
+    return _speech_cache
@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from open_webui.config import WHISPER_QUEUE_SIZE, WHISPER_REPLICAS
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+
+
+class WhisperQueueFullError(Exception):
+    pass
+
+
+class WhisperJob:
+    def __init__(self, fn: Callable[[], tuple[str, Any]], user_id: str):
+        self.fn = fn
+        self.user_id = user_id
+        self.future: Future = Future()
+        self.queued_at = time.monotonic()
+
+
+class WhisperPool:
+    """
+    Runs local faster-whisper transcriptions on a fixed number of worker
+    threads, one per model replica, so concurrent uploads wait their turn
+    instead of oversubscribing the CPU.
+
+    Waiting jobs are taken from each user in turn, so a long recording split
+    into many chunks doesn't hold up everyone else. Once ``max_queue_size``
+    jobs are waiting, new ones are refused.
+    """
+
+    def __init__(
+        self,
+        workers: int = WHISPER_REPLICAS,
+        max_queue_size: int = WHISPER_QUEUE_SIZE,
+    ):
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+
+        # user id -> waiting jobs, in the order users get their next turn
+        self._queues: OrderedDict[str, deque[WhisperJob]] = OrderedDict()
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+        self.queue_wait: Optional[float] = None
+        self.max_queue_wait = 0.0
+        self.real_time_factor: Optional[float] = None
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+
+    def transcribe(
+        self, model, file_path: str, user_id: Optional[str] = None, **kwargs
+    ) -> tuple[str, Any]:
+        """
+        Transcribe ``file_path`` with ``model`` on one of the workers, blocking
+        until done. Returns the transcript and faster-whisper's info.
+        """
+
+        def run():
+            segments, info = model.transcribe(file_path, **kwargs)
+            # Segments are decoded lazily, so this is where the work happens
+            return "".join([segment.text for segment in segments]), info
+
+        return self.submit(run, user_id).result()
+
+    def submit(self, fn: Callable[[], tuple[str, Any]], user_id: Optional[str]):
+        job = WhisperJob(fn, user_id or "")
+
+        with self._condition:
+            if self.queued >= self.max_queue_size:
+                self.rejected += 1
+                raise WhisperQueueFullError(
+                    f"Transcription queue is full ({self.queued} waiting), try again later"
+                )
+
+            self._start()
+            self._queues.setdefault(job.user_id, deque()).append(job)
+            self.queued += 1
+            self._condition.notify()
+
+        return job.future
+
+    def _start(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work,
+                name=f"whisper-{len(self._threads)}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self) -> WhisperJob:
+        with self._condition:
+            while not self._queues:
+                self._condition.wait()
+
+            # Round robin: the user served goes to the back of the line
+            user_id, jobs = self._queues.popitem(last=False)
+            job = jobs.popleft()
+            if jobs:
+                self._queues[user_id] = jobs
+
+            self.queued -= 1
+            self.running += 1
+            return job
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if not job.future.set_running_or_notify_cancel():
+                with self._condition:
+                    self.running -= 1
+                continue
+
+            started_at = time.monotonic()
+            try:
+                result = job.fn()
+            except BaseException as e:
+                with self._condition:
+                    self.running -= 1
+                    self.failed += 1
+                job.future.set_exception(e)
+                continue
+
+            self._record(job, started_at, result[1])
+            job.future.set_result(result)
+
+    def _record(self, job: WhisperJob, started_at: float, info):
+        finished_at = time.monotonic()
+        queue_wait = started_at - job.queued_at
+        elapsed = finished_at - started_at
+        duration = getattr(info, "duration", 0) or 0
+
+        with self._condition:
+            self.running -= 1
+            self.completed += 1
+
+            self.queue_wait = (
+                queue_wait
+                if self.queue_wait is None
+                else EWMA_ALPHA * queue_wait + (1 - EWMA_ALPHA) * self.queue_wait
+            )
+            self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+
+            if duration > 0:
+                rtf = elapsed / duration
+                self.real_time_factor = (
+                    rtf
+                    if self.real_time_factor is None
+                    else EWMA_ALPHA * rtf + (1 - EWMA_ALPHA) * self.real_time_factor
+                )
+                self.audio_seconds += duration
+                self.processing_seconds += elapsed
+
+        log.info(
+            f"Transcribed {duration:.1f}s of audio in {elapsed:.1f}s "
+            f"(RTF {elapsed / duration if duration > 0 else 0:.2f}) "
+            f"after waiting {queue_wait:.1f}s"
+        )
+
+    def get_stats(self) -> dict:
+        with self._condition:
+            return {
+                "workers": self.workers,
+                "max_queue_size": self.max_queue_size,
+                "queued": self.queued,
+                "running": self.running,
+                "users_waiting": len(self._queues),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "queue_wait": (
+                    round(self.queue_wait, 3) if self.queue_wait is not None else None
+                ),
+                "max_queue_wait": round(self.max_queue_wait, 3),
+                "real_time_factor": (
+                    round(self.real_time_factor, 3)
+                    if self.real_time_factor is not None
+                    else None
+                ),
+                "audio_seconds": round(self.audio_seconds, 1),
+                "processing_seconds": round(self.processing_seconds, 1),
+            }
+
+
+_whisper_pool: Optional[WhisperPool] = None
+
+
+def get_whisper_pool() -> WhisperPool:
+    global _whisper_pool
+
+    if _whisper_pool is None:
+        _whisper_pool = WhisperPool()
+    return _whisper_pool